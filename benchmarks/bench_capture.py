@@ -0,0 +1,63 @@
+"""Benchmark quick-capture latency against data file size.
+
+Compares ``NoteService.create_note`` (load, append, rewrite the whole file)
+with ``NoteService.capture_note`` (one spool file) for data files of
+increasing size, and reports the mean time per note.
+
+Usage:
+    PYTHONPATH=src python benchmarks/bench_capture.py [--captures 50] [--dir PATH]
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from pkm.services.note_service import NoteService
+from pkm.storage.json_store import JSONStore
+from pkm.storage.schema import create_empty_schema
+
+SIZES = (100, 1_000, 10_000, 50_000)
+
+
+def seed(data_dir: Path, notes: int) -> None:
+    """Write a data file with ``notes`` notes."""
+    data = create_empty_schema()
+    data["notes"] = [
+        {"id": f"n{i}", "content": f"Lecture notes {i} " + "lorem ipsum " * 20, "topics": []}
+        for i in range(1, notes + 1)
+    ]
+    JSONStore(data_dir / "data.json")._write(data, sync=True)
+
+
+def time_per_note(method: str, notes: int, captures: int, base: str | None) -> float:
+    """Time adding ``captures`` notes one by one; returns ms per note."""
+    with tempfile.TemporaryDirectory(dir=base) as tmp:
+        data_dir = Path(tmp)
+        seed(data_dir, notes)
+        # The first capture seeds the spool's ID watermark from the data file
+        getattr(NoteService(data_dir), method)("warm-up")
+
+        start = time.perf_counter()
+        for i in range(captures):
+            # A fresh service per note, like separate `pkm add note` runs
+            getattr(NoteService(data_dir), method)(f"quick capture {i}")
+        elapsed = time.perf_counter() - start
+    return elapsed / captures * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--captures", type=int, default=50, help="Notes to add per run")
+    parser.add_argument("--dir", default=None, help="Directory to benchmark in")
+    args = parser.parse_args()
+
+    print(f"{'notes in file':>14} {'create_note':>12} {'capture_note':>13}")
+    for notes in SIZES:
+        create = time_per_note("create_note", notes, args.captures, args.dir)
+        capture = time_per_note("capture_note", notes, args.captures, args.dir)
+        print(f"{notes:>14,} {create:>10.2f}ms {capture:>11.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Benchmark near-duplicate detection on a large collection.
+
+Generates notes of which one in ten is an edited copy of another and
+reports the time to sign every note (once, on first use), to build the band
+tables from stored signatures, to check one new note, and to find every
+cluster. The pairwise comparison that the band tables avoid is estimated
+from a sample.
+
+Usage:
+    PYTHONPATH=src python benchmarks/bench_dedupe.py [--notes 50000]
+"""
+
+import argparse
+import random
+import time
+
+from pkm.services.near_duplicates import (
+    THRESHOLD,
+    DuplicateIndex,
+    ensure_signatures,
+    jaccard,
+    shingles,
+)
+from pkm.storage.schema import create_empty_schema
+
+_rng = random.Random(42)
+WORDS = [
+    "".join(_rng.choices("abcdefghijklmnopqrstuvwxyz", k=_rng.randint(2, 9))) for _ in range(5000)
+]
+
+
+def generate(notes: int) -> dict:
+    """Build data with ``notes`` notes, one in ten a copy with a word changed."""
+    rng = random.Random(0)
+    data = create_empty_schema()
+    data["notes"] = []
+    for i in range(1, notes + 1):
+        if i > 1 and i % 10 == 0:
+            words = rng.choice(data["notes"])["content"].split()
+            words[rng.randrange(len(words))] = rng.choice(WORDS)
+        else:
+            words = rng.choices(WORDS, k=30)
+        data["notes"].append({"id": f"n{i}", "content": " ".join(words), "topics": []})
+    return data
+
+
+def timed(label: str, action):  # type: ignore[no-untyped-def]
+    """Run ``action`` once and print how long it took."""
+    start = time.perf_counter()
+    result = action()
+    print(f"{label:>24} {(time.perf_counter() - start) * 1000:>9.1f}ms")
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--notes", type=int, default=50_000, help="Notes to generate")
+    args = parser.parse_args()
+
+    data = generate(args.notes)
+    timed("sign all notes", lambda: ensure_signatures(data))  # type: ignore[arg-type]
+    index = timed("build band tables", lambda: DuplicateIndex(data))  # type: ignore[arg-type]
+    new = data["notes"][0]["content"] + " extra"
+    timed("check one note", lambda: index.matches(new))
+    clusters = timed("find all clusters", index.clusters)
+    print(f"{len(clusters)} clusters of {sum(len(c) for c in clusters)} notes")
+
+    sample = [shingles(n["content"]) for n in data["notes"][:300]]
+    start = time.perf_counter()
+    for i, a in enumerate(sample):
+        for b in sample[i + 1 :]:
+            jaccard(a, b) >= THRESHOLD  # noqa: B015
+    per_pair = (time.perf_counter() - start) / (len(sample) * (len(sample) - 1) / 2)
+    pairs = args.notes * (args.notes - 1) / 2
+    print(f"{'pairwise (estimated)':>24} {per_pair * pairs * 1000:>9.0f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Benchmark streaming schema migration on a large v1 data file.
+
+Generates a schema v1 ``data.json`` of roughly the requested size, migrates
+it with ``migrate_file`` and reports wall time and peak Python heap usage.
+Peak memory should stay flat as the file grows.
+
+Usage:
+    PYTHONPATH=src python benchmarks/bench_migration.py [--size-mb 100]
+"""
+
+import argparse
+import json
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from pkm.storage.migrations import migrate_file
+
+COURSES = [f"Course {i:03d}" for i in range(50)]
+
+
+def write_v1_file(path: Path, size_mb: int) -> int:
+    """Write a v1 data file of about ``size_mb`` megabytes.
+
+    Returns:
+        Number of records written
+    """
+    target = size_mb * 1024 * 1024
+    written = 0
+    count = 0
+    with open(path, "w", encoding="utf-8") as f:
+        f.write('{\n  "notes": [')
+        while written < target:
+            record = {
+                "id": f"n_20250101_{count:08d}",
+                "content": f"Lecture notes {count} " + "lorem ipsum dolor " * 20,
+                "course": COURSES[count % len(COURSES)],
+                "topics": ["review"],
+                "created_at": "2025-01-01T10:00:00",
+                "modified_at": "2025-01-01T10:00:00",
+                "linked_from_tasks": [],
+            }
+            text = ("," if count else "") + "\n    " + json.dumps(record)
+            f.write(text)
+            written += len(text)
+            count += 1
+        f.write('\n  ],\n  "tasks": [],\n  "courses": []\n}\n')
+    return count
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size-mb", type=int, default=100)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "data.json"
+        records = write_v1_file(path, args.size_mb)
+        size = path.stat().st_size
+        print(f"Generated {size / 1e6:.1f} MB v1 file with {records:,} records")
+
+        tracemalloc.start()
+        start = time.perf_counter()
+        report = migrate_file(path)
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        print(f"Migrated v{report.from_version} -> v{report.to_version} "
+              f"({sum(report.records.values()):,} records) in {elapsed:.1f}s")
+        print(f"Peak traced memory: {peak / 1e6:.2f} MB "
+              f"({peak / size:.2%} of file size)")
+
+
+if __name__ == "__main__":
+    main()
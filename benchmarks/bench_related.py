@@ -0,0 +1,68 @@
+"""Benchmark related-note lookups on a large collection.
+
+Builds ``TfidfVectors`` over generated notes once and reports the mean time
+to find the top 5 neighbours of a note, with NumPy (if installed) and with
+the pure-Python fallback. Building the vectors is timed separately, since
+it happens once per command.
+
+Usage:
+    PYTHONPATH=src python benchmarks/bench_related.py [--notes 50000] [--runs 50]
+"""
+
+import argparse
+import random
+import time
+
+from pkm.services import similarity
+from pkm.services.term_stats import rebuild_term_stats
+from pkm.storage.schema import create_empty_schema
+
+SUBJECTS = [
+    [f"{stem}{i}" for i in range(300)]
+    for stem in ("cell", "treaty", "enzyme", "poem", "matrix", "market", "orbit", "verb")
+]
+COMMON = "lecture notes chapter review summary exam week reading".split()
+
+
+def generate(notes: int) -> dict:
+    """Build data with ``notes`` notes, each mostly about one subject."""
+    rng = random.Random(0)
+    data = create_empty_schema()
+    data["notes"] = []
+    for i in range(1, notes + 1):
+        words = rng.choices(rng.choice(SUBJECTS), k=25) + rng.choices(COMMON, k=10)
+        data["notes"].append({"id": f"n{i}", "content": " ".join(words), "topics": []})
+    return data
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--notes", type=int, default=50_000, help="Notes to generate")
+    parser.add_argument("--runs", type=int, default=50, help="Lookups per mode")
+    args = parser.parse_args()
+
+    data = generate(args.notes)
+    rebuild_term_stats(data)  # type: ignore[arg-type]
+    numpy = similarity.np
+    modes = [("numpy", numpy), ("pure python", None)]
+    if numpy is None:
+        modes = modes[1:]
+
+    print(f"{'mode':>12} {'build':>9} {'top 5':>9}")
+    for name, module in modes:
+        similarity.np = module
+        start = time.perf_counter()
+        vectors = similarity.TfidfVectors(data)  # type: ignore[arg-type]
+        build = (time.perf_counter() - start) * 1000
+
+        ids = random.Random(1).sample(vectors.ids, args.runs)
+        start = time.perf_counter()
+        for note_id in ids:
+            vectors.neighbours(note_id)
+        lookup = (time.perf_counter() - start) / args.runs * 1000
+        print(f"{name:>12} {build:>7.0f}ms {lookup:>7.2f}ms")
+    similarity.np = numpy
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Benchmark phrase, prefix and substring queries on a large collection.
+
+Builds the in-memory ``RecordIndex`` over generated notes once, then reports
+the mean time to answer each kind of text query from it ("planner"). The
+"search" column is what ``pkm search`` pays end to end: a fresh
+``SearchService`` loads the data file and the search.index sidecar, runs
+the query, hydrates the matches and highlights the 20 notes shown.
+
+Usage:
+    PYTHONPATH=src python benchmarks/bench_search.py [--notes 50000] [--runs 20]
+"""
+
+import argparse
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from pkm.services.query import parse_query
+from pkm.services.query_index import RecordIndex
+from pkm.services.query_service import Planner
+from pkm.services.search_service import SearchService
+from pkm.storage.json_store import JSONStore
+from pkm.storage.schema import create_empty_schema
+
+VOCABULARY = (
+    "light reaction dark cycle calvin photosynthesis photon photograph chlorophyll "
+    "membrane cell wall enzyme protein glucose energy carbon oxygen water plant "
+    "leaf root stem lecture chapter exam review summary treaty empire war"
+).split()
+
+QUERIES = {
+    "phrase": '"light reaction"',
+    "prefix": "photo*",
+    "substring": "synth",
+    "phrase + prefix": '"calvin cycle" chloro*',
+}
+
+
+def generate(notes: int) -> dict:
+    """Build data with ``notes`` notes of random words."""
+    rng = random.Random(0)
+    data = create_empty_schema()
+    data["notes"] = [
+        {
+            "id": f"n{i}",
+            "content": " ".join(rng.choices(VOCABULARY, k=40)),
+            "topics": [],
+            "created_at": "2025-11-01T10:00:00",
+            "modified_at": "2025-11-01T10:00:00",
+        }
+        for i in range(1, notes + 1)
+    ]
+    return data
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--notes", type=int, default=50_000, help="Notes to generate")
+    parser.add_argument("--runs", type=int, default=20, help="Runs per query")
+    args = parser.parse_args()
+
+    data = generate(args.notes)
+    start = time.perf_counter()
+    index = RecordIndex(data)  # type: ignore[arg-type]
+    print(f"index build: {(time.perf_counter() - start) * 1000:.0f}ms for {args.notes:,} notes")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = Path(tmp)
+        # Written like any commit, with the search.index sidecar beside it
+        JSONStore(data_dir / "data.json").save(data)  # type: ignore[arg-type]
+
+        print(f"{'query':>16} {'matches':>8} {'planner':>9} {'search':>9}")
+        for name, query in QUERIES.items():
+            node = parse_query(query)
+            start = time.perf_counter()
+            for _ in range(args.runs):
+                # A fresh planner per run, so no estimates are cached
+                found = Planner(index).run(node)
+            planner = (time.perf_counter() - start) / args.runs * 1000
+
+            start = time.perf_counter()
+            for _ in range(args.runs):
+                result = SearchService(data_dir).search_result(query)
+                for note in result.notes[:20]:
+                    result.highlights.get(note.id)
+            search = (time.perf_counter() - start) / args.runs * 1000
+            print(f"{name:>16} {len(found):>8,} {planner:>7.1f}ms {search:>7.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
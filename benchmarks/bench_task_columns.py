@@ -0,0 +1,92 @@
+"""Benchmark task filtering on the columnar cache against record filters.
+
+Generates tasks, writes them with their ``tasks.columns`` sidecar, and
+reports the time to find the tasks due this week: with a predicate over
+parsed records, and with the columns (read from the sidecar) using
+NumPy masks (if installed) and array loops.
+
+Usage:
+    PYTHONPATH=src python benchmarks/bench_task_columns.py [--tasks 50000] [--runs 20]
+"""
+
+import argparse
+import json
+import random
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+from pkm.storage import task_columns
+from pkm.storage.schema import create_empty_schema
+
+
+def generate(tasks: int) -> dict:
+    """Build data with ``tasks`` tasks due around today."""
+    rng = random.Random(0)
+    today = date.today()
+    data = create_empty_schema()
+    for i in range(1, tasks + 1):
+        due = today + timedelta(days=rng.randint(-60, 60), hours=rng.randint(0, 23))
+        data["tasks"].append(
+            {
+                "id": f"t{i}",
+                "title": f"Task {i}",
+                "created_at": "2025-01-01T09:00:00",
+                "due_date": due.isoformat(),
+                "priority": rng.choice(["high", "medium", "low"]),
+                "completed": rng.random() < 0.5,
+                "course_id": rng.choice([None, "c1", "c2", "c3"]),
+            }
+        )
+    return data
+
+
+def timed(label: str, runs: int, action) -> None:  # type: ignore[no-untyped-def]
+    """Print the mean time of ``runs`` calls of ``action``."""
+    start = time.perf_counter()
+    for _ in range(runs):
+        found = action()
+    mean = (time.perf_counter() - start) / runs * 1000
+    print(f"{label:>24} {mean:>8.2f}ms  ({len(found)} tasks)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tasks", type=int, default=50_000, help="Tasks to generate")
+    parser.add_argument("--runs", type=int, default=20, help="Runs per measurement")
+    args = parser.parse_args()
+
+    data = generate(args.tasks)
+    today = date.today()
+    end = today + timedelta(days=7)
+
+    def due_this_week(task: dict) -> bool:
+        due = datetime.fromisoformat(task["due_date"]).date()
+        return not task["completed"] and today <= due <= end
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data_file = Path(tmp) / "data.json"
+        data_file.write_text(json.dumps(data))
+        task_columns.write_task_columns(data_file, data)
+
+        timed("record filter", args.runs, lambda: [t for t in data["tasks"] if due_this_week(t)])
+        timed("read sidecar", args.runs, lambda: task_columns.read_task_columns(data_file).ids)
+        columns = task_columns.read_task_columns(data_file)
+        assert columns is not None
+
+        def select() -> list[int]:
+            return columns.select(
+                open_only=True, due_from=today, due_before=today + timedelta(days=8)
+            )
+
+        numpy = task_columns.np
+        if numpy is not None:
+            timed("columns (numpy)", args.runs, select)
+        task_columns.np = None
+        timed("columns (array)", args.runs, select)
+        task_columns.np = numpy
+
+
+if __name__ == "__main__":
+    main()
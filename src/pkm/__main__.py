@@ -1,6 +1,6 @@
 """Entry point for running pkm as a module: python -m pkm"""
 
-from pkm.cli.main import cli
+from pkm.cli.entry import main
 
 if __name__ == "__main__":
-    cli()
+    main()
@@ -4,11 +4,12 @@ from pathlib import Path
 
 import click
 
-from pkm.cli.helpers import error, info, success
+from pkm.cli.helpers import error, info, success, truncate, warning
 from pkm.cli.main import cli
+from pkm.models.task import Recurrence
 from pkm.services.note_service import NoteService
 from pkm.services.task_service import TaskService
-from pkm.utils.date_parser import format_due_date, parse_due_date
+from pkm.utils.date_parser import format_due_date, parse_due_date, parse_recurrence
 
 
 def get_data_dir(ctx: click.Context) -> Path:
@@ -51,8 +52,20 @@ def add() -> None:
 @click.argument("content", required=True)
 @click.option("--course", "-c", help="Assign to course (leaves inbox if omitted)")
 @click.option("--topics", "-t", multiple=True, help="Add topic tags (can use multiple times)")
+@click.option(
+    "--duplicates",
+    type=click.Choice(["warn", "merge"]),
+    default=None,
+    help="Check for near-duplicate notes first: warn, or merge into the closest",
+)
 @click.pass_context
-def add_note(ctx: click.Context, content: str, course: str | None, topics: tuple[str, ...]) -> None:
+def add_note(
+    ctx: click.Context,
+    content: str,
+    course: str | None,
+    topics: tuple[str, ...],
+    duplicates: str | None,
+) -> None:
     """Add a new note to your inbox or directly to a course.
 
     \b
@@ -62,6 +75,9 @@ def add_note(ctx: click.Context, content: str, course: str | None, topics: tuple
     Options:
       -c, --course TEXT    Assign to a course (e.g., "Biology 101")
       -t, --topics TEXT    Add topic tags (use multiple times for multiple topics)
+      --duplicates MODE    Check for near-duplicates first: "warn" (add anyway)
+                           or "merge" (add the course and topics to the
+                           closest existing note instead)
 
     \b
     Examples:
@@ -83,13 +99,36 @@ def add_note(ctx: click.Context, content: str, course: str | None, topics: tuple
       - Calvin cycle in stroma
       - Produces glucose"
 
+      # Pasted snippet, folded into an earlier copy if there is one
+      pkm add note "Mitochondria are the powerhouse of the cell" --duplicates merge
+
     Notes without a course are stored in your inbox for later organization.
+    New notes go to a capture spool and are merged into your data by the
+    next command that reads it, so adding takes the same time however much
+    data you have. Checking for duplicates reads your notes first (see
+    "pkm dedupe").
     """
     try:
         data_dir = get_data_dir(ctx)
         service = NoteService(data_dir)
 
-        note = service.create_note(
+        if duplicates is not None:
+            matches = service.find_near_duplicates(content)
+            if matches and duplicates == "merge":
+                closest, similarity = matches[0]
+                note = service.create_note(
+                    content, course, list(topics) if topics else None, merge_duplicates=True
+                )
+                warning(f"Near-duplicate of {closest.id} ({similarity:.0%} similar)")
+                success(f"Merged into existing note: {note.id}")
+                return
+            for match, similarity in matches:
+                warning(
+                    f"Near-duplicate of {match.id} ({similarity:.0%} similar): "
+                    f"{truncate(match.content, 50)}"
+                )
+
+        note = service.capture_note(
             content=content,
             course=course,
             topics=list(topics) if topics else None,
@@ -106,13 +145,52 @@ def add_note(ctx: click.Context, content: str, course: str | None, topics: tuple
         ctx.exit(1)
 
 
+def parse_repeat_options(repeat: str | None, until: str | None) -> Recurrence | None:
+    """Parse the --repeat and --until options of ``pkm add task``.
+
+    Args:
+        repeat: Repeat rule (e.g., "every fri")
+        until: Last day to repeat until
+
+    Returns:
+        Recurrence, or None if the task does not repeat
+
+    Raises:
+        ValueError: If an option is not understood
+    """
+    if not repeat:
+        if until:
+            raise ValueError("--until needs --repeat")
+        return None
+    until_date = parse_due_date(until) if until else None
+    if until and until_date is None:
+        raise ValueError(f"Could not parse end date: '{until}'")
+    recurrence = parse_recurrence(repeat, until_date.date() if until_date else None)
+    if recurrence is None:
+        raise ValueError(
+            f"Could not parse repeat rule: '{repeat}' "
+            "(try 'weekly', 'every 3 days', 'every mon, wed' or 'every weekday')"
+        )
+    return recurrence
+
+
 @add.command(name="task")
 @click.argument("title", required=True)
 @click.option("--due", "-d", help="Due date (e.g., 'tomorrow', 'next Friday', '2025-12-01', 'Friday 11:59pm')")
 @click.option("--priority", "-p", type=click.Choice(["high", "medium", "low"]), default="medium", help="Task priority: high, medium (default), or low")
 @click.option("--course", "-c", help="Assign to course (leaves inbox if omitted)")
+@click.option("--repeat", "-r", help="Repeat the due date (e.g., 'weekly', 'every mon, wed')")
+@click.option("--until", help="Last day of a repeating task (with --repeat)")
 @click.pass_context
-def add_task(ctx: click.Context, title: str, due: str | None, priority: str, course: str | None) -> None:
+def add_task(
+    ctx: click.Context,
+    title: str,
+    due: str | None,
+    priority: str,
+    course: str | None,
+    repeat: str | None,
+    until: str | None,
+) -> None:
     """Add a new task to your inbox or directly to a course.
 
     \b
@@ -123,6 +201,8 @@ def add_task(ctx: click.Context, title: str, due: str | None, priority: str, cou
       -d, --due TEXT         Due date (natural language or YYYY-MM-DD)
       -p, --priority TEXT    Priority level: high, medium, low (default: medium)
       -c, --course TEXT      Assign to a course (e.g., "Math 201")
+      -r, --repeat TEXT      Repeat the due date (e.g., "weekly", "every fri")
+      --until TEXT           Last day to repeat until
 
     \b
     Examples:
@@ -140,6 +220,9 @@ def add_task(ctx: click.Context, title: str, due: str | None, priority: str, cou
       # Task with course
       pkm add task "Complete problem set 5" --course "Math 201"
 
+      # Weekly problem set, due every Friday until the end of term
+      pkm add task "Problem set" --repeat "every fri 5pm" --until "Dec 12"
+
       # Combine options
       pkm add task "Finish research paper" \\
         --due "next Friday" \\
@@ -158,7 +241,15 @@ def add_task(ctx: click.Context, title: str, due: str | None, priority: str, cou
       ISO:     "2025-12-01"
       Human:   "Dec 1", "Friday 11:59pm"
 
+    \b
+    Repeat Rules:
+      "daily", "weekly", "biweekly", "every 3 days", "every 2 weeks",
+      "every mon, wed", "every weekday", "every week on tue and thu"
+    Only the next occurrence is stored; views list the occurrences they
+    cover, and completing one moves the task on to the next.
+
     Tasks without a course are stored in your inbox for later organization.
+    Like notes, new tasks are captured instantly and merged on next read.
     """
     try:
         data_dir = get_data_dir(ctx)
@@ -173,18 +264,29 @@ def add_task(ctx: click.Context, title: str, due: str | None, priority: str, cou
                 info("Try formats like: 'tomorrow', 'next Friday', '2025-12-01', 'Friday 11:59pm'")
                 ctx.exit(1)
 
-        task = service.create_task(
+        # Parse repeat rule
+        try:
+            recurrence = parse_repeat_options(repeat, until)
+        except ValueError as e:
+            error(str(e))
+            ctx.exit(1)
+
+        task = service.capture_task(
             title=title,
             due_date=due_date,
             priority=priority,
             course=course,
+            recurrence=recurrence,
         )
 
         location = f"course '{course}'" if course else "inbox"
         success(f"Task created: {task.id} in {location}")
 
-        if due_date:
-            success(f"Due: {format_due_date(due_date)}")
+        if task.due_date:
+            success(f"Due: {format_due_date(task.due_date)}")
+
+        if task.recurrence:
+            success(f"Repeats {task.recurrence.describe()}")
 
         if priority != "medium":
             success(f"Priority: {priority}")
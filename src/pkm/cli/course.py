@@ -0,0 +1,105 @@
+"""Course management commands."""
+
+
+import click
+
+from pkm.cli.add import get_data_dir
+from pkm.cli.helpers import error, info, success
+from pkm.cli.main import cli
+from pkm.services.course_service import CourseService
+
+
+@cli.group()
+def course() -> None:
+    """Manage courses (rename, merge).
+
+    \b
+    Commands:
+      pkm course rename OLD NEW       - Rename a course
+      pkm course merge SOURCE TARGET  - Merge one course into another
+
+    \b
+    Examples:
+      pkm course rename "Bio 101" "Biology 101"
+      pkm course merge "Bio" "Biology 101"
+
+    Notes and tasks refer to courses by ID, so both commands are instant
+    no matter how many items a course has.
+    """
+    pass
+
+
+@course.command(name="rename")
+@click.argument("old_name", required=True)
+@click.argument("new_name", required=True)
+@click.pass_context
+def rename_course(ctx: click.Context, old_name: str, new_name: str) -> None:
+    """Rename a course.
+
+    \b
+    OLD_NAME: Current course name
+    NEW_NAME: New course name
+
+    \b
+    Examples:
+      pkm course rename "Bio 101" "Biology 101"
+
+    All notes and tasks in the course show the new name immediately.
+    """
+    try:
+        data_dir = get_data_dir(ctx)
+        service = CourseService(data_dir)
+
+        renamed = service.rename_course(old_name, new_name)
+        if renamed is None:
+            error(f"Course not found: {old_name}")
+            info("Use 'pkm view courses' to see course names")
+            ctx.exit(1)
+
+        success(f"Course renamed: '{old_name}' → '{new_name}'")
+
+    except ValueError as e:
+        error(str(e))
+        ctx.exit(1)
+    except Exception as e:
+        error(f"Failed to rename course: {e}")
+        ctx.exit(1)
+
+
+@course.command(name="merge")
+@click.argument("source", required=True)
+@click.argument("target", required=True)
+@click.pass_context
+def merge_courses(ctx: click.Context, source: str, target: str) -> None:
+    """Merge one course into another.
+
+    \b
+    SOURCE: Course to merge away
+    TARGET: Course that receives its notes and tasks
+
+    \b
+    Examples:
+      # Combine a duplicate course created by a typo
+      pkm course merge "Bio" "Biology 101"
+
+    After merging, SOURCE no longer appears in 'pkm view courses'.
+    """
+    try:
+        data_dir = get_data_dir(ctx)
+        service = CourseService(data_dir)
+
+        merged = service.merge_courses(source, target)
+        if merged is None:
+            error(f"Course not found: '{source}' or '{target}'")
+            info("Use 'pkm view courses' to see course names")
+            ctx.exit(1)
+
+        success(f"Merged '{source}' into '{target}'")
+        info(f"'{target}' now has {merged.note_count} notes, {merged.task_count} tasks")
+
+    except ValueError as e:
+        error(str(e))
+        ctx.exit(1)
+    except Exception as e:
+        error(f"Failed to merge courses: {e}")
+        ctx.exit(1)
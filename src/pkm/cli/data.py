@@ -0,0 +1,307 @@
+"""Data file maintenance commands."""
+
+
+from datetime import datetime, timedelta
+
+import click
+from rich.console import Console
+
+from pkm.cli.add import get_data_dir
+from pkm.cli.helpers import create_table, error, info, success, warning
+from pkm.cli.main import cli
+from pkm.services.maintenance_service import MaintenanceService
+from pkm.storage.json_store import JSONStore
+from pkm.storage.migrations import migrate_file
+from pkm.storage.recovery import RecoveryReport
+
+
+@cli.group()
+def data() -> None:
+    """Maintain the data file.
+
+    \b
+    Commands:
+      pkm data migrate             - Upgrade data.json to the current schema
+      pkm data migrate --dry-run   - Show what would change without writing
+      pkm data recover             - Salvage a damaged data file
+      pkm data recover --dry-run   - Report damage without writing
+      pkm data fsck                - Check data file integrity
+      pkm data export FILE         - Export notes and tasks as JSON Lines
+      pkm data archive             - Move old completed tasks to archive.jsonl
+
+    \b
+    Examples:
+      pkm data migrate --dry-run
+      pkm data fsck
+      pkm data export backup.jsonl --type notes
+      pkm data archive --days 180 --dry-run
+
+    Every command here streams data.json one record at a time, so they
+    work on very large files without loading them into memory.
+    """
+    pass
+
+
+@data.command(name="migrate")
+@click.option("--dry-run", is_flag=True, help="Run the migration without writing")
+@click.pass_context
+def migrate(ctx: click.Context, dry_run: bool) -> None:
+    """Upgrade the data file to the current schema version.
+
+    Records are converted one at a time into a new file, so even very
+    large data files migrate in constant memory. The original file is
+    kept as data.json.bak.
+
+    \b
+    Options:
+      --dry-run    Convert every record but leave the file untouched
+
+    \b
+    Examples:
+      pkm data migrate --dry-run
+      pkm data migrate
+    """
+    try:
+        data_file = get_data_dir(ctx) / "data.json"
+        JSONStore(data_file).drain()
+        if not data_file.exists():
+            info("No data file yet - nothing to migrate")
+            return
+
+        def progress(section: str, done: int) -> None:
+            info(f"{section}: {done:,} record(s) migrated")
+
+        report = migrate_file(data_file, dry_run=dry_run, progress=progress)
+
+        if not report.steps:
+            success(f"Data is already at schema v{report.to_version}")
+            return
+
+        for step in report.steps:
+            info(step)
+        total = sum(report.records.values())
+        if dry_run:
+            success(
+                f"Dry run: {total:,} record(s) would migrate "
+                f"from v{report.from_version} to v{report.to_version}"
+            )
+        else:
+            success(
+                f"Migrated {total:,} record(s) "
+                f"from v{report.from_version} to v{report.to_version}"
+            )
+            info("Previous version saved as data.json.bak")
+
+    except Exception as e:
+        error(f"Migration failed: {e}")
+        ctx.exit(1)
+
+
+def show_recovery(report: RecoveryReport) -> None:
+    """Print what a recovery kept, restored and lost.
+
+    Args:
+        report: Recovery report
+    """
+    table = create_table("Recovery", ["Section", "Intact", "From Backup", "Lost"])
+    for section, salvaged in report.salvaged.items():
+        table.add_row(
+            section.capitalize(),
+            str(salvaged),
+            str(len(report.restored[section])),
+            str(len(report.lost[section])),
+        )
+    Console().print(table)
+
+    for section, ids in report.lost.items():
+        if ids:
+            warning(f"Lost {section}: {', '.join(ids)}")
+    if report.unidentified:
+        warning(f"{report.unidentified} damaged region(s) with unreadable record IDs")
+    if report.lost_sections:
+        info(f"Rebuilt sections: {', '.join(report.lost_sections)}")
+    if report.unknown_courses:
+        warning(
+            f"{len(report.unknown_courses)} course name(s) lost; "
+            "use 'pkm course rename' to restore them"
+        )
+
+
+@data.command(name="recover")
+@click.option("--dry-run", is_flag=True, help="Report damage without writing")
+@click.pass_context
+def recover(ctx: click.Context, dry_run: bool) -> None:
+    """Salvage every intact record from a damaged data file.
+
+    Verifies each note and task against its checksum in one pass over the
+    file. Damaged or missing records are restored from data.json.bak when
+    it has them; anything that cannot be restored is listed.
+
+    \b
+    Options:
+      --dry-run    Show what would be recovered without writing
+
+    \b
+    Examples:
+      pkm data recover --dry-run
+      pkm data recover
+
+    The damaged file is kept as data.json.corrupt and the backup is not
+    overwritten.
+    """
+    try:
+        store = JSONStore(get_data_dir(ctx) / "data.json")
+        store.drain()
+        if not store.data_file.exists():
+            info("No data file yet - nothing to recover")
+            return
+
+        recovered, report = store.salvage()
+        if not report.damaged:
+            total = sum(report.salvaged.values())
+            success(f"Data file is intact ({total:,} record(s) verified)")
+            return
+        if report.empty:
+            error("Nothing could be recovered from the data file or its backup")
+            ctx.exit(1)
+
+        show_recovery(report)
+        if dry_run:
+            info("Dry run: nothing written")
+            return
+
+        store.save_recovered(recovered)
+        success("Recovered data saved")
+        info("Damaged file kept as data.json.corrupt")
+
+    except Exception as e:
+        error(f"Recovery failed: {e}")
+        ctx.exit(1)
+
+
+@data.command(name="fsck")
+@click.pass_context
+def fsck(ctx: click.Context) -> None:
+    """Check the integrity of the data file.
+
+    Reads every note and task once and reports checksum mismatches,
+    duplicate or missing IDs, unknown courses and broken task/note links.
+    Exits with status 1 if anything is wrong.
+
+    \b
+    Examples:
+      pkm data fsck
+    """
+    try:
+        service = MaintenanceService(get_data_dir(ctx))
+        if not service.data_file.exists():
+            info("No data file yet - nothing to check")
+            return
+
+        checked, issues = service.check()
+        if not issues:
+            success(f"No problems found ({checked:,} record(s) checked)")
+            return
+
+        table = create_table(f"Problems ({len(issues)})", ["Section", "Record", "Problem"])
+        for issue in issues:
+            table.add_row(issue.section or "-", issue.record_id or "-", issue.detail)
+        Console().print(table)
+
+        kinds = {issue.kind for issue in issues}
+        if kinds & {"damaged", "checksum", "duplicate_id", "missing_id"}:
+            info("Run 'pkm data recover' to salvage damaged records")
+        if kinds & {"dangling_link", "one_sided_link"}:
+            info("Run 'pkm links check --fix' to repair links")
+        ctx.exit(1)
+
+    except Exception as e:
+        error(f"Check failed: {e}")
+        ctx.exit(1)
+
+
+@data.command(name="export")
+@click.argument("output", type=click.Path(dir_okay=False, writable=True))
+@click.option(
+    "--type",
+    "record_type",
+    type=click.Choice(["notes", "tasks", "all"]),
+    default="all",
+    help="Records to export",
+)
+@click.pass_context
+def export(ctx: click.Context, output: str, record_type: str) -> None:
+    """Export notes and tasks as JSON Lines.
+
+    \b
+    OUTPUT: File to write (one JSON object per line)
+
+    \b
+    Options:
+      --type    notes, tasks or all (default: all)
+
+    \b
+    Examples:
+      pkm data export everything.jsonl
+      pkm data export notes.jsonl --type notes
+
+    Each line has a "type" field ("note" or "task") and the course name.
+    """
+    try:
+        service = MaintenanceService(get_data_dir(ctx))
+        if not service.data_file.exists():
+            info("No data file yet - nothing to export")
+            return
+
+        sections = ("notes", "tasks") if record_type == "all" else (record_type,)
+        with open(output, "w", encoding="utf-8") as out:
+            counts = service.export(out, sections)
+
+        summary = ", ".join(f"{n:,} {section}" for section, n in counts.items())
+        success(f"Exported {summary} to {output}")
+
+    except Exception as e:
+        error(f"Export failed: {e}")
+        ctx.exit(1)
+
+
+@data.command(name="archive")
+@click.option(
+    "--days", type=int, default=90, show_default=True, help="Archive tasks completed this long ago"
+)
+@click.option("--dry-run", is_flag=True, help="Show what would be archived")
+@click.pass_context
+def archive(ctx: click.Context, days: int, dry_run: bool) -> None:
+    """Move long-completed tasks out of the data file.
+
+    Tasks completed more than DAYS days ago are appended to archive.jsonl
+    (next to data.json) and removed from data.json, which keeps everyday
+    commands fast.
+
+    \b
+    Options:
+      --days       Age in days of completed tasks to archive (default: 90)
+      --dry-run    List what would be archived without writing
+
+    \b
+    Examples:
+      pkm data archive
+      pkm data archive --days 30 --dry-run
+    """
+    try:
+        service = MaintenanceService(get_data_dir(ctx))
+        if not service.data_file.exists():
+            info("No data file yet - nothing to archive")
+            return
+
+        archived = service.archive(datetime.now() - timedelta(days=days), dry_run=dry_run)
+        if not archived:
+            info(f"No tasks completed more than {days} day(s) ago")
+        elif dry_run:
+            info(f"Dry run: {len(archived)} task(s) would be archived")
+        else:
+            success(f"Archived {len(archived)} task(s) to {service.archive_file.name}")
+
+    except Exception as e:
+        error(f"Archive failed: {e}")
+        ctx.exit(1)
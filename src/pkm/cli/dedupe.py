@@ -0,0 +1,69 @@
+"""Near-duplicate note command."""
+
+import click
+from rich.console import Console
+
+from pkm.cli.add import get_data_dir
+from pkm.cli.helpers import create_table, error, info, success, truncate
+from pkm.cli.main import cli
+from pkm.services.near_duplicates import THRESHOLD
+from pkm.services.note_service import NoteService
+
+console = Console()
+
+
+@cli.command(name="dedupe")
+@click.option(
+    "--threshold",
+    type=click.FloatRange(0.0, 1.0, min_open=True),
+    default=THRESHOLD,
+    show_default=True,
+    help="Least similarity (0-1) for notes to count as duplicates",
+)
+@click.option("--merge", is_flag=True, help="Merge each cluster into its oldest note")
+@click.pass_context
+def dedupe(ctx: click.Context, threshold: float, merge: bool) -> None:
+    """Find clusters of near-duplicate notes.
+
+    Notes are near-duplicates when most of their text is the same, such as
+    a snippet pasted twice or a copy with small edits. Each note is hashed
+    once and only notes with matching hashes are compared, so this stays
+    fast with many notes.
+
+    \b
+    Options:
+      --threshold    Least similarity from 0 to 1 (default: 0.7)
+      --merge        Keep the oldest note of each cluster; it gains the
+                     topics and task links of the others, which are deleted
+
+    \b
+    Examples:
+      pkm dedupe
+      pkm dedupe --threshold 0.6
+      pkm dedupe --merge
+    """
+    try:
+        service = NoteService(get_data_dir(ctx))
+        clusters = service.duplicate_clusters(threshold)
+        if not clusters:
+            info("No near-duplicate notes found")
+            return
+
+        table = create_table(
+            f"Near-Duplicate Notes ({len(clusters)})", ["Cluster", "ID", "Content"]
+        )
+        for number, cluster in enumerate(clusters, 1):
+            for note in cluster:
+                table.add_row(str(number), note.id, truncate(note.content, 60))
+        console.print(table)
+
+        if merge:
+            service.merge_notes([[note.id for note in cluster] for cluster in clusters])
+            removed = sum(len(cluster) - 1 for cluster in clusters)
+            success(f"Merged {removed} notes into {len(clusters)}")
+        else:
+            info("Run with --merge to keep only the oldest note of each cluster")
+
+    except Exception as e:
+        error(f"Failed to find duplicates: {e}")
+        ctx.exit(1)
@@ -0,0 +1,74 @@
+"""Console entry point.
+
+``pkm status --prompt`` runs on every shell prompt or status bar redraw, so
+it is answered here from the precomputed summary before the full CLI
+(click, rich, pydantic) is imported. Every other command, and any prompt
+query this parser does not recognise, goes to ``pkm.cli.main``.
+"""
+
+import sys
+from pathlib import Path
+
+from pkm.storage.summary import PROMPT_FORMAT, render_prompt
+
+
+def _take_value(args: list[str], i: int, name: str) -> tuple[str, int] | None:
+    """Read the value of option ``name`` at ``args[i]`` ("--opt V" or "--opt=V")."""
+    arg = args[i]
+    if arg.startswith(name + "="):
+        return arg[len(name) + 1 :], i + 1
+    if arg == name and i + 1 < len(args):
+        return args[i + 1], i + 2
+    return None
+
+
+def parse_prompt_args(args: list[str]) -> tuple[Path, str] | None:
+    """Recognise ``[--data-dir DIR] status --prompt [--format FMT]``.
+
+    Args:
+        args: Command-line arguments without the program name
+
+    Returns:
+        Data directory and format, or None if this is any other command
+    """
+    data_dir = Path.home() / ".pkm"
+    fmt = PROMPT_FORMAT
+    prompt = False
+    seen_status = False
+    i = 0
+    while i < len(args):
+        name = "--format" if seen_status else "--data-dir"
+        taken = _take_value(args, i, name)
+        if taken is not None:
+            value, i = taken
+            if seen_status:
+                fmt = value
+            else:
+                data_dir = Path(value).expanduser()
+            continue
+        if args[i] == "status" and not seen_status:
+            seen_status = True
+        elif args[i] == "--prompt" and seen_status:
+            prompt = True
+        else:
+            return None
+        i += 1
+    return (data_dir, fmt) if prompt else None
+
+
+def main() -> None:
+    """Run pkm."""
+    parsed = parse_prompt_args(sys.argv[1:])
+    if parsed is not None:
+        data_dir, fmt = parsed
+        try:
+            line = render_prompt(data_dir / "data.json", fmt)
+        except (KeyError, IndexError, ValueError):
+            pass  # let the full CLI report the bad format
+        else:
+            print(line)
+            return
+
+    from pkm.cli.main import cli
+
+    cli()
@@ -51,6 +51,7 @@ def help_commands(ctx: click.Context) -> None:
 ## Adding Items
 - `pkm add note CONTENT` - Add a note to inbox
 - `pkm add task TITLE` - Add a task to inbox
+- `pkm add task TITLE --repeat "every fri"` - Add a repeating task
 
 ## Viewing Data
 - `pkm view inbox` - Show unorganized notes and tasks
@@ -59,26 +60,58 @@ def help_commands(ctx: click.Context) -> None:
 - `pkm view overdue` - Past-due tasks
 - `pkm view courses` - List all courses
 - `pkm view course NAME` - View items in a course
+- `pkm view note ID` - Note details, referencing tasks and related notes
+- `pkm status` - Counts of due, overdue and inbox items
+- `pkm status --prompt` - One fast plain line for shell prompts
+- `pkm stats` - Completion rates, lateness, upcoming workload and inbox age
 
 ## Organizing
 - `pkm organize note ID --course NAME` - Assign note to course
 - `pkm organize task ID --course NAME` - Assign task to course
+- `pkm course rename OLD NEW` - Rename a course
+- `pkm course merge SOURCE TARGET` - Merge one course into another
 
 ## Task Management
 - `pkm task complete ID` - Mark task as done
 - `pkm task add-subtask ID TITLE` - Add a subtask
 - `pkm task check-subtask ID NUM` - Complete a subtask
+- `pkm task link-note ID NOTE_ID` - Link a note to a task
+- `pkm remind` - Remind before tasks are due (runs until stopped)
+- `pkm task delete ID` - Delete a task
+
+## Links
+- `pkm links check` - Report broken task/note links
+- `pkm links check --fix` - Repair broken links
 
 ## Note Management
 - `pkm note edit ID` - Edit note in external editor
 - `pkm note delete ID` - Delete a note
 - `pkm note add-topic ID TOPIC` - Add topic to note
 - `pkm note remove-topic ID TOPIC` - Remove topic from note
+- `pkm dedupe` - Find clusters of near-duplicate notes
+- `pkm dedupe --merge` - Keep the oldest note of each cluster
 
 ## Search
 - `pkm search QUERY` - Search notes and tasks
 - `pkm search QUERY --type notes` - Search only notes
 - `pkm search QUERY --course NAME` - Search within course
+- `pkm search '"light reaction"'` - Search for an exact phrase
+- `pkm search "photo*"` - Search for words starting with a prefix
+- `pkm search PATTERN --regex` - Search with a regular expression
+- `pkm query 'course:"Bio 101" due<7d -completed'` - Query by course, topic, due date and status
+- `pkm query QUERY --explain` - Show how a query was answered
+- `pkm view save NAME QUERY` - Save a query as a view kept up to date
+- `pkm view open NAME` - Open a saved view
+- `pkm view saved` - List saved views
+- `pkm view drop NAME` - Delete a saved view
+
+## Data Maintenance
+- `pkm data migrate` - Upgrade data file to current schema
+- `pkm data migrate --dry-run` - Preview a migration
+- `pkm data recover` - Salvage a damaged data file
+- `pkm data fsck` - Check data file integrity
+- `pkm data export FILE` - Export notes and tasks as JSON Lines
+- `pkm data archive` - Archive tasks completed 90+ days ago
 
 ## Help
 - `pkm --help` - Show general help
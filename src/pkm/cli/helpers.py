@@ -1,6 +1,7 @@
 """CLI helper utilities for formatting and display."""
 
 from rich.console import Console
+from rich.markup import escape
 from rich.table import Table
 
 console = Console()
@@ -94,3 +95,44 @@ def truncate(text: str, max_length: int = 50) -> str:
     if len(text) <= max_length:
         return text
     return text[: max_length - 3] + "..."
+
+
+def snippet(text: str, spans: list[tuple[int, int]], width: int = 60) -> str:
+    """Show the part of a text with the most matches, highlighted.
+
+    Args:
+        text: Full text
+        spans: Sorted (start, end) positions of matches in ``text``
+        width: Maximum length of the snippet
+
+    Returns:
+        Rich markup: a window of ``text`` with matches in bold yellow and
+        "..." where text was cut
+    """
+    if not spans:
+        return escape(truncate(text, width).replace("\n", " "))
+
+    # Window start that covers the most matches, with some context before:
+    # slide over the spans, ``last`` marking the end of those that fit
+    best, most, last = spans[0], 0, 0
+    for first, span in enumerate(spans):
+        last = max(last, first)
+        while last < len(spans) and spans[last][1] <= span[0] + width:
+            last += 1
+        if last - first > most:
+            best, most = span, last - first
+    start = max(0, min(best[0] - width // 4, len(text) - width))
+    end = min(len(text), start + width)
+
+    parts = ["..." if start else ""]
+    pos = start
+    for span_start, span_end in spans:
+        span_start, span_end = max(span_start, pos), min(span_end, end)
+        if span_start >= span_end:
+            continue
+        parts.append(escape(text[pos:span_start]))
+        parts.append(f"[bold yellow]{escape(text[span_start:span_end])}[/bold yellow]")
+        pos = span_end
+    parts.append(escape(text[pos:end]))
+    parts.append("..." if end < len(text) else "")
+    return "".join(parts).replace("\n", " ")
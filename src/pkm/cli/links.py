@@ -0,0 +1,86 @@
+"""Link maintenance commands for task <-> note references."""
+
+
+import click
+from rich.console import Console
+
+from pkm.cli.add import get_data_dir
+from pkm.cli.helpers import create_table, error, info, success, warning
+from pkm.cli.main import cli
+from pkm.services.link_index import LinkIndex
+from pkm.storage.json_store import JSONStore
+
+ISSUE_DESCRIPTIONS = {
+    "dangling_note": "Task links to a note that no longer exists",
+    "dangling_task": "Note is referenced by a task that no longer exists",
+    "missing_backlink": "Note does not list the task linking to it",
+    "missing_forward_link": "Task does not list the note that references it",
+    "duplicate": "Link is recorded more than once",
+}
+
+
+@cli.group()
+def links() -> None:
+    """Check and repair links between tasks and notes.
+
+    \b
+    Commands:
+      pkm links check         - Report inconsistent links
+      pkm links check --fix   - Repair them in place
+
+    \b
+    Examples:
+      pkm links check
+      pkm links check --fix
+    """
+    pass
+
+
+@links.command(name="check")
+@click.option("--fix", is_flag=True, help="Repair inconsistencies in place")
+@click.pass_context
+def check_links(ctx: click.Context, fix: bool) -> None:
+    """Find dangling, one-sided and duplicate task <-> note links.
+
+    \b
+    Options:
+      --fix    Rewrite link lists so both sides agree
+
+    \b
+    Repair rules:
+      - Links to deleted notes or tasks are dropped
+      - One-sided links are completed on the other side
+      - Duplicate entries are collapsed
+
+    \b
+    Examples:
+      pkm links check
+      pkm links check --fix
+    """
+    try:
+        data_dir = get_data_dir(ctx)
+        store = JSONStore(data_dir / "data.json")
+        data = store.load()
+        index = LinkIndex(data)
+
+        issues = index.repair() if fix else index.check()
+
+        if not issues:
+            success("All links are consistent")
+            return
+
+        table = create_table(f"Link Issues ({len(issues)})", ["Task", "Note", "Problem"])
+        for issue in issues:
+            table.add_row(issue.task_id, issue.note_id, ISSUE_DESCRIPTIONS[issue.kind])
+        Console().print(table)
+
+        if fix:
+            store.save(data)
+            success(f"Repaired {len(issues)} link issue(s)")
+        else:
+            warning(f"Found {len(issues)} link issue(s)")
+            info("Run 'pkm links check --fix' to repair them")
+
+    except Exception as e:
+        error(f"Link check failed: {e}")
+        ctx.exit(1)
@@ -7,6 +7,8 @@ from rich.console import Console
 from rich.markdown import Markdown
 from rich.panel import Panel
 
+from pkm.storage.durability import DURABILITY_MODES, set_default_durability
+
 console = Console()
 
 
@@ -96,8 +98,20 @@ def check_first_run(data_dir: Path) -> bool:
 )
 @click.option("--no-color", is_flag=True, help="Disable colored output")
 @click.option("--verbose", "-v", is_flag=True, help="Enable verbose output")
+@click.option(
+    "--durability",
+    type=click.Choice(DURABILITY_MODES),
+    default=None,
+    help="When writes reach the disk: none, per-commit (default) or grouped",
+)
 @click.pass_context
-def cli(ctx: click.Context, data_dir: str | None, no_color: bool, verbose: bool) -> None:
+def cli(
+    ctx: click.Context,
+    data_dir: str | None,
+    no_color: bool,
+    verbose: bool,
+    durability: str | None,
+) -> None:
     """Pro Study Planner - Terminal-based personal knowledge management for students.
 
     \b
@@ -125,6 +139,7 @@ def cli(ctx: click.Context, data_dir: str | None, no_color: bool, verbose: bool)
     ctx.obj["data_dir"] = data_dir
     ctx.obj["no_color"] = no_color
     ctx.obj["verbose"] = verbose
+    set_default_durability(durability)  # type: ignore[arg-type]
 
     # Check for first run and show onboarding
     if ctx.invoked_subcommand is None:
@@ -141,7 +156,23 @@ def cli(ctx: click.Context, data_dir: str | None, no_color: bool, verbose: bool)
 
 # Import command groups to register them with the CLI
 # This must happen after cli() is defined
-from pkm.cli import add, help, note, organize, search, task, view  # noqa: E402, F401
+from pkm.cli import (  # noqa: E402, F401
+    add,
+    course,
+    data,
+    dedupe,
+    help,
+    links,
+    note,
+    organize,
+    query,
+    remind,
+    search,
+    stats,
+    status,
+    task,
+    view,
+)
 
 
 # Add custom error handling for better user experience
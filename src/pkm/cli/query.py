@@ -0,0 +1,79 @@
+"""Query command for structured searches."""
+
+import click
+from rich.console import Console
+
+from pkm.cli.add import get_data_dir
+from pkm.cli.helpers import create_table, error, info
+from pkm.cli.main import cli
+from pkm.cli.search import show_results
+from pkm.services.query import QuerySyntaxError
+from pkm.services.query_service import QueryResult, QueryService
+
+console = Console()
+
+
+@cli.command(name="query")
+@click.argument("query", required=True)
+@click.option("--explain", is_flag=True, help="Show the plan used to answer the query")
+@click.pass_context
+def query(ctx: click.Context, query: str, explain: bool) -> None:
+    """Find notes and tasks with a query.
+
+    \b
+    QUERY: Terms that must all match:
+      word                  Text in content, titles, topics, courses
+      "a phrase"            Whole words in a row
+      word*                 Words starting with the text
+      course:NAME           Assigned to a course (quote names with spaces)
+      topic:NAME            Tagged with a topic
+      priority:LEVEL        high, medium or low
+      type:note|task        Only notes or only tasks
+      due<7d, due>=today    Due date (today, tomorrow, Nd, Nw, YYYY-MM-DD)
+      completed, open,      Task status
+      overdue, inbox
+    Put - before a term to exclude it, join alternatives with OR and
+    group with parentheses.
+
+    \b
+    Options:
+      --explain    Show which indexes were used and how many records
+                   each step left
+
+    \b
+    Examples:
+      pkm query 'course:"Bio 101" topic:cells'
+      pkm query 'due<7d -completed priority:high'
+      pkm query '"calvin cycle" OR photosynthesis' --explain
+    """
+    try:
+        result = QueryService(get_data_dir(ctx)).execute(query)
+    except QuerySyntaxError as e:
+        error(f"Invalid query: {e}")
+        ctx.exit(1)
+        return
+    except Exception as e:
+        error(f"Query failed: {e}")
+        ctx.exit(1)
+        return
+
+    if explain:
+        show_plan(result)
+
+    if not result.notes and not result.tasks:
+        info(f"No results found for '{query}'")
+        return
+
+    console.print()
+    show_results(result.notes, result.tasks, result.highlights)
+    total = len(result.notes) + len(result.tasks)
+    info(f"Total: {total} results ({len(result.notes)} notes, {len(result.tasks)} tasks)")
+
+
+def show_plan(result: QueryResult) -> None:
+    """Display the steps a query took."""
+    table = create_table("Query Plan", ["Step", "Action", "Term", "Postings", "Remaining"])
+    for i, step in enumerate(result.steps, 1):
+        table.add_row(str(i), step.action, step.term, str(step.postings), str(step.remaining))
+    console.print(table)
+    info(f"{result.examined} per-record checks over {result.total} indexed records")
@@ -0,0 +1,153 @@
+"""Reminder command."""
+
+import re
+import shlex
+import signal
+import subprocess
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import click
+from rich.console import Console
+from rich.markup import escape
+
+from pkm.cli.add import get_data_dir
+from pkm.cli.helpers import create_table, error, info, truncate, warning
+from pkm.cli.main import cli
+from pkm.services.reminder_service import Reminder, ReminderService
+from pkm.utils.date_parser import DueDateFormatter
+
+console = Console()
+
+_LEAD = re.compile(r"(\d+)\s*([mhd]?)")
+_LEAD_UNITS = {"m": "minutes", "h": "hours", "d": "days", "": "minutes"}
+
+
+def parse_leads(
+    ctx: click.Context, param: click.Parameter, values: tuple[str, ...]
+) -> list[timedelta]:
+    """Parse lead times like "15m", "2h", "1d" or "0" into timedeltas."""
+    leads = []
+    for value in values:
+        match = _LEAD.fullmatch(value.strip().lower())
+        if match is None:
+            raise click.BadParameter(f"'{value}' is not a time like 15m, 2h or 1d")
+        leads.append(timedelta(**{_LEAD_UNITS[match.group(2)]: int(match.group(1))}))
+    return leads
+
+
+def describe(reminder: Reminder) -> str:
+    """Describe a reminder in one line."""
+    course = f" [{reminder.course}]" if reminder.course else ""
+    when = "now" if reminder.at >= reminder.due else DueDateFormatter(reminder.at)(reminder.due)
+    return f"{reminder.title}{course} is due {when} ({reminder.task_id})"
+
+
+def run_command(template: str, reminder: Reminder) -> None:
+    """Run the configured command for a reminder, without a shell.
+
+    Each argument of the template may use {id}, {title}, {due} and {course}.
+    """
+    fields = {
+        "id": reminder.task_id,
+        "title": reminder.title,
+        "due": reminder.due.isoformat(sep=" ", timespec="minutes"),
+        "course": reminder.course or "",
+    }
+    try:
+        args = [arg.format(**fields) for arg in shlex.split(template)]
+        subprocess.run(args, check=True, timeout=60)
+    except (KeyError, IndexError, ValueError) as e:
+        warning(f"Bad reminder command '{template}': {e}")
+    except (OSError, subprocess.SubprocessError) as e:
+        warning(f"Reminder command failed: {e}")
+
+
+@cli.command(name="remind")
+@click.option(
+    "--before",
+    "-b",
+    "leads",
+    multiple=True,
+    default=["1h"],
+    show_default=True,
+    callback=parse_leads,
+    help="Remind this long before each due date, e.g. 15m, 2h, 1d, 0 (can repeat)",
+)
+@click.option(
+    "--log",
+    "log_file",
+    type=click.Path(dir_okay=False, path_type=Path),
+    help="Also append reminders to this file",
+)
+@click.option(
+    "--command",
+    "command",
+    envvar="PKM_REMIND_COMMAND",
+    help="Run this command for each reminder ({id}, {title}, {due}, {course})",
+)
+@click.option("--list", "list_only", is_flag=True, help="Show the upcoming reminders and exit")
+@click.pass_context
+def remind(
+    ctx: click.Context,
+    leads: list[timedelta],
+    log_file: Path | None,
+    command: str | None,
+    list_only: bool,
+) -> None:
+    """Watch tasks and remind you before they are due.
+
+    Runs until interrupted (Ctrl-C) - start it in the background, e.g.
+    with "pkm remind &". Tasks added, changed or completed while it runs
+    are picked up within a couple of seconds; between reminders it sleeps.
+
+    \b
+    Examples:
+      pkm remind
+      pkm remind --before 1d --before 1h
+      pkm remind --log ~/reminders.log
+      pkm remind --command 'notify-send "Due soon" "{title}"'
+      pkm remind --list
+    """
+    try:
+        service = ReminderService(get_data_dir(ctx), leads)
+        service.refresh(datetime.now())
+    except Exception as e:
+        error(f"Failed to start reminders: {e}")
+        ctx.exit(1)
+
+    if list_only:
+        upcoming = service.queue.upcoming(20)
+        if not upcoming:
+            info("No upcoming reminders")
+            return
+        format_at = DueDateFormatter()
+        table = create_table("Upcoming Reminders", ["At", "ID", "Task", "Due"])
+        for reminder in upcoming:
+            table.add_row(
+                format_at(reminder.at),
+                reminder.task_id,
+                truncate(reminder.title, 40),
+                reminder.due.strftime("%b %d %H:%M"),
+            )
+        console.print(table)
+        return
+
+    def emit(reminder: Reminder) -> None:
+        message = describe(reminder)
+        console.print(f"[yellow]⏰[/yellow] {escape(message)}")
+        if log_file is not None:
+            with open(log_file, "a", encoding="utf-8") as f:
+                f.write(f"{reminder.at.isoformat(sep=' ', timespec='minutes')}  {message}\n")
+        if command:
+            run_command(command, reminder)
+
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda signum, frame: stop.set())
+    info(f"Watching {len(service.queue)} upcoming reminder(s) - press Ctrl-C to stop")
+    try:
+        service.watch(emit, stop)
+    except KeyboardInterrupt:
+        pass
+    info("Stopped")
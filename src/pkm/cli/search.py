@@ -1,14 +1,19 @@
 """Search commands for finding notes and tasks."""
 
+import re
+from collections.abc import Mapping
 
 import click
 from rich.console import Console
 
 from pkm.cli.add import get_data_dir
-from pkm.cli.helpers import create_table, error, info, truncate
+from pkm.cli.helpers import create_table, error, info, snippet, truncate
 from pkm.cli.main import cli
+from pkm.models.note import Note
+from pkm.models.task import Task
+from pkm.services.regex_search import RegexTimeoutError
 from pkm.services.search_service import SearchService
-from pkm.utils.date_parser import format_due_date
+from pkm.utils.date_parser import DueDateFormatter
 
 
 @cli.command()
@@ -16,8 +21,16 @@ from pkm.utils.date_parser import format_due_date
 @click.option("--type", "-t", type=click.Choice(["notes", "tasks"]), help="Filter by type")
 @click.option("--course", "-c", help="Filter by course name")
 @click.option("--topic", help="Filter by topic (notes only)")
+@click.option("--regex", "-r", is_flag=True, help="Treat QUERY as a regular expression")
 @click.pass_context
-def search(ctx: click.Context, query: str, type: str | None, course: str | None, topic: str | None) -> None:
+def search(
+    ctx: click.Context,
+    query: str,
+    type: str | None,
+    course: str | None,
+    topic: str | None,
+    regex: bool,
+) -> None:
     """Search for notes and tasks by keyword.
 
     \b
@@ -28,6 +41,7 @@ def search(ctx: click.Context, query: str, type: str | None, course: str | None,
       -t, --type TEXT     Filter: notes or tasks
       -c, --course TEXT   Filter by course name
       --topic TEXT        Filter by topic (notes only)
+      -r, --regex         QUERY is a regular expression
 
     \b
     Examples:
@@ -43,13 +57,22 @@ def search(ctx: click.Context, query: str, type: str | None, course: str | None,
       # Search by topic
       pkm search "cell" --topic "Biology"
 
-    Search is case-insensitive and matches partial words.
+      # Exact phrase, and words starting with "photo"
+      pkm search '"light reaction"'
+      pkm search "photo*"
+
+      # Regular expression
+      pkm search "photosynth(esis|etic)" --regex
+
+    Search is case-insensitive and matches partial words, except inside
+    quotes, which match whole words in order.
     """
     try:
         data_dir = get_data_dir(ctx)
         search_service = SearchService(data_dir)
 
-        notes, tasks = search_service.search(query, type, course, topic)
+        result = search_service.search_result(query, type, course, topic, regex)
+        notes, tasks = result.notes, result.tasks
 
         if not notes and not tasks:
             info(f"No results found for '{query}'")
@@ -60,44 +83,66 @@ def search(ctx: click.Context, query: str, type: str | None, course: str | None,
         Console().print(f"\n[bold]🔍 Search Results for '{query}'[/bold]")
         Console().print()
 
-        # Display notes
-        if notes:
-            table = create_table(f"Notes ({len(notes)})", ["Content", "Course", "Topics"])
-            for note in notes[:20]:  # Show first 20
-                # Highlight query in content
-                content_display = truncate(note.content, 60)
-
-                table.add_row(
-                    content_display,
-                    note.course or "-",
-                    ", ".join(note.topics[:3]) if note.topics else "-",
-                )
-            Console().print(table)
-            if len(notes) > 20:
-                info(f"Showing 20 of {len(notes)} notes")
-            Console().print()
-
-        # Display tasks
-        if tasks:
-            table = create_table(f"Tasks ({len(tasks)})", ["Title", "Due", "Course", "Status"])
-            for task in tasks[:20]:  # Show first 20
-                due_display = format_due_date(task.due_date) if task.due_date else "-"
-                status = "✓ Done" if task.completed else "Active"
-
-                table.add_row(
-                    truncate(task.title, 40),
-                    truncate(due_display, 20),
-                    task.course or "-",
-                    status,
-                )
-            Console().print(table)
-            if len(tasks) > 20:
-                info(f"Showing 20 of {len(tasks)} tasks")
-            Console().print()
+        show_results(notes, tasks, result.highlights)
 
         total = len(notes) + len(tasks)
         info(f"Total: {total} results ({len(notes)} notes, {len(tasks)} tasks)")
 
+    except re.error as e:
+        error(f"Invalid regular expression: {e}")
+        ctx.exit(1)
+    except RegexTimeoutError as e:
+        error(f"{e} - the pattern is too slow; try a simpler one")
+        ctx.exit(1)
     except Exception as e:
         error(f"Search failed: {e}")
         ctx.exit(1)
+
+
+def show_results(
+    notes: list[Note],
+    tasks: list[Task],
+    highlights: Mapping[str, list[tuple[int, int]]] | None = None,
+) -> None:
+    """Display matching notes and tasks as tables (first 20 of each).
+
+    Args:
+        notes: Matching notes
+        tasks: Matching tasks
+        highlights: Match positions in note content and task titles by ID
+            (see ``QueryResult.highlights``); shown as highlighted snippets
+    """
+    if highlights is None:
+        highlights = {}
+    # Display notes
+    if notes:
+        table = create_table(f"Notes ({len(notes)})", ["Content", "Course", "Topics"])
+        for note in notes[:20]:  # Show first 20
+            table.add_row(
+                snippet(note.content, highlights.get(note.id, []), 60),
+                note.course or "-",
+                ", ".join(note.topics[:3]) if note.topics else "-",
+            )
+        Console().print(table)
+        if len(notes) > 20:
+            info(f"Showing 20 of {len(notes)} notes")
+        Console().print()
+
+    # Display tasks
+    if tasks:
+        table = create_table(f"Tasks ({len(tasks)})", ["Title", "Due", "Course", "Status"])
+        format_due = DueDateFormatter()
+        for task in tasks[:20]:  # Show first 20
+            due_display = format_due(task.due_date) if task.due_date else "-"
+            status = "✓ Done" if task.completed else "Active"
+
+            table.add_row(
+                snippet(task.title, highlights.get(task.id, []), 40),
+                truncate(due_display, 20),
+                task.course or "-",
+                status,
+            )
+        Console().print(table)
+        if len(tasks) > 20:
+            info(f"Showing 20 of {len(tasks)} tasks")
+        Console().print()
@@ -0,0 +1,90 @@
+"""Work analytics command."""
+
+import click
+from rich.console import Console
+
+from pkm.cli.add import get_data_dir
+from pkm.cli.helpers import create_table, error, info
+from pkm.cli.main import cli
+from pkm.services.stats_service import StatsService
+
+console = Console()
+
+
+def format_lateness(days: float | None) -> str:
+    """Describe a mean lateness in days ("-" if unknown)."""
+    if days is None:
+        return "-"
+    if abs(days) < 0.05:
+        return "on time"
+    return f"{abs(days):.1f} days {'late' if days > 0 else 'early'}"
+
+
+@cli.command(name="stats")
+@click.option(
+    "--weeks",
+    type=click.IntRange(1, 52),
+    default=4,
+    show_default=True,
+    help="Weeks of upcoming workload to show",
+)
+@click.pass_context
+def stats(ctx: click.Context, weeks: int) -> None:
+    """Show completion rates, lateness, upcoming workload and inbox age.
+
+    \b
+    Reports:
+      - Tasks completed per course and how late they were finished
+        (completion time vs. due date; negative lateness is early)
+      - Open tasks due on each day of the next few weeks
+      - How long notes and tasks have been waiting in the inbox
+
+    Counted from the columnar task cache, so it stays fast on years of data.
+
+    \b
+    Examples:
+      pkm stats
+      pkm stats --weeks 8
+    """
+    try:
+        result = StatsService(get_data_dir(ctx)).work_stats(weeks)
+        if not result.courses and not any(count for _, count in result.inbox_ages):
+            info("No data yet - add a note or task to get started")
+            return
+
+        table = create_table(
+            "Completion by Course", ["Course", "Tasks", "Done", "Rate", "Lateness"]
+        )
+        for course in result.courses:
+            table.add_row(
+                course.course or "[dim]Inbox[/dim]",
+                str(course.total),
+                str(course.completed),
+                f"{course.rate:.0%}",
+                format_lateness(course.lateness_days),
+            )
+        console.print(table)
+        console.print(f"Average lateness: {format_lateness(result.lateness_days)}")
+
+        busy = [(day, count) for day, count in result.workload if count]
+        console.print()
+        if result.overdue:
+            console.print(f"[red]Overdue: {result.overdue}[/red]")
+        if busy:
+            peak = max(count for _, count in busy)
+            table = create_table(f"Workload (next {weeks} weeks)", ["Day", "Due", "Load"])
+            for day, count in busy:
+                bar = "█" * max(1, round(20 * count / peak))
+                table.add_row(day.strftime("%a %b %d"), str(count), f"[cyan]{bar}[/cyan]")
+            console.print(table)
+        else:
+            info(f"Nothing due in the next {weeks} weeks")
+
+        table = create_table("Inbox Age", ["Waiting", "Items"])
+        for label, count in result.inbox_ages:
+            table.add_row(label, str(count))
+        console.print(table)
+
+    except Exception as e:
+        error(f"Failed to compute stats: {e}")
+        ctx.exit(1)
@@ -0,0 +1,70 @@
+"""Status summary command."""
+
+import click
+from rich.console import Console
+
+from pkm.cli.add import get_data_dir
+from pkm.cli.helpers import create_table, error, info
+from pkm.cli.main import cli
+from pkm.storage.summary import PROMPT_FORMAT, read_summary, render_prompt, status_fields
+
+console = Console()
+
+
+@cli.command(name="status")
+@click.option("--prompt", is_flag=True, help="Print one plain line for a shell prompt")
+@click.option(
+    "--format",
+    "fmt",
+    default=PROMPT_FORMAT,
+    show_default=True,
+    help="Template for --prompt",
+)
+@click.pass_context
+def status(ctx: click.Context, prompt: bool, fmt: str) -> None:
+    """Show what is due, overdue and waiting in the inbox.
+
+    Reads a small summary that is refreshed on every change, so it is fast
+    enough to run on every prompt redraw (well under 20 ms with --prompt).
+
+    \b
+    Options:
+      --prompt     One plain line, no colors (for shell prompts and tmux)
+      --format     Template for --prompt with the fields {today}, {overdue},
+                   {inbox}, {open}, {next} and {next_due}
+
+    \b
+    Examples:
+      pkm status
+      pkm status --prompt
+      pkm status --prompt --format "{overdue}! {today} due"
+
+    \b
+    Shell prompt (bash):
+      PS1='[$(pkm status --prompt)] \\w \\$ '
+    """
+    try:
+        data_file = get_data_dir(ctx) / "data.json"
+        if prompt:
+            click.echo(render_prompt(data_file, fmt))
+            return
+
+        summary = read_summary(data_file)
+        if summary is None:
+            info("No data yet - add a note or task to get started")
+            return
+
+        fields = status_fields(summary)
+        table = create_table("Status", ["Due Today", "Overdue", "Inbox", "Open Tasks"])
+        overdue = f"[red]{fields['overdue']}[/red]" if fields["overdue"] else "0"
+        table.add_row(str(fields["today"]), overdue, str(fields["inbox"]), str(fields["open"]))
+        console.print(table)
+        if fields["next"]:
+            info(f"Next due: {fields['next']} ({fields['next_due']})")
+
+    except (KeyError, IndexError, ValueError) as e:
+        error(f"Invalid --format: {e}")
+        ctx.exit(1)
+    except Exception as e:
+        error(f"Failed to read status: {e}")
+        ctx.exit(1)
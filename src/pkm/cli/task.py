@@ -7,6 +7,7 @@ from pkm.cli.add import get_data_dir
 from pkm.cli.helpers import error, info, success
 from pkm.cli.main import cli
 from pkm.services.task_service import TaskService
+from pkm.utils.date_parser import format_due_date
 
 
 @cli.group()
@@ -18,6 +19,7 @@ def task() -> None:
       pkm task complete TASK_ID       - Mark task as done
       pkm task add-subtask TASK_ID    - Add a subtask/bullet point
       pkm task check-subtask TASK_ID  - Mark subtask as complete
+      pkm task delete TASK_ID         - Delete a task
 
     \b
     Examples:
@@ -46,6 +48,8 @@ def complete_task(ctx: click.Context, task_id: str) -> None:
       pkm --data-dir ~/study task complete t_20251123_140000_xyz
 
     Completed tasks are marked with a timestamp and won't appear in active task views.
+    Completing a repeating task completes its current occurrence and moves
+    the task on to the next one.
     """
     try:
         data_dir = get_data_dir(ctx)
@@ -61,6 +65,11 @@ def complete_task(ctx: click.Context, task_id: str) -> None:
         if task.completed_at:
             info(f"Completed at: {task.completed_at.strftime('%Y-%m-%d %H:%M')}")
 
+        # A recurring task moves on to its next occurrence
+        series = service.get_task(task_id) if task.id != task_id else None
+        if series and series.due_date:
+            info(f"Next due: {format_due_date(series.due_date)}")
+
     except Exception as e:
         error(f"Failed to complete task: {e}")
         ctx.exit(1)
@@ -249,3 +258,59 @@ def unlink_note(ctx: click.Context, task_id: str, note_id: str) -> None:
     except Exception as e:
         error(f"Failed to unlink note: {e}")
         ctx.exit(1)
+
+
+@task.command(name="delete")
+@click.argument("task_id", required=True)
+@click.option("--yes", "-y", is_flag=True, help="Skip confirmation prompt")
+@click.pass_context
+def delete_task(ctx: click.Context, task_id: str, yes: bool) -> None:
+    """Delete a task.
+
+    \b
+    TASK_ID: The task ID to delete (use 'pkm view inbox' to see IDs)
+
+    \b
+    Options:
+      -y, --yes    Skip confirmation prompt
+
+    \b
+    Examples:
+      # With confirmation
+      pkm task delete t_20251123_140000_xyz
+
+      # Skip confirmation
+      pkm task delete t_20251123_140000_xyz -y
+
+    Linked notes are kept; only their reference to this task is removed.
+
+    WARNING: This action cannot be undone!
+    """
+    try:
+        data_dir = get_data_dir(ctx)
+        service = TaskService(data_dir)
+
+        task = service.get_task(task_id)
+        if task is None:
+            error(f"Task not found: {task_id}")
+            info("Use 'pkm view inbox' or 'pkm view course' to see task IDs")
+            ctx.exit(1)
+
+        if task.linked_notes:
+            info(f"Task is linked to {len(task.linked_notes)} note(s); links will be removed")
+
+        if not yes:
+            click.echo(f"\nTask: {task.title}")
+            if not click.confirm("\nAre you sure you want to delete this task?"):
+                info("Deletion cancelled")
+                return
+
+        if service.delete_task(task_id):
+            success(f"Task deleted: {task_id}")
+        else:
+            error(f"Failed to delete task: {task_id}")
+            ctx.exit(1)
+
+    except Exception as e:
+        error(f"Failed to delete task: {e}")
+        ctx.exit(1)
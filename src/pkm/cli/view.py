@@ -1,17 +1,21 @@
 """View commands for displaying notes and tasks."""
 
 from datetime import datetime
+from itertools import islice
 
 import click
 from rich.console import Console
 
 from pkm.cli.add import get_data_dir
-from pkm.cli.helpers import create_table, format_datetime, info, truncate
+from pkm.cli.helpers import create_table, error, format_datetime, info, success, truncate
 from pkm.cli.main import cli
+from pkm.cli.search import show_results
 from pkm.services.course_service import CourseService
 from pkm.services.note_service import NoteService
+from pkm.services.query import QuerySyntaxError
+from pkm.services.saved_view_service import SavedViewService
 from pkm.services.task_service import TaskService
-from pkm.utils.date_parser import format_due_date
+from pkm.utils.date_parser import DueDateFormatter, format_due_date
 
 
 @cli.group()
@@ -24,6 +28,8 @@ def view() -> None:
       pkm view today    - Tasks due today
       pkm view week     - Tasks due this week
       pkm view overdue  - Overdue tasks
+      pkm view save     - Save a query as a named view
+      pkm view open     - Open a saved view
 
     \b
     Coming soon:
@@ -91,6 +97,7 @@ def view_inbox(ctx: click.Context) -> None:
     # Display tasks
     if inbox_tasks:
         table = create_table("Inbox Tasks", ["Title", "Due", "Priority", "Subtasks"])
+        format_due = DueDateFormatter()
         for task in inbox_tasks:
             priority_color = {
                 "high": "[red]HIGH[/red]",
@@ -99,7 +106,7 @@ def view_inbox(ctx: click.Context) -> None:
             }[task.priority]
 
             # Format due date
-            due_display = format_due_date(task.due_date) if task.due_date else "-"
+            due_display = format_due(task.due_date) if task.due_date else "-"
 
             # Format subtasks progress
             if task.subtasks:
@@ -220,6 +227,7 @@ def view_week(ctx: click.Context) -> None:
 
     table = create_table(f"Tasks Due This Week ({len(tasks)})", ["Title", "Due", "Priority", "Subtasks", "Course"])
 
+    format_due = DueDateFormatter()
     for task in tasks:
         priority_color = {
             "high": "[red]HIGH[/red]",
@@ -228,7 +236,7 @@ def view_week(ctx: click.Context) -> None:
         }[task.priority]
 
         # Format due date
-        due_display = format_due_date(task.due_date) if task.due_date else "-"
+        due_display = format_due(task.due_date) if task.due_date else "-"
 
         # Format subtasks progress
         if task.subtasks:
@@ -285,6 +293,7 @@ def view_overdue(ctx: click.Context) -> None:
 
     table = create_table(f"[red]Overdue Tasks ({len(tasks)})[/red]", ["Title", "Due", "Priority", "Subtasks", "Course"])
 
+    format_due = DueDateFormatter()
     for task in tasks:
         priority_color = {
             "high": "[red]HIGH[/red]",
@@ -293,7 +302,7 @@ def view_overdue(ctx: click.Context) -> None:
         }[task.priority]
 
         # Format due date (highlight how overdue)
-        due_display = f"[red]{format_due_date(task.due_date)}[/red]" if task.due_date else "-"
+        due_display = f"[red]{format_due(task.due_date)}[/red]" if task.due_date else "-"
 
         # Format subtasks progress
         if task.subtasks:
@@ -343,7 +352,9 @@ def view_course(ctx: click.Context, course_name: str) -> None:
     note_service = NoteService(data_dir)
     task_service = TaskService(data_dir)
 
-    notes = note_service.get_notes_by_course(course_name)
+    # Only the first page of notes is hydrated; the total comes from a count
+    note_count = note_service.count_notes(course=course_name)
+    notes = list(islice(note_service.iter_notes(course=course_name), 10))
     tasks = task_service.get_tasks_by_course(course_name)
 
     if not notes and not tasks:
@@ -355,21 +366,22 @@ def view_course(ctx: click.Context, course_name: str) -> None:
 
     # Display notes
     if notes:
-        table = create_table(f"Notes ({len(notes)})", ["Content", "Created", "Topics"])
-        for note in notes[:10]:  # Show first 10
+        table = create_table(f"Notes ({note_count})", ["Content", "Created", "Topics"])
+        for note in notes:  # Show first 10
             table.add_row(
                 truncate(note.content, 50),
                 format_datetime(note.created_at),
                 ", ".join(note.topics) if note.topics else "-",
             )
         Console().print(table)
-        if len(notes) > 10:
-            info(f"Showing 10 of {len(notes)} notes")
+        if note_count > 10:
+            info(f"Showing 10 of {note_count} notes")
         Console().print()
 
     # Display tasks
     if tasks:
         table = create_table(f"Tasks ({len(tasks)})", ["Title", "Due", "Priority", "Status"])
+        format_due = DueDateFormatter()
         for task in tasks:
             priority_color = {
                 "high": "[red]HIGH[/red]",
@@ -377,7 +389,7 @@ def view_course(ctx: click.Context, course_name: str) -> None:
                 "low": "[green]LOW[/green]",
             }[task.priority]
 
-            due_display = format_due_date(task.due_date) if task.due_date else "-"
+            due_display = format_due(task.due_date) if task.due_date else "-"
             status = "✓ Done" if task.completed else "Active"
 
             table.add_row(
@@ -389,7 +401,7 @@ def view_course(ctx: click.Context, course_name: str) -> None:
         Console().print(table)
         Console().print()
 
-    info(f"Total: {len(notes)} notes, {len(tasks)} tasks")
+    info(f"Total: {note_count} notes, {len(tasks)} tasks")
 
 
 @view.command(name="courses")
@@ -401,7 +413,8 @@ def view_courses(ctx: click.Context) -> None:
     Shows:
       - All courses in your system
       - Number of notes per course
-      - Number of tasks per course
+      - Number of tasks per course (open, done, overdue)
+      - When each course last changed
 
     \b
     Examples:
@@ -419,15 +432,21 @@ def view_courses(ctx: click.Context) -> None:
         info("No courses found. Organize notes and tasks to create courses.")
         return
 
-    table = create_table(f"Courses ({len(courses)})", ["Course", "Notes", "Tasks", "Total Items"])
+    table = create_table(
+        f"Courses ({len(courses)})",
+        ["Course", "Notes", "Tasks", "Open", "Done", "Overdue", "Last Activity"],
+    )
 
     for course in courses:
-        total = course.note_count + course.task_count
+        overdue = f"[red]{course.overdue_count}[/red]" if course.overdue_count else "0"
         table.add_row(
             course.name,
             str(course.note_count),
             str(course.task_count),
-            str(total),
+            str(course.open_count),
+            str(course.completed_count),
+            overdue,
+            format_datetime(course.last_activity),
         )
 
     Console().print(table)
@@ -492,6 +511,8 @@ def view_task(ctx: click.Context, task_id: str, expand: bool) -> None:
     if task.due_date:
         formatted_due = format_due_date(task.due_date)
         console.print(f"Due: {formatted_due}")
+    if task.recurrence:
+        console.print(f"Repeats: {task.recurrence.describe()}")
 
     console.print(f"Priority: {task.priority}")
     console.print(f"Status: {'[green]✓ Completed[/green]' if task.completed else '[yellow]Pending[/yellow]'}")
@@ -549,6 +570,7 @@ def view_note(ctx: click.Context, note_id: str) -> None:
       - Topics
       - Course (if assigned)
       - Tasks that reference this note
+      - Up to 5 related notes (by shared, distinctive words and topics)
     """
     from pkm.cli.helpers import error
 
@@ -595,4 +617,113 @@ def view_note(ctx: click.Context, note_id: str) -> None:
         console.print("\n[dim]No tasks reference this note[/dim]")
         info("Use 'pkm task link-note TASK_ID NOTE_ID' to link this note to a task")
 
+    related = note_service.related_notes(note_id)
+    if related:
+        console.print(f"\n[bold]Related Notes ({len(related)}):[/bold]")
+        for other, score in related:
+            console.print(f"  • {other.id}: {truncate(other.content, 60)} [dim]({score:.2f})[/dim]")
+    else:
+        console.print("\n[dim]No related notes[/dim]")
+
     console.print()
+
+
+@view.command(name="save")
+@click.argument("name", required=True)
+@click.argument("query", required=True)
+@click.pass_context
+def view_save(ctx: click.Context, name: str, query: str) -> None:
+    """Save a query as a named view.
+
+    The view's results are stored and kept up to date as notes and tasks
+    change, so opening it later does not search everything again.
+
+    \b
+    NAME: View name (saving an existing name replaces it)
+    QUERY: Query as for 'pkm query'
+
+    \b
+    Examples:
+      pkm view save crunch 'priority:high due<10d -completed'
+      pkm view save bio-cells 'course:"Bio 101" topic:cells'
+    """
+    try:
+        saved = SavedViewService(get_data_dir(ctx)).save_view(name, query)
+        success(f"Saved view '{name}' ({saved.count} items)")
+        info(f"Open it with: pkm view open {name}")
+    except QuerySyntaxError as e:
+        error(f"Invalid query: {e}")
+        ctx.exit(1)
+    except Exception as e:
+        error(f"Failed to save view: {e}")
+        ctx.exit(1)
+
+
+@view.command(name="open")
+@click.argument("name", required=True)
+@click.pass_context
+def view_open(ctx: click.Context, name: str) -> None:
+    """Open a saved view.
+
+    \b
+    Examples:
+      pkm view open crunch
+    """
+    try:
+        found = SavedViewService(get_data_dir(ctx)).open_view(name)
+    except Exception as e:
+        error(f"Failed to open view: {e}")
+        ctx.exit(1)
+        return
+
+    if found is None:
+        error(f"View not found: {name}")
+        info("Use 'pkm view saved' to list saved views")
+        ctx.exit(1)
+        return
+
+    notes, tasks = found
+    if not notes and not tasks:
+        info(f"View '{name}' is empty")
+        return
+
+    Console().print()
+    show_results(notes, tasks)
+    info(f"Total: {len(notes) + len(tasks)} items ({len(notes)} notes, {len(tasks)} tasks)")
+
+
+@view.command(name="saved")
+@click.pass_context
+def view_saved(ctx: click.Context) -> None:
+    """List saved views.
+
+    \b
+    Examples:
+      pkm view saved
+    """
+    views = SavedViewService(get_data_dir(ctx)).list_views()
+    if not views:
+        info("No saved views yet")
+        info("Save one with: pkm view save NAME QUERY")
+        return
+
+    table = create_table(f"Saved Views ({len(views)})", ["Name", "Query", "Items"])
+    for saved in views:
+        table.add_row(saved.name, saved.query, "-" if saved.count is None else str(saved.count))
+    Console().print(table)
+
+
+@view.command(name="drop")
+@click.argument("name", required=True)
+@click.pass_context
+def view_drop(ctx: click.Context, name: str) -> None:
+    """Delete a saved view (its notes and tasks are kept).
+
+    \b
+    Examples:
+      pkm view drop crunch
+    """
+    if not SavedViewService(get_data_dir(ctx)).delete_view(name):
+        error(f"View not found: {name}")
+        ctx.exit(1)
+    success(f"Deleted view '{name}'")
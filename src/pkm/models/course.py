@@ -1,5 +1,7 @@
 """Course model definition."""
 
+from datetime import datetime
+
 from pydantic import BaseModel, Field
 
 
@@ -7,13 +9,23 @@ class Course(BaseModel):
     """A course/subject for organizing notes and tasks.
 
     Attributes:
+        id: Stable identifier (e.g., "c1") referenced by notes and tasks
         name: Course name (e.g., "Biology 101")
         note_count: Number of notes in this course (computed)
         task_count: Number of tasks in this course (computed)
+        open_count: Number of incomplete tasks (computed)
+        completed_count: Number of completed tasks (computed)
+        overdue_count: Number of incomplete tasks past their due date (computed)
+        last_activity: When an item in this course last changed (computed)
     """
 
+    id: str | None = Field(default=None, pattern=r"^c\d+$")
     name: str = Field(..., min_length=1, max_length=100)
     note_count: int = Field(default=0, ge=0)
     task_count: int = Field(default=0, ge=0)
+    open_count: int = Field(default=0, ge=0)
+    completed_count: int = Field(default=0, ge=0)
+    overdue_count: int = Field(default=0, ge=0)
+    last_activity: datetime | None = None
 
     model_config = {"frozen": False}
@@ -1,6 +1,7 @@
 """Task and Subtask model definitions."""
 
-from datetime import datetime
+from collections.abc import Iterator
+from datetime import date, datetime, timedelta
 from typing import Literal
 
 from pydantic import BaseModel, Field, field_validator, model_validator
@@ -22,6 +23,119 @@ class Subtask(BaseModel):
     model_config = {"frozen": False}
 
 
+WEEKDAY_NAMES = ("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun")
+
+
+class Recurrence(BaseModel):
+    """A rule repeating a task's due date.
+
+    A recurring task stores only its current (earliest open) occurrence as
+    its due date; later occurrences are generated from it when a view needs
+    them, and completing an occurrence moves the due date to the next one.
+
+    Attributes:
+        every: Interval in units (e.g., 2 for every other week)
+        unit: "day" or "week"
+        weekdays: Days of the week (0 = Monday) for weekly rules; empty
+            repeats on the weekday of the due date
+        until: Last day an occurrence may fall on (None = no end)
+    """
+
+    every: int = Field(1, ge=1, le=365)
+    unit: Literal["day", "week"] = "week"
+    weekdays: list[int] = Field(default_factory=list)
+    until: date | None = None
+
+    @field_validator("weekdays")
+    @classmethod
+    def validate_weekdays(cls, v: list[int]) -> list[int]:
+        """Ensure weekdays are valid, sorted and unique."""
+        if any(not 0 <= day <= 6 for day in v):
+            raise ValueError("Weekdays must be between 0 (Monday) and 6 (Sunday)")
+        return sorted(set(v))
+
+    @model_validator(mode="after")
+    def validate_unit(self) -> "Recurrence":
+        """Ensure weekdays are only given for weekly rules."""
+        if self.weekdays and self.unit != "week":
+            raise ValueError("Weekdays can only be given for weekly recurrence")
+        return self
+
+    @property
+    def period(self) -> timedelta:
+        """Time after which the pattern of occurrences repeats."""
+        return timedelta(days=self.every * (7 if self.unit == "week" else 1))
+
+    def _in_range(self, due: datetime) -> datetime | None:
+        """Get a candidate occurrence, or None if it falls after ``until``."""
+        return due if self.until is None or due.date() <= self.until else None
+
+    def first(self, due: datetime) -> datetime | None:
+        """Get the first occurrence on or after a due date.
+
+        Args:
+            due: Requested due date (its time is kept)
+
+        Returns:
+            The due date itself, or the next listed weekday; None if that
+            is after ``until``
+        """
+        if self.weekdays and due.weekday() not in self.weekdays:
+            later = [day for day in self.weekdays if day > due.weekday()]
+            offset = later[0] if later else self.weekdays[0] + 7
+            due += timedelta(days=offset - due.weekday())
+        return self._in_range(due)
+
+    def following(self, due: datetime) -> datetime | None:
+        """Get the occurrence after another.
+
+        Args:
+            due: An occurrence
+
+        Returns:
+            The next occurrence, or None if the rule has ended
+        """
+        if not self.weekdays:
+            return self._in_range(due + self.period)
+        later = [day for day in self.weekdays if day > due.weekday()]
+        if later:
+            return self._in_range(due + timedelta(days=later[0] - due.weekday()))
+        return self._in_range(due + timedelta(days=self.weekdays[0] - due.weekday()) + self.period)
+
+    def occurrences(self, due: datetime, start: datetime) -> Iterator[datetime]:
+        """Generate occurrences on or after ``start``, lazily and in order.
+
+        Whole periods before ``start`` are skipped without generating their
+        occurrences.
+
+        Args:
+            due: An occurrence to count from
+            start: Earliest occurrence wanted
+
+        Yields:
+            Occurrences until the rule ends (forever if it does not)
+        """
+        if due < start:
+            due += self.period * ((start - due) // self.period)
+        current: datetime | None = self._in_range(due)
+        while current is not None:
+            if current >= start:
+                yield current
+            current = self.following(current)
+
+    def describe(self) -> str:
+        """Describe the rule, e.g. "every 2 weeks on Mon, Wed until 2025-12-12"."""
+        unit = self.unit if self.every == 1 else f"{self.every} {self.unit}s"
+        text = f"every {unit}"
+        if self.weekdays:
+            text += " on " + ", ".join(WEEKDAY_NAMES[day] for day in self.weekdays)
+        if self.until:
+            text += f" until {self.until.isoformat()}"
+        return text
+
+    model_config = {"frozen": False}
+
+
 class Task(BaseModel):
     """An actionable item with optional deadline, priority, and subtasks.
 
@@ -36,6 +150,7 @@ class Task(BaseModel):
         course: Course assignment (None = inbox)
         linked_notes: Note IDs providing context for this task
         subtasks: Nested subtasks
+        recurrence: Rule repeating the due date (None = one-off task)
     """
 
     id: str = Field(..., pattern=r"^t\d+$")
@@ -48,6 +163,7 @@ class Task(BaseModel):
     course: str | None = Field(None, min_length=1, max_length=100)
     linked_notes: list[str] = Field(default_factory=list)
     subtasks: list[Subtask] = Field(default_factory=list)
+    recurrence: Recurrence | None = None
 
     @field_validator("completed_at")
     @classmethod
@@ -66,6 +182,13 @@ class Task(BaseModel):
                 raise ValueError("Subtask IDs must be unique")
         return self
 
+    @model_validator(mode="after")
+    def validate_recurrence(self) -> "Task":
+        """Ensure recurring tasks have a due date to repeat."""
+        if self.recurrence is not None and self.due_date is None:
+            raise ValueError("Recurring tasks need a due date")
+        return self
+
     @property
     def is_overdue(self) -> bool:
         """Check if task is overdue."""
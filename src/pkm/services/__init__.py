@@ -1 +1,8 @@
-"""Services package for business logic."""
+"""Services package for business logic.
+
+Importing it registers the services' part of every commit with the store:
+the search index sidecar and the updates for drained captures (see
+``pkm.storage.json_store.on_commit`` and ``on_capture``).
+"""
+
+from pkm.services import mutations, query_index  # noqa: F401
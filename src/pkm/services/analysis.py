@@ -0,0 +1,224 @@
+"""Text analysis for the search index.
+
+Indexed text and query text go through the same analyzer, so that both end
+up as the same terms. An analyzer is a chain of steps:
+
+- ``fold``: Unicode case folding and accent stripping
+  ("Schrödinger" -> "schrodinger")
+- ``cjk``: runs of Chinese, Japanese or Korean characters become
+  overlapping two-character terms, since these scripts do not put spaces
+  between words ("光合作用" -> "光合", "合作", "作用")
+- ``stopwords``: common English words are dropped (they still take up a
+  position, so phrases keep their shape)
+- ``stem``: light English stemming of plurals ("cells" -> "cell")
+
+The chain is chosen with ``PKM_ANALYZER`` (step names separated by commas;
+empty for plain lowercase words) and defaults to every step. Steps always
+run in the order above.
+
+Folding maps each character to exactly one character, so character offsets
+in folded text are offsets in the original text too. Analyzed characters
+and terms are memoized per analyzer, so each distinct word is analyzed once
+per process. Across processes the analysis is kept in the search index
+(see pkm.storage.search_index): every record's words, and the words behind
+each stemmed term, stored under the analyzer steps they were made with, so
+a query analyzes its own text and only the records it has to highlight.
+"""
+
+import os
+import re
+import unicodedata
+from collections.abc import Iterable, Iterator
+
+ANALYZER_STEPS: tuple[str, ...] = ("fold", "cjk", "stopwords", "stem")
+
+# Lucene's English stopword set
+STOPWORDS = frozenset(
+    "a an and are as at be but by for if in into is it no not of on or such that the their "
+    "then there these they this to was will with".split()
+)
+
+# Hiragana, Katakana, CJK Unified Ideographs (and Extension A), Hangul syllables,
+# CJK Compatibility Ideographs
+_CJK = "\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\uf900-\ufaff"
+_TOKEN = re.compile(rf"(?P<cjk>[{_CJK}]+)|(?:(?![{_CJK}])\w)+")
+_WORD = re.compile(r"\w+")
+
+# Memoized terms kept per analyzer before the memo is cleared
+_MEMO_SIZE = 100_000
+
+_analyzers: dict[tuple[str, ...], "Analyzer"] = {}
+
+
+def stem(word: str) -> str:
+    """Strip English plural endings (an S-stemmer).
+
+    Args:
+        word: Lowercase word
+
+    Returns:
+        Stemmed word ("studies" -> "study", "cells" -> "cell")
+    """
+    if len(word) <= 3:
+        return word
+    if word.endswith("ies") and not word.endswith(("eies", "aies")):
+        return word[:-3] + "y"
+    if word.endswith("sses"):
+        return word[:-2]
+    if word.endswith("es") and not word.endswith(("aes", "ees", "oes")):
+        return word[:-1]
+    if word.endswith("s") and not word.endswith(("us", "ss", "is")):
+        return word[:-1]
+    return word
+
+
+class Analyzer:
+    """Turns text into index terms."""
+
+    def __init__(self, steps: Iterable[str] = ANALYZER_STEPS) -> None:
+        """Create an analyzer.
+
+        Args:
+            steps: Names of the steps to run (see ``ANALYZER_STEPS``)
+
+        Raises:
+            ValueError: If a step is unknown
+        """
+        steps = set(steps)
+        unknown = steps - set(ANALYZER_STEPS)
+        if unknown:
+            raise ValueError(f"Unknown analyzer step: {', '.join(sorted(unknown))}")
+        self.steps = tuple(s for s in ANALYZER_STEPS if s in steps)
+        self._token = _TOKEN if "cjk" in self.steps else _WORD
+        self._chars: dict[str, str] = {}
+        self._terms: dict[str, str | None] = {}
+
+    def normalize(self, text: str) -> str:
+        """Lowercase (or fold) text, one character for each character.
+
+        Args:
+            text: Any text
+
+        Returns:
+            Text of the same length
+        """
+        if text.isascii():
+            return text.lower()
+        chars = self._chars
+        return "".join(chars.get(c) or self._char(c) for c in text)
+
+    def _char(self, char: str) -> str:
+        folded = char.casefold() if "fold" in self.steps else char.lower()
+        if len(folded) != 1:
+            folded = char.lower() if len(char.lower()) == 1 else char
+        if "fold" in self.steps:
+            decomposed = unicodedata.normalize("NFD", folded)
+            if all(unicodedata.combining(c) for c in decomposed[1:]):
+                folded = decomposed[0]
+        self._chars[char] = folded
+        return folded
+
+    def term(self, word: str) -> str | None:
+        """Analyze one normalized word.
+
+        Args:
+            word: Normalized word characters
+
+        Returns:
+            Index term, or None if the word is a stopword
+        """
+        if word in self._terms:
+            return self._terms[word]
+        if len(self._terms) >= _MEMO_SIZE:
+            self._terms.clear()
+        term: str | None = word
+        if "stopwords" in self.steps and word in STOPWORDS:
+            term = None
+        elif "stem" in self.steps:
+            term = stem(word)
+        self._terms[word] = term
+        return term
+
+    def scan(self, text: str) -> Iterator[tuple[str, str | None, int]]:
+        """Split normalized text into words and their terms, one per position.
+
+        Args:
+            text: Normalized text (see ``normalize``)
+
+        Yields:
+            (word, term, character offset) triples; the word is the text at
+            the position (two characters within CJK), the term is None for a
+            stopword
+        """
+        pattern = _WORD if text.isascii() else self._token
+        for match in pattern.finditer(text):
+            start = match.start()
+            if match.lastgroup == "cjk":
+                run = match.group()
+                if len(run) == 1:
+                    yield run, run, start
+                for i in range(len(run) - 1):
+                    yield run[i : i + 2], run[i : i + 2], start + i
+            else:
+                word = match.group()
+                yield word, self.term(word), start
+
+    def tokens(self, text: str) -> Iterator[tuple[str | None, int]]:
+        """Split normalized text into terms, one per position.
+
+        Args:
+            text: Normalized text (see ``normalize``)
+
+        Yields:
+            (term, character offset) pairs; the term is None for a stopword
+        """
+        for _, term, start in self.scan(text):
+            yield term, start
+
+    def terms(self, text: str) -> list[str]:
+        """Analyze text into its terms, stopwords left out.
+
+        Args:
+            text: Any text
+
+        Returns:
+            Index terms in order
+        """
+        return [term for term, _ in self.tokens(self.normalize(text)) if term is not None]
+
+    def token_end(self, text: str, start: int) -> int:
+        """Find where the token starting at ``start`` ends.
+
+        Args:
+            text: Normalized text
+            start: Offset of a token
+
+        Returns:
+            Offset just past the token (two characters at most within CJK)
+        """
+        match = self._token.match(text, start)
+        if match is None:
+            return start
+        if match.lastgroup == "cjk":
+            return min(match.end(), start + 2)
+        return match.end()
+
+
+def default_analyzer() -> Analyzer:
+    """Get the analyzer configured with ``PKM_ANALYZER``.
+
+    Unknown step names are ignored. Analyzers are shared, so their memos
+    last for the whole process.
+
+    Returns:
+        Analyzer running the configured steps (all steps if unset)
+    """
+    value = os.environ.get("PKM_ANALYZER")
+    if value is None:
+        steps = ANALYZER_STEPS
+    else:
+        names = {name.strip().lower() for name in value.split(",")}
+        steps = tuple(s for s in ANALYZER_STEPS if s in names)
+    if steps not in _analyzers:
+        _analyzers[steps] = Analyzer(steps)
+    return _analyzers[steps]
@@ -1,10 +1,19 @@
 """Course service for managing courses."""
 
+from datetime import date
 from pathlib import Path
 
 from pkm.models.course import Course
+from pkm.services.course_stats import (
+    course_from_stats,
+    ensure_course_stats,
+    merge_course_stats,
+    rebuild_course_stats,
+)
 from pkm.services.note_service import NoteService
+from pkm.services.saved_views import invalidate_saved_views
 from pkm.services.task_service import TaskService
+from pkm.storage.course_registry import CourseRegistry
 from pkm.storage.json_store import JSONStore
 
 
@@ -22,31 +31,28 @@ class CourseService:
         self.task_service = TaskService(data_dir)
 
     def list_courses(self) -> list[Course]:
-        """List all courses with note and task counts.
+        """List all courses with note and task statistics.
+
+        Statistics are read from the incrementally maintained ``course_stats``
+        section, so this is O(number of courses) rather than a scan of every
+        note and task. Files written before that section existed are
+        upgraded once here.
 
         Returns:
-            List of courses with metadata
+            List of courses with metadata, sorted by name
         """
         data = self.store.load()
-        courses: dict[str, Course] = {}
-
-        # Count notes by course
-        for note_data in data["notes"]:
-            course_name = note_data.get("course")
-            if course_name:
-                if course_name not in courses:
-                    courses[course_name] = Course(name=course_name, note_count=0, task_count=0)
-                courses[course_name].note_count += 1
-
-        # Count tasks by course
-        for task_data in data["tasks"]:
-            course_name = task_data.get("course")
-            if course_name:
-                if course_name not in courses:
-                    courses[course_name] = Course(name=course_name, note_count=0, task_count=0)
-                courses[course_name].task_count += 1
-
-        return sorted(courses.values(), key=lambda c: c.name)
+        if "course_stats" not in data:
+            rebuild_course_stats(data)
+            self.store.save(data)
+
+        courses = CourseRegistry(data)
+        today = date.today()
+        summaries = [
+            course_from_stats(course_id, courses.name_of(course_id) or course_id, entry, today)
+            for course_id, entry in data["course_stats"].items()
+        ]
+        return sorted(summaries, key=lambda c: c.name)
 
     def get_course(self, course_name: str) -> Course | None:
         """Get a course with counts.
@@ -57,8 +63,59 @@ class CourseService:
         Returns:
             Course if exists, None otherwise
         """
-        courses = self.list_courses()
-        for course in courses:
-            if course.name == course_name:
-                return course
-        return None
+        data = self.store.load()
+        course_id = CourseRegistry(data).id_of(course_name)
+        entry = ensure_course_stats(data).get(course_id) if course_id else None
+        if course_id is None or entry is None:
+            return None
+        return course_from_stats(course_id, course_name, entry, date.today())
+
+    def rename_course(self, old_name: str, new_name: str) -> Course | None:
+        """Rename a course.
+
+        Only the registry entry changes; notes and tasks reference the course
+        by ID and pick up the new name automatically.
+
+        Args:
+            old_name: Current course name
+            new_name: New course name
+
+        Returns:
+            Renamed course if found, None otherwise
+
+        Raises:
+            ValueError: If another course already uses ``new_name``
+        """
+        data = self.store.load()
+        if CourseRegistry(data).rename(old_name, new_name) is None:
+            return None
+
+        invalidate_saved_views(data)
+        self.store.save(data)
+        return self.get_course(new_name) or Course(name=new_name)
+
+    def merge_courses(self, source_name: str, target_name: str) -> Course | None:
+        """Merge one course into another.
+
+        The source becomes an alias of the target in the registry, so items
+        are not rewritten; their statistics are folded into the target.
+
+        Args:
+            source_name: Course to merge away
+            target_name: Course that absorbs the source
+
+        Returns:
+            Merged target course if both exist, None otherwise
+
+        Raises:
+            ValueError: If source and target are the same course
+        """
+        data = self.store.load()
+        merged = CourseRegistry(data).merge(source_name, target_name)
+        if merged is None:
+            return None
+
+        merge_course_stats(data, *merged)
+        invalidate_saved_views(data)
+        self.store.save(data)
+        return self.get_course(target_name) or Course(name=target_name)
@@ -0,0 +1,199 @@
+"""Incrementally maintained per-course statistics.
+
+Aggregates live in the ``course_stats`` section of the data file, keyed by
+canonical course ID, and are updated by the note and task services on every
+mutation, so listing courses never has to walk the note and task arrays.
+
+Each entry has the shape::
+
+    {
+        "note_count": 3,
+        "task_count": 5,
+        "open_count": 4,
+        "completed_count": 1,
+        "open_due": ["2025-11-20", "2025-12-01"],  # sorted due dates of open tasks
+        "last_activity": "2025-11-23T10:00:00",
+    }
+
+Overdue counts depend on the current date, so they are derived on read by
+bisecting ``open_due`` rather than stored.
+"""
+
+from bisect import bisect_left, insort
+from datetime import date, datetime
+from typing import Any
+
+from pkm.models.course import Course
+from pkm.storage.course_registry import CourseRegistry
+from pkm.storage.schema import DataSchema
+
+
+def _empty_entry() -> dict[str, Any]:
+    """Create a zeroed statistics entry."""
+    return {
+        "note_count": 0,
+        "task_count": 0,
+        "open_count": 0,
+        "completed_count": 0,
+        "open_due": [],
+        "last_activity": None,
+    }
+
+
+def _record_activity(record: dict[str, Any]) -> str | None:
+    """Get the latest timestamp stored on a raw record."""
+    stamps = [record.get(key) for key in ("created_at", "modified_at", "completed_at")]
+    return max((s for s in stamps if s), default=None)
+
+
+def _bump_activity(entry: dict[str, Any], stamp: str | None) -> None:
+    """Move an entry's last activity forward to ``stamp``."""
+    if stamp and (entry["last_activity"] is None or stamp > entry["last_activity"]):
+        entry["last_activity"] = stamp
+
+
+def _apply(
+    stats: dict[str, dict[str, Any]],
+    courses: CourseRegistry,
+    kind: str,
+    record: dict[str, Any],
+    sign: int,
+) -> None:
+    """Add (sign=1) or remove (sign=-1) one record's contribution."""
+    course = courses.resolve(record.get("course_id"))
+    if not course:
+        return
+
+    entry = stats.setdefault(course, _empty_entry())
+
+    if kind == "note":
+        entry["note_count"] += sign
+    else:
+        entry["task_count"] += sign
+        if record.get("completed"):
+            entry["completed_count"] += sign
+        else:
+            entry["open_count"] += sign
+            due = record.get("due_date")
+            if due:
+                day = due[:10]
+                if sign > 0:
+                    insort(entry["open_due"], day)
+                else:
+                    pos = bisect_left(entry["open_due"], day)
+                    if pos < len(entry["open_due"]) and entry["open_due"][pos] == day:
+                        del entry["open_due"][pos]
+
+    if entry["note_count"] <= 0 and entry["task_count"] <= 0:
+        del stats[course]
+
+
+def rebuild_course_stats(data: DataSchema) -> dict[str, dict[str, Any]]:
+    """Recompute all course statistics from the records in one pass.
+
+    Args:
+        data: Loaded data schema
+
+    Returns:
+        Fresh statistics keyed by course (also stored on ``data``)
+    """
+    courses = CourseRegistry(data)
+    stats: dict[str, dict[str, Any]] = {}
+    for kind, records in (("note", data["notes"]), ("task", data["tasks"])):
+        for record in records:
+            _apply(stats, courses, kind, record, 1)
+            course = courses.resolve(record.get("course_id"))
+            if course:
+                _bump_activity(stats[course], _record_activity(record))
+    data["course_stats"] = stats
+    return stats
+
+
+def ensure_course_stats(data: DataSchema) -> dict[str, dict[str, Any]]:
+    """Get the statistics section, building it for files that predate it.
+
+    Args:
+        data: Loaded data schema
+
+    Returns:
+        Statistics keyed by course
+    """
+    if "course_stats" not in data:
+        return rebuild_course_stats(data)
+    return data["course_stats"]
+
+
+def record_change(
+    data: DataSchema, kind: str, before: dict[str, Any] | None, after: dict[str, Any] | None
+) -> None:
+    """Update course statistics for a single record mutation.
+
+    Must be called after the mutation has been applied to ``data``.
+
+    Args:
+        data: Loaded data schema (updated in place)
+        kind: "note" or "task"
+        before: Raw record before the change (None on create)
+        after: Raw record after the change (None on delete)
+    """
+    courses = CourseRegistry(data)
+    if "course_stats" in data:
+        stats = data["course_stats"]
+        if before is not None:
+            _apply(stats, courses, kind, before, -1)
+        if after is not None:
+            _apply(stats, courses, kind, after, 1)
+    else:
+        # Older file: a full rebuild already reflects this mutation
+        stats = rebuild_course_stats(data)
+
+    now = datetime.now().isoformat()
+    for record in (before, after):
+        course = courses.resolve(record.get("course_id")) if record else None
+        if course and course in stats:
+            _bump_activity(stats[course], now)
+
+
+def merge_course_stats(data: DataSchema, source_id: str, target_id: str) -> None:
+    """Fold one course's statistics into another after a merge.
+
+    Args:
+        data: Loaded data schema (updated in place)
+        source_id: Course ID that was merged away
+        target_id: Course ID that absorbed it
+    """
+    stats = ensure_course_stats(data)
+    source = stats.pop(source_id, None)
+    if source is None:
+        return
+
+    target = stats.setdefault(target_id, _empty_entry())
+    for key in ("note_count", "task_count", "open_count", "completed_count"):
+        target[key] += source[key]
+    target["open_due"] = sorted(target["open_due"] + source["open_due"])
+    _bump_activity(target, source["last_activity"])
+
+
+def course_from_stats(course_id: str, name: str, entry: dict[str, Any], today: date) -> Course:
+    """Build a Course summary from a statistics entry.
+
+    Args:
+        course_id: Canonical course ID
+        name: Course name
+        entry: Statistics entry
+        today: Date used to decide which open tasks are overdue
+
+    Returns:
+        Course with counts filled in
+    """
+    last_activity = entry.get("last_activity")
+    return Course(
+        id=course_id,
+        name=name,
+        note_count=entry["note_count"],
+        task_count=entry["task_count"],
+        open_count=entry["open_count"],
+        completed_count=entry["completed_count"],
+        overdue_count=bisect_left(entry["open_due"], today.isoformat()),
+        last_activity=datetime.fromisoformat(last_activity) if last_activity else None,
+    )
@@ -0,0 +1,32 @@
+"""Record filters for the streaming query API.
+
+Filters are predicates over raw (serialized) note and task records, used with
+``NoteService.iter_notes`` and ``TaskService.iter_tasks`` so that records are
+only validated into models once they are known to match.
+"""
+
+from collections.abc import Iterable
+from typing import Any
+
+from pkm.storage.schema import RecordFilter
+
+
+def in_inbox(record: dict[str, Any]) -> bool:
+    """Match records without a course assignment."""
+    return record.get("course_id") is None
+
+
+def in_course(course_ids: Iterable[str]) -> RecordFilter:
+    """Build a filter matching records assigned to a course.
+
+    Args:
+        course_ids: Stored IDs of the course, including merge aliases
+            (see ``CourseRegistry.ids_for``)
+    """
+    ids = frozenset(course_ids)
+    return lambda record: record.get("course_id") in ids
+
+
+def has_topic(topic_name: str) -> RecordFilter:
+    """Build a filter matching notes tagged with a topic."""
+    return lambda record: topic_name in record.get("topics", [])
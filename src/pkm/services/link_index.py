@@ -0,0 +1,335 @@
+"""Bidirectional link index between tasks and notes."""
+
+from dataclasses import dataclass
+from typing import Any
+
+from pkm.storage.schema import DataSchema
+
+
+@dataclass(frozen=True)
+class LinkIssue:
+    """An inconsistency found between ``linked_notes`` and ``linked_from_tasks``.
+
+    Attributes:
+        kind: One of "dangling_note", "dangling_task", "missing_backlink",
+            "missing_forward_link" or "duplicate"
+        task_id: Task side of the link
+        note_id: Note side of the link
+    """
+
+    kind: str
+    task_id: str
+    note_id: str
+
+
+class LinkIndex:
+    """Task <-> note links over loaded storage records.
+
+    Linking, unlinking and cascade deletes work from the link lists stored
+    on the records themselves, so they touch only the records involved. The
+    ID -> position maps take one pass over the IDs when first needed, and
+    after a delete they are rebuilt only if another lookup follows.
+
+    The adjacency maps walk every link list, so they are built only for
+    ``check`` and ``repair`` (and kept in sync by later mutations). A link
+    is considered valid when both endpoints exist and at least one side
+    records it; ``check`` reports every record that disagrees with that view
+    and ``repair`` rewrites the records to match it. Until then, cascade
+    deletes follow only the links the deleted record itself lists.
+    """
+
+    def __init__(self, data: DataSchema) -> None:
+        """Wrap loaded data; nothing is scanned yet.
+
+        Args:
+            data: Loaded data schema (records are mutated in place)
+        """
+        self.data = data
+        self._note_pos: dict[str, int] | None = None
+        self._task_pos: dict[str, int] | None = None
+        # Ordered sets (dict keys) so link order is preserved on repair
+        self._task_notes: dict[str, dict[str, None]] | None = None
+        self._note_tasks: dict[str, dict[str, None]] | None = None
+
+    @property
+    def note_pos(self) -> dict[str, int]:
+        """Position of each note in ``data["notes"]``."""
+        if self._note_pos is None:
+            self._note_pos = {n["id"]: i for i, n in enumerate(self.data["notes"])}
+        return self._note_pos
+
+    @property
+    def task_pos(self) -> dict[str, int]:
+        """Position of each task in ``data["tasks"]``."""
+        if self._task_pos is None:
+            self._task_pos = {t["id"]: i for i, t in enumerate(self.data["tasks"])}
+        return self._task_pos
+
+    @property
+    def task_notes(self) -> dict[str, dict[str, None]]:
+        """Valid links of each task, from either side."""
+        if self._task_notes is None:
+            self._task_notes, self._note_tasks = self._build_adjacency()
+        return self._task_notes
+
+    @property
+    def note_tasks(self) -> dict[str, dict[str, None]]:
+        """Valid links of each note, from either side."""
+        if self._note_tasks is None:
+            self._task_notes, self._note_tasks = self._build_adjacency()
+        return self._note_tasks
+
+    def _build_adjacency(self) -> tuple[dict[str, dict[str, None]], dict[str, dict[str, None]]]:
+        """Build both adjacency maps in one pass over every link list."""
+        task_notes: dict[str, dict[str, None]] = {t["id"]: {} for t in self.data["tasks"]}
+        note_tasks: dict[str, dict[str, None]] = {n["id"]: {} for n in self.data["notes"]}
+        edges = [
+            (task_data["id"], note_id)
+            for task_data in self.data["tasks"]
+            for note_id in task_data.get("linked_notes", [])
+        ] + [
+            (task_id, note_data["id"])
+            for note_data in self.data["notes"]
+            for task_id in note_data.get("linked_from_tasks", [])
+        ]
+        for task_id, note_id in edges:
+            if task_id in task_notes and note_id in note_tasks:
+                task_notes[task_id][note_id] = None
+                note_tasks[note_id][task_id] = None
+        return task_notes, note_tasks
+
+    def _add_edge(self, task_id: str, note_id: str) -> None:
+        """Record a new link in the adjacency maps, if they are built."""
+        if self._task_notes is not None and self._note_tasks is not None:
+            self._task_notes[task_id][note_id] = None
+            self._note_tasks[note_id][task_id] = None
+
+    def task_record(self, task_id: str) -> dict[str, Any] | None:
+        """Get the raw task record for an ID."""
+        pos = self.task_pos.get(task_id)
+        return None if pos is None else self.data["tasks"][pos]
+
+    def note_record(self, note_id: str) -> dict[str, Any] | None:
+        """Get the raw note record for an ID."""
+        pos = self.note_pos.get(note_id)
+        return None if pos is None else self.data["notes"][pos]
+
+    def tasks_of(self, note_id: str) -> list[str]:
+        """Get the existing tasks linked to a note.
+
+        Args:
+            note_id: Note ID
+
+        Returns:
+            Task IDs in link order (empty if the note does not exist)
+        """
+        if self._note_tasks is not None:
+            return list(self._note_tasks.get(note_id, {}))
+        note_data = self.note_record(note_id)
+        if note_data is None:
+            return []
+        linked = dict.fromkeys(note_data.get("linked_from_tasks", []))
+        return [task_id for task_id in linked if task_id in self.task_pos]
+
+    def notes_of(self, task_id: str) -> list[str]:
+        """Get the existing notes linked to a task.
+
+        Args:
+            task_id: Task ID
+
+        Returns:
+            Note IDs in link order (empty if the task does not exist)
+        """
+        if self._task_notes is not None:
+            return list(self._task_notes.get(task_id, {}))
+        task_data = self.task_record(task_id)
+        if task_data is None:
+            return []
+        linked = dict.fromkeys(task_data.get("linked_notes", []))
+        return [note_id for note_id in linked if note_id in self.note_pos]
+
+    def link(self, task_id: str, note_id: str) -> bool:
+        """Link a note to a task on both sides.
+
+        Args:
+            task_id: Task ID
+            note_id: Note ID
+
+        Returns:
+            True if both endpoints exist, False otherwise
+        """
+        task_data = self.task_record(task_id)
+        note_data = self.note_record(note_id)
+        if task_data is None or note_data is None:
+            return False
+
+        linked_notes = task_data.setdefault("linked_notes", [])
+        if note_id not in linked_notes:
+            linked_notes.append(note_id)
+        linked_tasks = note_data.setdefault("linked_from_tasks", [])
+        if task_id not in linked_tasks:
+            linked_tasks.append(task_id)
+
+        self._add_edge(task_id, note_id)
+        return True
+
+    def unlink(self, task_id: str, note_id: str) -> bool:
+        """Remove a link between a task and a note on both sides.
+
+        Args:
+            task_id: Task ID
+            note_id: Note ID
+
+        Returns:
+            True if the task exists, False otherwise
+        """
+        task_data = self.task_record(task_id)
+        if task_data is None:
+            return False
+
+        task_data["linked_notes"] = [
+            n for n in task_data.get("linked_notes", []) if n != note_id
+        ]
+        note_data = self.note_record(note_id)
+        if note_data is not None:
+            note_data["linked_from_tasks"] = [
+                t for t in note_data.get("linked_from_tasks", []) if t != task_id
+            ]
+
+        if self._task_notes is not None and self._note_tasks is not None:
+            self._task_notes[task_id].pop(note_id, None)
+            self._note_tasks.get(note_id, {}).pop(task_id, None)
+        return True
+
+    def remove_note(self, note_id: str) -> bool:
+        """Delete a note record and strip it from every task linking to it.
+
+        Args:
+            note_id: Note ID to delete
+
+        Returns:
+            True if deleted, False if not found
+        """
+        pos = self.note_pos.get(note_id)
+        if pos is None:
+            return False
+
+        for task_id in self.tasks_of(note_id):
+            task_data = self.data["tasks"][self.task_pos[task_id]]
+            task_data["linked_notes"] = [
+                n for n in task_data.get("linked_notes", []) if n != note_id
+            ]
+            if self._task_notes is not None:
+                self._task_notes[task_id].pop(note_id, None)
+
+        del self.data["notes"][pos]
+        if self._note_tasks is not None:
+            del self._note_tasks[note_id]
+        if pos == len(self.data["notes"]):
+            del self.note_pos[note_id]
+        else:
+            self._note_pos = None  # later notes moved up
+        return True
+
+    def remove_task(self, task_id: str) -> bool:
+        """Delete a task record and strip it from every note it links to.
+
+        Args:
+            task_id: Task ID to delete
+
+        Returns:
+            True if deleted, False if not found
+        """
+        pos = self.task_pos.get(task_id)
+        if pos is None:
+            return False
+
+        for note_id in self.notes_of(task_id):
+            note_data = self.data["notes"][self.note_pos[note_id]]
+            note_data["linked_from_tasks"] = [
+                t for t in note_data.get("linked_from_tasks", []) if t != task_id
+            ]
+            if self._note_tasks is not None:
+                self._note_tasks[note_id].pop(task_id, None)
+
+        del self.data["tasks"][pos]
+        if self._task_notes is not None:
+            del self._task_notes[task_id]
+        if pos == len(self.data["tasks"]):
+            del self.task_pos[task_id]
+        else:
+            self._task_pos = None  # later tasks moved up
+        return True
+
+    def check(self) -> list[LinkIssue]:
+        """Find every record whose link lists disagree with the index.
+
+        Returns:
+            List of issues, in task order then note order
+        """
+        issues: list[LinkIssue] = []
+
+        for task_data in self.data["tasks"]:
+            task_id = task_data["id"]
+            problems = self._diff(
+                task_data.get("linked_notes", []),
+                self.task_notes[task_id],
+                self.note_tasks,
+                ("dangling_note", "missing_forward_link"),
+            )
+            issues.extend(LinkIssue(kind, task_id, note_id) for kind, note_id in problems)
+
+        for note_data in self.data["notes"]:
+            note_id = note_data["id"]
+            problems = self._diff(
+                note_data.get("linked_from_tasks", []),
+                self.note_tasks[note_id],
+                self.task_notes,
+                ("dangling_task", "missing_backlink"),
+            )
+            issues.extend(LinkIssue(kind, task_id, note_id) for kind, task_id in problems)
+
+        return issues
+
+    @staticmethod
+    def _diff(
+        recorded: list[str],
+        expected: dict[str, None],
+        existing: dict[str, dict[str, None]],
+        kinds: tuple[str, str],
+    ) -> list[tuple[str, str]]:
+        """Compare one record's link list against its adjacency set.
+
+        Args:
+            recorded: Link list stored on the record
+            expected: Valid links for the record according to the index
+            existing: Adjacency map of the other side (to detect dangling IDs)
+            kinds: Issue kinds to report for (dangling, missing) links
+
+        Returns:
+            (kind, other_id) pairs
+        """
+        dangling_kind, missing_kind = kinds
+        problems: list[tuple[str, str]] = []
+        seen: set[str] = set()
+        for other_id in recorded:
+            if other_id in seen:
+                problems.append(("duplicate", other_id))
+            elif other_id not in existing:
+                problems.append((dangling_kind, other_id))
+            seen.add(other_id)
+        problems.extend((missing_kind, other_id) for other_id in expected if other_id not in seen)
+        return problems
+
+    def repair(self) -> list[LinkIssue]:
+        """Rewrite every record's link lists to match the index.
+
+        Returns:
+            The issues that were repaired
+        """
+        issues = self.check()
+        for task_data in self.data["tasks"]:
+            task_data["linked_notes"] = list(self.task_notes[task_data["id"]])
+        for note_data in self.data["notes"]:
+            note_data["linked_from_tasks"] = list(self.note_tasks[note_data["id"]])
+        return issues
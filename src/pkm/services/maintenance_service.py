@@ -0,0 +1,288 @@
+"""Maintenance operations that stream the data file.
+
+Export, integrity checks and archiving each look at every record once, so
+they read ``data.json`` through the incremental reader in
+``pkm.storage.stream`` instead of loading it. Memory use stays proportional
+to the largest record (plus sets of IDs) however large the file grows.
+"""
+
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import IO, Any
+
+from pkm.services.saved_views import forget_records
+from pkm.storage.checksum import CHECKSUM_KEY, checksum_ok
+from pkm.storage.course_registry import CourseRegistry, decode_course
+from pkm.storage.fileops import REAL_FILE_OPS
+from pkm.storage.json_store import JSONStore
+from pkm.storage.stream import (
+    RECORD_SECTIONS,
+    iter_document,
+    iter_records,
+    read_header,
+    rewrite_file,
+)
+
+# Record type written on each exported line, by section
+RECORD_TYPES = {"notes": "note", "tasks": "task"}
+
+# Fields holding the links on each side, by section
+LINK_FIELDS = {"notes": "linked_from_tasks", "tasks": "linked_notes"}
+
+
+@dataclass(frozen=True)
+class FsckIssue:
+    """One problem found by an integrity check.
+
+    Attributes:
+        kind: "damaged", "checksum", "missing_id", "duplicate_id",
+            "unknown_course", "dangling_link" or "one_sided_link"
+        section: "notes" or "tasks" ("" for whole-file problems)
+        record_id: Affected record ("" if unknown)
+        detail: Human-readable specifics
+    """
+
+    kind: str
+    section: str
+    record_id: str
+    detail: str
+
+
+def _line_id(line: str) -> str | None:
+    """Get the record ID of an archive line (None if the line is torn)."""
+    try:
+        entry = json.loads(line)
+    except json.JSONDecodeError:
+        return None
+    record_id = entry.get("id") if isinstance(entry, dict) else None
+    return record_id if isinstance(record_id, str) else None
+
+
+class _Checker:
+    """Accumulates integrity state while records stream past."""
+
+    def __init__(self) -> None:
+        self.issues: list[FsckIssue] = []
+        self.ids: dict[str, set[str]] = {s: set() for s in RECORD_SECTIONS}
+        # (task_id, note_id) pairs as recorded on each side
+        self.links: dict[str, set[tuple[str, str]]] = {s: set() for s in RECORD_SECTIONS}
+        self.course_refs: dict[str, tuple[str, str]] = {}
+        self.records = 0
+
+    def check_record(self, section: str, record: dict[str, Any]) -> None:
+        """Check one record and remember its IDs and links."""
+        self.records += 1
+        record_id = record.get("id")
+        if not isinstance(record_id, str):
+            self.issues.append(FsckIssue("missing_id", section, "", "Record has no ID"))
+            return
+        if not checksum_ok(record):
+            self.issues.append(
+                FsckIssue("checksum", section, record_id, "Content does not match checksum")
+            )
+        if record_id in self.ids[section]:
+            self.issues.append(FsckIssue("duplicate_id", section, record_id, "ID used twice"))
+        self.ids[section].add(record_id)
+
+        course_id = record.get("course_id")
+        if course_id:
+            self.course_refs.setdefault(course_id, (section, record_id))
+
+        for other in record.get(LINK_FIELDS[section], []):
+            pair = (record_id, other) if section == "tasks" else (other, record_id)
+            self.links[section].add(pair)
+
+    def finish(self, header: dict[str, Any]) -> list[FsckIssue]:
+        """Run the checks that need every record, then return all issues."""
+        courses = {entry.get("id") for entry in header.get("courses", [])}
+        for course_id, (section, record_id) in self.course_refs.items():
+            if course_id not in courses:
+                self.issues.append(
+                    FsckIssue("unknown_course", section, record_id, f"Unknown course {course_id}")
+                )
+
+        notes, tasks = self.ids["notes"], self.ids["tasks"]
+        for section, pairs, other in (
+            ("tasks", self.links["tasks"], self.links["notes"]),
+            ("notes", self.links["notes"], self.links["tasks"]),
+        ):
+            for task_id, note_id in sorted(pairs):
+                record_id = task_id if section == "tasks" else note_id
+                if task_id not in tasks or note_id not in notes:
+                    missing = f"note {note_id}" if note_id not in notes else f"task {task_id}"
+                    kind, detail = "dangling_link", f"Links to missing {missing}"
+                elif (task_id, note_id) not in other:
+                    kind, detail = "one_sided_link", f"Link {task_id} -> {note_id} is one-sided"
+                else:
+                    continue
+                self.issues.append(FsckIssue(kind, section, record_id, detail))
+        return self.issues
+
+
+class MaintenanceService:
+    """Streaming export, integrity check and archive of the data file."""
+
+    def __init__(self, data_dir: Path) -> None:
+        """Initialize maintenance service.
+
+        Args:
+            data_dir: Directory containing data.json
+        """
+        self.data_file = data_dir / "data.json"
+        self.archive_file = data_dir / "archive.jsonl"
+        # Entries of an archive in progress, appended once the data file is rewritten
+        self.pending_file = data_dir / "archive.jsonl.pending"
+        # Captures must reach the data file before it is streamed
+        JSONStore(self.data_file).drain()
+
+    def export(self, out: IO[str], sections: tuple[str, ...] = RECORD_SECTIONS) -> dict[str, int]:
+        """Write records as JSON Lines, one note or task per line.
+
+        Course IDs are replaced by course names so the export stands alone.
+
+        Args:
+            out: Writable text file
+            sections: Record sections to export
+
+        Returns:
+            Number of records exported per section
+        """
+        courses = CourseRegistry(read_header(self.data_file))  # type: ignore[arg-type]
+        counts: dict[str, int] = {}
+        for section in sections:
+            counts[section] = 0
+            for record in iter_records(self.data_file, section):
+                record.pop(CHECKSUM_KEY, None)
+                line = {"type": RECORD_TYPES[section], **decode_course(record, courses)}
+                out.write(json.dumps(line, ensure_ascii=False, default=str) + "\n")
+                counts[section] += 1
+        return counts
+
+    def check(self) -> tuple[int, list[FsckIssue]]:
+        """Check the data file's integrity in one streaming pass.
+
+        Verifies record checksums, IDs, course references and that links
+        between tasks and notes are recorded on both sides.
+
+        Returns:
+            Number of records checked and the issues found
+        """
+        checker = _Checker()
+        header: dict[str, Any] = {}
+        try:
+            for key, value, is_record in iter_document(self.data_file):
+                if is_record:
+                    checker.check_record(key, value)
+                else:
+                    header[key] = value
+        except (json.JSONDecodeError, UnicodeDecodeError) as e:
+            damaged = FsckIssue("damaged", "", "", f"File does not parse: {e}")
+            return checker.records, checker.issues + [damaged]
+        return checker.records, checker.finish(header)
+
+    def archive(self, before: datetime, dry_run: bool = False) -> list[str]:
+        """Move tasks completed before a date into ``archive.jsonl``.
+
+        Archived tasks are appended to the archive one JSON object per line
+        and removed from the notes that link to them and from saved views.
+        Course statistics are rebuilt on next use.
+
+        The entries are first written (and synced) to a pending file, and
+        appended to the archive only after the data file has been rewritten
+        without the tasks, so a failed or interrupted archive never leaves
+        entries for tasks that are still in the data file.
+
+        Args:
+            before: Archive tasks completed before this time
+            dry_run: Report what would be archived without writing
+
+        Returns:
+            IDs of the archived tasks
+        """
+        cutoff = before.isoformat()
+        old_tasks = (
+            task
+            for task in iter_records(self.data_file, "tasks")
+            if task.get("completed") and (task.get("completed_at") or "") < cutoff
+        )
+        if dry_run:
+            return [task["id"] for task in old_tasks]
+
+        self._settle_pending()
+        stamp = datetime.now().isoformat()
+        archived = []
+        with open(self.pending_file, "w", encoding="utf-8") as pending:
+            for task in old_tasks:
+                archived.append(task["id"])
+                task.pop(CHECKSUM_KEY, None)
+                pending.write(json.dumps({**task, "archived_at": stamp}, default=str) + "\n")
+        if not archived:
+            self.pending_file.unlink()
+            return archived
+        REAL_FILE_OPS.fsync(self.pending_file)
+
+        archived_ids = set(archived)
+        header = read_header(self.data_file)
+        header.pop("course_stats", None)
+        forget_records(header, archived_ids)
+
+        def transform(section: str, record: dict[str, Any]) -> dict[str, Any] | None:
+            if section == "notes":
+                backlinks = record.get("linked_from_tasks", [])
+                record["linked_from_tasks"] = [t for t in backlinks if t not in archived_ids]
+                return record
+            return None if record.get("id") in archived_ids else record
+
+        try:
+            rewrite_file(self.data_file, transform, lambda: header)
+        except BaseException:
+            self._settle_pending()  # the rewrite may have failed after its rename
+            raise
+        self._append_pending()
+        return archived
+
+    def _settle_pending(self) -> None:
+        """Finish or drop an archive that was interrupted.
+
+        If the tasks of a leftover pending file are gone from the data file,
+        its rewrite completed, so the entries are appended (skipping any that
+        already were); otherwise the rewrite never happened and the pending
+        entries are dropped.
+        """
+        if not self.pending_file.exists():
+            return
+        with open(self.pending_file, "r", encoding="utf-8") as pending:
+            pending_ids = {_line_id(line) for line in pending} - {None}
+        live = {task.get("id") for task in iter_records(self.data_file, "tasks")}
+        if pending_ids and not pending_ids & live:
+            self._append_pending(skip_archived=True)
+        else:
+            self.pending_file.unlink()
+
+    def _append_pending(self, skip_archived: bool = False) -> None:
+        """Append the pending entries to the archive and remove the pending file.
+
+        Args:
+            skip_archived: Skip entries whose task is already in the archive
+                (after an interrupted append)
+        """
+        skip: set[str | None] = set()
+        torn = False
+        if skip_archived and self.archive_file.exists():
+            with open(self.archive_file, "r", encoding="utf-8") as archive:
+                for line in archive:
+                    skip.add(_line_id(line))
+                    torn = not line.endswith("\n")
+        with (
+            open(self.pending_file, "r", encoding="utf-8") as pending,
+            open(self.archive_file, "a", encoding="utf-8") as archive,
+        ):
+            if torn:
+                archive.write("\n")
+            for line in pending:
+                if _line_id(line) not in skip:
+                    archive.write(line)
+        REAL_FILE_OPS.fsync(self.archive_file)
+        self.pending_file.unlink()
@@ -0,0 +1,55 @@
+"""One entry point for keeping derived sections current.
+
+Several sections of the data file are maintained record by record rather
+than recomputed: course statistics, saved view results, term statistics and
+near-duplicate signatures. Every service that adds, changes or deletes a
+record reports the change once to ``record_mutation``, which passes it on
+to each of them. Captures drained from the spool by the store are reported
+to ``record_capture`` instead.
+"""
+
+from typing import Any
+
+from pkm.services.course_stats import record_change
+from pkm.services.near_duplicates import record_signature_change
+from pkm.services.saved_views import record_view_change
+from pkm.services.term_stats import record_term_change
+from pkm.storage.json_store import on_capture
+from pkm.storage.schema import DataSchema
+
+_HOOKS = (record_change, record_view_change, record_term_change, record_signature_change)
+
+
+def record_mutation(
+    data: DataSchema, kind: str, before: dict[str, Any] | None, after: dict[str, Any] | None
+) -> None:
+    """Update every derived section for a single record mutation.
+
+    Must be called after the mutation has been applied to ``data``.
+
+    Args:
+        data: Loaded data schema (updated in place)
+        kind: "note" or "task"
+        before: Raw record before the change (None on create)
+        after: Raw record after the change (None on delete)
+    """
+    for hook in _HOOKS:
+        hook(data, kind, before, after)
+
+
+@on_capture
+def record_capture(data: DataSchema, kind: str, record: dict[str, Any]) -> None:
+    """Update the derived sections for a capture drained from the spool.
+
+    Course and term statistics count it like any new record; saved views
+    only list it, to be matched against the views on next use.
+
+    Args:
+        data: Loaded data schema (updated in place)
+        kind: "note" or "task"
+        record: Raw record as appended to ``data``
+    """
+    record_change(data, kind, None, record)
+    record_term_change(data, kind, None, record)
+    if "saved_views" in data:
+        data["saved_views"].setdefault("unseen", []).append(record["id"])
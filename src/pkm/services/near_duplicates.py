@@ -0,0 +1,253 @@
+"""Near-duplicate notes by MinHash and locality-sensitive hashing.
+
+Two notes are near-duplicates when their sets of character shingles (every
+run of ``SHINGLE`` characters of the lowercased words) overlap by at least
+a Jaccard similarity threshold, so a pasted snippet matches its copy even
+after small edits.
+
+Each note gets a MinHash signature of ``BANDS * ROWS`` values, made with
+one hash per shingle (one-permutation hashing: the hash picks a bin and the
+smallest value per bin is kept; empty bins borrow from the next filled one).
+The signature is cut into ``BANDS`` bands and only the hash of each band is
+stored, as hex, in the ``note_signatures`` section of the data file::
+
+    {"n1": "9f3a01c2...", "n2": ""}   # 8 hex digits per band; "" for no words
+
+Notes sharing the hash of any band are candidates, and candidates are
+checked against the exact shingle overlap. With 8 bands of 3 rows a pair
+at 0.7 similarity becomes a candidate 96.5% of the time (99.6% at 0.8) and
+a pair at 0.3 only 20% of the time, so finding every duplicate cluster is a
+pass over the band tables instead of a comparison of every pair.
+
+Signatures depend on note content only. The note service reports content
+changes to ``record_signature_change``; notes without a signature (new
+files, captures drained from the spool) are signed on next use.
+"""
+
+import re
+import zlib
+from typing import Any
+
+from pkm.storage.schema import DataSchema
+
+SHINGLE = 5
+BANDS = 8
+ROWS = 3
+THRESHOLD = 0.7
+
+_WORD = re.compile(r"\w+")
+_BINS = BANDS * ROWS
+
+
+def shingles(text: str) -> set[str]:
+    """Split text into overlapping character shingles.
+
+    Args:
+        text: Any text
+
+    Returns:
+        Shingles of the lowercased words joined by single spaces (the whole
+        text if shorter than a shingle; empty if it has no words)
+    """
+    flat = " ".join(_WORD.findall(text.casefold()))
+    if len(flat) <= SHINGLE:
+        return {flat} if flat else set()
+    return {flat[i : i + SHINGLE] for i in range(len(flat) - SHINGLE + 1)}
+
+
+def jaccard(a: set[str], b: set[str]) -> float:
+    """Compute the Jaccard similarity of two shingle sets."""
+    if not a or not b:
+        return 0.0
+    shared = len(a & b)
+    return shared / (len(a) + len(b) - shared)
+
+
+def signature(text: str) -> str:
+    """Compute the banded MinHash signature of text.
+
+    Args:
+        text: Note content
+
+    Returns:
+        ``BANDS`` band hashes as 8 hex digits each, or "" if the text has no
+        words
+    """
+    mins: list[int | None] = [None] * _BINS
+    for shingle in shingles(text):
+        h = zlib.crc32(shingle.encode())
+        slot, value = h % _BINS, h // _BINS
+        current = mins[slot]
+        if current is None or value < current:
+            mins[slot] = value
+    if all(value is None for value in mins):
+        return ""
+
+    # Densify: an empty bin takes the next filled bin's value, offset by distance
+    filled = [value if value is not None else -1 for value in mins]
+    for slot in range(_BINS):
+        step = 1
+        while filled[slot] < 0:
+            borrowed = mins[(slot + step) % _BINS]
+            if borrowed is not None:
+                filled[slot] = borrowed + step * 0x9E3779B1
+            step += 1
+
+    bands = []
+    for band in range(BANDS):
+        rows = filled[band * ROWS : (band + 1) * ROWS]
+        key = f"{band}:" + ",".join(map(str, rows))
+        bands.append(f"{zlib.crc32(key.encode()):08x}")
+    return "".join(bands)
+
+
+def band_keys(sig: str) -> list[str]:
+    """Split a stored signature into its band hashes."""
+    return [sig[i : i + 8] for i in range(0, len(sig), 8)]
+
+
+def ensure_signatures(data: DataSchema) -> bool:
+    """Sign every note that has no signature and forget deleted notes.
+
+    Args:
+        data: Loaded data schema (updated in place)
+
+    Returns:
+        True if the section changed (and should be saved)
+    """
+    section = data.setdefault("note_signatures", {})
+    changed = False
+    ids = set()
+    for record in data["notes"]:
+        ids.add(record["id"])
+        if record["id"] not in section:
+            section[record["id"]] = signature(record.get("content", ""))
+            changed = True
+    for note_id in [n for n in section if n not in ids]:
+        del section[note_id]
+        changed = True
+    return changed
+
+
+def record_signature_change(
+    data: DataSchema, kind: str, before: dict[str, Any] | None, after: dict[str, Any] | None
+) -> None:
+    """Keep signatures current for a single record mutation.
+
+    Tasks do not count, and files without signatures are left alone until
+    signatures are first used.
+
+    Args:
+        data: Loaded data schema (updated in place)
+        kind: "note" or "task"
+        before: Raw record before the change (None on create)
+        after: Raw record after the change (None on delete)
+    """
+    section = data.get("note_signatures")
+    if kind != "note" or section is None:
+        return
+    if after is None:
+        if before is not None:
+            section.pop(before["id"], None)
+        return
+    content = after.get("content", "")
+    if before is None or before.get("content", "") != content or after["id"] not in section:
+        section[after["id"]] = signature(content)
+
+
+class DuplicateIndex:
+    """Band tables over the note signatures of loaded data."""
+
+    def __init__(self, data: DataSchema) -> None:
+        """Build the band tables.
+
+        Args:
+            data: Loaded data schema; notes without a signature are signed
+                (see ``ensure_signatures``)
+        """
+        ensure_signatures(data)
+        self.records: dict[str, dict[str, Any]] = {}
+        self.position: dict[str, int] = {}
+        # One table per band: band hash -> note IDs, in note order
+        self.tables: list[dict[str, list[str]]] = [{} for _ in range(BANDS)]
+        self._shingles: dict[str, set[str]] = {}
+
+        signatures = data["note_signatures"]
+        for record in data["notes"]:
+            note_id = record["id"]
+            self.records[note_id] = record
+            self.position[note_id] = len(self.position)
+            for table, key in zip(self.tables, band_keys(signatures[note_id])):
+                table.setdefault(key, []).append(note_id)
+
+    def shingles_of(self, note_id: str) -> set[str]:
+        """Get a note's shingles (computed once per index)."""
+        if note_id not in self._shingles:
+            self._shingles[note_id] = shingles(self.records[note_id].get("content", ""))
+        return self._shingles[note_id]
+
+    def matches(self, text: str, threshold: float = THRESHOLD) -> list[tuple[str, float]]:
+        """Find the notes that are near-duplicates of some text.
+
+        Args:
+            text: Text to look up (e.g. the content of a new note)
+            threshold: Least Jaccard similarity of shingles
+
+        Returns:
+            (note ID, similarity) pairs, most similar first
+        """
+        candidates: set[str] = set()
+        for table, key in zip(self.tables, band_keys(signature(text))):
+            candidates.update(table.get(key, ()))
+
+        own = shingles(text)
+        found = []
+        for note_id in candidates:
+            similarity = jaccard(own, self.shingles_of(note_id))
+            if similarity >= threshold:
+                found.append((note_id, similarity))
+        found.sort(key=lambda pair: (-pair[1], self.position[pair[0]]))
+        return found
+
+    def clusters(self, threshold: float = THRESHOLD) -> list[list[str]]:
+        """Group all notes into clusters of near-duplicates.
+
+        Notes sharing a band are compared with the notes that started a
+        group within that band only, and groups are joined transitively, so
+        a band shared by many copies costs one comparison per copy.
+
+        Args:
+            threshold: Least Jaccard similarity of shingles
+
+        Returns:
+            Clusters of two or more note IDs, each in note order (oldest
+            first), ordered by their first note
+        """
+        parent = {note_id: note_id for note_id in self.records}
+
+        def root(note_id: str) -> str:
+            while parent[note_id] != note_id:
+                parent[note_id] = parent[parent[note_id]]
+                note_id = parent[note_id]
+            return note_id
+
+        for table in self.tables:
+            for bucket in table.values():
+                leaders: list[str] = []
+                for note_id in bucket:
+                    for leader in leaders:
+                        if root(leader) == root(note_id):
+                            break
+                        own, other = self.shingles_of(note_id), self.shingles_of(leader)
+                        if jaccard(own, other) >= threshold:
+                            parent[root(note_id)] = root(leader)
+                            break
+                    else:
+                        leaders.append(note_id)
+
+        groups: dict[str, list[str]] = {}
+        for note_id in self.records:
+            groups.setdefault(root(note_id), []).append(note_id)
+        found = [group for group in groups.values() if len(group) > 1]
+        found.sort(key=lambda group: self.position[group[0]])
+        return found
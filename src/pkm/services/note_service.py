@@ -1,14 +1,19 @@
 """Note service for note management business logic."""
 
-import re
+from collections.abc import Iterator
 from datetime import datetime
 from pathlib import Path
 
-from pkm.models.common import reset_id_counter
 from pkm.models.note import Note
-from pkm.services.id_generator import generate_note_id
+from pkm.services.filters import has_topic, in_course, in_inbox
+from pkm.services.link_index import LinkIndex
+from pkm.services.mutations import record_mutation
+from pkm.services.near_duplicates import THRESHOLD, DuplicateIndex, ensure_signatures
+from pkm.services.similarity import TfidfVectors
+from pkm.services.term_stats import has_term_stats, rebuild_term_stats
+from pkm.storage.course_registry import CourseRegistry
 from pkm.storage.json_store import JSONStore
-from pkm.storage.schema import deserialize_note, serialize_note
+from pkm.storage.schema import DataSchema, RecordFilter, deserialize_note, serialize_note
 
 
 class NoteService:
@@ -21,25 +26,26 @@ class NoteService:
             data_dir: Directory containing data.json
         """
         self.store = JSONStore(data_dir / "data.json")
-        self._initialize_id_counter()
 
-    def _initialize_id_counter(self) -> None:
-        """Initialize the ID counter based on existing notes."""
-        data = self.store.load()
-        max_id = 0
-
-        for note_data in data.get("notes", []):
-            note_id = note_data.get("id", "")
-            # Extract number from ID (e.g., "n5" -> 5)
-            match = re.match(r"n(\d+)", note_id)
-            if match:
-                num = int(match.group(1))
-                max_id = max(max_id, num)
-
-        reset_id_counter("n", max_id)
+    def _new_note(self, content: str, course: str | None, topics: list[str] | None) -> Note:
+        """Build a note with a freshly reserved ID (see pkm.storage.spool)."""
+        now = datetime.now()
+        return Note(
+            id=self.store.spool.reserve("n"),
+            content=content,
+            created_at=now,
+            modified_at=now,
+            course=course,
+            topics=topics or [],
+            linked_from_tasks=[],
+        )
 
     def create_note(
-        self, content: str, course: str | None = None, topics: list[str] | None = None
+        self,
+        content: str,
+        course: str | None = None,
+        topics: list[str] | None = None,
+        merge_duplicates: bool = False,
     ) -> Note:
         """Create a new note.
 
@@ -47,28 +53,52 @@ class NoteService:
             content: Note content
             course: Optional course assignment
             topics: Optional topic tags
+            merge_duplicates: If an existing note is a near-duplicate of the
+                content (see pkm.services.near_duplicates), add the course
+                and topics to the most similar one instead of creating a note
 
         Returns:
-            Created note
+            Created note, or the existing note merged into
         """
-        now = datetime.now()
-        note = Note(
-            id=generate_note_id(),
-            content=content,
-            created_at=now,
-            modified_at=now,
-            course=course,
-            topics=topics or [],
-            linked_from_tasks=[],
-        )
+        data = self.store.load()
+        if merge_duplicates:
+            matches = self._duplicate_index(data).matches(content)
+            if matches:
+                merged = self._merge(data, LinkIndex(data), matches[0][0], [], course, topics or [])
+                self.store.save(data)
+                return merged
+
+        note = self._new_note(content, course, topics)
 
         # Save to storage
-        data = self.store.load()
-        data["notes"].append(serialize_note(note))
+        courses = CourseRegistry(data)
+        data["notes"].append(serialize_note(note, courses))
+        record_mutation(data, "note", None, data["notes"][-1])
         self.store.save(data)
 
         return note
 
+    def capture_note(
+        self, content: str, course: str | None = None, topics: list[str] | None = None
+    ) -> Note:
+        """Capture a note without loading the data file.
+
+        The note is written to the capture spool and added to the data file
+        by the next command that loads it, so capturing takes the same time
+        however much data there is, and concurrent captures never conflict.
+
+        Args:
+            content: Note content
+            course: Optional course assignment
+            topics: Optional topic tags
+
+        Returns:
+            Captured note
+        """
+        note = self._new_note(content, course, topics)
+        self.store.spool.capture(note.model_dump(mode="json"))
+        return note
+
     def get_note(self, note_id: str) -> Note | None:
         """Get a note by ID.
 
@@ -79,19 +109,201 @@ class NoteService:
             Note if found, None otherwise
         """
         data = self.store.load()
+        courses = CourseRegistry(data)
         for note_data in data["notes"]:
             if note_data["id"] == note_id:
-                return deserialize_note(note_data)
+                return deserialize_note(note_data, courses)
         return None
 
+    def related_notes(self, note_id: str, limit: int = 5) -> list[tuple[Note, float]]:
+        """Find the notes most similar to a note by TF-IDF cosine similarity.
+
+        Term weights come from the incrementally maintained ``term_stats``
+        section (see pkm.services.similarity). Files without it, or with
+        statistics from a different analyzer, are upgraded once here.
+
+        Args:
+            note_id: Note ID
+            limit: Most notes to return
+
+        Returns:
+            (note, similarity) pairs, most similar first; empty if the note
+            does not exist or shares no terms with other notes
+        """
+        data = self.store.load()
+        if not any(n["id"] == note_id for n in data["notes"]):
+            return []
+        if not has_term_stats(data):
+            rebuild_term_stats(data)
+            self.store.save(data)
+
+        vectors = TfidfVectors(data)
+        courses = CourseRegistry(data)
+        return [
+            (deserialize_note(vectors.records[other], courses), score)
+            for other, score in vectors.neighbours(note_id, limit)
+        ]
+
+    def find_near_duplicates(
+        self, content: str, threshold: float = THRESHOLD
+    ) -> list[tuple[Note, float]]:
+        """Find existing notes that are near-duplicates of some content.
+
+        Candidates come from the locality-sensitive hash tables of the note
+        signatures, so only a few notes are compared with the content.
+
+        Args:
+            content: Content to look up
+            threshold: Least similarity (Jaccard similarity of character
+                shingles, 0 to 1)
+
+        Returns:
+            (note, similarity) pairs, most similar first
+        """
+        data = self.store.load()
+        index = self._duplicate_index(data)
+        courses = CourseRegistry(data)
+        return [
+            (deserialize_note(index.records[note_id], courses), similarity)
+            for note_id, similarity in index.matches(content, threshold)
+        ]
+
+    def duplicate_clusters(self, threshold: float = THRESHOLD) -> list[list[Note]]:
+        """Find every cluster of near-duplicate notes.
+
+        Args:
+            threshold: Least similarity (Jaccard similarity of character
+                shingles, 0 to 1)
+
+        Returns:
+            Clusters of two or more notes, oldest note first
+        """
+        data = self.store.load()
+        index = self._duplicate_index(data)
+        courses = CourseRegistry(data)
+        return [
+            [deserialize_note(index.records[note_id], courses) for note_id in cluster]
+            for cluster in index.clusters(threshold)
+        ]
+
+    def _duplicate_index(self, data: DataSchema) -> DuplicateIndex:
+        """Index note signatures, saving any that were missing.
+
+        Signatures are computed once per note, so after the first lookup
+        only new or edited notes are hashed.
+        """
+        if ensure_signatures(data):
+            self.store.save(data)
+        return DuplicateIndex(data)
+
+    def merge_notes(self, clusters: list[list[str]]) -> list[Note]:
+        """Merge each cluster of notes into its first note, deleting the others.
+
+        The kept note keeps its content. It gains the topics and task links
+        of the others, and the course of the first of them that has one if
+        it has none. All clusters are merged in one write.
+
+        Args:
+            clusters: Lists of note IDs, the note to keep first (missing IDs
+                are skipped)
+
+        Returns:
+            Merged notes, one per cluster whose first note was found
+        """
+        data = self.store.load()
+        links = LinkIndex(data)
+        merged = [
+            self._merge(data, links, keep_id, [n for n in others if n != keep_id], None, [])
+            for keep_id, *others in clusters
+            if keep_id in links.note_pos
+        ]
+        if merged:
+            self.store.save(data)
+        return merged
+
+    def _merge(
+        self,
+        data: DataSchema,
+        links: LinkIndex,
+        keep_id: str,
+        other_ids: list[str],
+        course: str | None,
+        topics: list[str],
+    ) -> Note:
+        """Fold other notes, a course and topics into an existing note record."""
+        courses = CourseRegistry(data)
+        task_ids: list[str] = []
+        for other_id in other_ids:
+            record = links.note_record(other_id)
+            if record is None:
+                continue
+            other = deserialize_note(record, courses)
+            course = course or other.course
+            topics = topics + other.topics
+            task_ids.extend(links.tasks_of(other_id))
+            links.remove_note(other_id)
+            record_mutation(data, "note", record, None)
+
+        pos = links.note_pos[keep_id]
+        before = data["notes"][pos]
+        note = deserialize_note(before, courses)
+        note.course = note.course or course
+        note.topics.extend(t for t in dict.fromkeys(topics) if t not in note.topics)
+        note.modified_at = datetime.now()
+        data["notes"][pos] = serialize_note(note, courses)
+        for task_id in task_ids:
+            links.link(task_id, keep_id)
+
+        after = data["notes"][pos]
+        record_mutation(data, "note", before, after)
+        return deserialize_note(after, courses)
+
+    def iter_notes(
+        self, filter: RecordFilter | None = None, course: str | None = None
+    ) -> Iterator[Note]:
+        """Iterate over notes, hydrating each one only when it is reached.
+
+        The filter runs on the raw record, so non-matching notes are never
+        validated into models and callers can stop early (e.g. with
+        ``itertools.islice``) without building the full list.
+
+        Args:
+            filter: Optional predicate over the raw note record
+            course: Only notes in this course (merge aliases included)
+
+        Yields:
+            Matching notes in storage order
+        """
+        data = self.store.load()
+        courses = CourseRegistry(data)
+        filter = _with_course(filter, courses, course)
+        for note_data in data["notes"]:
+            if filter is None or filter(note_data):
+                yield deserialize_note(note_data, courses)
+
+    def count_notes(self, filter: RecordFilter | None = None, course: str | None = None) -> int:
+        """Count notes matching a filter without hydrating them.
+
+        Args:
+            filter: Optional predicate over the raw note record
+            course: Only notes in this course (merge aliases included)
+
+        Returns:
+            Number of matching notes
+        """
+        data = self.store.load()
+        filter = _with_course(filter, CourseRegistry(data), course)
+        if filter is None:
+            return len(data["notes"])
+        return sum(1 for note_data in data["notes"] if filter(note_data))
+
     def list_notes(self) -> list[Note]:
         """List all notes.
 
         Returns:
             List of all notes
         """
-        data = self.store.load()
-        return [deserialize_note(note_data) for note_data in data["notes"]]
+        return list(self.iter_notes())
 
     def get_inbox_notes(self) -> list[Note]:
         """Get all notes in inbox (course=None).
@@ -99,7 +311,7 @@ class NoteService:
         Returns:
             List of inbox notes
         """
-        return [note for note in self.list_notes() if note.course is None]
+        return list(self.iter_notes(in_inbox))
 
     def organize_note(self, note_id: str, course: str) -> Note | None:
         """Assign a note to a course (move from inbox).
@@ -112,14 +324,16 @@ class NoteService:
             Updated note if found, None otherwise
         """
         data = self.store.load()
+        courses = CourseRegistry(data)
 
         for i, note_data in enumerate(data["notes"]):
             if note_data["id"] == note_id:
-                note = deserialize_note(note_data)
+                note = deserialize_note(note_data, courses)
                 note.course = course
 
                 # Update in storage
-                data["notes"][i] = serialize_note(note)
+                data["notes"][i] = serialize_note(note, courses)
+                record_mutation(data, "note", note_data, data["notes"][i])
                 self.store.save(data)
 
                 return note
@@ -135,7 +349,7 @@ class NoteService:
         Returns:
             List of notes in the course
         """
-        return [note for note in self.list_notes() if note.course == course_name]
+        return list(self.iter_notes(course=course_name))
 
     def get_notes_by_topic(self, topic_name: str) -> list[Note]:
         """Get all notes with a specific topic.
@@ -146,7 +360,7 @@ class NoteService:
         Returns:
             List of notes with the topic
         """
-        return [note for note in self.list_notes() if topic_name in note.topics]
+        return list(self.iter_notes(has_topic(topic_name)))
 
     def add_topics(self, note_id: str, topics: list[str]) -> Note | None:
         """Add topics to a note.
@@ -159,10 +373,11 @@ class NoteService:
             Updated note if found, None otherwise
         """
         data = self.store.load()
+        courses = CourseRegistry(data)
 
         for i, note_data in enumerate(data["notes"]):
             if note_data["id"] == note_id:
-                note = deserialize_note(note_data)
+                note = deserialize_note(note_data, courses)
 
                 # Add topics (avoid duplicates)
                 for topic in topics:
@@ -170,7 +385,8 @@ class NoteService:
                         note.topics.append(topic)
 
                 # Update in storage
-                data["notes"][i] = serialize_note(note)
+                data["notes"][i] = serialize_note(note, courses)
+                record_mutation(data, "note", note_data, data["notes"][i])
                 self.store.save(data)
 
                 return note
@@ -188,15 +404,17 @@ class NoteService:
             Updated note if found, None otherwise
         """
         data = self.store.load()
+        courses = CourseRegistry(data)
 
         for i, note_data in enumerate(data["notes"]):
             if note_data["id"] == note_id:
-                note = deserialize_note(note_data)
+                note = deserialize_note(note_data, courses)
                 note.content = new_content
                 note.modified_at = datetime.now()
 
                 # Update in storage
-                data["notes"][i] = serialize_note(note)
+                data["notes"][i] = serialize_note(note, courses)
+                record_mutation(data, "note", note_data, data["notes"][i])
                 self.store.save(data)
 
                 return note
@@ -214,17 +432,19 @@ class NoteService:
             Updated note if found, None otherwise
         """
         data = self.store.load()
+        courses = CourseRegistry(data)
 
         for i, note_data in enumerate(data["notes"]):
             if note_data["id"] == note_id:
-                note = deserialize_note(note_data)
+                note = deserialize_note(note_data, courses)
 
                 # Remove topic if present
                 if topic in note.topics:
                     note.topics.remove(topic)
 
                 # Update in storage
-                data["notes"][i] = serialize_note(note)
+                data["notes"][i] = serialize_note(note, courses)
+                record_mutation(data, "note", note_data, data["notes"][i])
                 self.store.save(data)
 
                 return note
@@ -232,7 +452,7 @@ class NoteService:
         return None
 
     def delete_note(self, note_id: str) -> bool:
-        """Delete a note.
+        """Delete a note and remove it from the tasks that link to it.
 
         Args:
             note_id: Note ID to delete
@@ -242,10 +462,25 @@ class NoteService:
         """
         data = self.store.load()
 
-        for i, note_data in enumerate(data["notes"]):
-            if note_data["id"] == note_id:
-                del data["notes"][i]
-                self.store.save(data)
-                return True
+        links = LinkIndex(data)
+        record = links.note_record(note_id)
 
-        return False
+        if record is None:
+            return False
+
+        links.remove_note(note_id)
+        record_mutation(data, "note", record, None)
+        self.store.save(data)
+        return True
+
+
+def _with_course(
+    filter: RecordFilter | None, courses: CourseRegistry, course: str | None
+) -> RecordFilter | None:
+    """Narrow a filter to the records of a course, resolved in loaded data."""
+    if course is None:
+        return filter
+    course_filter = in_course(courses.ids_for(course))
+    if filter is None:
+        return course_filter
+    return lambda record: filter(record) and course_filter(record)
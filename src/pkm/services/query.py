@@ -0,0 +1,342 @@
+"""Query language for notes and tasks.
+
+A query is a list of terms that must all match::
+
+    course:"Bio 101" topic:cells due<7d -completed priority:high "calvin cycle"
+
+Terms:
+    word                   Text in content, titles, topics or course names
+                           (case-insensitive, matches inside words)
+    "a phrase"             Whole words, next to each other and in order
+    word*                  A word starting with the text (e.g. photo*)
+    course:NAME            Assigned to a course (merged courses included)
+    topic:NAME             Tagged with a topic (notes)
+    priority:LEVEL         high, medium or low (tasks)
+    type:note, type:task   Only notes or only tasks
+    due<DATE, due<=DATE,   Due date compared with DATE (tasks); DATE is
+    due>DATE, due>=DATE,   today, tomorrow, yesterday, Nd or Nw from today
+    due:DATE               (e.g. 7d, -2w), YYYY-MM-DD or a natural date
+    completed, open        Task status
+    overdue                Open tasks due before today
+    inbox                  Not assigned to a course
+
+Any term can be negated with a leading ``-``, alternatives are joined with
+``OR``, and parentheses group. The keywords ``completed``, ``open``,
+``overdue``, ``inbox``, ``OR`` and ``AND`` are searched as text when quoted.
+
+``parse_query`` turns a query into an AST of the node classes below;
+``pkm.services.query_service`` plans and runs it against indexes.
+"""
+
+import re
+from dataclasses import dataclass
+from datetime import date, timedelta
+
+from pkm.services.query_index import words
+from pkm.utils.date_parser import parse_due_date
+
+FIELDS = ("course", "topic", "priority", "type")
+FLAGS = ("completed", "open", "overdue", "inbox")
+COMPARISONS = ("<", "<=", ">", ">=", "=")
+
+_TOKEN = re.compile(
+    r"""
+    (?P<space>\s+)
+  | (?P<lparen>\()
+  | (?P<rparen>\))
+  | (?P<neg>-)(?=[^\s)])
+  | (?P<field>[A-Za-z_]+)(?P<op><=|>=|<|>|:|=)(?:"(?P<qvalue>[^"]*)"|(?P<value>[^\s()"]+))
+  | "(?P<phrase>[^"]*)"
+  | (?P<word>[^\s()"]+)
+    """,
+    re.VERBOSE,
+)
+
+
+class QuerySyntaxError(ValueError):
+    """A query that cannot be parsed."""
+
+
+@dataclass(frozen=True)
+class Text:
+    """Text in any searchable field; ``value`` is lowercase.
+
+    A ``prefilter`` term only narrows the candidates of another term (the
+    literals of a regex) and is not highlighted.
+    """
+
+    value: str
+    prefilter: bool = False
+
+    def __str__(self) -> str:
+        return f'"{self.value}"' if " " in self.value else self.value
+
+
+@dataclass(frozen=True)
+class Phrase:
+    """Whole words in a row; ``value`` is lowercase."""
+
+    value: str
+
+    def __str__(self) -> str:
+        return f'"{self.value}"'
+
+
+@dataclass(frozen=True)
+class Prefix:
+    """A word starting with ``value`` (lowercase word characters)."""
+
+    value: str
+
+    def __str__(self) -> str:
+        return f"{self.value}*"
+
+
+@dataclass(frozen=True)
+class Field:
+    """Exact match on a record attribute (see ``FIELDS``)."""
+
+    name: str
+    value: str
+
+    def __str__(self) -> str:
+        value = f'"{self.value}"' if " " in self.value else self.value
+        return f"{self.name}:{value}"
+
+
+@dataclass(frozen=True)
+class Flag:
+    """A status keyword (see ``FLAGS``)."""
+
+    name: str
+
+    def __str__(self) -> str:
+        return self.name
+
+
+@dataclass(frozen=True)
+class Due:
+    """Due date comparison; ``op`` is one of ``COMPARISONS``."""
+
+    op: str
+    day: date
+
+    def __str__(self) -> str:
+        return f"due{self.op}{self.day.isoformat()}"
+
+
+@dataclass(frozen=True)
+class Regex:
+    """Regular expression over the searchable text.
+
+    Not part of the query syntax; ``SearchService`` builds it for --regex
+    (see pkm.services.regex_search).
+    """
+
+    pattern: str
+
+    def __str__(self) -> str:
+        return f"/{self.pattern}/"
+
+
+@dataclass(frozen=True)
+class Not:
+    """Negation of a term."""
+
+    child: "Node"
+
+    def __str__(self) -> str:
+        return f"-{_grouped(self.child)}"
+
+
+@dataclass(frozen=True)
+class And:
+    """All children must match."""
+
+    children: tuple["Node", ...]
+
+    def __str__(self) -> str:
+        return " ".join(_grouped(c) for c in self.children)
+
+
+@dataclass(frozen=True)
+class Or:
+    """At least one child must match."""
+
+    children: tuple["Node", ...]
+
+    def __str__(self) -> str:
+        return " OR ".join(_grouped(c) for c in self.children)
+
+
+Node = Text | Phrase | Prefix | Field | Flag | Due | Regex | Not | And | Or
+
+
+def _grouped(node: Node) -> str:
+    """Format a child node, parenthesized if it is compound."""
+    return f"({node})" if isinstance(node, (And, Or)) else str(node)
+
+
+def parse_day(value: str, today: date) -> date:
+    """Parse the date of a ``due`` comparison.
+
+    Args:
+        value: today, tomorrow, yesterday, Nd/Nw offset, YYYY-MM-DD or a
+            natural language date
+        today: Date relative offsets count from
+
+    Returns:
+        Calendar date
+
+    Raises:
+        QuerySyntaxError: If the date is not understood
+    """
+    value = value.strip().lower()
+    offsets = {"today": 0, "tomorrow": 1, "yesterday": -1}
+    if value in offsets:
+        return today + timedelta(days=offsets[value])
+    match = re.fullmatch(r"([+-]?\d+)([dw])", value)
+    if match:
+        days = int(match.group(1)) * (7 if match.group(2) == "w" else 1)
+        return today + timedelta(days=days)
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        pass
+    parsed = parse_due_date(value, today)
+    if parsed is None:
+        raise QuerySyntaxError(f"Cannot understand date '{value}'")
+    return parsed.date()
+
+
+def _tokenize(query: str) -> list[tuple[str, re.Match[str]]]:
+    """Split a query into (kind, match) tokens."""
+    tokens = []
+    pos = 0
+    while pos < len(query):
+        match = _TOKEN.match(query, pos)
+        if match is None:  # an unterminated quote
+            raise QuerySyntaxError(f"Unterminated quote at position {pos + 1}")
+        kind = match.lastgroup or ""
+        if kind in ("op", "qvalue", "value"):
+            kind = "field"
+        if kind != "space":
+            tokens.append((kind, match))
+        pos = match.end()
+    return tokens
+
+
+class _Parser:
+    """Recursive descent parser over query tokens.
+
+    Grammar::
+
+        query   := or
+        or      := and ("OR" and)*
+        and     := unary+
+        unary   := "-" unary | "(" or ")" | term
+    """
+
+    def __init__(self, query: str, today: date) -> None:
+        self.tokens = _tokenize(query)
+        self.pos = 0
+        self.today = today
+
+    def peek(self) -> tuple[str, re.Match[str]] | None:
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else None
+
+    def is_keyword(self, word: str) -> bool:
+        token = self.peek()
+        return token is not None and token[0] == "word" and token[1].group() == word
+
+    def parse(self) -> Node:
+        if not self.tokens:
+            raise QuerySyntaxError("Empty query")
+        node = self.parse_or()
+        if self.peek() is not None:
+            raise QuerySyntaxError(f"Unexpected '{self.peek()[1].group()}'")  # type: ignore[index]
+        return node
+
+    def parse_or(self) -> Node:
+        children = [self.parse_and()]
+        while self.is_keyword("OR"):
+            self.pos += 1
+            children.append(self.parse_and())
+        return children[0] if len(children) == 1 else Or(tuple(children))
+
+    def parse_and(self) -> Node:
+        children: list[Node] = []
+        while True:
+            token = self.peek()
+            if token is None or token[0] == "rparen" or self.is_keyword("OR"):
+                break
+            if self.is_keyword("AND"):
+                self.pos += 1
+                continue
+            children.append(self.parse_unary())
+        if not children:
+            raise QuerySyntaxError("Expected a search term")
+        return children[0] if len(children) == 1 else And(tuple(children))
+
+    def parse_unary(self) -> Node:
+        kind, match = self.tokens[self.pos]
+        self.pos += 1
+        if kind == "neg":
+            if self.peek() is None:
+                raise QuerySyntaxError("Expected a term after '-'")
+            return Not(self.parse_unary())
+        if kind == "lparen":
+            node = self.parse_or()
+            if self.peek() is None or self.peek()[0] != "rparen":  # type: ignore[index]
+                raise QuerySyntaxError("Missing ')'")
+            self.pos += 1
+            return node
+        if kind == "rparen":
+            raise QuerySyntaxError("Unexpected ')'")
+        if kind == "phrase":
+            value = match.group("phrase").lower()
+            return Phrase(value) if words(value) else Text(value)
+        if kind == "field":
+            return self.field(match)
+        word = match.group()
+        if word in FLAGS:
+            return Flag(word)
+        if word.endswith("*") and re.fullmatch(r"\w+", word[:-1]):
+            return Prefix(word[:-1].lower())
+        return Text(word.lower())
+
+    def field(self, match: re.Match[str]) -> Node:
+        name = match.group("field").lower()
+        op = match.group("op")
+        value = match.group("qvalue") if match.group("qvalue") is not None else match.group("value")
+        if name == "due":
+            return Due("=" if op == ":" else op, parse_day(value, self.today))
+        if op != ":":
+            raise QuerySyntaxError(f"'{name}' takes ':' not '{op}'")
+        if name == "is" and value in FLAGS:
+            return Flag(value)
+        if name not in FIELDS:
+            raise QuerySyntaxError(f"Unknown field '{name}' (use {', '.join(FIELDS)} or due)")
+        if name == "type":
+            value = value.rstrip("s")
+            if value not in ("note", "task"):
+                raise QuerySyntaxError("type: must be note or task")
+        if name == "priority" and value not in ("high", "medium", "low"):
+            raise QuerySyntaxError("priority: must be high, medium or low")
+        return Field(name, value)
+
+
+def parse_query(query: str, today: date | None = None) -> Node:
+    """Parse a query into an AST.
+
+    Args:
+        query: Query text (see the module docstring)
+        today: Date relative due dates count from (default: today)
+
+    Returns:
+        Root node
+
+    Raises:
+        QuerySyntaxError: If the query is malformed
+    """
+    return _Parser(query, today or date.today()).parse()
@@ -0,0 +1,293 @@
+"""Secondary indexes for running queries over loaded data.
+
+``RecordIndex`` is built in a single pass over loaded data and maps each
+indexed attribute to the set of record IDs ("postings") that have it. Note
+and task IDs never collide (``n``/``t`` prefixes), so both live in the same
+sets.
+
+Text is indexed word by word (see pkm.storage.search_index): every word of
+the normalized text (see pkm.services.analysis; two characters at a time
+within CJK runs) has a positional posting, and the words are grouped by the
+term the ``Analyzer`` makes of them ("cells" and "cell" both under "cell").
+Whole words and phrases are matched by term, so queries are analyzed with
+``index.analyzer`` to meet the same terms; substrings and prefixes are
+matched against the words themselves, so "studie" still finds "studies"
+although its term is "study". The word postings come from the search index
+kept beside the data file (written with every commit, see ``write_index``)
+when one is given, so a query analyzes no records at all; the normalized
+fields (to check longer substrings) and character offsets (to highlight)
+are worked out only for the records that need them.
+
+Postings record the positions (token numbers) at which a word occurs in
+each record, so phrases are matched by checking that their terms sit at
+consecutive positions. ``starts`` maps positions back to character offsets
+for highlighting; offsets count through the record's searchable fields as if
+joined by one separator, so offsets below ``len(fields(...)[0])`` fall in
+the note content or task title. Words are kept in sorted order, so prefix
+queries are a binary search.
+"""
+
+import re
+from bisect import bisect_left, bisect_right
+from datetime import date
+from pathlib import Path
+from typing import Any
+
+from pkm.services.analysis import Analyzer, default_analyzer
+from pkm.storage.course_registry import CourseRegistry
+from pkm.storage.json_store import on_commit
+from pkm.storage.schema import DataSchema
+from pkm.storage.search_index import SearchIndex, record_fields, scan_fields, write_search_index
+
+_WORD = re.compile(r"\w+")
+
+
+def words(text: str) -> list[str]:
+    """Split text into its runs of word characters."""
+    return _WORD.findall(text)
+
+
+@on_commit
+def write_index(data_file: Path, data: dict[str, Any]) -> None:
+    """Write the search index beside freshly committed (stamped) data."""
+    write_search_index(data_file, data, default_analyzer(), stamped=True)
+
+
+class RecordIndex:
+    """Posting sets over the notes and tasks of loaded data."""
+
+    def __init__(
+        self,
+        data: DataSchema,
+        analyzer: Analyzer | None = None,
+        search: SearchIndex | None = None,
+    ) -> None:
+        """Build the index from loaded data.
+
+        Args:
+            data: Loaded data schema (not modified)
+            analyzer: Text analyzer (default: the configured one)
+            search: Word postings of ``data`` (default: built here; also
+                rebuilt if made with other analyzer steps)
+        """
+        self.analyzer = analyzer or default_analyzer()
+        self.courses = CourseRegistry(data)
+        self.records: dict[str, dict[str, Any]] = {}
+        self.position: dict[str, int] = {}
+        self.by_type: dict[str, set[str]] = {"note": set(), "task": set()}
+        self.by_course: dict[str | None, set[str]] = {}
+        self.by_topic: dict[str, set[str]] = {}
+        self.by_priority: dict[str, set[str]] = {}
+        self.completed: set[str] = set()
+        self.open: set[str] = set()
+        # record ID -> searchable fields normalized, the character offset of
+        # each position (-1 between fields) and its word; worked out on demand
+        self._analyzed: dict[str, tuple[tuple[str, ...], list[int], list[str]]] = {}
+        self._merged: dict[str, dict[str, list[int]]] = {}
+        # text piece or prefix -> matching words, and the records having them
+        self._matching: dict[str, dict[str, None]] = {}
+        self._containing: dict[str, set[str]] = {}
+        self._prefixed: dict[str, set[str]] = {}
+        due: list[tuple[str, str]] = []
+
+        for kind, section in (("note", "notes"), ("task", "tasks")):
+            for record in data[section]:  # type: ignore[literal-required]
+                record_id = record["id"]
+                self.records[record_id] = record
+                self.position[record_id] = len(self.position)
+                self.by_type[kind].add(record_id)
+                self.by_course.setdefault(record.get("course_id"), set()).add(record_id)
+                if kind == "note":
+                    for topic in record.get("topics", []):
+                        self.by_topic.setdefault(topic, set()).add(record_id)
+                else:
+                    self.by_priority.setdefault(record.get("priority", "medium"), set()).add(
+                        record_id
+                    )
+                    (self.completed if record.get("completed") else self.open).add(record_id)
+                    if record.get("due_date"):
+                        due.append((record["due_date"][:10], record_id))
+
+        if search is None or search.steps != self.analyzer.steps:
+            search = SearchIndex.build(data, self.analyzer)  # type: ignore[arg-type]
+        self.search = search
+        due.sort()
+        self.due_days = [day for day, _ in due]
+        self.due_ids = [record_id for _, record_id in due]
+
+    def _analyze(self, record_id: str) -> tuple[tuple[str, ...], list[int], list[str]]:
+        """Normalize a record's fields and locate each position in them."""
+        if record_id not in self._analyzed:
+            fields = tuple(self.analyzer.normalize(t) for t in self.text(record_id))
+            starts: list[int] = []
+            located: list[str] = []
+            for position, word, _, offset in scan_fields(self.analyzer, fields):
+                starts.extend([-1] * (position - len(starts)))
+                located.extend([""] * (position - len(located)))
+                starts.append(offset)
+                located.append(word)
+            self._analyzed[record_id] = (fields, starts, located)
+        return self._analyzed[record_id]
+
+    def text(self, record_id: str) -> list[str]:
+        """Get a record's searchable fields as stored, for regular expressions."""
+        record = self.records[record_id]
+        return record_fields(record, self.courses.name_of(record.get("course_id")))
+
+    def fields(self, record_id: str) -> tuple[str, ...]:
+        """Get a record's searchable fields, normalized."""
+        return self._analyze(record_id)[0]
+
+    def located(self, record_id: str) -> list[tuple[str, int]]:
+        """Get each word of a record and the character offset it starts at."""
+        _, starts, located = self._analyze(record_id)
+        return [(word, start) for word, start in zip(located, starts) if word]
+
+    def starts(self, record_id: str) -> list[int]:
+        """Get the character offset of each position in a record."""
+        return self._analyze(record_id)[1]
+
+    @property
+    def size(self) -> int:
+        """Number of indexed records."""
+        return len(self.records)
+
+    def all_ids(self) -> set[str]:
+        """Get the IDs of every record."""
+        return set(self.records)
+
+    def course_ids(self, name: str) -> set[str]:
+        """Get the records assigned to a course, including merged courses."""
+        result: set[str] = set()
+        for course_id in self.courses.ids_for(name):
+            result |= self.by_course.get(course_id, set())
+        return result
+
+    def term_postings(self, term: str) -> dict[str, list[int]]:
+        """Get the positions of a term in each record, over all its words."""
+        variants = self.search.variants(term, self.analyzer)
+        if len(variants) == 1:
+            return self.search.postings(variants[0])
+        if term not in self._merged:
+            merged: dict[str, list[int]] = {}
+            for word in variants:
+                for record_id, positions in self.search.postings(word).items():
+                    merged.setdefault(record_id, []).extend(positions)
+            for positions in merged.values():
+                positions.sort()
+            self._merged[term] = merged
+        return self._merged[term]
+
+    def words_matching(self, piece: str) -> list[str]:
+        """Get the indexed words a text piece matches.
+
+        Args:
+            piece: Normalized word
+
+        Returns:
+            Words containing ``piece``, and words with the same term as
+            ``piece`` (other forms of it)
+        """
+        return list(self._words_matching(piece))
+
+    def _words_matching(self, piece: str) -> dict[str, None]:
+        if piece not in self._matching:
+            found = dict.fromkeys(w for w in self.search.sorted_words() if piece in w)
+            term = self.analyzer.term(piece)
+            if term is not None:
+                found.update(dict.fromkeys(self.search.variants(term, self.analyzer)))
+            self._matching[piece] = found
+        return self._matching[piece]
+
+    def words_with_prefix(self, prefix: str) -> list[str]:
+        """Get the indexed words that start with ``prefix``, from the sorted words."""
+        sorted_words = self.search.sorted_words()
+        lo = bisect_left(sorted_words, prefix)
+        hi = lo
+        while hi < len(sorted_words) and sorted_words[hi].startswith(prefix):
+            hi += 1
+        return sorted_words[lo:hi]
+
+    def records_matching(self, piece: str) -> set[str]:
+        """Get the records with a word a text piece matches (see ``words_matching``)."""
+        if piece not in self._containing:
+            postings = self.search.postings
+            self._containing[piece] = set().union(*map(postings, self._words_matching(piece)))
+        return self._containing[piece]
+
+    def records_with_prefix(self, prefix: str) -> set[str]:
+        """Get the records with a word that starts with ``prefix``."""
+        if prefix not in self._prefixed:
+            postings = self.search.postings
+            self._prefixed[prefix] = set().union(*map(postings, self.words_with_prefix(prefix)))
+        return self._prefixed[prefix]
+
+    def contains(self, record_id: str, piece: str) -> bool:
+        """Check whether one of a record's words matches a text piece."""
+        return record_id in self.records_matching(piece)
+
+    def phrase_positions(self, record_id: str, phrase: list[tuple[int, str]]) -> list[int]:
+        """Find where the terms of a phrase occur in a record, in order.
+
+        Args:
+            record_id: Record ID
+            phrase: (position relative to the first term, term) pairs,
+                starting with (0, first term)
+
+        Returns:
+            Positions of the phrase's first term, in order
+        """
+        found = self.term_postings(phrase[0][1]).get(record_id, [])
+        for offset, term in phrase[1:]:
+            if not found:
+                break
+            positions = self.term_postings(term).get(record_id, ())
+            found = [p for p in found if p + offset in positions]
+        return found
+
+    def due_range(self, start: date | None, end: date | None) -> range:
+        """Get positions in the due list of tasks due within [start, end].
+
+        Args:
+            start: First day included (None for no lower bound)
+            end: Last day included (None for no upper bound)
+
+        Returns:
+            Range of positions into ``due_ids``
+        """
+        lo = 0 if start is None else bisect_left(self.due_days, start.isoformat())
+        hi = len(self.due_days) if end is None else bisect_right(self.due_days, end.isoformat())
+        return range(lo, max(lo, hi))
+
+    def due_day(self, record_id: str) -> str | None:
+        """Get the day (YYYY-MM-DD) a task is due, or None."""
+        due = self.records[record_id].get("due_date")
+        return due[:10] if due else None
+
+    def occurrences(self, record_id: str, piece: str) -> list[tuple[int, int]]:
+        """Find where a text piece matches in a record.
+
+        Args:
+            record_id: Record ID
+            piece: Normalized word
+
+        Returns:
+            Sorted (start, end) character offsets: the piece itself within
+            words containing it, the whole word for other forms of it
+        """
+        matching = self._words_matching(piece)
+        found: list[tuple[int, int]] = []
+        for word, start in self.located(record_id):
+            if word not in matching:
+                continue
+            at = word.find(piece)
+            if at == -1:
+                found.append((start, start + len(word)))
+            while at != -1:
+                found.append((start + at, start + at + len(piece)))
+                at = word.find(piece, at + 1)
+        return sorted(found)
+
+    def text_matches(self, record_id: str, text: str) -> bool:
+        """Check whether normalized text occurs in one of a record's fields."""
+        return any(text in field for field in self.fields(record_id))
@@ -0,0 +1,517 @@
+"""Query planning and execution.
+
+A parsed query (see pkm.services.query) is run against a ``RecordIndex``.
+Each term can either produce its posting set from the index or test a
+single record. For the top-level conjunction the planner
+
+1. estimates the posting size of every positive term from the index,
+2. materializes the smallest one as the candidate set (the driver),
+3. walks the remaining terms from most to least selective, intersecting
+   with a term's postings while they are smaller than the candidate set and
+   otherwise testing the remaining candidates one by one, and
+4. applies negated terms as filters on what is left,
+
+stopping as soon as no candidates remain. Only records that survive every
+step are hydrated into models.
+
+Text terms are split into words with the index's analyzer before lookup. A
+word matches the indexed words containing it and the other forms of it
+(same term), so "studie" finds "studies" and "equations" finds "equation".
+Phrases are answered from the positional postings (records holding every
+term, then a check that the terms are adjacent) and prefixes from the
+sorted word list, so neither scans the text.
+"""
+
+import re
+import time
+from collections.abc import Iterator, Mapping
+from contextlib import nullcontext
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from pathlib import Path
+
+from pkm.models.note import Note
+from pkm.models.task import Task
+from pkm.services.analysis import default_analyzer
+from pkm.services.query import (
+    And,
+    Due,
+    Field,
+    Flag,
+    Node,
+    Not,
+    Or,
+    Phrase,
+    Prefix,
+    Regex,
+    Text,
+    parse_query,
+)
+from pkm.services.query_index import RecordIndex, words
+from pkm.services.regex_search import RegexTimeoutError, compile_pattern, time_limit
+from pkm.storage.json_store import JSONStore
+from pkm.storage.schema import deserialize_note, deserialize_task
+
+
+@dataclass
+class PlanStep:
+    """One step of an executed plan, with actual counts."""
+
+    action: str  # "scan", "index", "intersect", "filter" or "stop"
+    term: str
+    postings: int  # estimated postings of the term
+    remaining: int  # candidates left after the step
+
+
+@dataclass
+class QueryResult:
+    """Matches of a query and how they were found."""
+
+    notes: list[Note]
+    tasks: list[Task]
+    steps: list[PlanStep] = field(default_factory=list)
+    # Record ID -> (start, end) of matches in the note content or task title,
+    # located on lookup (see Highlights)
+    highlights: Mapping[str, list[tuple[int, int]]] = field(default_factory=dict)
+    examined: int = 0  # per-record checks made by filter steps
+    total: int = 0  # records in the index
+
+
+class Highlights(Mapping[str, list[tuple[int, int]]]):
+    """Record ID -> sorted (start, end) spans of a query's text matches.
+
+    Spans are located when a record is first looked up, so showing a page
+    of results only searches the records on it. Regex searches share the
+    time the query had left when it finished.
+    """
+
+    def __init__(
+        self, planner: "Planner", node: Node, record_ids: list[str], budget: float | None = None
+    ) -> None:
+        """Create the highlights of a query.
+
+        Args:
+            planner: Planner that ran the query
+            node: Parsed query
+            record_ids: Matched records, in storage order
+            budget: Seconds regex searches may take in total (default: no limit)
+        """
+        self._planner = planner
+        self._terms = list(_positive_text(node))
+        self._record_ids = record_ids
+        self._matched = set(record_ids)
+        self._budget = budget
+        self._found: dict[str, list[tuple[int, int]]] = {}
+
+    def __getitem__(self, record_id: str) -> list[tuple[int, int]]:
+        if record_id not in self._found:
+            if record_id not in self._matched:
+                raise KeyError(record_id)
+            if self._budget is None:
+                spans = self._planner.highlight(self._terms, record_id)
+            else:
+                deadline = time.monotonic() + self._budget
+                spans = self._planner.highlight(self._terms, record_id, deadline)
+                self._budget = max(0.0, deadline - time.monotonic())
+            self._found[record_id] = spans
+        if not self._found[record_id]:
+            raise KeyError(record_id)
+        return self._found[record_id]
+
+    def __iter__(self) -> Iterator[str]:
+        return (r for r in self._record_ids if r in self)
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+
+class Planner:
+    """Evaluates query nodes against a record index."""
+
+    def __init__(self, index: RecordIndex, today: date | None = None) -> None:
+        """Create a planner.
+
+        Args:
+            index: Index over the loaded data
+            today: Date the ``overdue`` flag counts from (default: today)
+        """
+        self.index = index
+        self.today = today or date.today()
+        self.examined = 0
+        self._estimates: dict[Node, int] = {}
+        self._lookups: dict[Node, set[str]] = {}
+        self._patterns: dict[str, re.Pattern[str]] = {}
+        self._texts: dict[Text, tuple[list[str], str | None]] = {}
+        self._phrases: dict[Phrase, list[tuple[int, str]]] = {}
+
+    def estimate(self, node: Node) -> int:
+        """Estimate how many records a node matches, from index sizes only."""
+        if node not in self._estimates:
+            self._estimates[node] = self._estimate(node)
+        return self._estimates[node]
+
+    def text(self, node: Text) -> tuple[list[str], str | None]:
+        """Split a text term into words.
+
+        Returns:
+            The term's normalized words (pieces), and its normalized text if
+            matches must also contain it literally (anything but a single
+            word)
+        """
+        if node not in self._texts:
+            analyzer = self.index.analyzer
+            value = analyzer.normalize(node.value)
+            pieces = [word for word, _, _ in analyzer.scan(value)]
+            single = len(pieces) == 1 and words(value) == [value]
+            self._texts[node] = (pieces, None if single else value)
+        return self._texts[node]
+
+    def phrase(self, node: Phrase) -> list[tuple[int, str]]:
+        """Analyze a phrase into (relative position, term) pairs.
+
+        Returns:
+            Pairs starting at position 0; empty if every word is a stopword
+        """
+        if node not in self._phrases:
+            analyzer = self.index.analyzer
+            tokens = list(analyzer.tokens(analyzer.normalize(node.value)))
+            kept = [(i, term) for i, (term, _) in enumerate(tokens) if term is not None]
+            self._phrases[node] = [(i - kept[0][0], term) for i, term in kept]
+        return self._phrases[node]
+
+    def _prefix_words(self, node: Prefix) -> list[str]:
+        return self.index.words_with_prefix(self.index.analyzer.normalize(node.value))
+
+    def _prefix_records(self, node: Prefix) -> set[str]:
+        return self.index.records_with_prefix(self.index.analyzer.normalize(node.value))
+
+    def _estimate(self, node: Node) -> int:
+        index = self.index
+        if isinstance(node, Phrase) and not self.phrase(node):
+            node = Text(node.value)
+        if isinstance(node, Text):
+            pieces = self.text(node)[0]
+            return min((self._text_cost(piece) for piece in pieces), default=index.size)
+        if isinstance(node, Phrase):
+            return min(len(index.term_postings(term)) for _, term in self.phrase(node))
+        if isinstance(node, Prefix):
+            return sum(index.search.doc_count(w) for w in self._prefix_words(node))
+        if isinstance(node, Due):
+            return len(index.due_range(*self._due_bounds(node)))
+        if isinstance(node, Regex):
+            # Not indexed: always filters candidates found by other terms
+            return index.size
+        if isinstance(node, Not):
+            return index.size - self.estimate(node.child)
+        if isinstance(node, Or):
+            return min(index.size, sum(self.estimate(c) for c in node.children))
+        if isinstance(node, And):
+            return min(self.estimate(c) for c in node.children)
+        return len(self.lookup(node))
+
+    def _text_cost(self, piece: str) -> int:
+        return sum(self.index.search.doc_count(w) for w in self.index.words_matching(piece))
+
+    def _due_bounds(self, node: Due) -> tuple[date | None, date | None]:
+        before = node.day - timedelta(days=1)
+        after = node.day + timedelta(days=1)
+        return {
+            "<": (None, before),
+            "<=": (None, node.day),
+            ">": (after, None),
+            ">=": (node.day, None),
+            "=": (node.day, node.day),
+        }[node.op]
+
+    def lookup(self, node: Field | Flag) -> set[str]:
+        """Get the posting set of a field or flag term (do not modify it)."""
+        if node not in self._lookups:
+            self._lookups[node] = self._lookup(node)
+        return self._lookups[node]
+
+    def _lookup(self, node: Field | Flag) -> set[str]:
+        index = self.index
+        if isinstance(node, Flag):
+            if node.name == "overdue":
+                positions = index.due_range(None, self.today - timedelta(days=1))
+                return {index.due_ids[i] for i in positions} & index.open
+            if node.name == "inbox":
+                return index.by_course.get(None, set())
+            return index.completed if node.name == "completed" else index.open
+        if node.name == "course":
+            return index.course_ids(node.value)
+        if node.name == "topic":
+            return index.by_topic.get(node.value, set())
+        if node.name == "priority":
+            return index.by_priority.get(node.value, set())
+        return index.by_type[node.value]
+
+    def postings(self, node: Node) -> set[str]:
+        """Get the IDs of every record a node matches."""
+        if isinstance(node, (Field, Flag)):
+            return set(self.lookup(node))
+        if isinstance(node, Text):
+            return self._text_postings(node)
+        if isinstance(node, Phrase):
+            return self._phrase_postings(node)
+        if isinstance(node, Prefix):
+            return set(self._prefix_records(node))
+        if isinstance(node, Due):
+            return {self.index.due_ids[i] for i in self.index.due_range(*self._due_bounds(node))}
+        if isinstance(node, Regex):
+            self.examined += self.index.size
+            return {r for r in self.index.records if self.matches(node, r)}
+        if isinstance(node, Not):
+            return self.index.all_ids() - self.postings(node.child)
+        if isinstance(node, Or):
+            return set().union(*(self.postings(c) for c in node.children))
+        return self.run_and(node.children, [])
+
+    def _text_postings(self, node: Text) -> set[str]:
+        pieces, literal = self.text(node)
+        candidates = self.index.all_ids()
+        for i, piece in enumerate(sorted(pieces, key=self._text_cost)):
+            found = self.index.records_matching(piece)
+            candidates = set(found) if i == 0 else candidates & found
+            if not candidates:
+                return candidates
+        if literal is None:
+            # A single word matches whole indexed words
+            return candidates
+        return {r for r in candidates if self.index.text_matches(r, literal)}
+
+    def _phrase_postings(self, node: Phrase) -> set[str]:
+        phrase = self.phrase(node)
+        if not phrase:
+            return self._text_postings(Text(node.value))
+        postings = sorted((self.index.term_postings(term) for _, term in phrase), key=len)
+        candidates = set(postings[0]).intersection(*postings[1:])
+        if len(postings) == 1:
+            return candidates
+        return {r for r in candidates if self.index.phrase_positions(r, phrase)}
+
+    def matches(self, node: Node, record_id: str) -> bool:
+        """Test whether one record matches a node."""
+        if isinstance(node, (Field, Flag)):
+            return record_id in self.lookup(node)
+        if isinstance(node, Phrase) and not self.phrase(node):
+            node = Text(node.value)
+        if isinstance(node, Text):
+            pieces, literal = self.text(node)
+            return all(self.index.contains(record_id, p) for p in pieces) and (
+                literal is None or self.index.text_matches(record_id, literal)
+            )
+        if isinstance(node, Phrase):
+            return bool(self.index.phrase_positions(record_id, self.phrase(node)))
+        if isinstance(node, Prefix):
+            return record_id in self._prefix_records(node)
+        if isinstance(node, Due):
+            day = self.index.due_day(record_id)
+            start, end = self._due_bounds(node)
+            return (
+                day is not None
+                and (start is None or day >= start.isoformat())
+                and (end is None or day <= end.isoformat())
+            )
+        if isinstance(node, Regex):
+            pattern = self._pattern(node)
+            return any(pattern.search(field) for field in self.index.text(record_id))
+        if isinstance(node, Not):
+            return not self.matches(node.child, record_id)
+        if isinstance(node, Or):
+            return any(self.matches(c, record_id) for c in node.children)
+        return all(self.matches(c, record_id) for c in node.children)
+
+    def run_and(self, terms: tuple[Node, ...], steps: list[PlanStep]) -> set[str]:
+        """Evaluate a conjunction, recording the steps taken.
+
+        Args:
+            terms: Terms that must all match
+            steps: List the plan steps are appended to
+
+        Returns:
+            IDs of matching records
+        """
+        positive = sorted((t for t in terms if not isinstance(t, Not)), key=self.estimate)
+        negative = sorted((t for t in terms if isinstance(t, Not)), key=self.estimate)
+
+        if positive:
+            driver, *rest = positive
+            candidates = self.postings(driver)
+            steps.append(PlanStep("index", str(driver), self.estimate(driver), len(candidates)))
+        else:
+            rest = []
+            candidates = self.index.all_ids()
+            steps.append(PlanStep("scan", "all records", self.index.size, len(candidates)))
+
+        for term in [*rest, *negative]:
+            if not candidates:
+                steps.append(PlanStep("stop", "no candidates left", 0, 0))
+                break
+            cost = self.estimate(term)
+            if not isinstance(term, Not) and cost < len(candidates):
+                candidates &= self.postings(term)
+                steps.append(PlanStep("intersect", str(term), cost, len(candidates)))
+            else:
+                self.examined += len(candidates)
+                candidates = {r for r in candidates if self.matches(term, r)}
+                steps.append(PlanStep("filter", str(term), cost, len(candidates)))
+        return candidates
+
+    def run(self, node: Node, steps: list[PlanStep] | None = None) -> list[str]:
+        """Evaluate a query.
+
+        Args:
+            node: Parsed query
+            steps: Optional list the plan steps are appended to
+
+        Returns:
+            IDs of matching records in storage order
+        """
+        terms = node.children if isinstance(node, And) else (node,)
+        matched = self.run_and(terms, [] if steps is None else steps)
+        return sorted(matched, key=self.index.position.__getitem__)
+
+    def highlight(
+        self, terms: list[Node], record_id: str, deadline: float | None = None
+    ) -> list[tuple[int, int]]:
+        """Locate the matches of text terms in a record's main field.
+
+        Word, phrase and prefix terms are located from the positional
+        postings; other text and regex terms search the record's text.
+        Regex terms stop at ``deadline`` and keep the matches found by then.
+
+        Args:
+            terms: Text and regex terms (see ``_positive_text``)
+            record_id: Record to locate matches in
+            deadline: ``time.monotonic()`` value regex searches end at
+
+        Returns:
+            Sorted (start, end) spans in the note content or task title
+        """
+        main = self.index.fields(record_id)[0]
+        spans: set[tuple[int, int]] = set()
+        for term in terms:
+            spans.update(self._spans(term, record_id, main, deadline))
+        return sorted((s, e) for s, e in spans if e <= len(main) and s < e)
+
+    def _spans(
+        self, term: Node, record_id: str, main: str, deadline: float | None
+    ) -> list[tuple[int, int]]:
+        if isinstance(term, Phrase) and not self.phrase(term):
+            term = Text(term.value)
+        if isinstance(term, Regex):
+            return self._regex_spans(term, record_id, deadline)
+        if isinstance(term, Text):
+            return self._text_spans(term, record_id, main)
+        starts = self.index.starts(record_id)
+        analyzer = self.index.analyzer
+        if isinstance(term, Phrase):
+            phrase = self.phrase(term)
+            last = phrase[-1][0]
+            return [
+                (starts[p], analyzer.token_end(main, starts[p + last]))
+                for p in self.index.phrase_positions(record_id, phrase)
+            ]
+        prefix = analyzer.normalize(term.value)  # type: ignore[union-attr]
+        return [(s, s + len(w)) for w, s in self.index.located(record_id) if w.startswith(prefix)]
+
+    def _pattern(self, node: Regex) -> re.Pattern[str]:
+        if node.pattern not in self._patterns:
+            self._patterns[node.pattern] = compile_pattern(node.pattern)
+        return self._patterns[node.pattern]
+
+    def _regex_spans(
+        self, term: Regex, record_id: str, deadline: float | None
+    ) -> list[tuple[int, int]]:
+        pattern = self._pattern(term)
+        text = self.index.text(record_id)[0]
+        if deadline is None:
+            return [m.span() for m in pattern.finditer(text)]
+        spans: list[tuple[int, int]] = []
+        remaining = deadline - time.monotonic()
+        if remaining > 0:
+            try:
+                with time_limit(remaining):
+                    for match in pattern.finditer(text):
+                        spans.append(match.span())
+            except RegexTimeoutError:
+                pass  # out of time: keep what was found
+        return spans
+
+    def _text_spans(self, term: Text, record_id: str, main: str) -> list[tuple[int, int]]:
+        pieces, literal = self.text(term)
+        if literal is not None:
+            spans = []
+            at = main.find(literal) if literal else -1
+            while at != -1:
+                spans.append((at, at + len(literal)))
+                at = main.find(literal, at + 1)
+            return spans
+        # A single word: the word itself, or the whole word of another form
+        return self.index.occurrences(record_id, pieces[0])
+
+
+def _positive_text(node: Node) -> Iterator[Node]:
+    """Yield the text and regex terms a match has to satisfy (not negated)."""
+    if isinstance(node, Text) and node.prefilter:
+        return
+    if isinstance(node, (Text, Phrase, Prefix, Regex)):
+        yield node
+    elif isinstance(node, (And, Or)):
+        for child in node.children:
+            yield from _positive_text(child)
+
+
+class QueryService:
+    """Service for running queries over notes and tasks."""
+
+    def __init__(self, data_dir: Path) -> None:
+        """Initialize query service.
+
+        Args:
+            data_dir: Directory containing data.json
+        """
+        self.store = JSONStore(data_dir / "data.json")
+
+    def execute(
+        self, query: str | Node, today: date | None = None, timeout: float | None = None
+    ) -> QueryResult:
+        """Run a query.
+
+        Args:
+            query: Query text (see pkm.services.query) or a parsed query
+            today: Date relative dates count from (default: today)
+            timeout: Seconds evaluation may take (for regex terms); regex
+                highlighting gets what is left
+
+        Returns:
+            Matching notes and tasks in storage order, with the plan taken
+
+        Raises:
+            QuerySyntaxError: If the query text is malformed
+            RegexTimeoutError: If evaluation takes longer than ``timeout``
+        """
+        deadline = time.monotonic() + timeout if timeout else None
+        node = parse_query(query, today) if isinstance(query, str) else query
+        data = self.store.load()
+        analyzer = default_analyzer()
+        index = RecordIndex(data, analyzer, self.store.search_index(data, analyzer))
+        planner = Planner(index, today)
+        steps: list[PlanStep] = []
+        with time_limit(timeout) if timeout else nullcontext():
+            matched = planner.run(node, steps)
+
+        notes = [
+            deserialize_note(index.records[r], index.courses)
+            for r in matched
+            if r in index.by_type["note"]
+        ]
+        tasks = [
+            deserialize_task(index.records[r], index.courses)
+            for r in matched
+            if r in index.by_type["task"]
+        ]
+        budget = max(0.0, deadline - time.monotonic()) if deadline is not None else None
+        highlights = Highlights(planner, node, matched, budget)
+        return QueryResult(notes, tasks, steps, highlights, planner.examined, index.size)
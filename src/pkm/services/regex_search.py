@@ -0,0 +1,114 @@
+"""Regular expression support for search.
+
+Running a regex over every note is slow on large collections, so a pattern
+is first reduced to the literal fragments any match must contain (e.g.
+``calvin\\s+cycle`` needs "calvin" and "cycle"). Those fragments are looked
+up in the text index like ordinary search terms, and the regex engine only
+runs on records that contain all of them.
+
+A pattern with nested repeats can take exponential time on some inputs, so
+evaluation runs under ``time_limit``.
+"""
+
+import re
+import signal
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
+from re import _parser  # type: ignore[attr-defined]
+from typing import Any
+
+# Seconds a regex search may run before it is abandoned
+REGEX_TIMEOUT = 2.0
+
+_REPEATS = (_parser.MAX_REPEAT, _parser.MIN_REPEAT, _parser.POSSESSIVE_REPEAT)
+
+
+class RegexTimeoutError(Exception):
+    """A regex search ran longer than its time limit."""
+
+
+def compile_pattern(pattern: str) -> re.Pattern[str]:
+    """Compile a search pattern (case-insensitive, like substring search).
+
+    Args:
+        pattern: Regular expression
+
+    Returns:
+        Compiled pattern
+
+    Raises:
+        re.error: If the pattern is invalid
+    """
+    return re.compile(pattern, re.IGNORECASE)
+
+
+def required_literals(pattern: str) -> list[str]:
+    """Find literal fragments every match of a pattern must contain.
+
+    Only fragments that are certain to appear are returned: text inside
+    alternatives, optional groups and character classes is skipped.
+
+    Args:
+        pattern: Valid regular expression
+
+    Returns:
+        Lowercase fragments, each containing at least one word character
+    """
+    fragments: list[str] = []
+    current: list[str] = []
+
+    def flush() -> None:
+        if current:
+            fragments.append("".join(current))
+            current.clear()
+
+    def walk(items: list[Any]) -> None:
+        for op, av in items:
+            if op is _parser.LITERAL:
+                current.append(chr(av))
+            elif op is _parser.SUBPATTERN:
+                walk(av[-1])
+            elif op in _REPEATS:
+                low, _, item = av
+                flush()
+                if low >= 1:
+                    walk(item)
+                flush()
+            elif op is not _parser.AT:  # anchors consume nothing
+                flush()
+
+    walk(list(_parser.parse(pattern, re.IGNORECASE)))
+    flush()
+    return [f.lower() for f in fragments if re.search(r"\w", f)]
+
+
+@contextmanager
+def time_limit(seconds: float) -> Iterator[None]:
+    """Abort the enclosed block with RegexTimeoutError after ``seconds``.
+
+    The regex engine checks for signals while matching, so a SIGALRM timer
+    interrupts even a single runaway match. Where no timer is available
+    (Windows, or outside the main thread) the block runs unguarded.
+
+    Args:
+        seconds: Time limit
+
+    Raises:
+        RegexTimeoutError: If the block is still running after the limit
+    """
+    in_main_thread = threading.current_thread() is threading.main_thread()
+    if not hasattr(signal, "setitimer") or not in_main_thread:
+        yield
+        return
+
+    def expire(signum: int, frame: object) -> None:
+        raise RegexTimeoutError(f"Search stopped after {seconds:g}s")
+
+    previous = signal.signal(signal.SIGALRM, expire)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
@@ -0,0 +1,264 @@
+"""Reminders of upcoming due dates.
+
+``ReminderQueue`` keeps one min-heap of reminder times (each due date minus
+each lead time), so the next reminder is always at the top and a watcher
+can sleep until it. When tasks change, only the changed tasks are pushed
+again: their old entries stay in the heap but no longer match the task's
+version and are dropped when they reach the top, and the heap is rebuilt
+only when it holds more than twice the entries the tasks could need.
+
+``ReminderService.watch`` notices changes by the modification stamps of
+data.json and the capture spool, which costs two ``stat`` calls per check
+whatever the number of tasks. It reads the store with ``JSONStore.peek``,
+so captures are seen without draining the spool and a watcher never
+rewrites data.json behind the commands it runs alongside.
+"""
+
+import heapq
+import os
+import threading
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any
+
+from pkm.models.task import Task
+from pkm.storage.course_registry import CourseRegistry
+from pkm.storage.json_store import JSONStore
+from pkm.storage.schema import deserialize_task
+
+# How often (seconds) a watcher checks the store for changes while waiting
+WATCH_INTERVAL = 2.0
+
+
+@dataclass(frozen=True)
+class Reminder:
+    """A reminder that a task is coming due.
+
+    Attributes:
+        at: When to remind
+        task_id: Task ID
+        title: Task title
+        due: Due date of the task (or of its occurrence)
+        course: Course name (None for inbox tasks)
+    """
+
+    at: datetime
+    task_id: str
+    title: str
+    due: datetime
+    course: str | None
+
+
+class ReminderQueue:
+    """Min-heap of upcoming reminders, updated task by task."""
+
+    def __init__(self, leads: list[timedelta]) -> None:
+        """Create an empty queue.
+
+        Args:
+            leads: How long before each due date to remind (0 = when due)
+        """
+        self.leads = sorted(set(leads), reverse=True)
+        # (at, version, task ID, due) - versions also break ties in order
+        self._heap: list[tuple[datetime, int, str, datetime]] = []
+        self._records: dict[str, dict[str, Any]] = {}
+        self._tasks: dict[str, tuple[int, Task]] = {}
+        self._version = 0
+
+    def __len__(self) -> int:
+        """Number of live (not stale) entries."""
+        return sum(1 for entry in self._heap if self._live(entry))
+
+    def _live(self, entry: tuple[datetime, int, str, datetime]) -> bool:
+        """Check that an entry belongs to the current version of its task."""
+        current = self._tasks.get(entry[2])
+        return current is not None and current[0] == entry[1]
+
+    def _schedule(self, version: int, task: Task, due: datetime | None, now: datetime) -> None:
+        """Push the reminders of a due date that are still ahead.
+
+        For a recurring task whose reminders of that occurrence have all
+        passed, the reminders of the next occurrence are pushed instead.
+        """
+        while due is not None:
+            ahead = [due - lead for lead in self.leads if due - lead > now]
+            for at in ahead:
+                heapq.heappush(self._heap, (at, version, task.id, due))
+            if ahead or task.recurrence is None:
+                return
+            due = task.recurrence.following(due)
+
+    def _next_due(self, task: Task, now: datetime) -> datetime | None:
+        """Get the due date to remind of: the first occurrence after ``now``
+        for a recurring task, the due date itself otherwise."""
+        if task.completed or task.due_date is None:
+            return None
+        if task.recurrence is None:
+            return task.due_date
+        return next(
+            task.recurrence.occurrences(task.due_date, now + timedelta(microseconds=1)), None
+        )
+
+    def update(self, records: list[dict[str, Any]], courses: CourseRegistry, now: datetime) -> int:
+        """Bring the queue up to date with the stored tasks.
+
+        Args:
+            records: Stored task records
+            courses: Course registry, to decode courses
+            now: Current time; reminders before it are not scheduled
+
+        Returns:
+            Number of tasks added, changed or removed
+        """
+        changed = 0
+        seen = set()
+        for record in records:
+            task_id = record["id"]
+            seen.add(task_id)
+            if self._records.get(task_id) == record:
+                continue
+            changed += 1
+            self._records[task_id] = record
+            self._version += 1
+            task = deserialize_task(record, courses)
+            self._tasks[task_id] = (self._version, task)
+            self._schedule(self._version, task, self._next_due(task, now), now)
+        for task_id in set(self._records) - seen:
+            changed += 1
+            del self._records[task_id]
+            del self._tasks[task_id]
+
+        if len(self._heap) > 2 * max(len(self._tasks) * len(self.leads), 16):
+            self._heap = [entry for entry in self._heap if self._live(entry)]
+            heapq.heapify(self._heap)
+        return changed
+
+    def _drop_stale(self) -> None:
+        """Pop stale entries off the top of the heap."""
+        while self._heap and not self._live(self._heap[0]):
+            heapq.heappop(self._heap)
+
+    def next_time(self) -> datetime | None:
+        """Get the time of the next reminder, or None if there is none."""
+        self._drop_stale()
+        return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now: datetime) -> list[Reminder]:
+        """Take the reminders whose time has come.
+
+        After the last reminder of a recurring task's occurrence, the
+        reminders of its next occurrence are scheduled.
+
+        Args:
+            now: Current time
+
+        Returns:
+            Reminders at or before ``now``, in order
+        """
+        reminders = []
+        while (at := self.next_time()) is not None and at <= now:
+            _, version, task_id, due = heapq.heappop(self._heap)
+            task = self._tasks[task_id][1]
+            reminders.append(Reminder(at, task_id, task.title, due, task.course))
+            if task.recurrence is not None and at == due - self.leads[-1]:
+                self._schedule(version, task, task.recurrence.following(due), now)
+        return reminders
+
+    def upcoming(self, limit: int) -> list[Reminder]:
+        """List the next reminders without taking them.
+
+        Args:
+            limit: Maximum number of reminders
+
+        Returns:
+            Up to ``limit`` reminders, in order
+        """
+        live = (entry for entry in self._heap if self._live(entry))
+        return [
+            Reminder(
+                at, task_id, self._tasks[task_id][1].title, due, self._tasks[task_id][1].course
+            )
+            for at, _, task_id, due in heapq.nsmallest(limit, live)
+        ]
+
+
+class ReminderService:
+    """Service watching the store and emitting reminders."""
+
+    def __init__(self, data_dir: Path, leads: list[timedelta]) -> None:
+        """Initialize reminder service.
+
+        Args:
+            data_dir: Directory containing data.json
+            leads: How long before each due date to remind
+        """
+        self.store = JSONStore(data_dir / "data.json")
+        self.queue = ReminderQueue(leads)
+        self._stamp: tuple[int, ...] | None = None
+
+    def _current_stamp(self) -> tuple[int, ...]:
+        """Identify the current contents of the data file and spool."""
+        stamp: tuple[int, ...] = ()
+        for path in (self.store.data_file, self.store.spool.dir):
+            try:
+                st = os.stat(path)
+                stamp += (st.st_mtime_ns, st.st_size)
+            except OSError:
+                stamp += (0, 0)
+        return stamp
+
+    def refresh(self, now: datetime) -> int:
+        """Reload the tasks if the store changed since the last refresh.
+
+        Args:
+            now: Current time
+
+        Returns:
+            Number of tasks added, changed or removed
+        """
+        stamp = self._current_stamp()
+        if stamp == self._stamp:
+            return 0
+        data = self.store.peek()  # read only: the watcher never commits
+        self._stamp = stamp
+        return self.queue.update(data["tasks"], CourseRegistry(data), now)
+
+    def poll(self, now: datetime) -> list[Reminder]:
+        """Refresh and take the reminders whose time has come.
+
+        Args:
+            now: Current time
+
+        Returns:
+            Reminders due by ``now``, in order
+        """
+        self.refresh(now)
+        return self.queue.pop_due(now)
+
+    def watch(
+        self,
+        emit: Callable[[Reminder], None],
+        stop: threading.Event,
+        interval: float = WATCH_INTERVAL,
+    ) -> None:
+        """Emit reminders as they come due until ``stop`` is set.
+
+        Between checks the watcher sleeps until the next reminder, or for
+        ``interval`` seconds if that is sooner, to notice changed tasks.
+
+        Args:
+            emit: Called with each reminder
+            stop: Event that ends the watch
+            interval: Seconds between checks for changes
+        """
+        while not stop.is_set():
+            now = datetime.now()
+            for reminder in self.poll(now):
+                emit(reminder)
+            wait = interval
+            next_time = self.queue.next_time()
+            if next_time is not None:
+                wait = min(wait, max(0.0, (next_time - datetime.now()).total_seconds()))
+            stop.wait(wait)
@@ -0,0 +1,134 @@
+"""Saved view service for named queries."""
+
+from dataclasses import dataclass
+from datetime import date
+from pathlib import Path
+
+from pkm.models.note import Note
+from pkm.models.task import Task
+from pkm.services.query import parse_query
+from pkm.services.saved_views import catch_up, is_stale, refresh_view
+from pkm.storage.course_registry import CourseRegistry
+from pkm.storage.json_store import JSONStore
+from pkm.storage.schema import DataSchema, deserialize_note, deserialize_task
+
+
+@dataclass
+class SavedView:
+    """A saved query and the size of its current result."""
+
+    name: str
+    query: str
+    count: int | None  # None while the results are stale
+
+
+class SavedViewService:
+    """Service for saving and opening named queries."""
+
+    def __init__(self, data_dir: Path) -> None:
+        """Initialize saved view service.
+
+        Args:
+            data_dir: Directory containing data.json
+        """
+        self.store = JSONStore(data_dir / "data.json")
+
+    def save_view(self, name: str, query: str, today: date | None = None) -> SavedView:
+        """Save (or replace) a named query and materialize its results.
+
+        Args:
+            name: View name
+            query: Query text (see pkm.services.query)
+            today: Date relative terms count from (default: today)
+
+        Returns:
+            The saved view
+
+        Raises:
+            QuerySyntaxError: If the query is malformed
+        """
+        today = today or date.today()
+        parse_query(query, today)
+        data = self.store.load()
+        catch_up(data)
+        section = data.setdefault("saved_views", {"views": {}})
+        section["views"][name] = {"query": query}
+        entry = refresh_view(data, name, today)
+        self.store.save(data)
+        return SavedView(name, query, len(entry["ids"]))
+
+    def open_view(
+        self, name: str, today: date | None = None
+    ) -> tuple[list[Note], list[Task]] | None:
+        """Get the notes and tasks a saved view currently holds.
+
+        The stored results are read as they are; the query is only
+        evaluated again if they went stale (see pkm.services.saved_views).
+
+        Args:
+            name: View name
+            today: Date relative terms count from (default: today)
+
+        Returns:
+            Tuple of (notes, tasks) in storage order, or None if no such view
+        """
+        today = today or date.today()
+        data = self.store.load()
+        entry = data.get("saved_views", {}).get("views", {}).get(name)
+        if entry is None:
+            return None
+
+        changed = catch_up(data)
+        if is_stale(entry, today):
+            entry = refresh_view(data, name, today)
+            changed = True
+        if changed:
+            self.store.save(data)
+        return self._hydrate(data, set(entry["ids"]))
+
+    def _hydrate(self, data: DataSchema, ids: set[str]) -> tuple[list[Note], list[Task]]:
+        """Build models for the records with the given IDs."""
+        courses = CourseRegistry(data)
+        notes = [deserialize_note(n, courses) for n in data["notes"] if n["id"] in ids]
+        tasks = [deserialize_task(t, courses) for t in data["tasks"] if t["id"] in ids]
+        return notes, tasks
+
+    def list_views(self, today: date | None = None) -> list[SavedView]:
+        """List saved views.
+
+        Captures drained since the views were last used are matched first,
+        so the counts are current; a view whose relative dates have moved
+        on has no count until it is opened again.
+
+        Args:
+            today: Date relative terms count from (default: today)
+
+        Returns:
+            Saved views sorted by name
+        """
+        today = today or date.today()
+        data = self.store.load()
+        if catch_up(data):
+            self.store.save(data)
+        views = data.get("saved_views", {}).get("views", {})
+        return [
+            SavedView(name, entry["query"], None if is_stale(entry, today) else len(entry["ids"]))
+            for name, entry in sorted(views.items())
+        ]
+
+    def delete_view(self, name: str) -> bool:
+        """Delete a saved view.
+
+        Args:
+            name: View name
+
+        Returns:
+            True if deleted, False if no such view
+        """
+        data = self.store.load()
+        views = data.get("saved_views", {}).get("views", {})
+        if name not in views:
+            return False
+        del views[name]
+        self.store.save(data)
+        return True
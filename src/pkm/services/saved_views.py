@@ -0,0 +1,206 @@
+"""Incrementally maintained results of saved queries.
+
+Saved views live in the ``saved_views`` section of the data file::
+
+    {
+        "views": {
+            "crunch": {
+                "query": "priority:high due<10d -completed",
+                "day": "2025-11-20",  # date relative terms were resolved against
+                "ids": ["t3", "t9"],  # matching records; absent while stale
+            }
+        },
+        "unseen": ["n13"],  # drained captures not matched yet (see JSONStore)
+    }
+
+The note and task services report every mutation to ``record_view_change``,
+which tests only the changed record against each view, so opening a view
+reads its stored IDs instead of evaluating the query. A view is evaluated in
+full only when its results cannot be maintained that way: when relative
+dates such as ``due<10d`` or ``overdue`` have moved to a new day, after a
+course rename or merge (course terms may now mean something else), and
+after a recovery.
+"""
+
+from datetime import date, timedelta
+from functools import lru_cache
+from typing import Any
+
+from pkm.services.query import Flag, Node, Not, parse_query
+from pkm.services.query_index import RecordIndex
+from pkm.services.query_service import Planner
+from pkm.storage.schema import DataSchema
+
+
+def _mentions_overdue(node: Node) -> bool:
+    """Check whether a query uses the ``overdue`` flag."""
+    if isinstance(node, Flag):
+        return node.name == "overdue"
+    if isinstance(node, Not):
+        return _mentions_overdue(node.child)
+    return any(_mentions_overdue(c) for c in getattr(node, "children", ()))
+
+
+def depends_on_date(query: str, day: date) -> bool:
+    """Check whether a query's results change from one day to the next.
+
+    Args:
+        query: Query text
+        day: Any date
+
+    Returns:
+        True if the query uses relative dates or ``overdue``
+    """
+    node = parse_query(query, day)
+    return node != parse_query(query, day + timedelta(days=1)) or _mentions_overdue(node)
+
+
+def is_stale(entry: dict[str, Any], day: date) -> bool:
+    """Check whether a view's stored results have to be evaluated again.
+
+    Args:
+        entry: View entry
+        day: Date relative terms count from
+
+    Returns:
+        True if the results were dropped or their relative dates moved on
+    """
+    return "ids" not in entry or (
+        entry["day"] != day.isoformat() and depends_on_date(entry["query"], day)
+    )
+
+
+def matching_ids(data: DataSchema, query: str, day: date) -> list[str]:
+    """Evaluate a query over all records.
+
+    Args:
+        data: Loaded data schema
+        query: Query text
+        day: Date relative terms count from
+
+    Returns:
+        IDs of matching records in storage order
+    """
+    return Planner(RecordIndex(data), day).run(parse_query(query, day))
+
+
+@lru_cache(maxsize=256)
+def _parsed(query: str, day: str) -> Node:
+    """Parse a view's query (once per query and resolving day)."""
+    return parse_query(query, date.fromisoformat(day))
+
+
+def _update(data: DataSchema, record_id: str, kind: str, record: dict[str, Any] | None) -> None:
+    """Move one record into or out of every maintained view.
+
+    The record is indexed on its own, once, and tested against each view's
+    parsed query with one planner per resolving day.
+    """
+    planners: dict[str, Planner] = {}
+    index: RecordIndex | None = None
+    for entry in data["saved_views"]["views"].values():
+        ids = entry.get("ids")
+        if ids is None:
+            continue
+        if record_id in ids:
+            ids.remove(record_id)
+        if record is None:
+            continue
+        if index is None:
+            one = {"notes": [], "tasks": [], "courses": data["courses"]}
+            one[f"{kind}s"].append(record)
+            index = RecordIndex(one)  # type: ignore[arg-type]
+        day = entry["day"]
+        if day not in planners:
+            planners[day] = Planner(index, date.fromisoformat(day))
+        if planners[day].matches(_parsed(entry["query"], day), record_id):
+            ids.append(record_id)
+
+
+def record_view_change(
+    data: DataSchema, kind: str, before: dict[str, Any] | None, after: dict[str, Any] | None
+) -> None:
+    """Update saved views for a single record mutation.
+
+    Must be called after the mutation has been applied to ``data``.
+
+    Args:
+        data: Loaded data schema (updated in place)
+        kind: "note" or "task"
+        before: Raw record before the change (None on create)
+        after: Raw record after the change (None on delete)
+    """
+    if "saved_views" not in data:
+        return
+    record = after if after is not None else before
+    if record is not None:
+        _update(data, record["id"], kind, after)
+
+
+def catch_up(data: DataSchema) -> bool:
+    """Match captures drained since views were last used.
+
+    Drained captures are appended to the end of the record arrays, so they
+    are found by walking back from the end.
+
+    Args:
+        data: Loaded data schema (updated in place)
+
+    Returns:
+        True if any view was updated
+    """
+    section = data.get("saved_views")
+    unseen = set(section.pop("unseen", [])) if section else set()
+    if not unseen:
+        return False
+
+    for kind in ("note", "task"):
+        wanted = {record_id for record_id in unseen if record_id.startswith(kind[0])}
+        for record in reversed(data[f"{kind}s"]):  # type: ignore[literal-required]
+            if not wanted:
+                break
+            if record["id"] in wanted:
+                wanted.discard(record["id"])
+                _update(data, record["id"], kind, record)
+        for record_id in wanted:  # changed or deleted before we got here
+            _update(data, record_id, kind, None)
+    return True
+
+
+def refresh_view(data: DataSchema, name: str, day: date) -> dict[str, Any]:
+    """Evaluate a saved view in full and store its results.
+
+    Args:
+        data: Loaded data schema (updated in place)
+        name: View name
+        day: Date relative terms count from
+
+    Returns:
+        The view entry
+    """
+    entry = data["saved_views"]["views"][name]
+    entry["day"] = day.isoformat()
+    entry["ids"] = matching_ids(data, entry["query"], day)
+    return entry
+
+
+def invalidate_saved_views(data: DataSchema) -> None:
+    """Drop every view's results so they are evaluated in full on next use.
+
+    Args:
+        data: Loaded data schema (updated in place)
+    """
+    for entry in data.get("saved_views", {}).get("views", {}).values():
+        entry.pop("ids", None)
+
+
+def forget_records(data: dict[str, Any], record_ids: set[str]) -> None:
+    """Remove records that left the data file (e.g. archived) from every view.
+
+    Args:
+        data: Data schema or header holding ``saved_views`` (updated in place)
+        record_ids: IDs of the removed records
+    """
+    for entry in data.get("saved_views", {}).get("views", {}).values():
+        if "ids" in entry:
+            entry["ids"] = [i for i in entry["ids"] if i not in record_ids]
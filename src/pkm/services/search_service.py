@@ -1,11 +1,44 @@
 """Search service for finding notes and tasks."""
 
+import re
 from pathlib import Path
 
 from pkm.models.note import Note
 from pkm.models.task import Task
-from pkm.services.note_service import NoteService
-from pkm.services.task_service import TaskService
+from pkm.services.query import And, Field, Node, Or, Phrase, Prefix, Regex, Text
+from pkm.services.query_index import words
+from pkm.services.query_service import QueryResult, QueryService
+from pkm.services.regex_search import REGEX_TIMEOUT, compile_pattern, required_literals
+
+_PART = re.compile(r'"([^"]*)"|(\S+)')
+
+
+def text_terms(query: str) -> list[Node]:
+    """Turn a plain search into text terms.
+
+    Quoted parts become phrases and words ending in ``*`` become prefixes;
+    everything else is matched as a substring. A search without either is a
+    single substring, spaces included, as it always was.
+
+    Args:
+        query: Search text
+
+    Returns:
+        Terms that must all match
+    """
+    query = query.lower()
+    parts = [(m.group(1), m.group(2)) for m in _PART.finditer(query)]
+    if not any(quoted is not None or re.fullmatch(r"\w+\*", word) for quoted, word in parts):
+        return [Text(query)]
+    terms: list[Node] = []
+    for quoted, word in parts:
+        if quoted is not None:
+            terms.append(Phrase(quoted) if words(quoted) else Text(quoted))
+        elif re.fullmatch(r"\w+\*", word):
+            terms.append(Prefix(word[:-1]))
+        else:
+            terms.append(Text(word))
+    return terms
 
 
 class SearchService:
@@ -17,8 +50,7 @@ class SearchService:
         Args:
             data_dir: Directory containing data.json
         """
-        self.note_service = NoteService(data_dir)
-        self.task_service = TaskService(data_dir)
+        self.query_service = QueryService(data_dir)
 
     def search(
         self,
@@ -26,51 +58,61 @@ class SearchService:
         type_filter: str | None = None,
         course_filter: str | None = None,
         topic_filter: str | None = None,
+        regex: bool = False,
     ) -> tuple[list[Note], list[Task]]:
         """Search for notes and tasks matching query.
 
+        Same as ``search_result`` without the match positions.
+
+        Returns:
+            Tuple of (matching_notes, matching_tasks)
+        """
+        result = self.search_result(query, type_filter, course_filter, topic_filter, regex)
+        return result.notes, result.tasks
+
+    def search_result(
+        self,
+        query: str,
+        type_filter: str | None = None,
+        course_filter: str | None = None,
+        topic_filter: str | None = None,
+        regex: bool = False,
+    ) -> QueryResult:
+        """Search for notes and tasks matching query.
+
+        The search runs as a query (see pkm.services.query), so it is
+        answered from the text, course and topic indexes.
+
         Args:
-            query: Search term (case-insensitive substring match)
+            query: Search term (case-insensitive substring match; quoted
+                phrases match whole words, ``word*`` matches a prefix)
             type_filter: Filter by type: "notes", "tasks", or None for both
             course_filter: Filter by course name
             topic_filter: Filter by topic name
+            regex: Treat ``query`` as a case-insensitive regular expression
 
         Returns:
-            Tuple of (matching_notes, matching_tasks)
+            Matching notes and tasks, with the positions of the matches in
+            each note's content and task's title (``highlights``)
+
+        Raises:
+            re.error: If ``regex`` is set and the pattern is invalid
+            RegexTimeoutError: If the pattern takes too long to evaluate
         """
-        query_lower = query.lower()
-        matching_notes: list[Note] = []
-        matching_tasks: list[Task] = []
-
-        # Search notes
-        if type_filter is None or type_filter == "notes":
-            all_notes = self.note_service.list_notes()
-
-            for note in all_notes:
-                # Apply filters
-                if course_filter and note.course != course_filter:
-                    continue
-                if topic_filter and topic_filter not in note.topics:
-                    continue
-
-                # Search in content, topics, course
-                if (query_lower in note.content.lower() or
-                    any(query_lower in topic.lower() for topic in note.topics) or
-                    (note.course and query_lower in note.course.lower())):
-                    matching_notes.append(note)
-
-        # Search tasks
-        if type_filter is None or type_filter == "tasks":
-            all_tasks = self.task_service.list_tasks()
-
-            for task in all_tasks:
-                # Apply filters
-                if course_filter and task.course != course_filter:
-                    continue
-
-                # Search in title, course
-                if (query_lower in task.title.lower() or
-                    (task.course and query_lower in task.course.lower())):
-                    matching_tasks.append(task)
-
-        return matching_notes, matching_tasks
+        if regex:
+            compile_pattern(query)
+            # Literals every match contains narrow the candidates via the index
+            terms: list[Node] = [Text(f, prefilter=True) for f in required_literals(query)]
+            terms.append(Regex(query))
+        else:
+            terms = text_terms(query)
+        if type_filter:
+            terms.append(Field("type", type_filter.rstrip("s")))
+        if course_filter:
+            terms.append(Field("course", course_filter))
+        if topic_filter:
+            # Tasks have no topics, so the topic filter only narrows notes
+            terms.append(Or((Field("topic", topic_filter), Field("type", "task"))))
+
+        timeout = REGEX_TIMEOUT if regex else None
+        return self.query_service.execute(And(tuple(terms)), timeout=timeout)
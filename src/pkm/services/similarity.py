@@ -0,0 +1,167 @@
+"""TF-IDF similarity between notes.
+
+A note is a sparse vector with one weight per term of its content and
+topics::
+
+    weight = (1 + log tf) * (log((1 + N) / (1 + df)) + 1)
+
+where ``tf`` counts the term in the note and ``df`` is the number of the
+``N`` notes that contain it, both read from the maintained term statistics
+(see pkm.services.term_stats), so building the vectors analyzes no notes.
+Vectors are scaled to unit length, so the dot product of two vectors is
+their cosine similarity.
+
+``TfidfVectors`` keeps the vectors in an inverted layout (term -> notes and
+weights), so the neighbours of a note are scored by walking the posting
+lists of that note's own terms only. With NumPy installed the posting
+lists are arrays and scores accumulate in vectorized steps. Without it,
+scores accumulate in a dict, and the long lists of common terms are only
+looked up for notes already found through rarer terms, unless a note could
+still reach the top through common terms alone (their largest weights tell).
+Terms found in a single note are left out of the postings (they cannot make
+two notes similar) but still count towards the vector length.
+"""
+
+import heapq
+import math
+from collections import Counter
+from typing import Any
+
+from pkm.services.analysis import Analyzer, default_analyzer
+from pkm.services.term_stats import note_terms
+from pkm.storage.schema import DataSchema
+
+try:
+    import numpy as np
+except ImportError:  # optional: the pure-Python path gives the same results
+    np = None  # type: ignore[assignment, unused-ignore]
+
+
+class TfidfVectors:
+    """TF-IDF vectors of every note, inverted by term."""
+
+    def __init__(self, data: DataSchema, analyzer: Analyzer | None = None) -> None:
+        """Build the vectors.
+
+        Args:
+            data: Loaded data schema holding current ``term_stats``
+            analyzer: Text analyzer (default: the configured one)
+        """
+        self.analyzer = analyzer or default_analyzer()
+        stats = data["term_stats"]
+        self.notes = max(stats["notes"], 1)
+        self.df: dict[str, int] = stats["df"]
+        self.tf: dict[str, dict[str, int]] = stats["tf"]
+        self.ids: list[str] = []
+        self.position: dict[str, int] = {}
+        self.records: dict[str, dict[str, Any]] = {}
+        postings: dict[str, tuple[list[int], list[float]]] = {}
+
+        for row, record in enumerate(data["notes"]):
+            self.ids.append(record["id"])
+            self.position[record["id"]] = row
+            self.records[record["id"]] = record
+            for term, weight in self.vector(record).items():
+                if self.df.get(term, 0) > 1:
+                    rows, weights = postings.setdefault(term, ([], []))
+                    rows.append(row)
+                    weights.append(weight)
+
+        self.postings: dict[str, Any] = postings
+        self.peak = {term: max(weights) for term, (_, weights) in postings.items()}
+        # Row -> weight of terms in more than 1 in 20 notes (pure Python only)
+        self.common: dict[str, dict[int, float]] = {}
+        if np is not None:
+            self.postings = {
+                term: (np.array(rows, dtype=np.int64), np.array(weights))
+                for term, (rows, weights) in postings.items()
+            }
+        else:
+            self.common = {
+                term: dict(zip(rows, weights))
+                for term, (rows, weights) in postings.items()
+                if len(rows) > len(self.ids) // 20
+            }
+
+    def vector(self, record: dict[str, Any]) -> dict[str, float]:
+        """Compute the unit-length TF-IDF vector of a raw note record."""
+        counts = self.tf.get(record["id"])
+        if counts is None:
+            counts = Counter(note_terms(record, self.analyzer))
+        weights = {
+            term: (1 + math.log(tf)) * (math.log((1 + self.notes) / (1 + self.df.get(term, 0))) + 1)
+            for term, tf in counts.items()
+        }
+        length = math.sqrt(sum(w * w for w in weights.values())) or 1.0
+        return {term: w / length for term, w in weights.items()}
+
+    def neighbours(self, note_id: str, limit: int = 5) -> list[tuple[str, float]]:
+        """Find the notes most similar to a note.
+
+        Args:
+            note_id: Note ID
+            limit: Most neighbours to return
+
+        Returns:
+            (note ID, cosine similarity) pairs, most similar first; notes
+            sharing no term with the note are left out
+        """
+        vector = self.vector(self.records[note_id])
+        own = self.position[note_id]
+        vector = {term: w for term, w in vector.items() if term in self.postings}
+        if np is not None:
+            found = self._scores_array(vector, own, limit)
+        else:
+            found = self._scores_dict(vector, own, limit)
+
+        best = heapq.nsmallest(limit, found, key=lambda pair: (-pair[0], pair[1]))
+        return [(self.ids[row], score) for score, row in best if score > 0]
+
+    def _scores_dict(
+        self, vector: dict[str, float], own: int, limit: int
+    ) -> list[tuple[float, int]]:
+        """Score notes in pure Python; returns (score, row) pairs unordered."""
+        common = [t for t in vector if t in self.common]
+        totals = self._walk(vector, [t for t in vector if t not in self.common])
+
+        # Complete the candidates on the common terms
+        for term in common:
+            weight, lookup = vector[term], self.common[term]
+            for row in totals:
+                totals[row] += weight * lookup.get(row, 0.0)
+        totals.pop(own, None)
+
+        # A note missed so far shares only common terms; can it reach the top?
+        bound = sum(vector[t] * self.peak[t] for t in common)
+        top = heapq.nlargest(limit, totals.values())
+        if common and (len(top) < limit or top[-1] < bound):
+            totals = self._walk(vector, list(vector))
+            totals.pop(own, None)
+        return [(score, row) for row, score in totals.items()]
+
+    def _walk(self, vector: dict[str, float], terms: list[str]) -> dict[int, float]:
+        """Accumulate scores along the whole posting lists of ``terms``."""
+        totals: dict[int, float] = {}
+        for term in terms:
+            weight = vector[term]
+            rows, weights = self.postings[term]
+            for row, other in zip(rows, weights):
+                totals[row] = totals.get(row, 0.0) + weight * other
+        return totals
+
+    def _scores_array(
+        self, vector: dict[str, float], own: int, limit: int
+    ) -> list[tuple[float, int]]:
+        """Score every note with NumPy; returns the top (score, row) pairs unordered."""
+        scores = np.zeros(len(self.ids))
+        for term, weight in vector.items():
+            rows, weights = self.postings[term]
+            scores[rows] += weight * weights
+        scores[own] = 0.0
+        if 0 < limit < len(scores):
+            # Keep ties at the cut, so ordering by row stays deterministic
+            cut = np.partition(scores, len(scores) - limit)[len(scores) - limit]
+            rows = np.flatnonzero((scores >= cut) & (scores > 0))
+        else:
+            rows = np.flatnonzero(scores)
+        return [(float(scores[row]), int(row)) for row in rows]
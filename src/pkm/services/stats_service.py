@@ -0,0 +1,233 @@
+"""Work analytics over the columnar task cache.
+
+Statistics are tallied in one pass over the task columns (see
+pkm.storage.task_columns): NumPy ``bincount`` over the course and day
+columns when NumPy is installed, a single loop over the arrays otherwise.
+Both give the same numbers. Notes only count towards the inbox ages, from
+the inbox notes' records.
+"""
+
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Any
+
+from pkm.storage.course_registry import CourseRegistry
+from pkm.storage.json_store import JSONStore
+from pkm.storage.task_columns import INBOX, NO_TIME, TaskColumns, day_seconds, to_seconds
+
+try:
+    import numpy as np
+except ImportError:  # optional: the loop gives the same numbers
+    np = None  # type: ignore[assignment, unused-ignore]
+
+_DAY = 86_400
+
+# Upper bounds (in days, exclusive) and labels of the inbox age buckets
+INBOX_AGES = ((1, "Under a day"), (7, "1-7 days"), (28, "1-4 weeks"), (None, "Over 4 weeks"))
+
+
+@dataclass(frozen=True)
+class CourseCompletion:
+    """How the tasks of one course were completed.
+
+    Attributes:
+        course: Course name (None for tasks in the inbox)
+        total: Number of tasks
+        completed: Number of completed tasks
+        lateness_days: Mean days between due date and completion of the
+            completed tasks that had a due date (negative when early), None
+            if there were none
+    """
+
+    course: str | None
+    total: int
+    completed: int
+    lateness_days: float | None
+
+    @property
+    def rate(self) -> float:
+        """Fraction of the tasks completed."""
+        return self.completed / self.total if self.total else 0.0
+
+
+@dataclass(frozen=True)
+class WorkStats:
+    """Completion, lateness, workload and inbox statistics.
+
+    Attributes:
+        courses: Completion per course, by name (inbox last)
+        lateness_days: Mean lateness over all courses (see
+            ``CourseCompletion``)
+        overdue: Open tasks due before today
+        workload: (day, open tasks due that day) for each day from today
+        inbox_ages: (label, notes and tasks) per ``INBOX_AGES`` bucket
+    """
+
+    courses: list[CourseCompletion]
+    lateness_days: float | None
+    overdue: int
+    workload: list[tuple[date, int]]
+    inbox_ages: list[tuple[str, int]]
+
+
+class _Tally:
+    """Raw counts per course slot (the inbox is the last slot)."""
+
+    def __init__(self, slots: int, days: int) -> None:
+        self.slots = slots
+        self.days = days
+        self.total = [0] * slots
+        self.completed = [0] * slots
+        self.late_sum = [0.0] * slots
+        self.late_count = [0] * slots
+        self.overdue = 0
+        self.workload = [0] * days
+        self.inbox_ages = [0] * len(INBOX_AGES)
+
+
+def _age_bucket(age_days: float) -> int:
+    """Get the ``INBOX_AGES`` bucket of an age."""
+    for bucket, (bound, _) in enumerate(INBOX_AGES):
+        if bound is None or age_days < bound:
+            return bucket
+    return len(INBOX_AGES) - 1
+
+
+def _tally_loop(columns: TaskColumns, tally: _Tally, start: int, now: int) -> None:
+    """Tally every task in one loop over the arrays."""
+    inbox = tally.slots - 1
+    rows = zip(
+        columns.course, columns.completed, columns.due, columns.completed_at, columns.created
+    )
+    for course, completed, due, completed_at, created in rows:
+        slot = inbox if course == INBOX else course
+        tally.total[slot] += 1
+        if completed:
+            tally.completed[slot] += 1
+            if due != NO_TIME and completed_at != NO_TIME:
+                tally.late_sum[slot] += (completed_at - due) / _DAY
+                tally.late_count[slot] += 1
+        elif due != NO_TIME:
+            offset = (due - start) // _DAY
+            if offset < 0:
+                tally.overdue += 1
+            elif offset < tally.days:
+                tally.workload[offset] += 1
+        if slot == inbox and created != NO_TIME:
+            tally.inbox_ages[_age_bucket((now - created) / _DAY)] += 1
+
+
+def _tally_array(columns: TaskColumns, tally: _Tally, start: int, now: int) -> None:
+    """Tally every task with NumPy counts over whole columns."""
+    course = np.frombuffer(columns.course, dtype=np.int32)
+    slot = np.where(course == INBOX, tally.slots - 1, course)
+    completed = np.frombuffer(columns.completed, dtype=np.int8).astype(bool)
+    due = np.frombuffer(columns.due, dtype=np.int64)
+    completed_at = np.frombuffer(columns.completed_at, dtype=np.int64)
+    created = np.frombuffer(columns.created, dtype=np.int64)
+
+    tally.total = np.bincount(slot, minlength=tally.slots).tolist()
+    tally.completed = np.bincount(slot[completed], minlength=tally.slots).tolist()
+
+    timed = completed & (due != NO_TIME) & (completed_at != NO_TIME)
+    delays = (completed_at[timed] - due[timed]) / _DAY
+    tally.late_sum = np.bincount(slot[timed], weights=delays, minlength=tally.slots).tolist()
+    tally.late_count = np.bincount(slot[timed], minlength=tally.slots).tolist()
+
+    offsets = (due[~completed & (due != NO_TIME)] - start) // _DAY
+    tally.overdue = int((offsets < 0).sum())
+    ahead = offsets[(offsets >= 0) & (offsets < tally.days)]
+    tally.workload = np.bincount(ahead, minlength=tally.days).tolist()
+
+    ages = (now - created[(slot == tally.slots - 1) & (created != NO_TIME)]) / _DAY
+    bounds = [bound for bound, _ in INBOX_AGES if bound is not None]
+    buckets = np.searchsorted(np.array(bounds, dtype=float), ages, side="right")
+    tally.inbox_ages = np.bincount(buckets, minlength=len(INBOX_AGES)).tolist()
+
+
+def compute_stats(
+    columns: TaskColumns,
+    notes: list[dict[str, Any]],
+    courses: CourseRegistry,
+    now: datetime,
+    weeks: int = 4,
+) -> WorkStats:
+    """Compute work statistics.
+
+    Args:
+        columns: Task columns
+        notes: Raw note records (for the inbox ages)
+        courses: Course registry, to name and merge course IDs
+        now: Current time; workload starts on its day
+        weeks: Weeks of workload to report
+
+    Returns:
+        Statistics
+    """
+    tally = _Tally(slots=len(columns.courses) + 1, days=7 * weeks)
+    start, now_seconds = day_seconds(now.date()), to_seconds(now.isoformat())
+    if np is not None:
+        _tally_array(columns, tally, start, now_seconds)
+    else:
+        _tally_loop(columns, tally, start, now_seconds)
+
+    for note in notes:
+        if note.get("course_id") is None and note.get("created_at"):
+            age = (now_seconds - to_seconds(note["created_at"])) / _DAY
+            tally.inbox_ages[_age_bucket(age)] += 1
+
+    # Merged courses (aliases) count under their surviving name
+    by_name: dict[str | None, list[float]] = {}
+    names = [courses.name_of(c) for c in columns.courses] + [None]
+    for slot, name in enumerate(names):
+        if tally.total[slot]:
+            entry = by_name.setdefault(name, [0, 0, 0.0, 0])
+            entry[0] += tally.total[slot]
+            entry[1] += tally.completed[slot]
+            entry[2] += tally.late_sum[slot]
+            entry[3] += tally.late_count[slot]
+
+    completion = [
+        CourseCompletion(name, int(total), int(done), late / count if count else None)
+        for name, (total, done, late, count) in by_name.items()
+    ]
+    completion.sort(key=lambda c: (c.course is None, (c.course or "").lower()))
+    late_count = sum(tally.late_count)
+    return WorkStats(
+        courses=completion,
+        lateness_days=sum(tally.late_sum) / late_count if late_count else None,
+        overdue=tally.overdue,
+        workload=[
+            (now.date() + timedelta(days=day), count) for day, count in enumerate(tally.workload)
+        ],
+        inbox_ages=[(label, count) for (_, label), count in zip(INBOX_AGES, tally.inbox_ages)],
+    )
+
+
+class StatsService:
+    """Service for work analytics."""
+
+    def __init__(self, data_dir: Path) -> None:
+        """Initialize stats service.
+
+        Args:
+            data_dir: Directory containing data.json
+        """
+        self.store = JSONStore(data_dir / "data.json")
+
+    def work_stats(self, weeks: int = 4, now: datetime | None = None) -> WorkStats:
+        """Compute completion, lateness, workload and inbox statistics.
+
+        Args:
+            weeks: Weeks of upcoming workload to report
+            now: Current time (default: now)
+
+        Returns:
+            Statistics over all notes and tasks
+        """
+        data = self.store.load()
+        columns = self.store.task_columns(data)
+        return compute_stats(
+            columns, data["notes"], CourseRegistry(data), now or datetime.now(), weeks
+        )
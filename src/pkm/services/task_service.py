@@ -1,14 +1,42 @@
 """Task service for task management business logic."""
 
-import re
-from datetime import date, datetime, timedelta
+from collections.abc import Iterator
+from datetime import date, datetime, time, timedelta
+from itertools import islice, takewhile
 from pathlib import Path
+from typing import Any
 
-from pkm.models.common import reset_id_counter
-from pkm.models.task import Subtask, Task
-from pkm.services.id_generator import generate_task_id
+from pkm.models.task import Recurrence, Subtask, Task
+from pkm.services.link_index import LinkIndex
+from pkm.services.mutations import record_mutation
+from pkm.storage.course_registry import CourseRegistry
 from pkm.storage.json_store import JSONStore
-from pkm.storage.schema import deserialize_task, serialize_task
+from pkm.storage.schema import DataSchema, RecordFilter, deserialize_task, serialize_task
+from pkm.utils.date_parser import END_OF_DAY
+
+
+def occurrences(task: Task, due_from: date, due_before: date | None = None) -> list[Task]:
+    """Expand a recurring task into its occurrences due in a window.
+
+    Args:
+        task: Recurring task (its due date is its current occurrence)
+        due_from: First day of the window
+        due_before: Day after the window (None: only the first occurrence)
+
+    Returns:
+        Copies of the task, one per occurrence, or the task itself if it
+        does not recur
+    """
+    if task.recurrence is None or task.due_date is None:
+        return [task]
+    dues = task.recurrence.occurrences(task.due_date, datetime.combine(due_from, time()))
+    window: Iterator[datetime]
+    if due_before is None:
+        window = islice(dues, 1)
+    else:
+        end = datetime.combine(due_before, time())
+        window = takewhile(lambda due: due < end, dues)
+    return [task.model_copy(update={"due_date": due}) for due in window]
 
 
 class TaskService:
@@ -21,22 +49,38 @@ class TaskService:
             data_dir: Directory containing data.json
         """
         self.store = JSONStore(data_dir / "data.json")
-        self._initialize_id_counter()
 
-    def _initialize_id_counter(self) -> None:
-        """Initialize the ID counter based on existing tasks."""
-        data = self.store.load()
-        max_id = 0
-
-        for task_data in data.get("tasks", []):
-            task_id = task_data.get("id", "")
-            # Extract number from ID (e.g., "t5" -> 5)
-            match = re.match(r"t(\d+)", task_id)
-            if match:
-                num = int(match.group(1))
-                max_id = max(max_id, num)
+    def _new_task(
+        self,
+        title: str,
+        due_date: datetime | None,
+        priority: str,
+        course: str | None,
+        recurrence: Recurrence | None = None,
+    ) -> Task:
+        """Build a task with a freshly reserved ID (see pkm.storage.spool).
 
-        reset_id_counter("t", max_id)
+        Raises:
+            ValueError: If a recurring task has no occurrence from its due date
+                (today if none is given)
+        """
+        if recurrence is not None:
+            due_date = recurrence.first(due_date or datetime.combine(date.today(), END_OF_DAY))
+            if due_date is None:
+                raise ValueError("Recurrence ends before the first due date")
+        return Task(
+            id=self.store.spool.reserve("t"),
+            title=title,
+            created_at=datetime.now(),
+            due_date=due_date,
+            priority=priority,  # type: ignore
+            completed=False,
+            completed_at=None,
+            course=course,
+            linked_notes=[],
+            subtasks=[],
+            recurrence=recurrence,
+        )
 
     def create_task(
         self,
@@ -44,6 +88,7 @@ class TaskService:
         due_date: datetime | None = None,
         priority: str = "medium",
         course: str | None = None,
+        recurrence: Recurrence | None = None,
     ) -> Task:
         """Create a new task.
 
@@ -52,30 +97,50 @@ class TaskService:
             due_date: Optional due date
             priority: Task priority (high, medium, low)
             course: Optional course assignment
+            recurrence: Optional rule repeating the due date (moved to the
+                rule's first occurrence; today if there is no due date)
 
         Returns:
             Created task
         """
-        task = Task(
-            id=generate_task_id(),
-            title=title,
-            created_at=datetime.now(),
-            due_date=due_date,
-            priority=priority,  # type: ignore
-            completed=False,
-            completed_at=None,
-            course=course,
-            linked_notes=[],
-            subtasks=[],
-        )
+        data = self.store.load()
+        task = self._new_task(title, due_date, priority, course, recurrence)
 
         # Save to storage
-        data = self.store.load()
-        data["tasks"].append(serialize_task(task))
+        courses = CourseRegistry(data)
+        data["tasks"].append(serialize_task(task, courses))
+        record_mutation(data, "task", None, data["tasks"][-1])
         self.store.save(data)
 
         return task
 
+    def capture_task(
+        self,
+        title: str,
+        due_date: datetime | None = None,
+        priority: str = "medium",
+        course: str | None = None,
+        recurrence: Recurrence | None = None,
+    ) -> Task:
+        """Capture a task without loading the data file.
+
+        Like ``NoteService.capture_note``, the task goes to the capture
+        spool and reaches the data file on the next load.
+
+        Args:
+            title: Task title
+            due_date: Optional due date
+            priority: Task priority (high, medium, low)
+            course: Optional course assignment
+            recurrence: Optional rule repeating the due date
+
+        Returns:
+            Captured task
+        """
+        task = self._new_task(title, due_date, priority, course, recurrence)
+        self.store.spool.capture(task.model_dump(mode="json"))
+        return task
+
     def get_task(self, task_id: str) -> Task | None:
         """Get a task by ID.
 
@@ -86,19 +151,84 @@ class TaskService:
             Task if found, None otherwise
         """
         data = self.store.load()
+        courses = CourseRegistry(data)
         for task_data in data["tasks"]:
             if task_data["id"] == task_id:
-                return deserialize_task(task_data)
+                return deserialize_task(task_data, courses)
         return None
 
+    def iter_tasks(self, filter: RecordFilter | None = None) -> Iterator[Task]:
+        """Iterate over tasks, hydrating each one only when it is reached.
+
+        The filter runs on the raw record, so non-matching tasks are never
+        validated into models and callers can stop early (e.g. with
+        ``itertools.islice``) without building the full list.
+
+        Args:
+            filter: Optional predicate over the raw task record
+
+        Yields:
+            Matching tasks in storage order
+        """
+        data = self.store.load()
+        courses = CourseRegistry(data)
+        for task_data in data["tasks"]:
+            if filter is None or filter(task_data):
+                yield deserialize_task(task_data, courses)
+
+    def count_tasks(self, filter: RecordFilter | None = None) -> int:
+        """Count tasks matching a filter without hydrating them.
+
+        Args:
+            filter: Optional predicate over the raw task record
+
+        Returns:
+            Number of matching tasks
+        """
+        data = self.store.load()
+        if filter is None:
+            return len(data["tasks"])
+        return sum(1 for task_data in data["tasks"] if filter(task_data))
+
+    def select_tasks(self, course: str | None = None, **conditions: Any) -> list[Task]:
+        """Get the tasks matching conditions on the task columns.
+
+        Matching runs over the columnar task cache (see
+        pkm.storage.task_columns), so only matching tasks are read from
+        their records and validated into models. With ``due_from``,
+        recurring tasks are expanded into their occurrences in the window.
+
+        Args:
+            course: Only tasks in this course (merge aliases included)
+            **conditions: Keyword conditions of ``TaskColumns.select``
+
+        Returns:
+            Matching tasks in storage order (a recurring task's occurrences
+            in due order)
+        """
+        data = self.store.load()
+        columns = self.store.task_columns(data)
+        courses = CourseRegistry(data)
+        if course is not None:
+            conditions["course_ids"] = courses.ids_for(course)
+        tasks: list[Task] = []
+        for row in columns.select(**conditions):
+            task = deserialize_task(data["tasks"][row], courses)
+            if task.recurrence is None or conditions.get("due_from") is None:
+                tasks.append(task)
+            else:
+                tasks.extend(
+                    occurrences(task, conditions["due_from"], conditions.get("due_before"))
+                )
+        return tasks
+
     def list_tasks(self) -> list[Task]:
         """List all tasks.
 
         Returns:
             List of all tasks
         """
-        data = self.store.load()
-        return [deserialize_task(task_data) for task_data in data["tasks"]]
+        return list(self.iter_tasks())
 
     def get_inbox_tasks(self) -> list[Task]:
         """Get all tasks in inbox (course=None).
@@ -106,7 +236,7 @@ class TaskService:
         Returns:
             List of inbox tasks
         """
-        return [task for task in self.list_tasks() if task.course is None]
+        return self.select_tasks(inbox=True)
 
     def get_tasks_today(self) -> list[Task]:
         """Get all tasks due today.
@@ -115,10 +245,9 @@ class TaskService:
             List of tasks due today
         """
         today = date.today()
-        return [
-            task for task in self.list_tasks()
-            if task.due_date and task.due_date.date() == today and not task.completed
-        ]
+        return self.select_tasks(
+            open_only=True, due_from=today, due_before=today + timedelta(days=1)
+        )
 
     def get_tasks_this_week(self) -> list[Task]:
         """Get all tasks due within 7 days.
@@ -127,13 +256,9 @@ class TaskService:
             List of tasks due this week
         """
         today = date.today()
-        week_end = today + timedelta(days=7)
-        return [
-            task for task in self.list_tasks()
-            if task.due_date
-            and today <= task.due_date.date() <= week_end
-            and not task.completed
-        ]
+        return self.select_tasks(
+            open_only=True, due_from=today, due_before=today + timedelta(days=8)
+        )
 
     def get_tasks_overdue(self) -> list[Task]:
         """Get all overdue tasks (past due and not completed).
@@ -141,39 +266,71 @@ class TaskService:
         Returns:
             List of overdue tasks
         """
-        today = date.today()
-        return [
-            task for task in self.list_tasks()
-            if task.due_date
-            and task.due_date.date() < today
-            and not task.completed
-        ]
+        return self.select_tasks(open_only=True, due_before=date.today())
 
     def complete_task(self, task_id: str) -> Task | None:
         """Mark a task as completed.
 
+        For a recurring task, only its current occurrence is completed: it
+        is stored as a completed task of its own, and the recurring task
+        moves on to its next occurrence with its subtasks unchecked. The
+        last occurrence completes the recurring task itself.
+
         Args:
             task_id: Task ID to complete
 
         Returns:
-            Updated task if found, None otherwise
+            Completed task (or occurrence) if found, None otherwise
         """
         data = self.store.load()
+        courses = CourseRegistry(data)
 
         for i, task_data in enumerate(data["tasks"]):
             if task_data["id"] == task_id:
-                task = deserialize_task(task_data)
+                task = deserialize_task(task_data, courses)
+                if task.recurrence is not None and task.due_date is not None:
+                    following = task.recurrence.following(task.due_date)
+                    if following is not None:
+                        return self._complete_occurrence(data, i, task, following)
                 task.completed = True
                 task.completed_at = datetime.now()
 
                 # Update in storage
-                data["tasks"][i] = serialize_task(task)
+                data["tasks"][i] = serialize_task(task, courses)
+                record_mutation(data, "task", task_data, data["tasks"][i])
                 self.store.save(data)
 
                 return task
 
         return None
 
+    def _complete_occurrence(
+        self, data: DataSchema, index: int, task: Task, following: datetime
+    ) -> Task:
+        """Store a recurring task's current occurrence as completed and advance it."""
+        courses = CourseRegistry(data)
+        done = task.model_copy(
+            update={
+                "id": self.store.spool.reserve("t"),
+                "completed": True,
+                "completed_at": datetime.now(),
+                "linked_notes": [],
+                "recurrence": None,
+            },
+            deep=True,
+        )
+        data["tasks"].append(serialize_task(done, courses))
+        record_mutation(data, "task", None, data["tasks"][-1])
+
+        task.due_date = following
+        for subtask in task.subtasks:
+            subtask.completed = False
+        before = data["tasks"][index]
+        data["tasks"][index] = serialize_task(task, courses)
+        record_mutation(data, "task", before, data["tasks"][index])
+        self.store.save(data)
+        return done
+
     def add_subtask(self, task_id: str, title: str) -> Task | None:
         """Add a subtask to a task.
 
@@ -185,10 +342,11 @@ class TaskService:
             Updated task if found, None otherwise
         """
         data = self.store.load()
+        courses = CourseRegistry(data)
 
         for i, task_data in enumerate(data["tasks"]):
             if task_data["id"] == task_id:
-                task = deserialize_task(task_data)
+                task = deserialize_task(task_data, courses)
 
                 # Generate subtask ID (integer)
                 subtask_id = len(task.subtasks) + 1
@@ -202,7 +360,8 @@ class TaskService:
                 task.subtasks.append(subtask)
 
                 # Update in storage
-                data["tasks"][i] = serialize_task(task)
+                data["tasks"][i] = serialize_task(task, courses)
+                record_mutation(data, "task", task_data, data["tasks"][i])
                 self.store.save(data)
 
                 return task
@@ -220,17 +379,19 @@ class TaskService:
             Updated task if found, None otherwise
         """
         data = self.store.load()
+        courses = CourseRegistry(data)
 
         for i, task_data in enumerate(data["tasks"]):
             if task_data["id"] == task_id:
-                task = deserialize_task(task_data)
+                task = deserialize_task(task_data, courses)
 
                 for subtask in task.subtasks:
                     if subtask.id == subtask_id:
                         subtask.completed = True
 
                         # Update in storage
-                        data["tasks"][i] = serialize_task(task)
+                        data["tasks"][i] = serialize_task(task, courses)
+                        record_mutation(data, "task", task_data, data["tasks"][i])
                         self.store.save(data)
 
                         return task
@@ -250,14 +411,16 @@ class TaskService:
             Updated task if found, None otherwise
         """
         data = self.store.load()
+        courses = CourseRegistry(data)
 
         for i, task_data in enumerate(data["tasks"]):
             if task_data["id"] == task_id:
-                task = deserialize_task(task_data)
+                task = deserialize_task(task_data, courses)
                 task.course = course
 
                 # Update in storage
-                data["tasks"][i] = serialize_task(task)
+                data["tasks"][i] = serialize_task(task, courses)
+                record_mutation(data, "task", task_data, data["tasks"][i])
                 self.store.save(data)
 
                 return task
@@ -273,7 +436,7 @@ class TaskService:
         Returns:
             List of tasks in the course
         """
-        return [task for task in self.list_tasks() if task.course == course_name]
+        return self.select_tasks(course=course_name)
 
     def get_tasks_by_priority(self, priority: str) -> list[Task]:
         """Get all tasks with a specific priority.
@@ -284,7 +447,7 @@ class TaskService:
         Returns:
             List of tasks with the priority
         """
-        return [task for task in self.list_tasks() if task.priority == priority and not task.completed]
+        return self.select_tasks(open_only=True, priority=priority)
 
     def link_note(self, task_id: str, note_id: str) -> Task | None:
         """Link a note to a task (bidirectional).
@@ -294,34 +457,18 @@ class TaskService:
             note_id: Note ID to link
 
         Returns:
-            Updated task if found, None otherwise
+            Updated task if both task and note exist, None otherwise
         """
         data = self.store.load()
+        courses = CourseRegistry(data)
+        links = LinkIndex(data)
+        record = links.task_record(task_id)
 
-        # Update task
-        for i, task_data in enumerate(data["tasks"]):
-            if task_data["id"] == task_id:
-                task = deserialize_task(task_data)
-
-                # Add note to task's linked notes if not already there
-                if note_id not in task.linked_notes:
-                    task.linked_notes.append(note_id)
-
-                # Update task in storage
-                data["tasks"][i] = serialize_task(task)
+        if record is None or not links.link(task_id, note_id):
+            return None
 
-                # Update note's linked_from_tasks (bidirectional)
-                for j, note_data in enumerate(data["notes"]):
-                    if note_data["id"] == note_id:
-                        if task_id not in note_data.get("linked_from_tasks", []):
-                            note_data.setdefault("linked_from_tasks", []).append(task_id)
-                        data["notes"][j] = note_data
-                        break
-
-                self.store.save(data)
-                return task
-
-        return None
+        self.store.save(data)
+        return deserialize_task(record, courses)
 
     def unlink_note(self, task_id: str, note_id: str) -> Task | None:
         """Unlink a note from a task (bidirectional).
@@ -334,30 +481,34 @@ class TaskService:
             Updated task if found, None otherwise
         """
         data = self.store.load()
+        courses = CourseRegistry(data)
+        links = LinkIndex(data)
+        record = links.task_record(task_id)
 
-        # Update task
-        for i, task_data in enumerate(data["tasks"]):
-            if task_data["id"] == task_id:
-                task = deserialize_task(task_data)
+        if record is None or not links.unlink(task_id, note_id):
+            return None
 
-                # Remove note from task's linked notes
-                if note_id in task.linked_notes:
-                    task.linked_notes.remove(note_id)
+        self.store.save(data)
+        return deserialize_task(record, courses)
 
-                # Update task in storage
-                data["tasks"][i] = serialize_task(task)
+    def delete_task(self, task_id: str) -> bool:
+        """Delete a task and remove it from the notes it links to.
 
-                # Update note's linked_from_tasks (bidirectional)
-                for j, note_data in enumerate(data["notes"]):
-                    if note_data["id"] == note_id:
-                        linked_tasks = note_data.get("linked_from_tasks", [])
-                        if task_id in linked_tasks:
-                            linked_tasks.remove(task_id)
-                            note_data["linked_from_tasks"] = linked_tasks
-                        data["notes"][j] = note_data
-                        break
+        Args:
+            task_id: Task ID to delete
 
-                self.store.save(data)
-                return task
+        Returns:
+            True if deleted, False if not found
+        """
+        data = self.store.load()
 
-        return None
+        links = LinkIndex(data)
+        record = links.task_record(task_id)
+
+        if record is None:
+            return False
+
+        links.remove_task(task_id)
+        record_mutation(data, "task", record, None)
+        self.store.save(data)
+        return True
@@ -0,0 +1,115 @@
+"""Incrementally maintained term counts of notes.
+
+Related-note recommendations (see pkm.services.similarity) weight each term
+of a note by how often it occurs there and how few notes contain it. The
+counts live in the ``term_stats`` section of the data file::
+
+    {
+        "analyzer": ["fold", "cjk", "stopwords", "stem"],  # steps the terms came from
+        "notes": 120,                                      # notes counted
+        "df": {"cell": 14, "mitosi": 3},                   # notes containing each term
+        "tf": {"n1": {"cell": 2, "wall": 1}},              # terms of each note, counted
+    }
+
+The note service and the capture spool drain report every mutation to
+``record_term_change``, so the table never needs a pass over all notes to
+stay current, and each note is analyzed only when it changes. Recovery
+drops the section, and so does a change of analyzer (or a section from
+before ``tf`` was kept); it is rebuilt on next use.
+"""
+
+from collections import Counter
+from typing import Any
+
+from pkm.services.analysis import Analyzer, default_analyzer
+from pkm.storage.schema import DataSchema
+
+
+def note_terms(record: dict[str, Any], analyzer: Analyzer) -> list[str]:
+    """Analyze the content and topics of a raw note record.
+
+    Args:
+        record: Raw note record
+        analyzer: Text analyzer
+
+    Returns:
+        Terms in order, with repeats
+    """
+    terms = analyzer.terms(record.get("content", ""))
+    for topic in record.get("topics", []):
+        terms.extend(analyzer.terms(topic))
+    return terms
+
+
+def _apply(stats: dict[str, Any], record: dict[str, Any], analyzer: Analyzer, sign: int) -> None:
+    """Add (sign=1) or remove (sign=-1) one note's contribution."""
+    df = stats["df"]
+    stats["notes"] += sign
+    if sign > 0:
+        counts = stats["tf"][record["id"]] = dict(Counter(note_terms(record, analyzer)))
+    else:
+        counts = stats["tf"].pop(record["id"], None)
+        if counts is None:
+            counts = Counter(note_terms(record, analyzer))
+    for term in counts:
+        count = df.get(term, 0) + sign
+        if count > 0:
+            df[term] = count
+        else:
+            df.pop(term, None)
+
+
+def rebuild_term_stats(data: DataSchema, analyzer: Analyzer | None = None) -> dict[str, Any]:
+    """Recount document frequencies from all notes in one pass.
+
+    Args:
+        data: Loaded data schema
+        analyzer: Text analyzer (default: the configured one)
+
+    Returns:
+        Fresh statistics (also stored on ``data``)
+    """
+    analyzer = analyzer or default_analyzer()
+    stats: dict[str, Any] = {"analyzer": list(analyzer.steps), "notes": 0, "df": {}, "tf": {}}
+    for record in data["notes"]:
+        _apply(stats, record, analyzer, 1)
+    data["term_stats"] = stats
+    return stats
+
+
+def has_term_stats(data: DataSchema, analyzer: Analyzer | None = None) -> bool:
+    """Check whether ``data`` holds per-note statistics made with ``analyzer``."""
+    stats = data.get("term_stats")
+    steps = (analyzer or default_analyzer()).steps
+    return stats is not None and tuple(stats["analyzer"]) == steps and "tf" in stats
+
+
+def record_term_change(
+    data: DataSchema,
+    kind: str,
+    before: dict[str, Any] | None,
+    after: dict[str, Any] | None,
+    analyzer: Analyzer | None = None,
+) -> None:
+    """Update term counts for a single record mutation.
+
+    Tasks do not count. Files without statistics are left alone until the
+    statistics are first used.
+
+    Args:
+        data: Loaded data schema (updated in place)
+        kind: "note" or "task"
+        before: Raw record before the change (None on create)
+        after: Raw record after the change (None on delete)
+        analyzer: Text analyzer (default: the configured one)
+    """
+    if kind != "note" or "term_stats" not in data:
+        return
+    analyzer = analyzer or default_analyzer()
+    if not has_term_stats(data, analyzer):
+        del data["term_stats"]
+        return
+    if before is not None:
+        _apply(data["term_stats"], before, analyzer, -1)
+    if after is not None:
+        _apply(data["term_stats"], after, analyzer, 1)
@@ -0,0 +1,202 @@
+"""Course registry for dictionary-encoded course references.
+
+Notes and tasks store a short course ID (``course_id``) instead of the full
+course name. The ``courses`` section maps IDs to names::
+
+    [
+        {"id": "c1", "name": "Biology 101"},
+        {"id": "c2", "name": "Bio", "merged_into": "c1"}
+    ]
+
+Renaming a course rewrites one registry entry, and merging turns the source
+entry into an alias of the target, so neither touches any note or task.
+"""
+
+import re
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from pkm.storage.schema import DataSchema
+
+
+class CourseRegistry:
+    """Lookup tables over the ``courses`` section of loaded data."""
+
+    def __init__(self, data: "DataSchema") -> None:
+        """Index the registry entries of loaded data.
+
+        Args:
+            data: Loaded data schema (``courses`` is updated in place)
+        """
+        self.entries = data["courses"]
+        self._by_id: dict[str, dict[str, Any]] = {}
+        self._by_name: dict[str, str] = {}
+        self._max_id = 0
+
+        for entry in self.entries:
+            self._index(entry)
+
+    def _index(self, entry: dict[str, Any]) -> None:
+        """Add a registry entry to the lookup tables."""
+        self._by_id[entry["id"]] = entry
+        if not entry.get("merged_into"):
+            self._by_name[entry["name"]] = entry["id"]
+        match = re.match(r"c(\d+)$", entry["id"])
+        if match:
+            self._max_id = max(self._max_id, int(match.group(1)))
+
+    def resolve(self, course_id: str | None) -> str | None:
+        """Follow merge aliases to the canonical course ID.
+
+        Args:
+            course_id: Stored course ID (may be an alias)
+
+        Returns:
+            Canonical course ID, or None for inbox items and unknown IDs
+        """
+        seen: set[str] = set()
+        while course_id is not None and course_id not in seen:
+            entry = self._by_id.get(course_id)
+            if entry is None:
+                return None
+            if not entry.get("merged_into"):
+                return course_id
+            seen.add(course_id)
+            course_id = entry["merged_into"]
+        return None
+
+    def name_of(self, course_id: str | None) -> str | None:
+        """Get the current name for a stored course ID.
+
+        Args:
+            course_id: Stored course ID (may be an alias)
+
+        Returns:
+            Course name, or None for inbox items
+        """
+        canonical = self.resolve(course_id)
+        return None if canonical is None else self._by_id[canonical]["name"]
+
+    def id_of(self, name: str) -> str | None:
+        """Get the canonical ID for a course name.
+
+        Args:
+            name: Course name
+
+        Returns:
+            Course ID if the course exists, None otherwise
+        """
+        return self._by_name.get(name)
+
+    def ensure(self, name: str) -> str:
+        """Get the ID for a course name, registering the course if new.
+
+        Args:
+            name: Course name
+
+        Returns:
+            Canonical course ID
+        """
+        course_id = self.id_of(name)
+        if course_id is None:
+            entry = {"id": f"c{self._max_id + 1}", "name": name}
+            self.entries.append(entry)
+            self._index(entry)
+            course_id = entry["id"]
+        return course_id
+
+    def ids_for(self, name: str) -> set[str]:
+        """Get every stored ID that refers to a course, including aliases.
+
+        Args:
+            name: Course name
+
+        Returns:
+            Set of IDs (empty if the course does not exist)
+        """
+        canonical = self.id_of(name)
+        if canonical is None:
+            return set()
+        return {cid for cid in self._by_id if self.resolve(cid) == canonical}
+
+    def names(self) -> list[str]:
+        """List canonical course names in registry order."""
+        return list(self._by_name)
+
+    def rename(self, old_name: str, new_name: str) -> str | None:
+        """Rename a course without touching any note or task.
+
+        Args:
+            old_name: Current course name
+            new_name: New course name
+
+        Returns:
+            Course ID if renamed, None if ``old_name`` does not exist
+
+        Raises:
+            ValueError: If ``new_name`` is already used by another course
+        """
+        course_id = self.id_of(old_name)
+        if course_id is None:
+            return None
+        if new_name != old_name and new_name in self._by_name:
+            raise ValueError(f"Course '{new_name}' already exists (use merge instead)")
+
+        del self._by_name[old_name]
+        self._by_id[course_id]["name"] = new_name
+        self._by_name[new_name] = course_id
+        return course_id
+
+    def merge(self, source_name: str, target_name: str) -> tuple[str, str] | None:
+        """Make one course an alias of another.
+
+        Args:
+            source_name: Course to merge away
+            target_name: Course that absorbs the source
+
+        Returns:
+            (source_id, target_id) if both exist, None otherwise
+
+        Raises:
+            ValueError: If source and target are the same course
+        """
+        source_id = self.id_of(source_name)
+        target_id = self.id_of(target_name)
+        if source_id is None or target_id is None:
+            return None
+        if source_id == target_id:
+            raise ValueError("Cannot merge a course into itself")
+
+        self._by_id[source_id]["merged_into"] = target_id
+        del self._by_name[source_name]
+        return source_id, target_id
+
+
+def encode_course(record: dict[str, Any], courses: CourseRegistry) -> dict[str, Any]:
+    """Replace a serialized record's course name with its course ID.
+
+    Args:
+        record: Serialized note or task with a ``course`` name
+        courses: Course registry (new courses are registered)
+
+    Returns:
+        The same record, now carrying ``course_id``
+    """
+    name = record.pop("course", None)
+    record["course_id"] = courses.ensure(name) if name else None
+    return record
+
+
+def decode_course(record: dict[str, Any], courses: CourseRegistry) -> dict[str, Any]:
+    """Build a copy of a stored record with the course name filled in.
+
+    Args:
+        record: Stored note or task carrying ``course_id``
+        courses: Course registry
+
+    Returns:
+        Shallow copy with ``course`` set to the current course name
+    """
+    decoded = dict(record)
+    decoded["course"] = courses.name_of(decoded.pop("course_id", None))
+    return decoded
@@ -0,0 +1,74 @@
+"""Filesystem operations used to commit data files.
+
+Every write, fsync, copy and rename the storage layer performs goes through
+a ``FileOps`` object. The default performs them on the real filesystem;
+the crash-consistency tests substitute one that records which changes have
+reached stable storage and can "crash" at any of these points.
+"""
+
+import os
+import shutil
+from pathlib import Path
+from typing import IO
+
+
+class FileOps:
+    """Real filesystem operations."""
+
+    def create(self, path: Path) -> IO[str]:
+        """Create or truncate a text file and open it for writing."""
+        return open(path, "w", encoding="utf-8")
+
+    def create_exclusive(self, path: Path) -> bool:
+        """Create an empty file unless it already exists (O_EXCL).
+
+        Returns:
+            True if this call created the file
+        """
+        try:
+            fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            return False
+        os.close(fd)
+        return True
+
+    def fsync(self, path: Path) -> None:
+        """Force a file's contents to stable storage."""
+        fd = os.open(path, os.O_RDWR if os.name == "nt" else os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    def fsync_dir(self, path: Path) -> None:
+        """Force a directory's entries (creates, renames) to stable storage."""
+        if os.name == "nt":  # pragma: no cover - directories cannot be opened on Windows
+            return
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    def copy(self, src: Path, dst: Path) -> None:
+        """Copy a file's contents and metadata, replacing ``dst``."""
+        shutil.copy2(src, dst)
+
+    def replace(self, src: Path, dst: Path) -> None:
+        """Atomically rename ``src`` over ``dst``."""
+        os.replace(src, dst)
+
+    def unlink(self, path: Path) -> None:
+        """Remove a file if it exists."""
+        path.unlink(missing_ok=True)
+
+    def exists(self, path: Path) -> bool:
+        """Check whether a file exists."""
+        return path.exists()
+
+    def makedirs(self, path: Path) -> None:
+        """Create a directory and its parents if missing."""
+        path.mkdir(parents=True, exist_ok=True)
+
+
+REAL_FILE_OPS = FileOps()
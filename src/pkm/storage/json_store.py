@@ -1,10 +1,66 @@
 """JSON file storage with atomic writes."""
 
+import copy
 import json
-import shutil
+from collections.abc import Callable, Iterator
 from pathlib import Path
+from typing import Any
 
+from pkm.storage.checksum import stamp_checksum
+from pkm.storage.course_registry import CourseRegistry, encode_course
+from pkm.storage.durability import Durability, default_durability, group_commit
+from pkm.storage.fileops import REAL_FILE_OPS, FileOps
+from pkm.storage.migrations import migrate_to_latest
+from pkm.storage.recovery import RecoveryReport, recover_data
 from pkm.storage.schema import DataSchema, create_empty_schema
+from pkm.storage.search_index import (
+    SearchIndex,
+    TextAnalyzer,
+    read_search_index,
+    write_search_index,
+)
+from pkm.storage.spool import SECTIONS, CaptureSpool
+from pkm.storage.summary import write_summary
+from pkm.storage.task_columns import TaskColumns, read_task_columns, write_task_columns
+
+CommitHook = Callable[[Path, dict[str, Any]], object]
+CaptureHook = Callable[[DataSchema, str, dict[str, Any]], None]
+
+# Sidecars written after every commit, and updates to derived sections for
+# every drained capture; the services register theirs (see pkm.services)
+_COMMIT_HOOKS: list[CommitHook] = [write_summary, write_task_columns]
+_CAPTURE_HOOKS: list[CaptureHook] = []
+
+
+def on_commit(hook: CommitHook) -> CommitHook:
+    """Register a sidecar writer to run after every commit.
+
+    Args:
+        hook: Called with the data file and the data just written; must
+            not raise (a sidecar is a cache, so failing to write it never
+            fails a commit)
+
+    Returns:
+        ``hook``, so this can be used as a decorator
+    """
+    if hook not in _COMMIT_HOOKS:
+        _COMMIT_HOOKS.append(hook)
+    return hook
+
+
+def on_capture(hook: CaptureHook) -> CaptureHook:
+    """Register an update to run for every capture drained from the spool.
+
+    Args:
+        hook: Called with the loaded data, the kind ("note" or "task") and
+            the record as stored, right after it is appended
+
+    Returns:
+        ``hook``, so this can be used as a decorator
+    """
+    if hook not in _CAPTURE_HOOKS:
+        _CAPTURE_HOOKS.append(hook)
+    return hook
 
 
 class JSONStore:
@@ -14,17 +70,42 @@ class JSONStore:
     - Writing to temporary file first (.tmp)
     - Renaming to target file only if write succeeds
     - Creating backups before overwriting (.bak)
+    - Stamping every note and task with a checksum, so a damaged file can be
+      salvaged record by record (see pkm.storage.recovery)
+    - Fsyncing the file and its directory according to the durability mode
+      (see pkm.storage.durability)
+
+    Each commit also refreshes the prompt summary (see pkm.storage.summary),
+    the task columns (see pkm.storage.task_columns) and the sidecars
+    registered with ``on_commit``, and each load drains quick captures
+    from the spool (see pkm.storage.spool), running the ``on_capture``
+    hooks for each.
     """
 
-    def __init__(self, data_file: Path) -> None:
+    def __init__(
+        self,
+        data_file: Path,
+        durability: Durability | None = None,
+        ops: FileOps = REAL_FILE_OPS,
+    ) -> None:
         """Initialize JSON store.
 
         Args:
             data_file: Path to the data.json file
+            durability: "none", "per-commit" or "grouped" (default: from
+                ``PKM_DURABILITY`` or ``pkm --durability``)
+            ops: Filesystem operations used for writing (replaced in tests)
         """
         self.data_file = data_file
+        self.durability = durability or default_durability()
+        self.ops = ops
         self.tmp_file = data_file.with_suffix(".json.tmp")
         self.bak_file = data_file.with_suffix(".json.bak")
+        self.corrupt_file = data_file.with_suffix(".json.corrupt")
+        self.spool = CaptureSpool(data_file, ops)
+        # Set when the last load had to salvage a damaged file
+        self.recovery: RecoveryReport | None = None
+        self._protect_backup = False
 
     def load(self) -> DataSchema:
         """Load data from JSON file.
@@ -32,55 +113,280 @@ class JSONStore:
         Returns:
             Data schema with notes, tasks, and courses
 
+        If the file is damaged, every intact record is salvaged and missing
+        ones are restored from the backup; ``recovery`` then describes what
+        was lost, and the damaged file is kept as ``data.json.corrupt``.
+
+        Notes and tasks captured into the spool since the last load are
+        added and committed first.
+
         Raises:
-            FileNotFoundError: If data file doesn't exist
-            json.JSONDecodeError: If file contains invalid JSON
+            ValueError: If the file is damaged and nothing can be recovered
         """
+        data = self._read()
+        if self.recovery is not None:
+            self._set_aside()
+        elif self.spool.busy():
+            self._drain(data)
+        return data
+
+    def peek(self) -> DataSchema:
+        """Load data without changing anything on disk.
+
+        Like ``load``, except that captures waiting in the spool are added
+        to the returned data only: the spool is not drained, nothing is
+        committed and a damaged file is not set aside. For readers that
+        must not write, such as the reminder watcher.
+
+        Returns:
+            Data schema with notes, tasks, and courses
+
+        Raises:
+            ValueError: If the file is damaged and nothing can be recovered
+        """
+        data = self._read()
+        if self.spool.busy():
+            for _ in self._add_captured(data, self.spool.pending()):
+                pass
+        return data
+
+    def _read(self) -> DataSchema:
+        """Read the data file (or pending grouped commit), salvaging if damaged."""
+        self.recovery = None
+        if self.durability == "grouped":
+            pending = group_commit.pending(self.data_file)
+            if pending is not None:
+                # A copy, so changes a caller never saves stay out of the commit
+                return copy.deepcopy(pending)  # type: ignore[no-any-return]
         if not self.data_file.exists():
             return create_empty_schema()
 
         try:
             with open(self.data_file, "r", encoding="utf-8") as f:
-                data = json.load(f)
-                # Ensure all required keys exist
-                if "notes" not in data:
-                    data["notes"] = []
-                if "tasks" not in data:
-                    data["tasks"] = []
-                if "courses" not in data:
-                    data["courses"] = []
-                return data
-        except json.JSONDecodeError as e:
-            # Try to recover from backup
-            if self.bak_file.exists():
-                with open(self.bak_file, "r", encoding="utf-8") as f:
-                    return json.load(f)
-            raise ValueError(f"Corrupted data file: {e}") from e
+                return self._prepare(json.load(f))
+        except (json.JSONDecodeError, UnicodeDecodeError) as e:
+            data, report = self.salvage()
+            if report.empty:
+                raise ValueError(f"Corrupted data file: {e}") from e
+            self.recovery = report
+            return data
+
+    def drain(self) -> None:
+        """Move spooled captures into the data file now.
+
+        For code that reads the data file without ``load`` (the streaming
+        maintenance commands). A damaged data file is left alone; captures
+        wait in the spool until it has been recovered.
+        """
+        if not self.spool.busy():
+            return
+        try:
+            data = self._read()
+        except ValueError:
+            return
+        if self.recovery is None:
+            self._drain(data)
+
+    def _drain(self, data: DataSchema) -> None:
+        """Move spooled captures into loaded data and commit it.
+
+        The commit is written (and synced) before the spool files are
+        removed, even in "grouped" mode, so a crash in between only means
+        the captures are seen - and skipped - again.
+
+        Args:
+            data: Loaded data (updated in place)
+        """
+        captured = self.spool.pending()
+        added = False
+        for section, record in self._add_captured(data, captured):
+            added = True
+            for hook in _CAPTURE_HOOKS:
+                hook(data, section[:-1], record)
+        sync = self.durability != "none"
+        if added:
+            group_commit.discard(self.data_file)
+            self._write(data, sync)
+        self.spool.clear(data, captured, sync)
+
+    @staticmethod
+    def _add_captured(
+        data: DataSchema, captured: list[dict[str, Any]]
+    ) -> Iterator[tuple[str, dict[str, Any]]]:
+        """Append the captured records that loaded data does not hold yet.
+
+        Args:
+            data: Loaded data (updated in place)
+            captured: Records read from the spool
+
+        Yields:
+            (section, record as stored) right after each append, so a
+            caller can report one mutation before the next is applied
+        """
+        courses = CourseRegistry(data)
+        for prefix, section in SECTIONS.items():
+            records = data[section]  # type: ignore[literal-required]
+            known = {record.get("id") for record in records}
+            for record in captured:
+                if record["id"][0] == prefix and record["id"] not in known:
+                    records.append(encode_course(dict(record), courses))
+                    yield section, records[-1]
+
+    def salvage(self) -> tuple[DataSchema, RecoveryReport]:
+        """Recover what can be read from the data file and its backup.
+
+        Unlike ``load``, every record checksum is verified, so damage that
+        still parses as JSON is found too. Nothing is written.
+
+        Returns:
+            Recovered data and a report of what was kept, restored and lost
+        """
+        data, report = recover_data(self.data_file, self.bak_file)
+        return self._prepare(data), report  # type: ignore[arg-type]
+
+    def save_recovered(self, data: DataSchema) -> None:
+        """Replace a damaged data file with recovered data.
+
+        The damaged file is kept as ``data.json.corrupt`` and the backup is
+        left untouched.
+
+        Args:
+            data: Recovered data
+        """
+        self._set_aside()
+        self.save(data)
+
+    def _set_aside(self) -> None:
+        """Keep a copy of the damaged file and protect the backup from it."""
+        self.ops.copy(self.data_file, self.corrupt_file)
+        self._protect_backup = True
+
+    @staticmethod
+    def _prepare(data: dict[str, Any]) -> DataSchema:
+        """Fill in missing sections and migrate to the current schema.
+
+        Args:
+            data: Parsed JSON document
+
+        Returns:
+            Data in the current schema version
+        """
+        # Ensure all required keys exist
+        if "notes" not in data:
+            data["notes"] = []
+        if "tasks" not in data:
+            data["tasks"] = []
+        if "courses" not in data:
+            data["courses"] = []
+        return migrate_to_latest(data)  # type: ignore[return-value]
 
     def save(self, data: DataSchema) -> None:
         """Save data to JSON file with atomic write.
 
         Process:
-        1. Write to temporary file
+        1. Write to temporary file (fsynced unless durability is "none")
         2. Create backup of existing file
-        3. Rename temp file to target
+        3. Rename temp file to target, then fsync the directory
+
+        In "grouped" mode the write is deferred so that saves arriving within
+        a short window share one write and fsync; call ``flush`` to force it.
+
+        Args:
+            data: Data schema to save
+        """
+        if self.durability == "grouped":
+            group_commit.submit(self.data_file, data, lambda d: self._write(d, sync=True))
+        else:
+            self._write(data, sync=self.durability == "per-commit")
+
+    def flush(self) -> None:
+        """Write any grouped commit for this file now."""
+        group_commit.flush(self.data_file)
+
+    def _write(self, data: DataSchema, sync: bool) -> None:
+        """Atomically replace the data file.
 
         Args:
             data: Data schema to save
+            sync: Fsync the new file before the rename and the directory after
         """
         # Ensure parent directory exists
-        self.data_file.parent.mkdir(parents=True, exist_ok=True)
+        self.ops.makedirs(self.data_file.parent)
+
+        for section in ("notes", "tasks"):
+            for record in data[section]:
+                stamp_checksum(record)
 
         # Write to temporary file first
-        with open(self.tmp_file, "w", encoding="utf-8") as f:
+        with self.ops.create(self.tmp_file) as f:
             json.dump(data, f, indent=2, default=str)
+        if sync:
+            self.ops.fsync(self.tmp_file)
 
-        # Create backup if file exists
-        if self.data_file.exists():
-            shutil.copy2(self.data_file, self.bak_file)
+        # Create backup if file exists (never from a damaged file)
+        if self.ops.exists(self.data_file) and not self._protect_backup:
+            self.ops.copy(self.data_file, self.bak_file)
+        self._protect_backup = False
 
         # Atomic rename
-        self.tmp_file.replace(self.data_file)
+        self.ops.replace(self.tmp_file, self.data_file)
+        if sync:
+            self.ops.fsync_dir(self.data_file.parent)
+        for hook in _COMMIT_HOOKS:
+            hook(self.data_file, data)  # type: ignore[arg-type]
+
+    def task_columns(self, data: DataSchema) -> TaskColumns:
+        """Get the task columns of loaded data.
+
+        The columns written with the last commit are used while the data
+        file is unchanged; otherwise they are rebuilt from ``data``.
+
+        Args:
+            data: Data returned by ``load``
+
+        Returns:
+            Columns with one row per task of ``data``, in order
+        """
+        pending = self.durability == "grouped" and group_commit.pending(self.data_file) is not None
+        if self.recovery is None and not pending:
+            columns = read_task_columns(self.data_file)
+            if columns is not None and len(columns) == len(data["tasks"]):
+                return columns
+            if self.data_file.exists():
+                columns = write_task_columns(self.data_file, data)  # type: ignore[arg-type]
+                if columns is not None:
+                    return columns
+        return TaskColumns.build(data)  # type: ignore[arg-type]
+
+    def search_index(self, data: DataSchema, analyzer: TextAnalyzer) -> SearchIndex:
+        """Get the search index of loaded data.
+
+        The index written with the last commit is used while the data file
+        is unchanged; otherwise it is brought up to date from it, analyzing
+        only the records that changed.
+
+        Args:
+            data: Data returned by ``load``
+            analyzer: Text analyzer (see pkm.services.analysis)
+
+        Returns:
+            Index with one entry per note and task of ``data``
+        """
+        pending = self.durability == "grouped" and group_commit.pending(self.data_file) is not None
+        if self.recovery is None and not pending:
+            index = read_search_index(self.data_file)
+            if (
+                index is not None
+                and index.steps == analyzer.steps
+                and len(index) == len(data["notes"]) + len(data["tasks"])
+            ):
+                return index
+            if self.data_file.exists():
+                index = write_search_index(self.data_file, data, analyzer)  # type: ignore[arg-type]
+                if index is not None:
+                    return index
+        previous = read_search_index(self.data_file, current=False)
+        return SearchIndex.build(data, analyzer, previous)  # type: ignore[arg-type]
 
     def backup_exists(self) -> bool:
         """Check if a backup file exists."""
@@ -92,6 +398,12 @@ class JSONStore:
         Raises:
             FileNotFoundError: If backup file doesn't exist
         """
-        if not self.bak_file.exists():
+        if not self.ops.exists(self.bak_file):
             raise FileNotFoundError("No backup file found")
-        shutil.copy2(self.bak_file, self.data_file)
+        group_commit.discard(self.data_file)
+        # Copy beside the data file and rename, so a crash mid-copy cannot
+        # leave a half-written data file
+        self.ops.copy(self.bak_file, self.tmp_file)
+        self.ops.fsync(self.tmp_file)
+        self.ops.replace(self.tmp_file, self.data_file)
+        self.ops.fsync_dir(self.data_file.parent)
@@ -1,6 +1,115 @@
-"""Data migration utilities for schema versioning."""
+"""Data migration utilities for schema versioning.
 
-from typing import Any
+Each schema change is a registered ``MigrationStep`` that upgrades data from
+one version to the next. Steps transform records one at a time, so the same
+step runs either in memory (``migrate_to_latest``, used by ``JSONStore.load``)
+or streamed from the old file into a new one (``migrate_file``) without ever
+holding both copies of a large data file in memory.
+"""
+
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, ClassVar
+
+from pkm.storage.course_registry import CourseRegistry
+from pkm.storage.schema import CURRENT_SCHEMA_VERSION
+from pkm.storage.stream import RECORD_SECTIONS, ProgressCallback, read_header, rewrite_file
+
+
+class MigrationStep:
+    """One schema upgrade from ``from_version`` to ``from_version + 1``.
+
+    Subclasses override any of the hooks; the defaults leave data unchanged.
+    Hooks are called in order: ``begin`` once with the header (every
+    top-level section except notes and tasks), ``migrate_record`` for each
+    record, then ``finish`` once with the header.
+    """
+
+    from_version: ClassVar[int]
+    description: ClassVar[str]
+
+    def begin(self, header: dict[str, Any]) -> None:
+        """Prepare to migrate; may update the header in place."""
+
+    def migrate_record(self, section: str, record: dict[str, Any]) -> dict[str, Any] | None:
+        """Upgrade one record.
+
+        Args:
+            section: "notes" or "tasks"
+            record: Raw record in the old version
+
+        Returns:
+            Upgraded record, or None to drop it
+        """
+        return record
+
+    def finish(self, header: dict[str, Any]) -> None:
+        """Complete the migration; may update the header in place."""
+
+
+MIGRATIONS: dict[int, type[MigrationStep]] = {}
+
+
+def register_migration(step: type[MigrationStep]) -> type[MigrationStep]:
+    """Class decorator registering a migration step by its source version.
+
+    Raises:
+        ValueError: If a step is already registered for that version
+    """
+    if step.from_version in MIGRATIONS:
+        raise ValueError(f"Migration from v{step.from_version} already registered")
+    MIGRATIONS[step.from_version] = step
+    return step
+
+
+@register_migration
+class CourseRegistryMigration(MigrationStep):
+    """v1 -> v2: move course names out of records into the course registry.
+
+    Version 1 stored the full course name on every note and task and left
+    ``courses`` empty. Version 2 registers each distinct name once and
+    stores its ID on records as ``course_id``.
+    """
+
+    from_version = 1
+    description = "Move course names into the course registry"
+
+    def begin(self, header: dict[str, Any]) -> None:
+        legacy_courses = header.get("courses", [])
+        header["courses"] = []
+        self.registry = CourseRegistry(header)  # type: ignore[arg-type]
+
+        # Keep any names that were registered without records
+        for entry in legacy_courses:
+            if entry.get("name"):
+                self.registry.ensure(entry["name"])
+
+        # Statistics were keyed by name; they are rebuilt by ID on next use
+        header.pop("course_stats", None)
+
+    def migrate_record(self, section: str, record: dict[str, Any]) -> dict[str, Any] | None:
+        name = record.pop("course", None)
+        record["course_id"] = self.registry.ensure(name) if name else None
+        return record
+
+
+@dataclass
+class MigrationReport:
+    """Outcome of a file migration.
+
+    Attributes:
+        from_version: Schema version found in the file
+        to_version: Schema version after migration
+        steps: Descriptions of the steps applied
+        records: Number of records written per section
+        dry_run: True if no file was written
+    """
+
+    from_version: int
+    to_version: int
+    steps: list[str] = field(default_factory=list)
+    records: dict[str, int] = field(default_factory=dict)
+    dry_run: bool = False
 
 
 def get_schema_version(data: dict[str, Any]) -> int:
@@ -12,11 +121,46 @@ def get_schema_version(data: dict[str, Any]) -> int:
     Returns:
         Schema version (default: 1)
     """
-    return data.get("_schema_version", 1)
+    return int(data.get("_schema_version", 1))
+
+
+def pending_steps(version: int) -> list[MigrationStep]:
+    """Instantiate the steps needed to bring data up to date.
+
+    Args:
+        version: Current schema version of the data
+
+    Returns:
+        Steps in the order they must run
+
+    Raises:
+        ValueError: If the data is newer than this program or a step is missing
+    """
+    if version > CURRENT_SCHEMA_VERSION:
+        raise ValueError(
+            f"Data schema v{version} is newer than supported v{CURRENT_SCHEMA_VERSION}"
+        )
+    steps = []
+    for v in range(version, CURRENT_SCHEMA_VERSION):
+        if v not in MIGRATIONS:
+            raise ValueError(f"No migration registered from schema v{v}")
+        steps.append(MIGRATIONS[v]())
+    return steps
+
+
+def _run_record(
+    steps: list[MigrationStep], section: str, record: dict[str, Any]
+) -> dict[str, Any] | None:
+    """Pass one record through every step."""
+    for step in steps:
+        record = step.migrate_record(section, record)  # type: ignore[assignment]
+        if record is None:
+            return None
+    return record
 
 
 def migrate_to_latest(data: dict[str, Any]) -> dict[str, Any]:
-    """Migrate data to the latest schema version.
+    """Migrate in-memory data to the latest schema version.
 
     Args:
         data: JSON data dictionary
@@ -24,19 +168,69 @@ def migrate_to_latest(data: dict[str, Any]) -> dict[str, Any]:
     Returns:
         Migrated data
     """
-    current_version = get_schema_version(data)
-
-    # No migrations needed yet - we're at version 1
-    if current_version == 1:
+    steps = pending_steps(get_schema_version(data))
+    if not steps:
         return data
 
-    # Future migrations would go here:
-    # if current_version < 2:
-    #     data = migrate_v1_to_v2(data)
-    # if current_version < 3:
-    #     data = migrate_v2_to_v3(data)
+    header = {k: v for k, v in data.items() if k not in RECORD_SECTIONS}
+    for step in steps:
+        step.begin(header)
+    sections = {}
+    for section in RECORD_SECTIONS:
+        migrated = (_run_record(steps, section, r) for r in data.get(section, []))
+        sections[section] = [r for r in migrated if r is not None]
+    for step in steps:
+        step.finish(header)
 
-    return data
+    return add_schema_version({**sections, **header}, CURRENT_SCHEMA_VERSION)
+
+
+def migrate_file(
+    path: Path, dry_run: bool = False, progress: ProgressCallback | None = None
+) -> MigrationReport:
+    """Migrate a data file to the latest schema by streaming its records.
+
+    Records are read, upgraded and written one at a time into a temporary
+    file that replaces the original once complete (the original is kept as
+    the ``.bak`` backup). Memory use is bounded by the largest record plus
+    the header, independent of file size.
+
+    Args:
+        path: Data file to migrate
+        dry_run: Run every step but write nothing
+        progress: Optional callback receiving (section, records_done)
+
+    Returns:
+        Report of what was (or would be) migrated
+    """
+    header = read_header(path)
+    version = get_schema_version(header)
+    steps = pending_steps(version)
+    report = MigrationReport(
+        from_version=version,
+        to_version=CURRENT_SCHEMA_VERSION,
+        steps=[f"v{s.from_version} -> v{s.from_version + 1}: {s.description}" for s in steps],
+        dry_run=dry_run,
+    )
+    if not steps:
+        return report
+
+    for step in steps:
+        step.begin(header)
+
+    def finish() -> dict[str, Any]:
+        for step in steps:
+            step.finish(header)
+        return add_schema_version(header, CURRENT_SCHEMA_VERSION)
+
+    report.records = rewrite_file(
+        path,
+        lambda section, record: _run_record(steps, section, record),
+        finish,
+        dry_run=dry_run,
+        progress=progress,
+    )
+    return report
 
 
 def add_schema_version(data: dict[str, Any], version: int = 1) -> dict[str, Any]:
@@ -0,0 +1,367 @@
+"""Tolerant recovery of damaged data files.
+
+When ``data.json`` no longer parses (a truncated write, a torn sector, stray
+bytes), the salvage scanner reads it once from start to end and keeps every
+record that still decodes and matches its checksum. After damage it skips
+ahead to the next line that starts a record or a top-level section, so one
+bad record costs only itself. Records lost to the damage are then filled in
+from the backup, and the report says exactly what was kept, restored and
+lost.
+
+Only records the damage could have held are taken from the backup: those
+seen damaged, and those the backup has where the damaged file has a damaged
+region (between the same intact neighbours, or past the end of a truncated
+section). Records deleted since the backup was written stay deleted.
+"""
+
+import json
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from pkm.storage.checksum import checksum_ok
+from pkm.storage.course_registry import CourseRegistry
+from pkm.storage.migrations import migrate_to_latest
+from pkm.storage.schema import CURRENT_SCHEMA_VERSION, DataSchema
+from pkm.storage.stream import RECORD_SECTIONS, _Buffer
+
+# Data files are written with two-space indentation: top-level keys start
+# lines indented by two spaces, records start lines indented by four and
+# record fields lines indented by six.
+_BOUNDARY = re.compile(r'\n  "([^"\\\n]+)": |\n    \{')
+_RECORD_ID = re.compile(r'\n      "id": "([^"\\\n]*)"')
+
+# Characters kept when scanning on, so a boundary split across chunks is found
+_TAIL = 64
+CHUNK_SIZE = 1 << 16
+# Longest run of undecodable text treated as a record still being read
+MAX_RECORD = 8 << 20
+
+
+@dataclass
+class Salvage:
+    """Everything readable from one, possibly damaged, data file.
+
+    Attributes:
+        header: Top-level sections other than records that decoded intact
+        records: Intact records per section
+        damaged_ids: IDs of damaged records per section (ordered, unique)
+        unidentified: Damaged regions in which no record ID could be read
+        gaps: Per section, IDs of intact records directly followed by damage
+            (None: damage before the first intact record)
+        closed: Sections whose record list was read to its end
+        damaged: True if anything in the file failed to decode or verify
+    """
+
+    header: dict[str, Any] = field(default_factory=dict)
+    records: dict[str, list[dict[str, Any]]] = field(
+        default_factory=lambda: {s: [] for s in RECORD_SECTIONS}
+    )
+    damaged_ids: dict[str, dict[str, None]] = field(
+        default_factory=lambda: {s: {} for s in RECORD_SECTIONS}
+    )
+    unidentified: int = 0
+    gaps: dict[str, set[str | None]] = field(
+        default_factory=lambda: {s: set() for s in RECORD_SECTIONS}
+    )
+    closed: set[str] = field(default_factory=set)
+    damaged: bool = False
+
+    @property
+    def readable(self) -> bool:
+        """True if any section or record could be read."""
+        return bool(self.header) or any(self.records.values())
+
+
+class _Scanner:
+    """Single-pass salvage of a data file, resyncing after damage."""
+
+    def __init__(self, buf: _Buffer) -> None:
+        self.buf = buf
+        self.result = Salvage()
+        self.section: str | None = None
+        self._skipped_ids = self._skipped_content = False
+        self.states = {
+            "key": self._key,
+            "value": self._value,
+            "records": self._records,
+        }
+
+    def run(self) -> Salvage:
+        """Scan to the end of the file."""
+        try:
+            self.buf.expect("{")
+            state = "key"
+        except json.JSONDecodeError:
+            state = self._resync()
+
+        while state != "done":
+            try:
+                state = self.states[state]()
+            except json.JSONDecodeError:
+                state = self._resync()
+        for section in RECORD_SECTIONS:
+            if section not in self.result.closed:
+                self._gap(section)  # truncated, or never reached
+        return self.result
+
+    def _gap(self, section: str) -> None:
+        """Note damage after the last intact record read in a section."""
+        records = self.result.records[section]
+        self.result.gaps[section].add(records[-1].get("id") if records else None)
+
+    def _key(self) -> str:
+        if self.buf.peek() == "}":
+            return "done"
+        key = self.buf.value()
+        if not isinstance(key, str):
+            raise json.JSONDecodeError("Expected section name", "", self.buf.pos)
+        self.buf.expect(":")
+        self.section = key
+        return "value"
+
+    def _value(self) -> str:
+        if self.section in RECORD_SECTIONS and self.buf.peek() == "[":
+            self.buf.expect("[")
+            return "records"
+        value = self.buf.value()
+        self.result.header[self.section] = value  # type: ignore[index]
+        return self._after_member()
+
+    def _after_member(self) -> str:
+        if self.buf.peek() == "}":
+            return "done"
+        self.buf.expect(",")
+        return "key"
+
+    def _records(self) -> str:
+        if self.buf.peek() == "]":
+            self.buf.pos += 1
+            self.result.closed.add(self.section)  # type: ignore[arg-type]
+            return self._after_member()
+
+        self._keep(self.buf.value())
+
+        if self.buf.peek() == "]":
+            self.buf.pos += 1
+            self.result.closed.add(self.section)  # type: ignore[arg-type]
+            return self._after_member()
+        self.buf.expect(",")
+        return "records"
+
+    def _keep(self, record: Any) -> None:
+        """Store a decoded record if it verifies, else note it as damaged."""
+        section = self.section
+        if isinstance(record, dict) and checksum_ok(record):
+            self.result.records[section].append(record)  # type: ignore[index]
+            return
+        self.result.damaged = True
+        self._gap(section)  # type: ignore[arg-type]
+        if isinstance(record, dict) and isinstance(record.get("id"), str):
+            self.result.damaged_ids[section][record["id"]] = None  # type: ignore[index]
+        else:
+            self.result.unidentified += 1
+
+    def _note_skipped(self, text: str) -> None:
+        """Remember what a stretch of skipped text contained."""
+        if self.section not in RECORD_SECTIONS:
+            return
+        for record_id in _RECORD_ID.findall(text):
+            self.result.damaged_ids[self.section][record_id] = None
+            self._skipped_ids = True
+        if text.strip(" \n\r\t,[]{}"):
+            self._skipped_content = True
+
+    def _end_skip(self) -> None:
+        """Count a damaged region of records that named no record."""
+        if self._skipped_content and not self._skipped_ids:
+            self.result.unidentified += 1
+        self._skipped_ids = self._skipped_content = False
+
+    def _resync(self) -> str:
+        """Skip damaged text up to the next record or section start."""
+        self.result.damaged = True
+        if self.section in RECORD_SECTIONS and self.section not in self.result.closed:
+            self._gap(self.section)
+        buf = self.buf
+        start, search = buf.pos, buf.pos + 1
+        self._skipped_ids = self._skipped_content = False
+
+        while True:
+            match = _BOUNDARY.search(buf.text, search)
+            if match is None:
+                # Account for what was skipped so far and read on, keeping a
+                # tail that is scanned again with the next chunk
+                self._note_skipped(buf.text[start:])
+                buf.pos = max(start, len(buf.text) - _TAIL)
+                if not buf._fill():
+                    self._end_skip()
+                    return "done"
+                start = search = 0
+                continue
+
+            self._note_skipped(buf.text[start:match.start()])
+            self._end_skip()
+            if match.group(1) is not None:
+                buf.pos = match.end()
+                self.section = match.group(1)
+                return "value"
+            if self.section in RECORD_SECTIONS:
+                buf.pos = match.end() - 1
+                return "records"
+            # Items of a damaged header section: keep looking for a section
+            start = search = match.end()
+
+
+def salvage_file(path: Path) -> Salvage:
+    """Read every intact record and section from a possibly damaged file.
+
+    Args:
+        path: Data file
+
+    Returns:
+        Salvaged content
+    """
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        return _Scanner(_Buffer(f, CHUNK_SIZE, max_value=MAX_RECORD)).run()
+
+
+@dataclass
+class RecoveryReport:
+    """What a recovery kept, restored and lost.
+
+    Attributes:
+        damaged: True if the data file was damaged at all
+        salvaged: Intact records kept from the data file, per section
+        restored: IDs of records taken from the backup, per section
+        lost: IDs of damaged records the backup could not replace, per section
+        unidentified: Damaged regions whose record IDs could not be read
+        lost_sections: Top-level sections missing from the data file
+        unknown_courses: Course IDs re-registered under placeholder names
+        backup_used: True if a readable backup was merged in
+    """
+
+    damaged: bool
+    salvaged: dict[str, int]
+    restored: dict[str, list[str]] = field(
+        default_factory=lambda: {s: [] for s in RECORD_SECTIONS}
+    )
+    lost: dict[str, list[str]] = field(default_factory=lambda: {s: [] for s in RECORD_SECTIONS})
+    unidentified: int = 0
+    lost_sections: list[str] = field(default_factory=list)
+    unknown_courses: list[str] = field(default_factory=list)
+    backup_used: bool = False
+
+    @property
+    def empty(self) -> bool:
+        """True if nothing at all could be recovered."""
+        return not any(self.salvaged.values()) and not self.backup_used
+
+
+def _infer_version(salvage: Salvage) -> int:
+    """Guess the schema version of a file whose version field was lost."""
+    for records in salvage.records.values():
+        for record in records:
+            if "course_id" in record:
+                return CURRENT_SCHEMA_VERSION
+            if "course" in record:
+                return 1
+    return CURRENT_SCHEMA_VERSION
+
+
+def _assemble(salvage: Salvage) -> DataSchema:
+    """Build current-schema data from salvaged content."""
+    data: dict[str, Any] = {**salvage.header, **salvage.records}
+    data.setdefault("courses", [])
+    data.setdefault("_schema_version", _infer_version(salvage))
+    # Counts cannot be trusted after damage; they are rebuilt on next use
+    data.pop("course_stats", None)
+    data.pop("term_stats", None)
+    data.pop("note_signatures", None)
+    for view in data.get("saved_views", {}).get("views", {}).values():
+        view.pop("ids", None)
+    return migrate_to_latest(data)  # type: ignore[return-value]
+
+
+def _merge_backup(
+    data: DataSchema, backup: DataSchema, main: Salvage, report: RecoveryReport
+) -> None:
+    """Add backup records that the damage took from the data file.
+
+    A backup record is restored if it was seen damaged, or if it sits where
+    the damaged file has a damaged region: walking the backup in order, the
+    last record the damaged file still has is one damage followed. Records
+    elsewhere that the data file lacks were deleted after the backup.
+    """
+    if "courses" in report.lost_sections:
+        data["courses"] = [dict(entry) for entry in backup["courses"]]
+    courses = CourseRegistry(data)
+    backup_courses = CourseRegistry(backup)
+
+    for section in RECORD_SECTIONS:
+        present = {record.get("id") for record in data[section]}  # type: ignore[literal-required]
+        gaps = main.gaps[section]
+        in_gap = None in gaps
+        for record in backup[section]:  # type: ignore[literal-required]
+            if record.get("id") in present:
+                in_gap = record.get("id") in gaps
+                continue
+            if not in_gap and record.get("id") not in main.damaged_ids[section]:
+                continue
+            restored = dict(record)
+            name = backup_courses.name_of(record.get("course_id"))
+            restored["course_id"] = courses.ensure(name) if name else None
+            data[section].append(restored)  # type: ignore[literal-required]
+            report.restored[section].append(record.get("id"))
+
+
+def _register_unknown_courses(data: DataSchema, report: RecoveryReport) -> None:
+    """Give course IDs whose registry entry was lost a placeholder name."""
+    known = {entry["id"] for entry in data["courses"]}
+    for section in RECORD_SECTIONS:
+        for record in data[section]:  # type: ignore[literal-required]
+            course_id = record.get("course_id")
+            if course_id and course_id not in known:
+                known.add(course_id)
+                data["courses"].append({"id": course_id, "name": f"Recovered course {course_id}"})
+                report.unknown_courses.append(course_id)
+
+
+def recover_data(
+    data_file: Path, backup_file: Path | None = None
+) -> tuple[DataSchema, RecoveryReport]:
+    """Salvage a data file and fill the gaps from its backup.
+
+    Intact records from ``data_file`` always win, since they are newer.
+    Records the damage took are added back from the backup, so nothing
+    written before the last successful save is lost; records deleted since
+    then are not.
+
+    Args:
+        data_file: Possibly damaged data file
+        backup_file: Backup to merge from, if any
+
+    Returns:
+        Recovered data in the current schema and a report of the recovery
+    """
+    main = salvage_file(data_file) if data_file.exists() else Salvage(damaged=True)
+    report = RecoveryReport(
+        damaged=main.damaged,
+        salvaged={s: len(main.records[s]) for s in RECORD_SECTIONS},
+        unidentified=main.unidentified,
+    )
+    if main.damaged:
+        report.lost_sections = [k for k in ("courses", "_schema_version") if k not in main.header]
+    data = _assemble(main)
+
+    backup = salvage_file(backup_file) if backup_file and backup_file.exists() else None
+    if main.damaged and backup is not None and backup.readable:
+        report.backup_used = True
+        _merge_backup(data, _assemble(backup), main, report)
+
+    for section in RECORD_SECTIONS:
+        present = {record.get("id") for record in data[section]}  # type: ignore[literal-required]
+        report.lost[section] = [i for i in main.damaged_ids[section] if i not in present]
+    _register_unknown_courses(data, report)
+    return data, report
@@ -1,10 +1,28 @@
 """JSON storage schema definition."""
 
-from typing import TypedDict
+from collections.abc import Callable
+from typing import Any, NotRequired, TypedDict
 
 from pkm.models.course import Course
 from pkm.models.note import Note
 from pkm.models.task import Task
+from pkm.storage.course_registry import CourseRegistry, decode_course, encode_course
+
+CURRENT_SCHEMA_VERSION = 2
+
+
+class SavedViews(TypedDict):
+    """Saved views section (see pkm.services.saved_views).
+
+    Structure:
+        {
+            "views": {...},    # view name -> query and its matching IDs
+            "unseen": [...]    # optional, captures not matched yet
+        }
+    """
+
+    views: dict[str, dict[str, Any]]
+    unseen: NotRequired[list[str]]
 
 
 class DataSchema(TypedDict):
@@ -12,47 +30,62 @@ class DataSchema(TypedDict):
 
     Structure:
         {
-            "notes": [...],
+            "_schema_version": 2,
+            "notes": [...],         # records reference courses by course_id
             "tasks": [...],
-            "courses": [...]
+            "courses": [...],       # see pkm.storage.course_registry
+            "course_stats": {...},  # optional, see pkm.services.course_stats
+            "saved_views": {...},   # optional, see pkm.services.saved_views
+            "term_stats": {...},    # optional, see pkm.services.term_stats
+            "note_signatures": {...}  # optional, see pkm.services.near_duplicates
         }
     """
 
-    notes: list[dict]
-    tasks: list[dict]
-    courses: list[dict]
+    _schema_version: NotRequired[int]
+    notes: list[dict[str, Any]]
+    tasks: list[dict[str, Any]]
+    courses: list[dict[str, Any]]
+    course_stats: NotRequired[dict[str, dict[str, Any]]]
+    saved_views: NotRequired[SavedViews]
+    term_stats: NotRequired[dict[str, Any]]
+    note_signatures: NotRequired[dict[str, str]]
+
+
+# Predicate over a raw (serialized) note or task record. Filtering on the raw
+# dict lets callers skip model validation for records they will discard.
+RecordFilter = Callable[[dict[str, Any]], bool]
 
 
 def create_empty_schema() -> DataSchema:
     """Create an empty data schema."""
-    return {"notes": [], "tasks": [], "courses": []}
+    return {"_schema_version": CURRENT_SCHEMA_VERSION, "notes": [], "tasks": [], "courses": []}
 
 
-def serialize_note(note: Note) -> dict:
-    """Serialize a Note to JSON-compatible dict."""
-    return note.model_dump(mode="json")
+def serialize_note(note: Note, courses: CourseRegistry) -> dict[str, Any]:
+    """Serialize a Note to JSON-compatible dict with an encoded course."""
+    return encode_course(note.model_dump(mode="json"), courses)
 
 
-def serialize_task(task: Task) -> dict:
-    """Serialize a Task to JSON-compatible dict."""
-    return task.model_dump(mode="json")
+def serialize_task(task: Task, courses: CourseRegistry) -> dict[str, Any]:
+    """Serialize a Task to JSON-compatible dict with an encoded course."""
+    return encode_course(task.model_dump(mode="json"), courses)
 
 
-def serialize_course(course: Course) -> dict:
+def serialize_course(course: Course) -> dict[str, Any]:
     """Serialize a Course to JSON-compatible dict."""
     return course.model_dump(mode="json")
 
 
-def deserialize_note(data: dict) -> Note:
-    """Deserialize a dict to Note model."""
-    return Note.model_validate(data)
+def deserialize_note(data: dict[str, Any], courses: CourseRegistry) -> Note:
+    """Deserialize a stored dict to Note model, decoding its course."""
+    return Note.model_validate(decode_course(data, courses))
 
 
-def deserialize_task(data: dict) -> Task:
-    """Deserialize a dict to Task model."""
-    return Task.model_validate(data)
+def deserialize_task(data: dict[str, Any], courses: CourseRegistry) -> Task:
+    """Deserialize a stored dict to Task model, decoding its course."""
+    return Task.model_validate(decode_course(data, courses))
 
 
-def deserialize_course(data: dict) -> Course:
+def deserialize_course(data: dict[str, Any]) -> Course:
     """Deserialize a dict to Course model."""
     return Course.model_validate(data)
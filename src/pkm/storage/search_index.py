@@ -0,0 +1,467 @@
+"""Word postings of notes and tasks, kept beside the data file.
+
+Every commit of the data file also writes ``search.index`` beside it, so a
+query (see pkm.services.query_index) starts from the analyzed text instead
+of analyzing every record again.
+
+Words are the normalized words of each record's searchable fields (see
+``record_fields``), numbered by position with one position left empty
+between fields, and a posting says at which positions a word occurs in a
+record. The postings are kept in two parts:
+
+- a merged segment: the records by ordinal, the sorted list of their words
+  and, for word ``i``, the entries ``word_start[i]:word_start[i + 1]`` of
+  the parallel ``rec`` (record ordinal) and ``pos`` (position) arrays
+- a delta: the postings of each record added or changed since the merge,
+  while merged records that were changed or deleted are listed in
+  ``removed``
+
+The file is one JSON header line (``version``, ``source`` as in
+pkm.storage.summary, ``analyzer`` steps, ``byteorder``, the segment's
+``ids``, ``keys``, ``words`` and ``stems``, then ``removed`` and ``delta``)
+followed by the raw bytes of the ``word_start``, ``docs`` (records per
+word), ``rec`` and ``pos`` arrays, so reading it costs no more than the
+header. A record's key is its checksum (the stored one when the store has
+just stamped it) and course name: a commit analyzes only the records whose
+key changed since the previous index (whatever data file that was made for)
+into the delta, and merges the delta into the segment once it holds more
+than ``MERGE_MIN`` records and one in ``MERGE_FRACTION`` of all of them.
+A change of analyzer steps rebuilds the index. Like the task columns it is a
+cache: trusted for reading only while ``source`` matches data.json, and
+failing to write it never fails a commit.
+"""
+
+import heapq
+import json
+import os
+import sys
+from array import array
+from bisect import bisect_left
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any, Protocol
+
+from pkm.storage.checksum import CHECKSUM_KEY, record_checksum
+from pkm.storage.course_registry import CourseRegistry
+
+# Bumped when the words change for the same analyzer steps (stemmer rules)
+INDEX_VERSION = 2
+# The delta is merged once it holds more than MERGE_MIN records and more
+# than one in MERGE_FRACTION of all records
+MERGE_MIN = 256
+MERGE_FRACTION = 10
+
+_ARRAYS = ("word_start", "docs", "rec", "pos")
+
+
+class TextAnalyzer(Protocol):
+    """What the index needs of a text analyzer (see pkm.services.analysis)."""
+
+    steps: tuple[str, ...]
+
+    def normalize(self, text: str) -> str: ...
+
+    def term(self, word: str) -> str | None: ...
+
+    def scan(self, text: str) -> Iterator[tuple[str, str | None, int]]: ...
+
+
+def search_index_file(data_file: Path) -> Path:
+    """Get the search index file kept beside a data file."""
+    return data_file.with_name("search.index")
+
+
+def record_fields(record: dict[str, Any], course_name: str | None) -> list[str]:
+    """Get the searchable fields of a raw record.
+
+    Args:
+        record: Raw note or task record
+        course_name: Name of the record's course, if any
+
+    Returns:
+        Note content and topics, or task title, then the course name; the
+        main field (content or title) comes first
+    """
+    if record["id"].startswith("n"):
+        fields = [record.get("content", ""), *record.get("topics", [])]
+    else:
+        fields = [record.get("title", "")]
+    if course_name:
+        fields.append(course_name)
+    return fields
+
+
+def scan_fields(
+    analyzer: TextAnalyzer, fields: tuple[str, ...]
+) -> Iterator[tuple[int, str, str | None, int]]:
+    """Split normalized fields into words, numbering positions across them.
+
+    One position is left empty between fields, so phrases never span two.
+
+    Args:
+        analyzer: Text analyzer
+        fields: Normalized fields (see ``Analyzer.normalize``)
+
+    Yields:
+        (position, word, term, character offset) tuples; offsets count
+        through the fields as if joined by one separator
+    """
+    position = 0
+    base = 0
+    for i, field in enumerate(fields):
+        if i:
+            position += 1
+        for word, term, offset in analyzer.scan(field):
+            yield position, word, term, base + offset
+            position += 1
+        base += len(field) + 1
+
+
+class SearchIndex:
+    """Positional postings of every word of the notes and tasks."""
+
+    def __init__(self, steps: tuple[str, ...]) -> None:
+        """Create an empty index.
+
+        Args:
+            steps: Analyzer steps the words are made with
+        """
+        self.steps = steps
+        # Merged segment
+        self.ids: list[str] = []
+        self.keys: list[str] = []
+        self.words: list[str] = []
+        # term -> words of the segment analyzed to it, other than the term itself
+        self.stems: dict[str, list[str]] = {}
+        self.word_start = array("i", [0])
+        self.docs = array("i")
+        self.rec = array("i")
+        self.pos = array("i")
+        # Ordinals of segment records changed or deleted since the merge
+        self.removed: set[int] = set()
+        # Records added or changed since the merge: ID -> [key, {word: positions}]
+        self.delta: dict[str, list[Any]] = {}
+        self._delta_words: dict[str, dict[str, list[int]]] | None = None
+        self._postings: dict[str, dict[str, list[int]]] = {}
+        self._sorted: list[str] | None = None
+
+    def __len__(self) -> int:
+        """Number of indexed records."""
+        return len(self.ids) - len(self.removed) + len(self.delta)
+
+    @classmethod
+    def build(
+        cls,
+        data: dict[str, Any],
+        analyzer: TextAnalyzer,
+        previous: "SearchIndex | None" = None,
+        stamped: bool = False,
+    ) -> "SearchIndex":
+        """Index the records of a data document.
+
+        Args:
+            data: Data document (records as stored)
+            analyzer: Text analyzer
+            previous: Index of an earlier version of the data, if any; it is
+                updated in place, so that only records whose key changed are
+                analyzed (ignored if made with other analyzer steps)
+            stamped: Every record's stored checksum is current (as when the
+                store has just written them), so it need not be recomputed
+
+        Returns:
+            Index with one entry per note and task
+        """
+        courses = CourseRegistry(data)  # type: ignore[arg-type]
+        current: dict[str, tuple[str, dict[str, Any], str | None]] = {}
+        for section in ("notes", "tasks"):
+            for record in data.get(section, []):
+                course_name = courses.name_of(record.get("course_id"))
+                checksum = record.get(CHECKSUM_KEY) if stamped else None
+                checksum = checksum or record_checksum(record)
+                current[record["id"]] = (f"{checksum} {course_name or ''}", record, course_name)
+
+        index = cls(analyzer.steps)
+        if previous is not None and previous.steps == analyzer.steps:
+            index = previous
+        index._update(current, analyzer)
+        return index
+
+    def _update(
+        self, current: dict[str, tuple[str, dict[str, Any], str | None]], analyzer: TextAnalyzer
+    ) -> None:
+        """Bring the delta up to date with the current records.
+
+        Args:
+            current: Record ID -> (key, record, course name) of every record
+            analyzer: Text analyzer
+        """
+        ordinal = {record_id: i for i, record_id in enumerate(self.ids)}
+        for i, record_id in enumerate(self.ids):
+            entry = current.get(record_id)
+            if entry is None or entry[0] != self.keys[i]:
+                self.removed.add(i)
+            else:
+                self.removed.discard(i)  # back to its merged version, e.g. restored
+        for record_id, (key, _) in list(self.delta.items()):
+            entry = current.get(record_id)
+            merged = ordinal.get(record_id)
+            if (
+                entry is None
+                or entry[0] != key
+                or (merged is not None and merged not in self.removed)
+            ):
+                del self.delta[record_id]
+        for record_id, (key, record, course_name) in current.items():
+            merged = ordinal.get(record_id)
+            if record_id in self.delta or (merged is not None and merged not in self.removed):
+                continue
+            fields = tuple(analyzer.normalize(f) for f in record_fields(record, course_name))
+            postings: dict[str, list[int]] = {}
+            for position, word, _, _ in scan_fields(analyzer, fields):
+                postings.setdefault(word, []).append(position)
+            self.delta[record_id] = [key, postings]
+        self._delta_words = None
+        self._postings.clear()
+        self._sorted = None
+
+    def needs_merge(self) -> bool:
+        """Check whether the delta has grown enough to be merged."""
+        changed = len(self.delta) + len(self.removed)
+        return changed > MERGE_MIN and changed * MERGE_FRACTION > len(self)
+
+    def merge(self, analyzer: TextAnalyzer) -> None:
+        """Fold the delta into the merged segment.
+
+        Args:
+            analyzer: The analyzer the index was made with
+        """
+        live = [i for i in range(len(self.ids)) if i not in self.removed]
+        renumber = {old: new for new, old in enumerate(live)}
+        delta_words = self._delta_postings()
+        delta_ordinal = {record_id: len(live) + k for k, record_id in enumerate(self.delta)}
+        merged = SearchIndex(self.steps)
+        merged.ids = [self.ids[i] for i in live] + list(self.delta)
+        merged.keys = [self.keys[i] for i in live] + [key for key, _ in self.delta.values()]
+
+        for word in heapq.merge(self.words, sorted(w for w in delta_words if not self._has(w))):
+            count = len(merged.rec)
+            records = merged._merge_word(self, self._find(word), renumber)
+            for record_id, positions in delta_words.get(word, {}).items():
+                merged.rec.extend([delta_ordinal[record_id]] * len(positions))
+                merged.pos.extend(positions)
+                records += 1
+            if records:
+                merged.words.append(word)
+                merged.docs.append(records)
+                merged.word_start.append(len(merged.rec))
+            else:
+                del merged.rec[count:], merged.pos[count:]
+        for word in merged.words:
+            term = analyzer.term(word)
+            if term is not None and term != word:
+                merged.stems.setdefault(term, []).append(word)
+        self.__dict__.update(merged.__dict__)
+
+    def _merge_word(self, source: "SearchIndex", i: int | None, renumber: dict[int, int]) -> int:
+        """Copy one word's live segment entries from ``source``, renumbered.
+
+        Returns:
+            Number of records copied
+        """
+        if i is None:
+            return 0
+        start, end = source.word_start[i], source.word_start[i + 1]
+        if not source.removed:
+            self.rec.extend(source.rec[start:end])
+            self.pos.extend(source.pos[start:end])
+            return source.docs[i]
+        records = 0
+        last = -1
+        for r, p in zip(source.rec[start:end], source.pos[start:end]):
+            new = renumber.get(r)
+            if new is None:
+                continue
+            self.rec.append(new)
+            self.pos.append(p)
+            if new != last:
+                records += 1
+                last = new
+        return records
+
+    def _find(self, word: str) -> int | None:
+        """Get the number of a word in the merged segment."""
+        i = bisect_left(self.words, word)
+        return i if i < len(self.words) and self.words[i] == word else None
+
+    def _has(self, word: str) -> bool:
+        return self._find(word) is not None
+
+    def _delta_postings(self) -> dict[str, dict[str, list[int]]]:
+        """Get the delta's postings by word."""
+        if self._delta_words is None:
+            self._delta_words = {}
+            for record_id, (_, postings) in self.delta.items():
+                for word, positions in postings.items():
+                    self._delta_words.setdefault(word, {})[record_id] = positions
+        return self._delta_words
+
+    def sorted_words(self) -> list[str]:
+        """Get every indexed word, sorted."""
+        if self._sorted is None:
+            extra = sorted(w for w in self._delta_postings() if not self._has(w))
+            self._sorted = list(heapq.merge(self.words, extra)) if extra else self.words
+        return self._sorted
+
+    def postings(self, word: str) -> dict[str, list[int]]:
+        """Get the positions of a word in each record (do not modify them)."""
+        if word not in self._postings:
+            found: dict[str, list[int]] = {}
+            i = self._find(word)
+            if i is not None:
+                start, end = self.word_start[i], self.word_start[i + 1]
+                for r, p in zip(self.rec[start:end], self.pos[start:end]):
+                    if r not in self.removed:
+                        found.setdefault(self.ids[r], []).append(p)
+            found.update(self._delta_postings().get(word, {}))
+            self._postings[word] = found
+        return self._postings[word]
+
+    def doc_count(self, word: str) -> int:
+        """Estimate how many records contain a word (without reading its postings)."""
+        i = self._find(word)
+        merged = self.docs[i] if i is not None else 0
+        return merged + len(self._delta_postings().get(word, {}))
+
+    def variants(self, term: str, analyzer: TextAnalyzer) -> list[str]:
+        """Get the indexed words analyzed to a term.
+
+        Args:
+            term: Index term
+            analyzer: The analyzer the index was made with
+
+        Returns:
+            Words, the term itself first if it is one
+        """
+        found = dict.fromkeys(self.stems.get(term, []))
+        for word in self._delta_postings():
+            if word != term and analyzer.term(word) == term:
+                found[word] = None
+        own = self._has(term) or term in self._delta_postings()
+        if own and analyzer.term(term) == term:
+            return [term, *found]
+        return list(found)
+
+    def to_bytes(self, source: list[int]) -> bytes:
+        """Serialize the index for the data file identified by ``source``."""
+        header = {
+            "version": INDEX_VERSION,
+            "source": source,
+            "analyzer": list(self.steps),
+            "byteorder": sys.byteorder,
+            "ids": self.ids,
+            "keys": self.keys,
+            "words": self.words,
+            "stems": self.stems,
+            "removed": sorted(self.removed),
+            "delta": self.delta,
+        }
+        body = b"".join(getattr(self, name).tobytes() for name in _ARRAYS)
+        return json.dumps(header, ensure_ascii=False, separators=(",", ":")).encode() + b"\n" + body
+
+    @classmethod
+    def from_bytes(cls, raw: bytes, source: list[int] | None) -> "SearchIndex | None":
+        """Deserialize an index, or None if it is not for ``source``.
+
+        Args:
+            raw: Serialized index
+            source: Identity of the data file, or None to accept an index
+                made for any version of it
+
+        Returns:
+            The index, or None
+        """
+        line, _, body = raw.partition(b"\n")
+        header = json.loads(line)
+        if (
+            header.get("version") != INDEX_VERSION
+            or header.get("byteorder") != sys.byteorder
+            or (source is not None and header.get("source") != source)
+        ):
+            return None
+        index = cls(tuple(header["analyzer"]))
+        index.ids = header["ids"]
+        index.keys = header["keys"]
+        index.words = header["words"]
+        index.stems = header["stems"]
+        index.removed = set(header["removed"])
+        index.delta = header["delta"]
+        offset = 0
+        for name in _ARRAYS:
+            column = array("i")
+            count = len(index.words) + (name == "word_start")
+            if name in ("rec", "pos"):
+                count = index.word_start[-1]
+            size = column.itemsize * count
+            column.frombytes(body[offset : offset + size])
+            setattr(index, name, column)
+            offset += size
+        if offset != len(body) or len(index.ids) != len(index.keys):
+            return None
+        return index
+
+
+def _source(data_file: Path) -> list[int]:
+    """Identify the current contents of the data file."""
+    st = os.stat(data_file)
+    return [st.st_mtime_ns, st.st_size]
+
+
+def read_search_index(data_file: Path, current: bool = True) -> SearchIndex | None:
+    """Read the search index of a data file.
+
+    Args:
+        data_file: Path to data.json
+        current: Only accept an index made for the data file as it is now
+
+    Returns:
+        Index, or None if missing, damaged or (with ``current``) stale
+    """
+    try:
+        source = _source(data_file) if current else None
+        with open(search_index_file(data_file), "rb") as f:
+            return SearchIndex.from_bytes(f.read(), source)
+    except (OSError, ValueError, KeyError, TypeError, IndexError):
+        return None
+
+
+def write_search_index(
+    data_file: Path, data: dict[str, Any], analyzer: TextAnalyzer, stamped: bool = False
+) -> SearchIndex | None:
+    """Bring the search index up to date with freshly committed data.
+
+    Only records changed since the previous index are analyzed, and the
+    delta is merged when it has grown. The file is replaced atomically but
+    not fsynced, and failing to write it never fails the commit.
+
+    Args:
+        data_file: Data file that now holds ``data``
+        data: Committed data
+        analyzer: Text analyzer
+        stamped: Every record's stored checksum is current
+
+    Returns:
+        Index written, or None if it could not be
+    """
+    path = search_index_file(data_file)
+    tmp = path.with_suffix(".index.tmp")
+    try:
+        previous = read_search_index(data_file, current=False)
+        index = SearchIndex.build(data, analyzer, previous, stamped)
+        if index.needs_merge():
+            index.merge(analyzer)
+        with open(tmp, "wb") as f:
+            f.write(index.to_bytes(_source(data_file)))
+        os.replace(tmp, path)
+    except OSError:
+        return None
+    return index
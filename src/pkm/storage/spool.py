@@ -0,0 +1,181 @@
+"""Capture spool: constant-time inbox capture beside the data file.
+
+``pkm add`` does not load and rewrite data.json. It reserves an ID and
+writes the new record as one small file in ``spool/`` next to the data
+file::
+
+    spool/
+        n41.issued       # watermark: every note ID up to n41 has been issued
+        n42.id           # reservation marker, created with O_EXCL
+        n42.json         # the captured record, renamed into place complete
+
+The next ``JSONStore.load`` drains the spool: captured records are appended
+to the loaded data, the data is committed, and only then are the spooled
+files removed. Draining is idempotent - a record whose ID is already in the
+data file is skipped - so a crash at any point neither loses nor
+duplicates a capture.
+
+IDs stay unique without a lock: a capture takes the first ID above the
+watermark whose marker it can create exclusively, so concurrent captures
+never collide. Every other ID-issuing path reserves through the spool too.
+A drain raises the watermark to the highest ID in the data file and clears
+the markers at or below it; nothing reserves at or below the watermark
+again, so clearing a marker whose capture is still being written is safe.
+The watermark is the highest ``.issued`` file name, so writing one is a
+single exclusive create and a stale writer can never lower it.
+"""
+
+import json
+import os
+import re
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Any
+
+from pkm.storage.durability import default_durability
+from pkm.storage.fileops import REAL_FILE_OPS, FileOps
+
+# Record section and ID prefix of each kind of capture
+SECTIONS = {"n": "notes", "t": "tasks"}
+
+_ENTRY = re.compile(r"^([nt])(\d+)\.(id|json|issued)$")
+_RECORD_ID = re.compile(r"^([nt])(\d+)$")
+
+
+def id_number(record_id: str, prefix: str) -> int:
+    """Get the number of a sequential ID, or 0 if it has another form."""
+    match = _RECORD_ID.match(record_id)
+    return int(match.group(2)) if match and match.group(1) == prefix else 0
+
+
+class CaptureSpool:
+    """Spool directory of captured notes and tasks for one data file."""
+
+    def __init__(self, data_file: Path, ops: FileOps = REAL_FILE_OPS) -> None:
+        """Initialize the spool beside a data file.
+
+        Args:
+            data_file: Path to data.json
+            ops: Filesystem operations used for writing (replaced in tests)
+        """
+        self.data_file = data_file
+        self.dir = data_file.with_name("spool")
+        self.ops = ops
+
+    def _entries(self) -> list[tuple[str, int, str]]:
+        """List (prefix, number, "id", "json" or "issued") for every spool entry."""
+        try:
+            names = os.listdir(self.dir)
+        except FileNotFoundError:
+            return []
+        entries = []
+        for name in names:
+            match = _ENTRY.match(name)
+            if match:
+                entries.append((match.group(1), int(match.group(2)), match.group(3)))
+        return entries
+
+    def busy(self) -> bool:
+        """Check whether there are captures or reservations to drain."""
+        return any(kind != "issued" for _, _, kind in self._entries())
+
+    @staticmethod
+    def _watermarks(entries: list[tuple[str, int, str]]) -> dict[str, int | None]:
+        """Get the highest issued ID number per prefix (None if never set)."""
+        marks: dict[str, int | None] = dict.fromkeys(SECTIONS)
+        for prefix, number, kind in entries:
+            if kind == "issued":
+                marks[prefix] = max(marks[prefix] or 0, number)
+        return marks
+
+    def _initial_watermark(self) -> dict[str, int]:
+        """Derive the watermark from the data file (first use only)."""
+        marks = dict.fromkeys(SECTIONS, 0)
+        try:
+            with open(self.data_file, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return marks
+        for prefix, section in SECTIONS.items():
+            for record in data.get(section, []):
+                marks[prefix] = max(marks[prefix], id_number(record.get("id", ""), prefix))
+        return marks
+
+    def reserve(self, prefix: str) -> str:
+        """Reserve a new note ("n") or task ("t") ID.
+
+        Args:
+            prefix: ID prefix
+
+        Returns:
+            ID no other capture or command will be given
+        """
+        self.ops.makedirs(self.dir)
+        mark = self._watermarks(self._entries())[prefix]
+        if mark is None:
+            mark = self._initial_watermark()[prefix]
+            self.ops.create_exclusive(self.dir / f"{prefix}{mark}.issued")
+        number = mark + 1
+        while not self.ops.create_exclusive(self.dir / f"{prefix}{number}.id"):
+            number += 1
+        return f"{prefix}{number}"
+
+    def capture(self, record: dict[str, Any]) -> None:
+        """Spool a serialized note or task whose ID came from ``reserve``.
+
+        The record keeps its course by name; it is registered when the
+        record is drained.
+
+        Args:
+            record: Serialized record with a reserved ``id``
+        """
+        path = self.dir / f"{record['id']}.json"
+        tmp = path.with_name(path.name + ".tmp")
+        sync = default_durability() != "none"
+        with self.ops.create(tmp) as f:
+            json.dump(record, f, default=str)
+        if sync:
+            self.ops.fsync(tmp)
+        self.ops.replace(tmp, path)
+        if sync:
+            self.ops.fsync_dir(self.dir)
+
+    def pending(self) -> list[dict[str, Any]]:
+        """Read the captured records waiting to be drained, oldest ID first."""
+        records = []
+        for prefix, number, kind in sorted(self._entries()):
+            if kind != "json":
+                continue
+            try:
+                with open(self.dir / f"{prefix}{number}.json", encoding="utf-8") as f:
+                    records.append(json.load(f))
+            except (OSError, ValueError):
+                continue  # removed by a concurrent drain
+        return records
+
+    def clear(self, data: Mapping[str, Any], drained: list[dict[str, Any]], sync: bool) -> None:
+        """Forget drained captures once ``data`` has been committed.
+
+        Args:
+            data: Data as committed
+            drained: Records that ``data`` now contains
+            sync: Make the new watermark durable before removing anything
+        """
+        entries = self._entries()
+        marks = {prefix: mark or 0 for prefix, mark in self._watermarks(entries).items()}
+        for prefix, section in SECTIONS.items():
+            for record in data[section]:
+                marks[prefix] = max(marks[prefix], id_number(record.get("id", ""), prefix))
+            self.ops.create_exclusive(self.dir / f"{prefix}{marks[prefix]}.issued")
+        if sync:
+            self.ops.fsync_dir(self.dir)
+
+        drained_ids = {record["id"] for record in drained}
+        for prefix, number, kind in entries:
+            record_id = f"{prefix}{number}"
+            if kind == "issued":
+                stale = number < marks[prefix]
+            else:
+                stale = record_id in drained_ids or (kind == "id" and number <= marks[prefix])
+            if stale:
+                self.ops.unlink(self.dir / f"{record_id}.{kind}")
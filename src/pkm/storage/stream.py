@@ -0,0 +1,283 @@
+"""Incremental reading and writing of data files.
+
+``json.load`` needs the whole document, and every object in it, in memory at
+once. The helpers here walk the top-level object of ``data.json`` one value
+at a time and stream the elements of the record sections (``notes`` and
+``tasks``) individually, so tools that only need to look at each record once
+run in memory proportional to the largest record rather than the file.
+"""
+
+import io
+import json
+from collections.abc import Callable, Iterator
+from pathlib import Path
+from typing import IO, Any
+
+from pkm.storage.checksum import stamp_checksum
+from pkm.storage.fileops import REAL_FILE_OPS, FileOps
+
+RECORD_SECTIONS = ("notes", "tasks")
+
+# Report progress every this many records while rewriting a file
+PROGRESS_EVERY = 10_000
+
+# Called with (section, record) for each record; returns the record to
+# write, or None to drop it
+RecordTransform = Callable[[str, dict[str, Any]], dict[str, Any] | None]
+ProgressCallback = Callable[[str, int], None]
+
+_WHITESPACE = " \t\n\r"
+
+
+class _Buffer:
+    """Sliding text window over a file for incremental JSON decoding."""
+
+    def __init__(self, f: IO[str], chunk_size: int, max_value: int | None = None) -> None:
+        self.f = f
+        self.chunk_size = chunk_size
+        # Give up on a value once this many characters fail to decode, so
+        # garbage mid-file is not mistaken for a value still being read
+        self.max_value = max_value
+        self.text = ""
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self) -> bool:
+        """Read another chunk, dropping consumed text. Returns False at EOF."""
+        if self.eof:
+            return False
+        chunk = self.f.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.text = self.text[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Skip whitespace and return the next character ("" at EOF)."""
+        while True:
+            while self.pos < len(self.text) and self.text[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.text):
+                return self.text[self.pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char: str) -> None:
+        """Consume ``char`` (after whitespace) or raise."""
+        found = self.peek()
+        if found != char:
+            raise json.JSONDecodeError(f"Expected '{char}'", found or "<EOF>", self.pos)
+        self.pos += 1
+
+    def value(self) -> Any:
+        """Decode the next complete JSON value."""
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.text, self.pos)
+            except json.JSONDecodeError:
+                too_long = self.max_value and len(self.text) - self.pos > self.max_value
+                if not too_long and self._fill():
+                    continue
+                raise
+            # A number or literal touching the end of the window may continue
+            if end == len(self.text) and not self.eof and self._fill():
+                continue
+            self.pos = end
+            return value
+
+
+def iter_document(
+    path: Path,
+    stream_keys: tuple[str, ...] = RECORD_SECTIONS,
+    chunk_size: int = 1 << 16,
+) -> Iterator[tuple[str, Any, bool]]:
+    """Walk the top-level object of a JSON file incrementally.
+
+    Args:
+        path: JSON file whose top level is an object
+        stream_keys: Keys whose array values are yielded element by element
+        chunk_size: Characters read per chunk
+
+    Yields:
+        ``(key, value, False)`` for ordinary top-level keys and
+        ``(key, element, True)`` for each element of a streamed array
+
+    Raises:
+        json.JSONDecodeError: If the file is not valid JSON
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        buf = _Buffer(f, chunk_size)
+        buf.expect("{")
+        if buf.peek() == "}":
+            return
+
+        while True:
+            key = buf.value()
+            buf.expect(":")
+
+            if key in stream_keys and buf.peek() == "[":
+                buf.expect("[")
+                if buf.peek() == "]":
+                    buf.pos += 1
+                else:
+                    while True:
+                        yield key, buf.value(), True
+                        if buf.peek() == "]":
+                            buf.pos += 1
+                            break
+                        buf.expect(",")
+            else:
+                yield key, buf.value(), False
+
+            if buf.peek() == "}":
+                return
+            buf.expect(",")
+
+
+def read_header(path: Path) -> dict[str, Any]:
+    """Read every top-level section of a data file except the records.
+
+    Args:
+        path: Data file
+
+    Returns:
+        Header sections (schema version, courses, statistics, ...)
+    """
+    return {key: value for key, value, is_record in iter_document(path) if not is_record}
+
+
+def iter_records(path: Path, section: str) -> Iterator[dict[str, Any]]:
+    """Stream the records of one section of a data file.
+
+    Args:
+        path: Data file
+        section: "notes" or "tasks"
+
+    Yields:
+        Raw records in file order
+    """
+    # Other record sections are streamed too (and skipped) so they are never
+    # decoded as a single value
+    found = False
+    for key, value, is_record in iter_document(path):
+        if is_record and key == section:
+            found = True
+            yield value
+        elif found:
+            return
+
+
+class StreamWriter:
+    """Write a data file one record at a time.
+
+    Record sections must be written one after another (``begin_section``,
+    any number of ``write_record`` calls, ``end_section``); header sections
+    are written last by ``close`` so steps that build them while records
+    stream past can finish first.
+    """
+
+    def __init__(self, f: IO[str]) -> None:
+        """Start a top-level object on an open text file.
+
+        Args:
+            f: Writable text file
+        """
+        self.f = f
+        self.f.write("{")
+        self._keys = 0
+        self._records = 0
+
+    def _key(self, key: str) -> None:
+        self.f.write(("," if self._keys else "") + "\n  " + json.dumps(key) + ": ")
+        self._keys += 1
+
+    def begin_section(self, section: str) -> None:
+        """Open a record array."""
+        self._key(section)
+        self.f.write("[")
+        self._records = 0
+
+    def write_record(self, record: dict[str, Any]) -> None:
+        """Append one record to the open array, stamping its checksum."""
+        text = json.dumps(stamp_checksum(record), indent=2, default=str).replace("\n", "\n    ")
+        self.f.write(("," if self._records else "") + "\n    " + text)
+        self._records += 1
+
+    def end_section(self) -> None:
+        """Close the open record array."""
+        self.f.write("\n  ]" if self._records else "]")
+
+    def close(self, header: dict[str, Any]) -> None:
+        """Write the header sections and close the top-level object.
+
+        Args:
+            header: Non-record top-level sections
+        """
+        for key, value in header.items():
+            self._key(key)
+            self.f.write(json.dumps(value, indent=2, default=str).replace("\n", "\n  "))
+        self.f.write("\n}\n")
+
+
+def rewrite_file(
+    path: Path,
+    transform: RecordTransform,
+    finish: Callable[[], dict[str, Any]],
+    dry_run: bool = False,
+    progress: ProgressCallback | None = None,
+    ops: FileOps = REAL_FILE_OPS,
+) -> dict[str, int]:
+    """Stream every record of a data file through ``transform`` into a new file.
+
+    The new file is written next to the original, fsynced, and replaces it
+    once complete; the original is kept as the ``.bak`` backup.
+
+    Args:
+        path: Data file to rewrite
+        transform: Per-record transformation
+        finish: Called after the last record; returns the header to write
+        dry_run: Run every transformation but write nothing
+        progress: Optional callback receiving (section, records_written)
+        ops: Filesystem operations used for writing
+
+    Returns:
+        Number of records written per section
+    """
+    tmp_path = path.with_suffix(".json.rewrite")
+    counts: dict[str, int] = {}
+    out = io.StringIO() if dry_run else ops.create(tmp_path)
+    try:
+        with out:
+            writer = StreamWriter(out)
+            for section in RECORD_SECTIONS:
+                writer.begin_section(section)
+                count = 0
+                for record in iter_records(path, section):
+                    result = transform(section, record)
+                    if result is None:
+                        continue
+                    writer.write_record(result)
+                    count += 1
+                    if progress and count % PROGRESS_EVERY == 0:
+                        progress(section, count)
+                writer.end_section()
+                counts[section] = count
+                if progress:
+                    progress(section, count)
+            writer.close(finish())
+            if dry_run:
+                return counts
+        ops.fsync(tmp_path)
+    except BaseException:
+        if not dry_run:
+            ops.unlink(tmp_path)
+        raise
+
+    ops.copy(path, path.with_suffix(".json.bak"))
+    ops.replace(tmp_path, path)
+    ops.fsync_dir(path.parent)
+    return counts
@@ -0,0 +1,233 @@
+"""Precomputed summary for shell prompts and status bars.
+
+Every commit of the data file also writes ``summary.json`` beside it: a few
+hundred bytes with everything ``pkm status`` shows. Reading it needs only the
+standard library, so the fast path in ``pkm.cli.entry`` answers
+``pkm status --prompt`` without importing click, rich or pydantic.
+
+The file has the shape::
+
+    {
+        "version": 1,
+        "source": [1732356000123456789, 48213],  # mtime_ns and size of data.json
+        "inbox": 4,   # notes and tasks without a course
+        "open": 12,   # tasks not completed
+        "due": [      # per due day of open tasks: count and first task due
+            ["2025-11-20", 2, "Submit lab report"],
+            ["2025-11-24", 1, "Quiz"],
+        ],
+    }
+
+As with course statistics, "today" and "overdue" depend on the current
+date, so they are derived on read from ``due``. The summary is trusted as
+long as ``source`` matches data.json; a data file written any other way
+(migration, archive, an older version) makes it stale, and it is rebuilt.
+Quick captures still waiting in the spool (see pkm.storage.spool) are
+counted on read.
+
+Nothing here (or in the spool module) imports beyond the standard library -
+keep it that way.
+"""
+
+import json
+import os
+from bisect import bisect_left
+from datetime import date
+from pathlib import Path
+from typing import Any
+
+from pkm.storage.spool import CaptureSpool
+
+SUMMARY_VERSION = 1
+
+# Output of ``pkm status --prompt`` unless --format is given
+PROMPT_FORMAT = "today {today} | overdue {overdue} | inbox {inbox}"
+
+
+def summary_file(data_file: Path) -> Path:
+    """Get the summary file kept beside a data file."""
+    return data_file.with_name("summary.json")
+
+
+def build_summary(data: dict[str, Any]) -> dict[str, Any]:
+    """Compute the summary of a data document.
+
+    Args:
+        data: Data document (records as stored)
+
+    Returns:
+        Summary without ``source``
+    """
+    inbox = 0
+    open_count = 0
+    # day -> [count, earliest due timestamp, its title]
+    days: dict[str, list[Any]] = {}
+
+    for section in ("notes", "tasks"):
+        for record in data.get(section, []):
+            # v1 files name the course in "course"
+            if record.get("course_id") is None and record.get("course") is None:
+                inbox += 1
+
+    for task in data.get("tasks", []):
+        if task.get("completed"):
+            continue
+        open_count += 1
+        due = task.get("due_date")
+        if not due:
+            continue
+        entry = days.setdefault(due[:10], [0, due, task.get("title", "")])
+        entry[0] += 1
+        if due < entry[1]:
+            entry[1:] = [due, task.get("title", "")]
+
+    return {
+        "version": SUMMARY_VERSION,
+        "inbox": inbox,
+        "open": open_count,
+        "due": [[day, count, title] for day, (count, _, title) in sorted(days.items())],
+    }
+
+
+def _merge(summary: dict[str, Any], extra: dict[str, Any]) -> dict[str, Any]:
+    """Add the counts of ``extra`` to a summary."""
+    days = {day: [count, title] for day, count, title in summary["due"]}
+    for day, count, title in extra["due"]:
+        entry = days.setdefault(day, [0, title])
+        entry[0] += count
+    return {
+        **summary,
+        "inbox": summary["inbox"] + extra["inbox"],
+        "open": summary["open"] + extra["open"],
+        "due": [[day, count, title] for day, (count, title) in sorted(days.items())],
+    }
+
+
+def _with_captures(spool: CaptureSpool, summary: dict[str, Any]) -> dict[str, Any]:
+    """Count captures that have not been drained into the data file yet."""
+    captured = spool.pending()
+    if not captured:
+        return summary
+    data = {
+        "notes": [r for r in captured if r["id"].startswith("n")],
+        "tasks": [r for r in captured if r["id"].startswith("t")],
+    }
+    return _merge(summary, build_summary(data))
+
+
+def _source(data_file: Path) -> list[int]:
+    """Identify the current contents of the data file."""
+    st = os.stat(data_file)
+    return [st.st_mtime_ns, st.st_size]
+
+
+def write_summary(data_file: Path, data: dict[str, Any]) -> dict[str, Any] | None:
+    """Write the summary of freshly committed data.
+
+    The summary is a cache, so it is replaced atomically but not fsynced,
+    and failing to write it never fails the commit.
+
+    Args:
+        data_file: Data file that now holds ``data``
+        data: Committed data
+
+    Returns:
+        Summary written, or None if it could not be
+    """
+    path = summary_file(data_file)
+    tmp = path.with_suffix(".json.tmp")
+    try:
+        summary = {**build_summary(data), "source": _source(data_file)}
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(summary, f)
+        os.replace(tmp, path)
+    except OSError:
+        return None
+    return summary
+
+
+def read_summary(data_file: Path) -> dict[str, Any] | None:
+    """Read the summary for a data file, rebuilding it if stale.
+
+    Args:
+        data_file: Path to data.json
+
+    Returns:
+        Summary including spooled captures, or None if there is no data
+    """
+    summary = _read_committed(data_file)
+    spool = CaptureSpool(data_file)
+    if summary is None:
+        if not spool.busy():
+            return None
+        summary = build_summary({})
+    return _with_captures(spool, summary)
+
+
+def _read_committed(data_file: Path) -> dict[str, Any] | None:
+    """Read the summary of the data file itself, rebuilding it if stale."""
+    try:
+        source = _source(data_file)
+    except OSError:
+        return None
+
+    try:
+        with open(summary_file(data_file), encoding="utf-8") as f:
+            summary: dict[str, Any] = json.load(f)
+        if summary.get("version") == SUMMARY_VERSION and summary.get("source") == source:
+            return summary
+    except (OSError, ValueError):
+        pass
+
+    try:
+        with open(data_file, encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return write_summary(data_file, data) or build_summary(data)
+
+
+def status_fields(summary: dict[str, Any], today: date | None = None) -> dict[str, Any]:
+    """Derive the date-dependent status fields from a summary.
+
+    Args:
+        summary: Summary from ``read_summary``
+        today: Date to count from (default: today)
+
+    Returns:
+        Dict with ``today``, ``overdue``, ``inbox`` and ``open`` counts,
+        ``next`` (title of the first open task due today or later) and
+        ``next_due`` (its due day, YYYY-MM-DD); both are "" if there is none
+    """
+    day = (today or date.today()).isoformat()
+    due = summary["due"]
+    pos = bisect_left(due, [day])
+    upcoming = due[pos] if pos < len(due) else None
+    return {
+        "today": upcoming[1] if upcoming and upcoming[0] == day else 0,
+        "overdue": sum(entry[1] for entry in due[:pos]),
+        "inbox": summary["inbox"],
+        "open": summary["open"],
+        "next": upcoming[2] if upcoming else "",
+        "next_due": upcoming[0] if upcoming else "",
+    }
+
+
+def render_prompt(data_file: Path, fmt: str = PROMPT_FORMAT, today: date | None = None) -> str:
+    """Format the one-line status for a shell prompt.
+
+    Args:
+        data_file: Path to data.json
+        fmt: ``str.format`` template over the ``status_fields`` names
+        today: Date to count from (default: today)
+
+    Returns:
+        Status line ("" if there is no data yet)
+
+    Raises:
+        KeyError: If ``fmt`` names an unknown field
+    """
+    summary = read_summary(data_file)
+    if summary is None:
+        return ""
+    return fmt.format(**status_fields(summary, today))
@@ -0,0 +1,292 @@
+"""Columnar cache of task attributes for filtering without parsing records.
+
+Every commit of the data file also writes ``tasks.columns`` beside it: the
+attributes that task views and statistics filter on, one array per
+attribute with one row per task in file order:
+
+- ``due``: due time in seconds since 1970-01-01 (wall clock, as stored),
+  ``NO_TIME`` if the task has no deadline
+- ``created`` and ``completed_at``: creation and completion times in the
+  same unit (``NO_TIME`` if unset)
+- ``priority``: index into ``PRIORITIES``
+- ``completed``: 1 if completed, else 0
+- ``recurring``: 1 if the task repeats (``due`` is then its current
+  occurrence), else 0
+- ``course``: index into ``courses`` (stored course IDs), ``INBOX`` if none
+
+The file is one JSON header line (``version``, ``source`` as in
+pkm.storage.summary, ``byteorder``, ``ids`` and ``courses``) followed by
+the raw bytes of each array. Like the summary, it is a cache trusted only
+while ``source`` matches data.json; otherwise it is rebuilt.
+
+``TaskColumns.select`` combines conditions into a row mask: vectorized
+with NumPy when it is installed, and as loops over the ``array`` columns
+otherwise.
+"""
+
+import json
+import operator
+import os
+import sys
+from array import array
+from collections.abc import Callable, Iterable
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Any
+
+try:
+    import numpy as np
+except ImportError:  # optional: the array loops give the same rows
+    np = None  # type: ignore[assignment, unused-ignore]
+
+COLUMNS_VERSION = 3
+PRIORITIES = ("high", "medium", "low")
+NO_TIME = -(2**63)
+INBOX = -1
+
+_EPOCH = datetime(1970, 1, 1)
+_DAY = 86_400
+_ONE_SECOND = timedelta(seconds=1)
+# (attribute, array typecode, NumPy dtype) in file order
+_LAYOUT = (
+    ("due", "q", "int64"),
+    ("created", "q", "int64"),
+    ("completed_at", "q", "int64"),
+    ("priority", "b", "int8"),
+    ("completed", "b", "int8"),
+    ("recurring", "b", "int8"),
+    ("course", "i", "int32"),
+)
+_DTYPES = {name: dtype for name, _, dtype in _LAYOUT}
+# Time columns and the record fields they come from
+_TIMES = (("due", "due_date"), ("created", "created_at"), ("completed_at", "completed_at"))
+
+
+def columns_file(data_file: Path) -> Path:
+    """Get the columns file kept beside a data file."""
+    return data_file.with_name("tasks.columns")
+
+
+def to_seconds(value: str) -> int:
+    """Convert a stored ISO timestamp to seconds since 1970-01-01 (wall clock)."""
+    moment = datetime.fromisoformat(value).replace(tzinfo=None)
+    return (moment - _EPOCH) // _ONE_SECOND
+
+
+def day_seconds(day: date) -> int:
+    """Get the first second of a day, in the unit of the time columns."""
+    return (day - _EPOCH.date()).days * _DAY
+
+
+class TaskColumns:
+    """Task attributes as parallel arrays, one row per task."""
+
+    def __init__(self) -> None:
+        """Create empty columns."""
+        self.ids: list[str] = []
+        self.courses: list[str] = []
+        self.due = array("q")
+        self.created = array("q")
+        self.completed_at = array("q")
+        self.priority = array("b")
+        self.completed = array("b")
+        self.recurring = array("b")
+        self.course = array("i")
+
+    def __len__(self) -> int:
+        """Number of rows."""
+        return len(self.ids)
+
+    @classmethod
+    def build(cls, data: dict[str, Any]) -> "TaskColumns":
+        """Extract the columns from the tasks of a data document.
+
+        Args:
+            data: Data document (records as stored)
+
+        Returns:
+            Columns with one row per task, in order
+        """
+        columns = cls()
+        codes: dict[str, int] = {}
+        priorities = {name: code for code, name in enumerate(PRIORITIES)}
+        for task in data.get("tasks", []):
+            columns.ids.append(task["id"])
+            for name, key in _TIMES:
+                stamp = task.get(key)
+                getattr(columns, name).append(to_seconds(stamp) if stamp else NO_TIME)
+            columns.priority.append(priorities.get(task.get("priority", "medium"), 1))
+            columns.completed.append(1 if task.get("completed") else 0)
+            columns.recurring.append(1 if task.get("recurrence") else 0)
+            course_id = task.get("course_id")
+            if course_id is None:
+                columns.course.append(INBOX)
+            else:
+                if course_id not in codes:
+                    codes[course_id] = len(columns.courses)
+                    columns.courses.append(course_id)
+                columns.course.append(codes[course_id])
+        return columns
+
+    def to_bytes(self, source: list[int]) -> bytes:
+        """Serialize the columns for the data file identified by ``source``."""
+        header = {
+            "version": COLUMNS_VERSION,
+            "source": source,
+            "byteorder": sys.byteorder,
+            "ids": self.ids,
+            "courses": self.courses,
+        }
+        body = b"".join(getattr(self, name).tobytes() for name, _, _ in _LAYOUT)
+        return json.dumps(header).encode() + b"\n" + body
+
+    @classmethod
+    def from_bytes(cls, raw: bytes, source: list[int]) -> "TaskColumns | None":
+        """Deserialize columns, or None if they are not for ``source``."""
+        line, _, body = raw.partition(b"\n")
+        header = json.loads(line)
+        if (
+            header.get("version") != COLUMNS_VERSION
+            or header.get("source") != source
+            or header.get("byteorder") != sys.byteorder
+        ):
+            return None
+        columns = cls()
+        columns.ids = header["ids"]
+        columns.courses = header["courses"]
+        offset = 0
+        for name, typecode, _ in _LAYOUT:
+            column = array(typecode)
+            size = column.itemsize * len(columns.ids)
+            column.frombytes(body[offset : offset + size])
+            setattr(columns, name, column)
+            offset += size
+        if offset != len(body):
+            return None
+        return columns
+
+    def select(
+        self,
+        *,
+        open_only: bool = False,
+        due_from: date | None = None,
+        due_before: date | None = None,
+        priority: str | None = None,
+        course_ids: Iterable[str] | None = None,
+        inbox: bool = False,
+    ) -> list[int]:
+        """Find the rows matching every given condition.
+
+        Args:
+            open_only: Only tasks not completed
+            due_from: Only tasks due on or after this day (recurring tasks
+                match whenever ``due_before`` does, since a later
+                occurrence may fall on or after it)
+            due_before: Only tasks due before this day
+            priority: Only tasks with this priority
+            course_ids: Only tasks in one of these stored course IDs
+            inbox: Only tasks without a course
+
+        Returns:
+            Matching rows, in order
+        """
+        checks: list[tuple[str, Callable[[Any, int], Any], int]] = []
+        if open_only:
+            checks.append(("completed", operator.eq, 0))
+        if due_from is not None or due_before is not None:
+            checks.append(("due", operator.ne, NO_TIME))
+        if due_before is not None:
+            checks.append(("due", operator.lt, day_seconds(due_before)))
+        if priority is not None:
+            checks.append(("priority", operator.eq, PRIORITIES.index(priority)))
+        if inbox:
+            checks.append(("course", operator.eq, INBOX))
+        codes = None
+        if course_ids is not None:
+            wanted = set(course_ids)
+            codes = {code for code, course_id in enumerate(self.courses) if course_id in wanted}
+        start = None if due_from is None else day_seconds(due_from)
+        return self._rows(checks, codes, start)
+
+    def _rows(
+        self,
+        checks: list[tuple[str, Callable[[Any, int], Any], int]],
+        codes: set[int] | None,
+        start: int | None,
+    ) -> list[int]:
+        """Apply (column, comparison, value) checks, course codes and a start.
+
+        Recurring tasks pass the start check whatever their due time.
+        """
+        if np is not None:
+            mask = np.ones(len(self), dtype=bool)
+            for name, compare, value in checks:
+                mask &= compare(np.frombuffer(getattr(self, name), dtype=_DTYPES[name]), value)
+            if start is not None:
+                due = np.frombuffer(self.due, dtype=np.int64)
+                mask &= (due >= start) | np.frombuffer(self.recurring, dtype=np.int8).astype(bool)
+            if codes is not None:
+                course = np.frombuffer(self.course, dtype=np.int32)
+                mask &= np.isin(course, np.array(sorted(codes), dtype=np.int32))
+            matched: list[int] = np.flatnonzero(mask).tolist()
+            return matched
+
+        rows: Iterable[int] = range(len(self))
+        for name, compare, value in checks:
+            column = getattr(self, name)
+            rows = [row for row in rows if compare(column[row], value)]
+        if start is not None:
+            due, recurring = self.due, self.recurring
+            rows = [row for row in rows if due[row] >= start or recurring[row]]
+        if codes is not None:
+            course = self.course
+            rows = [row for row in rows if course[row] in codes]
+        return list(rows)
+
+
+def _source(data_file: Path) -> list[int]:
+    """Identify the current contents of the data file."""
+    st = os.stat(data_file)
+    return [st.st_mtime_ns, st.st_size]
+
+
+def write_task_columns(data_file: Path, data: dict[str, Any]) -> TaskColumns | None:
+    """Write the columns of freshly committed data.
+
+    The columns are a cache, so they are replaced atomically but not
+    fsynced, and failing to write them never fails the commit.
+
+    Args:
+        data_file: Data file that now holds ``data``
+        data: Committed data
+
+    Returns:
+        Columns written, or None if they could not be
+    """
+    path = columns_file(data_file)
+    tmp = path.with_suffix(".columns.tmp")
+    try:
+        columns = TaskColumns.build(data)
+        with open(tmp, "wb") as f:
+            f.write(columns.to_bytes(_source(data_file)))
+        os.replace(tmp, path)
+    except OSError:
+        return None
+    return columns
+
+
+def read_task_columns(data_file: Path) -> TaskColumns | None:
+    """Read the columns of a data file if they are current.
+
+    Args:
+        data_file: Path to data.json
+
+    Returns:
+        Columns, or None if missing or stale
+    """
+    try:
+        source = _source(data_file)
+        with open(columns_file(data_file), "rb") as f:
+            return TaskColumns.from_bytes(f.read(), source)
+    except (OSError, ValueError):
+        return None
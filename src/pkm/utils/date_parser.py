@@ -1,13 +1,188 @@
-"""Natural language date parsing utilities."""
+"""Natural language date parsing utilities.
 
-from datetime import datetime, time
-from typing import Optional
+Common forms ("friday", "next fri", "in 3 days", "2025-12-01", "Dec 1",
+each optionally followed by a time like "11:59pm") are matched by a
+precompiled grammar; anything else falls back to fuzzy parsing with
+dateutil. Results are cached per (text, today), so importing many rows with
+the same few due dates parses each one once.
+"""
+
+import re
+from collections.abc import Iterable
+from datetime import date, datetime, time, timedelta
+from functools import lru_cache
+from typing import Literal, Optional
 
 from dateutil.parser import parse as dateutil_parse
 from dateutil.relativedelta import relativedelta
 
+from pkm.models.task import Recurrence
+
+END_OF_DAY = time(23, 59, 59)
+
+_WEEKDAYS = {
+    name: day
+    for day, names in enumerate(
+        [
+            "monday mon",
+            "tuesday tue tues",
+            "wednesday wed",
+            "thursday thu thur thurs",
+            "friday fri",
+            "saturday sat",
+            "sunday sun",
+        ]
+    )
+    for name in names.split()
+}
+_MONTHS = {
+    name: month
+    for month, names in enumerate(
+        [
+            "january jan",
+            "february feb",
+            "march mar",
+            "april apr",
+            "may",
+            "june jun",
+            "july jul",
+            "august aug",
+            "september sep sept",
+            "october oct",
+            "november nov",
+            "december dec",
+        ],
+        start=1,
+    )
+    for name in names.split()
+}
+_UNITS = {"day": "days", "week": "weeks", "month": "months"}
+
+
+def _names(names: Iterable[str]) -> str:
+    """Build a regex alternation, longest names first."""
+    return "|".join(sorted(names, key=len, reverse=True))
+
+
+# A trailing time: "5pm", "11:59 pm", "at 17:00"
+_TIME = re.compile(r"(?:^|\s+)(?:at\s+)?(\d{1,2})(?::(\d{2}))?\s*([ap]m)?$")
+# The day before it
+_DAY = re.compile(
+    r"(?P<named>today|tonight|tomorrow)"
+    rf"|(?P<next>next\s+)?(?P<weekday>{_names(_WEEKDAYS)})"
+    rf"|in\s+(?P<count>\d+)\s+(?P<unit>{_names(_UNITS)})s?"
+    r"|(?P<year>\d{4})-(?P<month>\d{1,2})-(?P<day>\d{1,2})"
+    rf"|(?P<month_name>{_names(_MONTHS)})\.?\s+(?P<month_day>\d{{1,2}})(?:st|nd|rd|th)?"
+    r"(?:,?\s+(?P<month_year>\d{4}))?"
+)
+
+
+def _parse_time(text: str) -> tuple[str, Optional[time]]:
+    """Split a trailing time off a date string.
+
+    Returns:
+        (rest of the string, time or None if there is none)
+
+    Raises:
+        ValueError: If the trailing time is out of range
+    """
+    match = _TIME.search(text)
+    # A bare number is a day or a year, not a time
+    if match is None or (match.group(2) is None and match.group(3) is None):
+        return text, None
+    hour, minute = int(match.group(1)), int(match.group(2) or 0)
+    meridiem = match.group(3)
+    if meridiem:
+        if not 1 <= hour <= 12:
+            raise ValueError(f"hour out of range: {hour}")
+        hour = hour % 12 + (12 if meridiem == "pm" else 0)
+    return text[: match.start()], time(hour, minute)
+
+
+def _parse_day(match: re.Match[str], today: date) -> date:
+    """Get the day named by a match of ``_DAY``."""
+    if match.group("named"):
+        return today + timedelta(days=1 if match.group("named") == "tomorrow" else 0)
+    if match.group("weekday"):
+        days_ahead = (_WEEKDAYS[match.group("weekday")] - today.weekday()) % 7
+        if match.group("next") and days_ahead == 0:
+            days_ahead = 7  # Next week, not today
+        return today + timedelta(days=days_ahead)
+    if match.group("unit"):
+        unit = _UNITS[match.group("unit")]
+        day: date = today + relativedelta(**{unit: int(match.group("count"))})
+        return day
+    if match.group("year"):
+        return date(int(match.group("year")), int(match.group("month")), int(match.group("day")))
+    year = int(match.group("month_year") or today.year)
+    return date(year, _MONTHS[match.group("month_name")], int(match.group("month_day")))
+
+
+def _parse_fast(text: str, today: date) -> Optional[datetime]:
+    """Parse a common form with the precompiled grammar.
+
+    Args:
+        text: Stripped, lowercased date string
+        today: Day that relative dates count from
+
+    Returns:
+        datetime, or None if the string is not a common form (or not a
+        valid date)
+    """
+    try:
+        rest, at = _parse_time(text)
+        rest = rest.strip()
+        if not rest:
+            day = today
+        else:
+            match = _DAY.fullmatch(rest)
+            if match is None:
+                return None
+            day = _parse_day(match, today)
+    except ValueError:
+        return None
+    return datetime.combine(day, at or END_OF_DAY)
+
+
+def _parse_fallback(text: str, today: date) -> Optional[datetime]:
+    """Parse any other form with fuzzy dateutil parsing."""
+    now = datetime.combine(today, time())
+
+    # Handle "next [day]" (e.g., "next friday afternoon")
+    if text.startswith("next "):
+        try:
+            target = dateutil_parse(text[5:], fuzzy=True)
+            days_ahead = (target.weekday() - today.weekday()) % 7 or 7
+            return datetime.combine(today + relativedelta(days=days_ahead), END_OF_DAY)
+        except (ValueError, OverflowError):
+            pass
+
+    # Handle "in X days/weeks/months" followed by other words
+    parts = text.split()
+    if len(parts) >= 3 and parts[0] == "in" and parts[1].isdigit():
+        unit = _UNITS.get(parts[2].rstrip("s"))
+        if unit:
+            target = today + relativedelta(**{unit: int(parts[1])})
+            return datetime.combine(target, END_OF_DAY)
+
+    try:
+        parsed: datetime = dateutil_parse(text, fuzzy=True, default=now)
+    except (ValueError, OverflowError):
+        return None
+
+    # If only date was provided (no time), default to end of day
+    if ":" not in text and "am" not in text and "pm" not in text:
+        parsed = datetime.combine(parsed.date(), END_OF_DAY)
+    return parsed
+
+
+@lru_cache(maxsize=4096)
+def _parse(text: str, today: date) -> Optional[datetime]:
+    """Parse a normalized date string, fast path first (cached)."""
+    return _parse_fast(text, today) or _parse_fallback(text, today)
+
 
-def parse_due_date(date_str: str) -> Optional[datetime]:
+def parse_due_date(date_str: str, today: Optional[date] = None) -> Optional[datetime]:
     """Parse a date string into a datetime object.
 
     Supports multiple formats:
@@ -16,8 +191,11 @@ def parse_due_date(date_str: str) -> Optional[datetime]:
     - Human format: "Dec 1", "December 1 2025"
     - With times: "Friday 11:59pm", "tomorrow at 5pm"
 
+    Dates without a time are due at the end of the day.
+
     Args:
         date_str: The date string to parse
+        today: Day that relative dates count from (default: today)
 
     Returns:
         datetime object or None if parsing fails
@@ -32,71 +210,150 @@ def parse_due_date(date_str: str) -> Optional[datetime]:
     """
     if not date_str or not date_str.strip():
         return None
+    return _parse(" ".join(date_str.lower().split()), today or date.today())
 
-    date_str = date_str.strip().lower()
-    now = datetime.now()
 
-    # Handle special cases first
-    if date_str in ["today", "tonight"]:
-        return datetime.combine(now.date(), time(23, 59, 59))
+def parse_due_dates(
+    date_strs: Iterable[str], today: Optional[date] = None
+) -> list[Optional[datetime]]:
+    """Parse many date strings, e.g. the due dates of imported rows.
 
-    if date_str == "tomorrow":
-        tomorrow = now.date() + relativedelta(days=1)
-        return datetime.combine(tomorrow, time(23, 59, 59))
+    Every string is parsed relative to the same day, and repeated strings
+    are parsed once.
 
-    # Handle "next [day]" (e.g., "next friday")
-    if date_str.startswith("next "):
-        day_name = date_str[5:]
-        try:
-            # Parse the day name
-            target = dateutil_parse(day_name, fuzzy=True)
-            # Find the next occurrence of that day
-            days_ahead = (target.weekday() - now.weekday()) % 7
-            if days_ahead == 0:
-                days_ahead = 7  # Next week, not today
-            next_day = now.date() + relativedelta(days=days_ahead)
-            return datetime.combine(next_day, time(23, 59, 59))
-        except (ValueError, AttributeError):
-            pass
+    Args:
+        date_strs: Date strings to parse
+        today: Day that relative dates count from (default: today)
 
-    # Handle "in X days/weeks/months"
-    if date_str.startswith("in "):
-        parts = date_str[3:].split()
-        if len(parts) >= 2:
-            try:
-                count = int(parts[0])
-                unit = parts[1].rstrip('s')  # Remove plural 's'
-
-                if unit in ["day", "days"]:
-                    target_date = now.date() + relativedelta(days=count)
-                elif unit in ["week", "weeks"]:
-                    target_date = now.date() + relativedelta(weeks=count)
-                elif unit in ["month", "months"]:
-                    target_date = now.date() + relativedelta(months=count)
-                else:
-                    target_date = None
-
-                if target_date:
-                    return datetime.combine(target_date, time(23, 59, 59))
-            except (ValueError, IndexError):
-                pass
-
-    # Try general parsing with dateutil
-    try:
-        parsed = dateutil_parse(date_str, fuzzy=True, default=now)
+    Returns:
+        One datetime (or None if parsing fails) per string, in order
+    """
+    today = today or date.today()
+    return [parse_due_date(date_str, today) for date_str in date_strs]
+
+
+# Recurrence: "daily", "every 2 weeks on mon, wed", "every tue and thu"
+_Unit = Literal["day", "week"]
+_REPEATS: dict[str, tuple[_Unit, int]] = {
+    "daily": ("day", 1),
+    "weekly": ("week", 1),
+    "biweekly": ("week", 2),
+}
+_EVERY = re.compile(r"every\s+(?:(?P<every>\d+)\s+)?(?P<unit>day|week)s?(?:\s+on\s+(?P<on>.+))?")
 
-        # If only date was provided (no time), default to end of day
-        if ":" not in date_str and "am" not in date_str and "pm" not in date_str:
-            parsed = datetime.combine(parsed.date(), time(23, 59, 59))
 
-        return parsed
-    except (ValueError, AttributeError):
+def _parse_weekdays(text: str) -> Optional[list[int]]:
+    """Parse a list of weekdays like "mon, wed and fri" (None if invalid)."""
+    days = []
+    for word in re.split(r"\s*,\s*|\s+", text.strip()):
+        name = word if word in _WEEKDAYS else word.removesuffix("s")  # "mondays"
+        if name in _WEEKDAYS:
+            days.append(_WEEKDAYS[name])
+        elif name == "weekday":
+            days.extend(range(5))
+        elif word != "and":
+            return None
+    return days or None
+
+
+def parse_recurrence(text: str, until: Optional[date] = None) -> Optional[Recurrence]:
+    """Parse a recurrence rule.
+
+    Supports "daily", "weekly", "biweekly", "every 3 days", "every 2 weeks",
+    "every week on mon, wed", "every tue and thu" and "every weekday".
+
+    Args:
+        text: The rule to parse
+        until: Last day an occurrence may fall on
+
+    Returns:
+        Recurrence, or None if the rule is not understood
+    """
+    text = " ".join(text.lower().split())
+    weekdays: Optional[list[int]] = []
+    unit: _Unit
+    match = _EVERY.fullmatch(text)
+    if text in _REPEATS:
+        unit, every = _REPEATS[text]
+    elif match:
+        unit = "day" if match.group("unit") == "day" else "week"
+        every = int(match.group("every") or 1)
+        if match.group("on"):
+            weekdays = _parse_weekdays(match.group("on"))
+    elif text.startswith("every "):
+        unit, every = "week", 1
+        weekdays = _parse_weekdays(text[6:])
+    else:
         return None
+    if weekdays is None:
+        return None
+    try:
+        return Recurrence(every=every, unit=unit, weekdays=weekdays, until=until)
+    except ValueError:
+        return None
+
+
+class DueDateFormatter:
+    """Formats due dates for one render of a view.
+
+    "Now" is captured once, and the date part (with its relative day) and
+    the time part are each formatted once per distinct value, so a table of
+    many tasks does not call ``datetime.now()`` and ``strftime`` per row.
+    Create one per table (or command) so the relative days stay current.
+
+    Examples:
+        >>> format_due = DueDateFormatter(datetime(2025, 11, 23, 9, 0))
+        >>> format_due(datetime(2025, 11, 25, 23, 59, 0))
+        'Tuesday, Nov 25 at 11:59 PM (2 days)'
+    """
+
+    def __init__(self, now: Optional[datetime] = None) -> None:
+        """Capture the moment relative days are counted from.
+
+        Args:
+            now: Current time (default: now)
+        """
+        self.today = (now or datetime.now()).date()
+        self._days: dict[date, str] = {}
+        self._times: dict[time, str] = {}
+
+    def __call__(self, dt: datetime) -> str:
+        """Format a datetime like ``format_due_date``."""
+        day, at = dt.date(), dt.time()
+        day_str = self._days.get(day)
+        if day_str is None:
+            day_str = self._days[day] = self._format_day(day)
+        time_str = self._times.get(at)
+        if time_str is None:
+            # Remove leading zero from hour
+            time_str = self._times[at] = at.strftime("at %I:%M %p").replace(" 0", " ")
+        return day_str.format(time_str)
+
+    def _format_day(self, day: date) -> str:
+        """Format a day with its relative day, leaving ``{}`` for the time."""
+        days_until = (day - self.today).days
+
+        # Add relative time indicator
+        if days_until == 0:
+            relative = "today"
+        elif days_until == 1:
+            relative = "tomorrow"
+        elif days_until == -1:
+            relative = "yesterday"
+        elif days_until < 0:
+            relative = f"{abs(days_until)} days ago"
+        else:
+            relative = f"{days_until} days"
+
+        return day.strftime("%A, %b %d") + " {} (" + relative + ")"
 
 
 def format_due_date(dt: datetime) -> str:
     """Format a datetime into a human-readable due date string.
 
+    To format many dates (e.g. the rows of a table), use one
+    ``DueDateFormatter`` instead.
+
     Args:
         dt: The datetime to format
 
@@ -108,23 +365,4 @@ def format_due_date(dt: datetime) -> str:
         >>> format_due_date(dt)
         'Friday, Nov 25 at 11:59 PM (2 days)'
     """
-    now = datetime.now()
-    days_until = (dt.date() - now.date()).days
-
-    # Format the date part
-    date_str = dt.strftime("%A, %b %d")
-    time_str = dt.strftime("at %I:%M %p").replace(" 0", " ")  # Remove leading zero from hour
-
-    # Add relative time indicator
-    if days_until == 0:
-        relative = "today"
-    elif days_until == 1:
-        relative = "tomorrow"
-    elif days_until == -1:
-        relative = "yesterday"
-    elif days_until < 0:
-        relative = f"{abs(days_until)} days ago"
-    else:
-        relative = f"{days_until} days"
-
-    return f"{date_str} {time_str} ({relative})"
+    return DueDateFormatter()(dt)
@@ -79,3 +79,34 @@ class TestCorruptedData:
 
         with pytest.raises(ValueError, match="Corrupted data file"):
             store.load()
+
+    def test_truncated_file_salvaged_without_backup(self, temp_data_dir: Path) -> None:
+        """Test intact records of a truncated file load without a backup."""
+        store = JSONStore(temp_data_dir / "data.json")
+        data = create_empty_schema()
+        data["notes"] = [{"id": f"n{i}", "content": f"note {i}"} for i in range(3)]
+        store.save(data)
+        text = store.data_file.read_text()
+        store.data_file.write_text(text[: text.index('"note 2"')])
+
+        loaded = store.load()
+
+        assert [n["id"] for n in loaded["notes"]] == ["n0", "n1"]
+        assert store.recovery is not None
+        assert store.recovery.lost["notes"] == ["n2"]
+        assert store.corrupt_file.read_text() == text[: text.index('"note 2"')]
+
+    def test_backup_kept_after_recovered_save(self, temp_data_dir: Path) -> None:
+        """Test saving salvaged data does not overwrite the good backup."""
+        store = JSONStore(temp_data_dir / "data.json")
+        store.save(create_empty_schema())
+        data = create_empty_schema()
+        data["notes"] = [{"id": "n1", "content": "kept"}]
+        store.save(data)
+        backup = store.bak_file.read_text()
+        store.data_file.write_text(store.data_file.read_text()[:-20])
+
+        store.save(store.load())
+
+        assert store.bak_file.read_text() == backup
+        assert json.loads(store.data_file.read_text())["notes"][0]["content"] == "kept"
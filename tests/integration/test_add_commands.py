@@ -36,6 +36,25 @@ class TestAddCommands:
         assert "inbox" in result.output
         assert "t" in result.output  # Task ID format (t1, t2, etc.)
 
+    def test_add_repeating_task(self, temp_data_dir: Path) -> None:
+        """Test a repeating task is created with its rule, and bad rules are refused."""
+        runner = CliRunner()
+        base = ["--data-dir", str(temp_data_dir), "add", "task"]
+
+        result = runner.invoke(
+            cli, [*base, "Problem set", "--repeat", "every fri", "--until", "2099-01-01"]
+        )
+        bad_rule = runner.invoke(cli, [*base, "Lab", "--repeat", "sometimes"])
+        bad_until = runner.invoke(cli, [*base, "Lab", "--until", "friday"])
+
+        assert result.exit_code == 0
+        assert "Repeats every week on Fri until 2099-01-01" in result.output
+        assert "Friday" in result.output
+        assert bad_rule.exit_code == 1
+        assert "Could not parse repeat rule" in bad_rule.output
+        assert bad_until.exit_code == 1
+        assert "--until needs --repeat" in bad_until.output
+
     def test_add_note_with_topics(self, temp_data_dir: Path) -> None:
         """Test adding a note with topic tags."""
         runner = CliRunner()
@@ -94,3 +113,23 @@ class TestAddCommands:
 
         assert result.exit_code == 0
         assert "course 'Biology 101'" in result.output
+
+    def test_add_note_checks_duplicates(self, temp_data_dir: Path) -> None:
+        """Test --duplicates warns about or merges into a near-duplicate."""
+        runner = CliRunner()
+        base = ["--data-dir", str(temp_data_dir), "add", "note"]
+        runner.invoke(cli, [*base, "The mitochondria is the powerhouse of the cell"])
+
+        warned = runner.invoke(
+            cli, [*base, "The mitochondria is the powerhouse of a cell", "--duplicates", "warn"]
+        )
+        merged = runner.invoke(
+            cli,
+            [*base, "the mitochondria is the powerhouse of the cell!", "--duplicates", "merge"],
+        )
+
+        assert warned.exit_code == 0
+        assert "Near-duplicate of n1 (76% similar)" in warned.output
+        assert "Note created: n2" in warned.output
+        assert merged.exit_code == 0
+        assert "Merged into existing note: n1" in merged.output
@@ -0,0 +1,159 @@
+"""Integration tests for data file maintenance commands."""
+
+import json
+from pathlib import Path
+
+from click.testing import CliRunner
+
+from pkm.cli.main import cli
+
+
+def write_v1_file(data_dir: Path) -> Path:
+    """Write a schema v1 data file with course names on records."""
+    path = data_dir / "data.json"
+    path.write_text(
+        json.dumps(
+            {
+                "notes": [{"id": "n1", "content": "Cells", "course": "Bio 101"}],
+                "tasks": [{"id": "t1", "title": "Lab", "course": "Bio 101"}],
+                "courses": [],
+            }
+        )
+    )
+    return path
+
+
+class TestDataCommands:
+    """Integration tests for pkm data."""
+
+    def test_migrate_upgrades_file(self, temp_data_dir: Path) -> None:
+        """Test migrate rewrites a v1 file at the current schema."""
+        path = write_v1_file(temp_data_dir)
+        runner = CliRunner()
+
+        result = runner.invoke(cli, ["--data-dir", str(temp_data_dir), "data", "migrate"])
+
+        assert result.exit_code == 0
+        assert "Migrated 2 record(s) from v1 to v2" in result.output
+        data = json.loads(path.read_text())
+        assert data["_schema_version"] == 2
+        assert data["notes"][0]["course_id"] == "c1"
+
+    def test_migrate_dry_run(self, temp_data_dir: Path) -> None:
+        """Test dry run leaves the file unchanged."""
+        path = write_v1_file(temp_data_dir)
+        original = path.read_text()
+        runner = CliRunner()
+
+        result = runner.invoke(
+            cli, ["--data-dir", str(temp_data_dir), "data", "migrate", "--dry-run"]
+        )
+
+        assert result.exit_code == 0
+        assert "Dry run" in result.output
+        assert path.read_text() == original
+
+    def test_migrate_up_to_date(self, temp_data_dir: Path) -> None:
+        """Test migrating current data reports nothing to do."""
+        runner = CliRunner()
+        runner.invoke(cli, ["--data-dir", str(temp_data_dir), "add", "note", "Hello"])
+
+        result = runner.invoke(cli, ["--data-dir", str(temp_data_dir), "data", "migrate"])
+
+        assert result.exit_code == 0
+        assert "already at schema v2" in result.output
+
+    def test_recover_intact_file(self, temp_data_dir: Path) -> None:
+        """Test recover verifies an intact file without changing it."""
+        runner = CliRunner()
+        runner.invoke(cli, ["--data-dir", str(temp_data_dir), "add", "note", "Hello"])
+
+        result = runner.invoke(cli, ["--data-dir", str(temp_data_dir), "data", "recover"])
+
+        assert result.exit_code == 0
+        assert "intact (1 record(s) verified)" in result.output
+
+    def test_recover_damaged_file(self, temp_data_dir: Path) -> None:
+        """Test recover salvages intact notes and reports the lost one."""
+        runner = CliRunner()
+        for content in ("First", "Second", "Third"):
+            runner.invoke(cli, ["--data-dir", str(temp_data_dir), "add", "note", content])
+        # Reading drains the captures into data.json
+        runner.invoke(cli, ["--data-dir", str(temp_data_dir), "view", "inbox"])
+        path = temp_data_dir / "data.json"
+        text = path.read_text()
+        lost_id = json.loads(text)["notes"][2]["id"]
+        (temp_data_dir / "data.json.bak").unlink(missing_ok=True)
+        path.write_text(text.replace('"Third"', '"Thi\x00rd"'))
+
+        result = runner.invoke(cli, ["--data-dir", str(temp_data_dir), "data", "recover"])
+
+        assert result.exit_code == 0
+        assert f"Lost notes: {lost_id}" in result.output
+        data = json.loads(path.read_text())
+        assert [n["content"] for n in data["notes"]] == ["First", "Second"]
+        assert (temp_data_dir / "data.json.corrupt").exists()
+
+    def test_recover_dry_run(self, temp_data_dir: Path) -> None:
+        """Test dry run reports damage but leaves the file alone."""
+        runner = CliRunner()
+        runner.invoke(cli, ["--data-dir", str(temp_data_dir), "add", "note", "Hello"])
+        runner.invoke(cli, ["--data-dir", str(temp_data_dir), "view", "inbox"])
+        path = temp_data_dir / "data.json"
+        damaged = path.read_text()[:-30]
+        path.write_text(damaged)
+
+        result = runner.invoke(
+            cli, ["--data-dir", str(temp_data_dir), "data", "recover", "--dry-run"]
+        )
+
+        assert result.exit_code == 0
+        assert "Dry run" in result.output
+        assert path.read_text() == damaged
+
+    def test_fsck_clean_and_broken(self, temp_data_dir: Path) -> None:
+        """Test fsck passes a clean file and fails a broken one."""
+        runner = CliRunner()
+        runner.invoke(cli, ["--data-dir", str(temp_data_dir), "add", "note", "Hello"])
+
+        result = runner.invoke(cli, ["--data-dir", str(temp_data_dir), "data", "fsck"])
+        assert result.exit_code == 0
+        assert "No problems found (1 record(s) checked)" in result.output
+
+        path = temp_data_dir / "data.json"
+        path.write_text(path.read_text().replace('"Hello"', '"Hellp"'))
+        result = runner.invoke(cli, ["--data-dir", str(temp_data_dir), "data", "fsck"])
+        assert result.exit_code == 1
+        assert "pkm data recover" in result.output
+
+    def test_export_writes_json_lines(self, temp_data_dir: Path) -> None:
+        """Test export writes one line per selected record."""
+        runner = CliRunner()
+        runner.invoke(cli, ["--data-dir", str(temp_data_dir), "add", "note", "Hello"])
+        runner.invoke(cli, ["--data-dir", str(temp_data_dir), "add", "task", "Lab"])
+        output = temp_data_dir / "notes.jsonl"
+
+        result = runner.invoke(
+            cli,
+            ["--data-dir", str(temp_data_dir), "data", "export", str(output), "--type", "notes"],
+        )
+
+        assert result.exit_code == 0
+        lines = output.read_text().splitlines()
+        assert len(lines) == 1
+        assert json.loads(lines[0])["content"] == "Hello"
+
+    def test_archive_dry_run(self, temp_data_dir: Path) -> None:
+        """Test archive reports old completed tasks without moving them."""
+        runner = CliRunner()
+        result = runner.invoke(cli, ["--data-dir", str(temp_data_dir), "add", "task", "Lab"])
+        task_id = result.output.split("Task created: ")[1].split()[0]
+        runner.invoke(cli, ["--data-dir", str(temp_data_dir), "task", "complete", task_id])
+
+        result = runner.invoke(
+            cli, ["--data-dir", str(temp_data_dir), "data", "archive", "--days", "-1", "--dry-run"]
+        )
+
+        assert result.exit_code == 0
+        assert "1 task(s) would be archived" in result.output
+        assert not (temp_data_dir / "archive.jsonl").exists()
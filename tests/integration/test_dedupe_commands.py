@@ -0,0 +1,62 @@
+"""Integration tests for pkm dedupe."""
+
+from pathlib import Path
+
+from click.testing import CliRunner
+
+from pkm.cli.main import cli
+
+
+class TestDedupeCommand:
+    """Integration tests for pkm dedupe."""
+
+    def test_dedupe_without_duplicates(self, temp_data_dir: Path) -> None:
+        """Test distinct notes form no clusters."""
+        runner = CliRunner()
+        base = ["--data-dir", str(temp_data_dir)]
+        runner.invoke(cli, [*base, "add", "note", "Cells divide by mitosis"])
+        runner.invoke(cli, [*base, "add", "note", "Treaty of Versailles"])
+
+        result = runner.invoke(cli, [*base, "dedupe"])
+
+        assert result.exit_code == 0
+        assert "No near-duplicate notes found" in result.output
+
+    def test_dedupe_lists_and_merges_clusters(self, temp_data_dir: Path) -> None:
+        """Test clusters are listed, then merged into their oldest note."""
+        runner = CliRunner()
+        base = ["--data-dir", str(temp_data_dir)]
+        for content in [
+            "Photosynthesis converts light into chemical energy",
+            "Treaty of Versailles",
+            "Photosynthesis converts light to chemical energy",
+            "photosynthesis converts light into chemical energy.",
+        ]:
+            runner.invoke(cli, [*base, "add", "note", content])
+
+        listed = runner.invoke(cli, [*base, "dedupe"])
+        merged = runner.invoke(cli, [*base, "dedupe", "--merge"])
+        after = runner.invoke(cli, [*base, "dedupe"])
+
+        assert listed.exit_code == 0
+        assert "Near-Duplicate Notes (1)" in listed.output
+        assert "n3" in listed.output and "n4" in listed.output
+        assert "--merge" in listed.output
+        assert merged.exit_code == 0
+        assert "Merged 2 notes into 1" in merged.output
+        assert "No near-duplicate notes found" in after.output
+
+    def test_dedupe_threshold(self, temp_data_dir: Path) -> None:
+        """Test a lower threshold finds looser copies."""
+        runner = CliRunner()
+        base = ["--data-dir", str(temp_data_dir)]
+        runner.invoke(cli, [*base, "add", "note", "Lecture 5 notes on cell biology"])
+        runner.invoke(cli, [*base, "add", "note", "Lecture 5 notes on cell division"])
+
+        strict = runner.invoke(cli, [*base, "dedupe"])
+        loose = runner.invoke(cli, [*base, "dedupe", "--threshold", "0.5"])
+        invalid = runner.invoke(cli, [*base, "dedupe", "--threshold", "2"])
+
+        assert "No near-duplicate notes found" in strict.output
+        assert "Near-Duplicate Notes (1)" in loose.output
+        assert invalid.exit_code != 0
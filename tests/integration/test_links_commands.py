@@ -0,0 +1,95 @@
+"""Integration tests for link maintenance and cascade deletes."""
+
+import json
+from pathlib import Path
+
+from click.testing import CliRunner
+
+from pkm.cli.main import cli
+
+
+def create_linked_pair(runner: CliRunner, data_dir: Path) -> tuple[str, str]:
+    """Create a note and a task and link them."""
+    note_result = runner.invoke(cli, ["--data-dir", str(data_dir), "add", "note", "Lab notes"])
+    note_id = note_result.output.split("Note created: ")[1].split()[0]
+    task_result = runner.invoke(cli, ["--data-dir", str(data_dir), "add", "task", "Lab report"])
+    task_id = task_result.output.split("Task created: ")[1].split()[0]
+    runner.invoke(cli, ["--data-dir", str(data_dir), "task", "link-note", task_id, note_id])
+    return task_id, note_id
+
+
+class TestLinkCommands:
+    """Integration tests for link consistency."""
+
+    def test_delete_note_removes_task_reference(self, temp_data_dir: Path) -> None:
+        """Test deleting a note leaves no dangling ID inside the task."""
+        runner = CliRunner()
+        task_id, note_id = create_linked_pair(runner, temp_data_dir)
+
+        result = runner.invoke(
+            cli, ["--data-dir", str(temp_data_dir), "note", "delete", note_id, "--yes"]
+        )
+        assert result.exit_code == 0
+
+        data = json.loads((temp_data_dir / "data.json").read_text())
+        assert data["tasks"][0]["linked_notes"] == []
+
+    def test_delete_task_removes_note_reference(self, temp_data_dir: Path) -> None:
+        """Test deleting a task removes it from the note's backlinks."""
+        runner = CliRunner()
+        task_id, note_id = create_linked_pair(runner, temp_data_dir)
+
+        result = runner.invoke(
+            cli, ["--data-dir", str(temp_data_dir), "task", "delete", task_id, "--yes"]
+        )
+        assert result.exit_code == 0
+        assert "deleted" in result.output.lower()
+
+        data = json.loads((temp_data_dir / "data.json").read_text())
+        assert data["tasks"] == []
+        assert data["notes"][0]["linked_from_tasks"] == []
+
+    def test_delete_task_not_found(self, temp_data_dir: Path) -> None:
+        """Test deleting a non-existent task."""
+        runner = CliRunner()
+
+        result = runner.invoke(
+            cli, ["--data-dir", str(temp_data_dir), "task", "delete", "t999", "--yes"]
+        )
+
+        assert result.exit_code == 1
+        assert "not found" in result.output.lower()
+
+    def test_links_check_clean(self, temp_data_dir: Path) -> None:
+        """Test links check on consistent data."""
+        runner = CliRunner()
+        create_linked_pair(runner, temp_data_dir)
+
+        result = runner.invoke(cli, ["--data-dir", str(temp_data_dir), "links", "check"])
+
+        assert result.exit_code == 0
+        assert "consistent" in result.output.lower()
+
+    def test_links_check_fix_repairs(self, temp_data_dir: Path) -> None:
+        """Test links check --fix repairs dangling and one-sided links."""
+        data_file = temp_data_dir / "data.json"
+        runner = CliRunner()
+        task_id, note_id = create_linked_pair(runner, temp_data_dir)
+
+        data = json.loads(data_file.read_text())
+        data["tasks"][0]["linked_notes"] = ["n999"]
+        data_file.write_text(json.dumps(data))
+
+        result = runner.invoke(cli, ["--data-dir", str(temp_data_dir), "links", "check"])
+        assert result.exit_code == 0
+        assert "2 link issue" in result.output
+
+        result = runner.invoke(cli, ["--data-dir", str(temp_data_dir), "links", "check", "--fix"])
+        assert result.exit_code == 0
+        assert "Repaired 2" in result.output
+
+        data = json.loads(data_file.read_text())
+        assert data["tasks"][0]["linked_notes"] == [note_id]
+
+        result = runner.invoke(cli, ["--data-dir", str(temp_data_dir), "links", "check"])
+        assert "consistent" in result.output.lower()
@@ -1,5 +1,6 @@
 """Integration tests for organize commands."""
 
+import json
 from pathlib import Path
 
 from click.testing import CliRunner
@@ -169,3 +170,73 @@ class TestOrganizeCommands:
         assert result.exit_code == 0
         assert "Biology" in result.output
         assert "Math" in result.output
+
+    def test_rename_course_keeps_items(self, temp_data_dir: Path) -> None:
+        """Test renaming a course relabels its items without rewriting them."""
+        runner = CliRunner()
+        runner.invoke(
+            cli,
+            ["--data-dir", str(temp_data_dir), "add", "note", "Cell notes", "--course", "Bio 101"],
+        )
+        # Reading drains the capture into data.json
+        runner.invoke(cli, ["--data-dir", str(temp_data_dir), "view", "inbox"])
+        data_before = json.loads((temp_data_dir / "data.json").read_text())
+
+        result = runner.invoke(
+            cli,
+            ["--data-dir", str(temp_data_dir), "course", "rename", "Bio 101", "Biology 101"],
+        )
+        assert result.exit_code == 0
+        assert "renamed" in result.output.lower()
+
+        data_after = json.loads((temp_data_dir / "data.json").read_text())
+        assert data_after["notes"] == data_before["notes"]
+
+        result = runner.invoke(
+            cli, ["--data-dir", str(temp_data_dir), "view", "course", "Biology 101"]
+        )
+        assert "Cell notes" in result.output
+
+    def test_rename_missing_course(self, temp_data_dir: Path) -> None:
+        """Test renaming a course that does not exist."""
+        runner = CliRunner()
+
+        result = runner.invoke(
+            cli, ["--data-dir", str(temp_data_dir), "course", "rename", "Nope", "New"]
+        )
+
+        assert result.exit_code == 1
+        assert "not found" in result.output.lower()
+
+    def test_merge_courses(self, temp_data_dir: Path) -> None:
+        """Test merging folds items and counts into the target course."""
+        runner = CliRunner()
+        runner.invoke(
+            cli, ["--data-dir", str(temp_data_dir), "add", "note", "Typo note", "--course", "Bio"]
+        )
+        runner.invoke(
+            cli,
+            ["--data-dir", str(temp_data_dir), "add", "task", "Lab", "--course", "Biology 101"],
+        )
+
+        result = runner.invoke(
+            cli, ["--data-dir", str(temp_data_dir), "course", "merge", "Bio", "Biology 101"]
+        )
+        assert result.exit_code == 0
+        assert "1 notes, 1 tasks" in result.output
+
+        result = runner.invoke(cli, ["--data-dir", str(temp_data_dir), "view", "courses"])
+        assert "Courses (1)" in result.output
+
+        result = runner.invoke(
+            cli, ["--data-dir", str(temp_data_dir), "view", "course", "Biology 101"]
+        )
+        assert "Typo note" in result.output
+        assert "Lab" in result.output
+
+        # A merge into itself is rejected
+        result = runner.invoke(
+            cli,
+            ["--data-dir", str(temp_data_dir), "course", "merge", "Biology 101", "Biology 101"],
+        )
+        assert result.exit_code == 1
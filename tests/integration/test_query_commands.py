@@ -0,0 +1,60 @@
+"""Integration tests for pkm query."""
+
+from pathlib import Path
+
+from click.testing import CliRunner
+
+from pkm.cli.main import cli
+
+
+class TestQueryCommand:
+    """Integration tests for pkm query."""
+
+    def test_query_finds_matching_items(self, temp_data_dir: Path) -> None:
+        """Test a query combining course, status and text terms."""
+        runner = CliRunner()
+        base = ["--data-dir", str(temp_data_dir)]
+        runner.invoke(cli, [*base, "add", "note", "Calvin cycle", "--course", "Bio 101"])
+        runner.invoke(cli, [*base, "add", "task", "Calvin quiz", "--course", "Bio 101"])
+        runner.invoke(cli, [*base, "add", "task", "Calvin essay", "--course", "History"])
+
+        result = runner.invoke(cli, [*base, "query", 'course:"Bio 101" calvin -completed'])
+
+        assert result.exit_code == 0
+        assert "Calvin cycle" in result.output
+        assert "Calvin quiz" in result.output
+        assert "Calvin essay" not in result.output
+        assert "Total: 2 results" in result.output
+
+    def test_query_explain(self, temp_data_dir: Path) -> None:
+        """Test --explain shows the plan."""
+        runner = CliRunner()
+        base = ["--data-dir", str(temp_data_dir)]
+        runner.invoke(cli, [*base, "add", "task", "Lab report", "--priority", "high"])
+
+        result = runner.invoke(cli, [*base, "query", "priority:high lab", "--explain"])
+
+        assert result.exit_code == 0
+        assert "Query Plan" in result.output
+        assert "intersect" in result.output or "filter" in result.output
+        assert "Lab report" in result.output
+
+    def test_query_no_results(self, temp_data_dir: Path) -> None:
+        """Test a query without matches."""
+        runner = CliRunner()
+        base = ["--data-dir", str(temp_data_dir)]
+        runner.invoke(cli, [*base, "add", "note", "Cells"])
+
+        result = runner.invoke(cli, [*base, "query", "overdue"])
+
+        assert result.exit_code == 0
+        assert "No results found" in result.output
+
+    def test_query_syntax_error(self, temp_data_dir: Path) -> None:
+        """Test a malformed query is reported."""
+        runner = CliRunner()
+
+        result = runner.invoke(cli, ["--data-dir", str(temp_data_dir), "query", "colour:red"])
+
+        assert result.exit_code == 1
+        assert "Invalid query" in result.output
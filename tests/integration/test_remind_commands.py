@@ -0,0 +1,45 @@
+"""Integration tests for pkm remind."""
+
+from pathlib import Path
+
+from click.testing import CliRunner
+
+from pkm.cli.main import cli
+
+
+class TestRemindCommand:
+    """Integration tests for pkm remind."""
+
+    def test_list_without_tasks(self, temp_data_dir: Path) -> None:
+        """Test an empty collection has nothing to remind of."""
+        runner = CliRunner()
+
+        result = runner.invoke(cli, ["--data-dir", str(temp_data_dir), "remind", "--list"])
+
+        assert result.exit_code == 0
+        assert "No upcoming reminders" in result.output
+
+    def test_list_shows_each_lead(self, temp_data_dir: Path) -> None:
+        """Test every lead time of a due task is listed, undated tasks are not."""
+        runner = CliRunner()
+        base = ["--data-dir", str(temp_data_dir)]
+        runner.invoke(cli, [*base, "add", "task", "Essay", "--due", "in 3 days"])
+        runner.invoke(cli, [*base, "add", "task", "Someday"])
+
+        result = runner.invoke(cli, [*base, "remind", "--list", "-b", "1d", "-b", "2h"])
+
+        assert result.exit_code == 0
+        assert "Upcoming Reminders" in result.output
+        assert result.output.count("Essay") == 2
+        assert "Someday" not in result.output
+
+    def test_rejects_bad_lead(self, temp_data_dir: Path) -> None:
+        """Test lead times must look like 15m, 2h or 1d."""
+        runner = CliRunner()
+
+        result = runner.invoke(
+            cli, ["--data-dir", str(temp_data_dir), "remind", "--before", "soon"]
+        )
+
+        assert result.exit_code != 0
+        assert "15m, 2h or 1d" in result.output
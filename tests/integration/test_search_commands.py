@@ -149,3 +149,44 @@ class TestSearchCommands:
 
         assert result.exit_code == 0
         assert "No results" in result.output or "not found" in result.output.lower() or "0 results" in result.output
+
+    def test_search_regex(self, temp_data_dir: Path) -> None:
+        """Test --regex matches a pattern instead of a substring."""
+        runner = CliRunner()
+        base = ["--data-dir", str(temp_data_dir)]
+        runner.invoke(cli, [*base, "add", "note", "Photosynthetic pigments"])
+        runner.invoke(cli, [*base, "add", "note", "Photosynthesis overview"])
+        runner.invoke(cli, [*base, "add", "note", "Photography club"])
+
+        result = runner.invoke(cli, [*base, "search", "photosynth(esis|etic)", "--regex"])
+
+        assert result.exit_code == 0
+        assert "Photosynthetic pigments" in result.output
+        assert "Photosynthesis overview" in result.output
+        assert "Photography" not in result.output
+
+    def test_search_invalid_regex(self, temp_data_dir: Path) -> None:
+        """Test an invalid pattern is reported."""
+        runner = CliRunner()
+
+        result = runner.invoke(
+            cli, ["--data-dir", str(temp_data_dir), "search", "cell(", "--regex"]
+        )
+
+        assert result.exit_code == 1
+        assert "Invalid regular expression" in result.output
+
+    def test_search_phrase_and_prefix(self, temp_data_dir: Path) -> None:
+        """Test quoted phrases match whole words in order and word* a prefix."""
+        runner = CliRunner()
+        base = ["--data-dir", str(temp_data_dir)]
+        runner.invoke(cli, [*base, "add", "note", "The light reaction"])
+        runner.invoke(cli, [*base, "add", "note", "Reaction to light"])
+        runner.invoke(cli, [*base, "add", "note", "Photography club"])
+
+        phrase = runner.invoke(cli, [*base, "search", '"light reaction"'])
+        prefix = runner.invoke(cli, [*base, "search", "photo*"])
+
+        assert "The light reaction" in phrase.output
+        assert "Reaction to light" not in phrase.output
+        assert "Photography club" in prefix.output
@@ -0,0 +1,46 @@
+"""Integration tests for pkm stats."""
+
+from pathlib import Path
+
+from click.testing import CliRunner
+
+from pkm.cli.main import cli
+
+
+class TestStatsCommand:
+    """Integration tests for pkm stats."""
+
+    def test_stats_without_data(self, temp_data_dir: Path) -> None:
+        """Test an empty collection has nothing to report."""
+        runner = CliRunner()
+
+        result = runner.invoke(cli, ["--data-dir", str(temp_data_dir), "stats"])
+
+        assert result.exit_code == 0
+        assert "No data yet" in result.output
+
+    def test_stats_reports_courses_workload_and_inbox(self, temp_data_dir: Path) -> None:
+        """Test completion, workload and inbox age are all reported."""
+        runner = CliRunner()
+        base = ["--data-dir", str(temp_data_dir)]
+        runner.invoke(cli, [*base, "add", "note", "Inbox thought"])
+        runner.invoke(cli, [*base, "add", "task", "Lab report", "--course", "Bio"])
+        runner.invoke(cli, [*base, "add", "task", "Essay", "--due", "tomorrow", "--course", "Bio"])
+        runner.invoke(cli, [*base, "task", "complete", "t1"])
+
+        result = runner.invoke(cli, [*base, "stats", "--weeks", "2"])
+
+        assert result.exit_code == 0
+        assert "Completion by Course" in result.output
+        assert "Bio" in result.output
+        assert "50%" in result.output
+        assert "Workload (next 2 weeks)" in result.output
+        assert "Under a day" in result.output
+
+    def test_stats_rejects_bad_weeks(self, temp_data_dir: Path) -> None:
+        """Test the workload horizon must be positive."""
+        runner = CliRunner()
+
+        result = runner.invoke(cli, ["--data-dir", str(temp_data_dir), "stats", "--weeks", "0"])
+
+        assert result.exit_code != 0
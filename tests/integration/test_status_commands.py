@@ -0,0 +1,68 @@
+"""Integration tests for pkm status."""
+
+from pathlib import Path
+
+from click.testing import CliRunner
+
+from pkm.cli.main import cli
+
+
+class TestStatusCommand:
+    """Integration tests for pkm status."""
+
+    def test_status_without_data(self, temp_data_dir: Path) -> None:
+        """Test status before anything was added."""
+        runner = CliRunner()
+
+        result = runner.invoke(cli, ["--data-dir", str(temp_data_dir), "status"])
+
+        assert result.exit_code == 0
+        assert "No data yet" in result.output
+
+    def test_status_table(self, temp_data_dir: Path) -> None:
+        """Test status counts items added through the CLI."""
+        runner = CliRunner()
+        base = ["--data-dir", str(temp_data_dir)]
+        runner.invoke(cli, [*base, "add", "note", "Cells"])
+        runner.invoke(cli, [*base, "add", "task", "Lab report", "--due", "today"])
+        runner.invoke(cli, [*base, "add", "task", "Old essay", "--due", "2020-01-15"])
+
+        result = runner.invoke(cli, [*base, "status"])
+
+        assert result.exit_code == 0
+        assert "Due Today" in result.output
+        assert "Next due: Lab report" in result.output
+
+    def test_status_prompt(self, temp_data_dir: Path) -> None:
+        """Test the one-line prompt output matches the data."""
+        runner = CliRunner()
+        base = ["--data-dir", str(temp_data_dir)]
+        runner.invoke(cli, [*base, "add", "task", "Lab report", "--due", "today"])
+        runner.invoke(cli, [*base, "add", "task", "Old essay", "--due", "2020-01-15"])
+
+        result = runner.invoke(cli, [*base, "status", "--prompt"])
+
+        assert result.exit_code == 0
+        assert result.output == "today 1 | overdue 1 | inbox 2\n"
+
+    def test_status_prompt_after_organize(self, temp_data_dir: Path) -> None:
+        """Test the prompt reflects the latest commit."""
+        runner = CliRunner()
+        base = ["--data-dir", str(temp_data_dir)]
+        runner.invoke(cli, [*base, "add", "note", "Cells"])
+        runner.invoke(cli, [*base, "organize", "note", "n1", "--course", "Bio 101"])
+
+        result = runner.invoke(cli, [*base, "status", "--prompt", "--format", "{inbox}"])
+
+        assert result.output == "0\n"
+
+    def test_status_bad_format(self, temp_data_dir: Path) -> None:
+        """Test an unknown format field is reported."""
+        runner = CliRunner()
+        base = ["--data-dir", str(temp_data_dir)]
+        runner.invoke(cli, [*base, "add", "note", "Cells"])
+
+        result = runner.invoke(cli, [*base, "status", "--prompt", "--format", "{bogus}"])
+
+        assert result.exit_code == 1
+        assert "Invalid --format" in result.output
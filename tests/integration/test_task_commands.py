@@ -215,3 +215,20 @@ class TestTaskCommands:
 
         assert result.exit_code == 0
         assert "completed" in result.output.lower() or "checked" in result.output.lower()
+
+    def test_complete_repeating_task(self, temp_data_dir: Path) -> None:
+        """Test completing a repeating task moves it on to its next occurrence."""
+        runner = CliRunner()
+        base = ["--data-dir", str(temp_data_dir)]
+        runner.invoke(cli, [*base, "add", "task", "Flashcards", "--repeat", "daily"])
+
+        week = runner.invoke(cli, [*base, "view", "week"])
+        result = runner.invoke(cli, [*base, "task", "complete", "t1"])
+        details = runner.invoke(cli, [*base, "view", "task", "t1"])
+
+        assert "Tasks Due This Week (8)" in week.output
+        assert result.exit_code == 0
+        assert "Task completed: Flashcards" in result.output
+        assert "Next due:" in result.output and "tomorrow" in result.output
+        assert "Repeats: every day" in details.output
+        assert "Pending" in details.output
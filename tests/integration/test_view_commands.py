@@ -192,6 +192,21 @@ class TestViewCommands:
         assert result.exit_code == 0
         assert task_id in result.output or "Analyze data" in result.output
 
+    def test_view_note_shows_related_notes(self, temp_data_dir: Path) -> None:
+        """Test viewing a note lists notes sharing its words."""
+        runner = CliRunner()
+        base = ["--data-dir", str(temp_data_dir)]
+        runner.invoke(cli, [*base, "add", "note", "Photosynthesis light reactions"])
+        runner.invoke(cli, [*base, "add", "note", "Light reactions need chlorophyll"])
+        runner.invoke(cli, [*base, "add", "note", "Treaty of Versailles"])
+
+        result = runner.invoke(cli, [*base, "view", "note", "n1"])
+
+        assert result.exit_code == 0
+        assert "Related Notes (1)" in result.output
+        assert "n2: Light reactions need chlorophyll" in result.output
+        assert "Versailles" not in result.output
+
     def test_view_notes_filtered_by_course_and_topic(self, temp_data_dir: Path) -> None:
         """Test US4-S3: Viewing notes filtered by course and topic."""
         runner = CliRunner()
@@ -349,3 +364,52 @@ class TestViewCommands:
         # Should show empty course or indicate no items
         assert "Physics" in result.output
 
+
+
+class TestSavedViewCommands:
+    """Integration tests for saved views."""
+
+    def test_save_and_open_view(self, temp_data_dir: Path) -> None:
+        """Test a saved view picks up items added after it was saved."""
+        runner = CliRunner()
+        base = ["--data-dir", str(temp_data_dir)]
+        runner.invoke(cli, [*base, "add", "task", "Lab report", "--priority", "high"])
+
+        result = runner.invoke(cli, [*base, "view", "save", "urgent", "priority:high -completed"])
+        assert result.exit_code == 0
+        assert "Saved view 'urgent' (1 items)" in result.output
+
+        runner.invoke(cli, [*base, "add", "task", "Exam prep", "--priority", "high"])
+        runner.invoke(cli, [*base, "add", "task", "Reading", "--priority", "low"])
+        result = runner.invoke(cli, [*base, "view", "open", "urgent"])
+
+        assert result.exit_code == 0
+        assert "Lab report" in result.output
+        assert "Exam prep" in result.output
+        assert "Reading" not in result.output
+
+    def test_list_and_drop_views(self, temp_data_dir: Path) -> None:
+        """Test listing and deleting saved views."""
+        runner = CliRunner()
+        base = ["--data-dir", str(temp_data_dir)]
+        runner.invoke(cli, [*base, "view", "save", "later", "inbox"])
+
+        result = runner.invoke(cli, [*base, "view", "saved"])
+        assert "later" in result.output
+
+        result = runner.invoke(cli, [*base, "view", "drop", "later"])
+        assert result.exit_code == 0
+        result = runner.invoke(cli, [*base, "view", "open", "later"])
+        assert result.exit_code == 1
+        assert "View not found" in result.output
+
+    def test_save_invalid_query(self, temp_data_dir: Path) -> None:
+        """Test an invalid query is not saved."""
+        runner = CliRunner()
+
+        result = runner.invoke(
+            cli, ["--data-dir", str(temp_data_dir), "view", "save", "bad", "(open"]
+        )
+
+        assert result.exit_code == 1
+        assert "Invalid query" in result.output
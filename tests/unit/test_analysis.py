@@ -0,0 +1,138 @@
+"""Unit tests for text analysis."""
+
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+
+from pkm.services.analysis import Analyzer, default_analyzer, stem
+from pkm.services.note_service import NoteService
+from pkm.services.search_service import SearchService
+
+
+class TestAnalyzer:
+    """Tests for the analyzer steps."""
+
+    def test_fold_keeps_offsets(self) -> None:
+        """Test folding strips case and accents one character at a time."""
+        text = "Schrödinger's Straße, ΣΊΣΥΦΟΣ"
+        folded = Analyzer().normalize(text)
+
+        assert folded == "schrodinger's straße, σισυφοσ"
+        assert len(folded) == len(text)
+        assert Analyzer(["stem"]).normalize("Schrödinger") == "schrödinger"
+
+    @pytest.mark.parametrize(
+        ("word", "expected"),
+        [
+            ("cells", "cell"),
+            ("studies", "study"),
+            ("classes", "class"),
+            ("class", "class"),
+            ("glasses", "glass"),
+            ("virus", "virus"),
+            ("analysis", "analysis"),
+            ("gas", "gas"),
+        ],
+    )
+    def test_stem(self, word: str, expected: str) -> None:
+        """Test plural endings are stripped."""
+        assert stem(word) == expected
+
+    def test_stopwords_keep_positions(self) -> None:
+        """Test stopwords are dropped but still take up a position."""
+        tokens = list(Analyzer().tokens("treaty of versailles"))
+
+        assert tokens == [("treaty", 0), (None, 7), ("versaille", 10)]
+
+    def test_cjk_bigrams(self) -> None:
+        """Test CJK runs become overlapping bigrams next to other words."""
+        analyzer = Analyzer()
+        terms = analyzer.terms("DNA复制与光合作用")
+
+        assert terms == ["dna", "复制", "制与", "与光", "光合", "合作", "作用"]
+        assert analyzer.terms("光") == ["光"]
+        assert Analyzer(["fold"]).terms("光合作用") == ["光合作用"]
+
+    def test_configured_steps(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test PKM_ANALYZER picks the steps, in their fixed order."""
+        monkeypatch.setenv("PKM_ANALYZER", "stem, fold, bogus")
+        assert default_analyzer().steps == ("fold", "stem")
+
+        monkeypatch.setenv("PKM_ANALYZER", "")
+        assert default_analyzer().terms("The Cells") == ["the", "cells"]
+
+        with pytest.raises(ValueError, match="bogus"):
+            Analyzer(["bogus"])
+
+
+class TestAnalyzedSearch:
+    """Tests for searching analyzed text."""
+
+    def test_index_and_query_meet(self, temp_data_dir: Path) -> None:
+        """Test accents, plurals, stopwords and CJK text are searchable."""
+        notes = NoteService(temp_data_dir)
+        notes.create_note("Schrödinger equation")
+        notes.create_note("Treaty of Versailles")
+        notes.create_note("光合作用の研究")
+        search = SearchService(temp_data_dir)
+
+        def found(query: str) -> list[str]:
+            return [n.id for n in search.search(query)[0]]
+
+        assert found("schrodinger") == ["n1"]
+        assert found("SCHRÖDINGER") == ["n1"]
+        assert found("equations") == ["n1"]
+        assert found('"treaty of versailles"') == ["n2"]
+        assert found('"treaty versailles"') == []
+        assert found("作用") == ["n3"]
+        assert found('"光合作用"') == ["n3"]
+
+    def test_substrings_match_unstemmed_words(self, temp_data_dir: Path) -> None:
+        """Test partial words and suffixes are found although their words are stemmed."""
+        NoteService(temp_data_dir).create_note("Case studies in photosynthesis")
+        NoteService(temp_data_dir).create_note("Study guide")
+        search = SearchService(temp_data_dir)
+
+        def found(query: str, regex: bool = False) -> list[str]:
+            return [n.id for n in search.search(query, regex=regex)[0]]
+
+        assert found("studie") == ["n1"]
+        assert found("ies") == ["n1"]
+        assert found("studies") == ["n1", "n2"]  # "study" is another form of it
+        assert found("studie*") == ["n1"]
+        assert found("ies", regex=True) == ["n1"]
+        assert found(r"stud(ies|y)\b", regex=True) == ["n1", "n2"]
+        result = search.search_result("ies")
+        assert result.highlights["n1"] == [(9, 12)]
+
+    def test_queries_analyze_only_highlighted_records(
+        self, temp_data_dir: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test a query reads other records' words from the search index."""
+        notes = NoteService(temp_data_dir)
+        notes.create_note("Cell walls")
+        notes.create_note("Calvin cycle")
+        notes.create_note("Krebs cycle")
+        search = SearchService(temp_data_dir)
+        scanned: list[str] = []
+        scan = Analyzer.scan
+
+        def counting_scan(self: Analyzer, text: str) -> Iterator[tuple[str, str | None, int]]:
+            scanned.append(text)
+            return scan(self, text)
+
+        monkeypatch.setattr(Analyzer, "scan", counting_scan)
+        result = search.search_result("walls")
+
+        assert [n.id for n in result.notes] == ["n1"]
+        assert result.highlights["n1"] == [(5, 10)]
+        assert "calvin cycle" not in scanned and "krebs cycle" not in scanned
+
+    def test_highlights_cover_original_words(self, temp_data_dir: Path) -> None:
+        """Test spans point into the stored text, whole words where stemmed."""
+        NoteService(temp_data_dir).create_note("Schrödinger's cell studies")
+
+        result = SearchService(temp_data_dir).search_result('schrodinger "cells study"')
+
+        assert result.highlights["n1"] == [(0, 11), (14, 26)]
@@ -1,8 +1,20 @@
 """Unit tests for date parsing utilities."""
 
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 
-from pkm.utils.date_parser import format_due_date, parse_due_date
+import pytest
+
+from pkm.models.task import Recurrence
+from pkm.utils import date_parser
+from pkm.utils.date_parser import (
+    DueDateFormatter,
+    format_due_date,
+    parse_due_date,
+    parse_due_dates,
+    parse_recurrence,
+)
+
+THURSDAY = date(2025, 11, 20)
 
 
 class TestDateParser:
@@ -130,3 +142,135 @@ class TestEdgeCases:
         assert result is not None
         assert result.year == 2020
         assert result < datetime.now()
+
+
+class TestFastPath:
+    """Tests for the precompiled grammar, cache and batch API."""
+
+    @pytest.mark.parametrize(
+        ("text", "expected"),
+        [
+            ("today", datetime(2025, 11, 20, 23, 59, 59)),
+            ("tonight at 8pm", datetime(2025, 11, 20, 20, 0)),
+            ("tomorrow at 5pm", datetime(2025, 11, 21, 17, 0)),
+            ("Friday", datetime(2025, 11, 21, 23, 59, 59)),
+            ("thursday", datetime(2025, 11, 20, 23, 59, 59)),
+            ("next thu", datetime(2025, 11, 27, 23, 59, 59)),
+            ("Friday 11:59pm", datetime(2025, 11, 21, 23, 59)),
+            ("in 1 day", datetime(2025, 11, 21, 23, 59, 59)),
+            ("in 2 months", datetime(2026, 1, 20, 23, 59, 59)),
+            ("2025-12-01", datetime(2025, 12, 1, 23, 59, 59)),
+            ("2025-12-01 17:30", datetime(2025, 12, 1, 17, 30)),
+            ("Dec 1", datetime(2025, 12, 1, 23, 59, 59)),
+            ("december 3rd, 2026", datetime(2026, 12, 3, 23, 59, 59)),
+            ("12am", datetime(2025, 11, 20, 0, 0)),
+        ],
+    )
+    def test_common_forms(self, text: str, expected: datetime) -> None:
+        """Test common forms are parsed by the grammar."""
+        assert date_parser._parse_fast(text.lower(), THURSDAY) == expected
+        assert parse_due_date(text, THURSDAY) == expected
+
+    @pytest.mark.parametrize(
+        "text", ["friday", "next thursday", "in 3 weeks", "2024-02-29", "sept 3", "5pm"]
+    )
+    def test_grammar_agrees_with_dateutil(self, text: str) -> None:
+        """Test the grammar gives what fuzzy parsing gives for the same form."""
+        assert date_parser._parse_fast(text, THURSDAY) == date_parser._parse_fallback(
+            text, THURSDAY
+        )
+
+    def test_other_forms_fall_back(self) -> None:
+        """Test forms outside the grammar and invalid dates fall back to dateutil."""
+        assert date_parser._parse_fast("1st dec", THURSDAY) is None
+        assert parse_due_date("1st dec", THURSDAY) == datetime(2025, 12, 1, 23, 59, 59)
+        assert parse_due_date("next friday afternoon", THURSDAY) == datetime(
+            2025, 11, 21, 23, 59, 59
+        )
+        assert parse_due_date("2025-02-30", THURSDAY) is None
+
+    def test_cache_is_keyed_by_day(self) -> None:
+        """Test cached results are reused only for the same day."""
+        date_parser._parse.cache_clear()
+        parse_due_date("Tomorrow", THURSDAY)
+        parse_due_date("  tomorrow ", THURSDAY)
+        later = parse_due_date("tomorrow", THURSDAY + timedelta(days=1))
+
+        assert date_parser._parse.cache_info().hits == 1
+        assert later == datetime(2025, 11, 22, 23, 59, 59)
+
+    def test_parse_due_dates(self) -> None:
+        """Test batch parsing keeps order and returns None for blanks."""
+        result = parse_due_dates(["friday", "", "2025-12-01", "friday"], THURSDAY)
+
+        assert result == [
+            datetime(2025, 11, 21, 23, 59, 59),
+            None,
+            datetime(2025, 12, 1, 23, 59, 59),
+            datetime(2025, 11, 21, 23, 59, 59),
+        ]
+
+
+class TestRecurrenceParser:
+    """Tests for parsing repeat rules."""
+
+    @pytest.mark.parametrize(
+        ("text", "expected"),
+        [
+            ("daily", Recurrence(unit="day")),
+            ("Weekly", Recurrence()),
+            ("biweekly", Recurrence(every=2)),
+            ("every 3 days", Recurrence(unit="day", every=3)),
+            ("every 2 weeks on mon, wed", Recurrence(every=2, weekdays=[0, 2])),
+            ("every tue and thursday", Recurrence(weekdays=[1, 3])),
+            ("every mondays", Recurrence(weekdays=[0])),
+            ("every weekday", Recurrence(weekdays=[0, 1, 2, 3, 4])),
+        ],
+    )
+    def test_rules(self, text: str, expected: Recurrence) -> None:
+        """Test supported rules."""
+        assert parse_recurrence(text) == expected
+
+    @pytest.mark.parametrize("text", ["every", "tomorrow", "every 0 days", "every 2 days on mon"])
+    def test_invalid_rules(self, text: str) -> None:
+        """Test rules that are not understood."""
+        assert parse_recurrence(text) is None
+
+    def test_until(self) -> None:
+        """Test the end date is kept."""
+        rule = parse_recurrence("every fri", until=date(2025, 12, 12))
+        assert rule is not None and rule.until == date(2025, 12, 12)
+
+
+class TestDueDateFormatter:
+    """Tests for formatting many due dates in one render."""
+
+    def test_relative_to_captured_now(self) -> None:
+        """Test relative days count from the moment the formatter was made."""
+        format_due = DueDateFormatter(datetime(2025, 11, 23, 9, 0))
+
+        assert format_due(datetime(2025, 11, 25, 23, 59)) == "Tuesday, Nov 25 at 11:59 PM (2 days)"
+        assert format_due(datetime(2025, 11, 23, 9, 5)) == "Sunday, Nov 23 at 9:05 AM (today)"
+        assert (
+            format_due(datetime(2025, 11, 22, 17, 0)) == "Saturday, Nov 22 at 5:00 PM (yesterday)"
+        )
+        assert (
+            format_due(datetime(2025, 11, 20, 8, 0)) == "Thursday, Nov 20 at 8:00 AM (3 days ago)"
+        )
+
+    def test_matches_format_due_date(self) -> None:
+        """Test the formatter gives what format_due_date gives."""
+        format_due = DueDateFormatter()
+        now = datetime.now().replace(second=0, microsecond=0)
+        for dt in [now, now + timedelta(days=1, hours=3), now - timedelta(days=9)]:
+            assert format_due(dt) == format_due_date(dt)
+
+    def test_formats_each_day_and_time_once(self) -> None:
+        """Test repeated days and times are formatted once."""
+        format_due = DueDateFormatter(datetime(2025, 11, 23, 9, 0))
+        for hour in [9, 17, 9, 17]:
+            for day in [24, 25, 24]:
+                format_due(datetime(2025, 11, day, hour, 0))
+
+        assert len(format_due._days) == 2
+        assert len(format_due._times) == 2
@@ -0,0 +1,41 @@
+"""Unit tests for CLI display helpers."""
+
+from pkm.cli.helpers import snippet
+
+
+class TestSnippet:
+    """Tests for search result snippets."""
+
+    def test_window_around_match(self) -> None:
+        """Test a match deep inside long text is shown with context."""
+        text = "x" * 500 + " Calvin cycle " + "y" * 500
+
+        result = snippet(text, [(501, 513)], width=40)
+
+        assert result.startswith("...")
+        assert result.endswith("...")
+        assert "[bold yellow]Calvin cycle[/bold yellow]" in result
+
+    def test_window_with_most_matches(self) -> None:
+        """Test the window covering the most matches is chosen."""
+        text = "cell " + "z" * 100 + " cell cell cell"
+        spans = [(0, 4), (106, 110), (111, 115), (116, 120)]
+
+        result = snippet(text, spans, width=30)
+
+        assert result.count("[bold yellow]cell[/bold yellow]") == 3
+
+    def test_no_matches_and_markup_escaped(self) -> None:
+        """Test text without matches is truncated and markup is escaped."""
+        assert snippet("see [bold] notes\nhere", []) == "see \\[bold] notes here"
+        assert snippet("a" * 100, [], width=10) == "aaaaaaa..."
+
+    def test_window_skips_span_too_long_to_fit(self) -> None:
+        """Test the window is placed among overlapping and oversized matches."""
+        text = "a" * 50 + " photo photon photosynthesis"
+        spans = [(0, 50), (51, 56), (57, 62), (57, 63), (64, 69)]
+
+        result = snippet(text, spans, width=30)
+
+        assert result.startswith("...")
+        assert "[bold yellow]photo[/bold yellow]synth" in result
@@ -0,0 +1,134 @@
+"""Unit tests for the task <-> note link index."""
+
+from pkm.services.link_index import LinkIndex, LinkIssue
+from pkm.storage.schema import DataSchema
+
+
+def make_data(
+    note_links: dict[str, list[str]], task_links: dict[str, list[str]]
+) -> DataSchema:
+    """Build minimal raw data with the given link lists."""
+    return {
+        "notes": [{"id": nid, "linked_from_tasks": tids} for nid, tids in note_links.items()],
+        "tasks": [{"id": tid, "linked_notes": nids} for tid, nids in task_links.items()],
+        "courses": [],
+    }
+
+
+class TestLinkIndex:
+    """Tests for LinkIndex."""
+
+    def test_link_updates_both_sides(self) -> None:
+        """Test linking records the reference on task and note."""
+        data = make_data({"n1": []}, {"t1": []})
+        index = LinkIndex(data)
+
+        assert index.link("t1", "n1")
+        assert index.link("t1", "n1")  # idempotent
+
+        assert data["tasks"][0]["linked_notes"] == ["n1"]
+        assert data["notes"][0]["linked_from_tasks"] == ["t1"]
+        assert index.check() == []
+
+    def test_link_missing_endpoint(self) -> None:
+        """Test linking to a missing note or task is refused."""
+        data = make_data({"n1": []}, {"t1": []})
+        index = LinkIndex(data)
+
+        assert not index.link("t1", "n9")
+        assert not index.link("t9", "n1")
+        assert data["tasks"][0]["linked_notes"] == []
+
+    def test_unlink_updates_both_sides(self) -> None:
+        """Test unlinking removes the reference on both sides."""
+        data = make_data({"n1": ["t1"]}, {"t1": ["n1"]})
+        index = LinkIndex(data)
+
+        assert index.unlink("t1", "n1")
+        assert data["tasks"][0]["linked_notes"] == []
+        assert data["notes"][0]["linked_from_tasks"] == []
+
+    def test_remove_note_cascades(self) -> None:
+        """Test deleting a note strips it from linking tasks."""
+        data = make_data(
+            {"n1": ["t1", "t2"], "n2": ["t1"]},
+            {"t1": ["n1", "n2"], "t2": ["n1"]},
+        )
+        index = LinkIndex(data)
+
+        assert index.remove_note("n1")
+        assert not index.remove_note("n1")
+        assert [n["id"] for n in data["notes"]] == ["n2"]
+        assert data["tasks"][0]["linked_notes"] == ["n2"]
+        assert data["tasks"][1]["linked_notes"] == []
+        # Positions of later records are kept in sync
+        assert index.note_record("n2") is data["notes"][0]
+
+    def test_remove_task_cascades(self) -> None:
+        """Test deleting a task strips it from linked notes."""
+        data = make_data({"n1": ["t1", "t2"]}, {"t1": ["n1"], "t2": ["n1"]})
+        index = LinkIndex(data)
+
+        assert index.remove_task("t1")
+        assert [t["id"] for t in data["tasks"]] == ["t2"]
+        assert data["notes"][0]["linked_from_tasks"] == ["t2"]
+        assert index.task_record("t2") is data["tasks"][0]
+
+    def test_check_reports_every_issue_kind(self) -> None:
+        """Test check finds dangling, one-sided and duplicate links."""
+        data = make_data(
+            {"n1": ["t9"], "n2": ["t1"]},
+            {"t1": ["n1", "n1", "n8"]},
+        )
+
+        issues = LinkIndex(data).check()
+
+        assert set(issues) == {
+            LinkIssue("duplicate", "t1", "n1"),
+            LinkIssue("dangling_note", "t1", "n8"),
+            LinkIssue("missing_forward_link", "t1", "n2"),
+            LinkIssue("dangling_task", "t9", "n1"),
+            LinkIssue("missing_backlink", "t1", "n1"),
+        }
+
+    def test_repair_makes_links_consistent(self) -> None:
+        """Test repair rewrites records so check passes."""
+        data = make_data(
+            {"n1": ["t9"], "n2": ["t1"]},
+            {"t1": ["n1", "n1", "n8"]},
+        )
+
+        repaired = LinkIndex(data).repair()
+
+        assert len(repaired) == 5
+        assert data["tasks"][0]["linked_notes"] == ["n1", "n2"]
+        assert data["notes"][0]["linked_from_tasks"] == ["t1"]
+        assert data["notes"][1]["linked_from_tasks"] == ["t1"]
+        assert LinkIndex(data).check() == []
+
+    def test_mutations_do_not_walk_every_link(self) -> None:
+        """Test linking and cascade deletes leave the adjacency maps unbuilt."""
+        data = make_data({"n1": ["t1"], "n2": [], "n3": []}, {"t1": ["n1"], "t2": []})
+        index = LinkIndex(data)
+
+        assert index.link("t2", "n2")
+        assert index.unlink("t1", "n1")
+        assert index.remove_note("n2")
+        assert index.remove_task("t1")
+
+        assert index._task_notes is None and index._note_tasks is None
+        assert data["tasks"] == [{"id": "t2", "linked_notes": []}]
+        assert index.note_record("n3") is data["notes"][1]
+
+    def test_built_maps_follow_mutations(self) -> None:
+        """Test mutations after a check keep the adjacency maps in sync."""
+        data = make_data({"n1": ["t1"], "n2": []}, {"t1": ["n1"], "t2": []})
+        index = LinkIndex(data)
+        assert index.check() == []
+
+        index.link("t2", "n2")
+        index.unlink("t1", "n1")
+        index.remove_note("n2")
+
+        assert index.check() == []
+        assert index.task_notes == {"t1": {}, "t2": {}}
@@ -1,6 +1,6 @@
 """Unit tests for Pydantic models."""
 
-from datetime import datetime
+from datetime import date, datetime
 
 import pytest
 from pydantic import ValidationError
@@ -8,7 +8,7 @@ from pydantic import ValidationError
 from pkm.models.common import generate_id
 from pkm.models.course import Course
 from pkm.models.note import Note
-from pkm.models.task import Subtask, Task
+from pkm.models.task import Recurrence, Subtask, Task
 
 
 class TestIDGeneration:
@@ -232,6 +232,64 @@ class TestTaskModel:
             )
 
 
+class TestRecurrence:
+    """Tests for recurrence rules."""
+
+    # Friday, Nov 21 2025 at 5 PM
+    FRIDAY = datetime(2025, 11, 21, 17, 0)
+
+    def test_following_every_n_units(self) -> None:
+        """Test daily and weekly rules step by their interval."""
+        assert Recurrence(unit="day", every=3).following(self.FRIDAY) == datetime(
+            2025, 11, 24, 17, 0
+        )
+        assert Recurrence(every=2).following(self.FRIDAY) == datetime(2025, 12, 5, 17, 0)
+
+    def test_following_weekdays(self) -> None:
+        """Test weekday rules visit each listed day, skipping off weeks."""
+        rule = Recurrence(every=2, weekdays=[0, 4])
+        monday = rule.following(self.FRIDAY)
+        assert monday == datetime(2025, 12, 1, 17, 0)
+        assert rule.following(monday) == datetime(2025, 12, 5, 17, 0)
+
+    def test_first_moves_to_listed_weekday(self) -> None:
+        """Test a due date off the listed weekdays moves to the next one."""
+        rule = Recurrence(weekdays=[1, 3])
+        assert rule.first(self.FRIDAY) == datetime(2025, 11, 25, 17, 0)
+        assert rule.first(datetime(2025, 11, 25, 9, 0)) == datetime(2025, 11, 25, 9, 0)
+
+    def test_until_ends_the_rule(self) -> None:
+        """Test no occurrence falls after the until date."""
+        rule = Recurrence(unit="day", until=date(2025, 11, 23))
+        dues = list(rule.occurrences(self.FRIDAY, self.FRIDAY))
+
+        assert [due.day for due in dues] == [21, 22, 23]
+        assert rule.following(dues[-1]) is None
+
+    def test_occurrences_skip_to_start(self) -> None:
+        """Test occurrences start at the window even years later."""
+        rule = Recurrence(weekdays=[0, 4])
+        dues = rule.occurrences(self.FRIDAY, datetime(2030, 1, 1))
+
+        assert next(dues) == datetime(2030, 1, 4, 17, 0)
+        assert next(dues) == datetime(2030, 1, 7, 17, 0)
+
+    def test_describe(self) -> None:
+        """Test rules describe themselves."""
+        assert Recurrence(unit="day").describe() == "every day"
+        rule = Recurrence(every=2, weekdays=[2, 0, 2], until=date(2025, 12, 12))
+        assert rule.describe() == "every 2 weeks on Mon, Wed until 2025-12-12"
+
+    def test_invalid_rules(self) -> None:
+        """Test invalid rules and recurring tasks without due date are rejected."""
+        with pytest.raises(ValidationError):
+            Recurrence(unit="day", weekdays=[0])
+        with pytest.raises(ValidationError):
+            Recurrence(weekdays=[7])
+        with pytest.raises(ValidationError):
+            Task(id="t1", title="Lab", created_at=self.FRIDAY, recurrence=Recurrence())
+
+
 class TestCourseModel:
     """Tests for Course model."""
 
@@ -0,0 +1,145 @@
+"""Unit tests for near-duplicate detection."""
+
+import random
+from pathlib import Path
+
+from pkm.services.near_duplicates import (
+    DuplicateIndex,
+    ensure_signatures,
+    jaccard,
+    shingles,
+    signature,
+)
+from pkm.services.note_service import NoteService
+from pkm.services.task_service import TaskService
+from pkm.storage.json_store import JSONStore
+
+MITOCHONDRIA = "The mitochondria is the powerhouse of the cell"
+
+
+def load(data_dir: Path) -> dict:
+    """Load the data file."""
+    return JSONStore(data_dir / "data.json").load()  # type: ignore[return-value]
+
+
+class TestSignatures:
+    """Tests for shingles and MinHash signatures."""
+
+    def test_shingles_ignore_case_and_punctuation(self) -> None:
+        """Test only the words count, not their case or separators."""
+        assert shingles("Cell  cycle!") == shingles("cell cycle")
+        assert shingles("DNA") == {"dna"}
+        assert shingles("...") == set()
+
+    def test_close_texts_share_bands(self) -> None:
+        """Test a small edit keeps most of the signature."""
+        edited = MITOCHONDRIA.replace("the cell", "a cell")
+        first, second = signature(MITOCHONDRIA), signature(edited)
+
+        assert len(first) == 64
+        assert signature(MITOCHONDRIA.upper()) == first
+        assert jaccard(shingles(MITOCHONDRIA), shingles(edited)) > 0.7
+        assert sum(a == b for a, b in zip(first[::8], second[::8])) > 0
+        assert signature("") == ""
+
+    def test_candidates_match_exhaustive_comparison(self) -> None:
+        """Test clusters from the band tables equal those from every pair."""
+        rng = random.Random(7)
+        vocabulary = [f"word{i}" for i in range(300)]
+        notes = []
+        for _ in range(40):
+            base = rng.sample(vocabulary, 20)
+            notes.append(" ".join(base))
+            for _ in range(rng.randint(0, 2)):
+                copy = list(base)
+                copy[rng.randrange(20)] = rng.choice(vocabulary)
+                notes.append(" ".join(copy))
+        data = {
+            "notes": [{"id": f"n{i}", "content": c} for i, c in enumerate(notes, 1)],
+            "tasks": [],
+            "courses": [],
+        }
+
+        index = DuplicateIndex(data)  # type: ignore[arg-type]
+        pairs = {
+            (a["id"], b["id"])
+            for i, a in enumerate(data["notes"])
+            for b in data["notes"][i + 1 :]
+            if jaccard(shingles(a["content"]), shingles(b["content"])) >= 0.7
+        }
+        clustered = {(a, b) for c in index.clusters() for i, a in enumerate(c) for b in c[i + 1 :]}
+
+        assert pairs
+        assert clustered == pairs
+
+
+class TestNoteDuplicates:
+    """Tests for near-duplicate checks in the note service."""
+
+    def test_signatures_follow_mutations(self, temp_data_dir: Path) -> None:
+        """Test edits and deletes keep the stored signatures exact."""
+        notes = NoteService(temp_data_dir)
+        notes.create_note(MITOCHONDRIA)
+        notes.create_note("Photosynthesis converts light into chemical energy")
+        notes.find_near_duplicates("anything")  # signs existing notes
+        notes.create_note("Treaty of Versailles")
+        notes.update_note("n1", "Ribosomes build proteins")
+        notes.delete_note("n2")
+
+        data = load(temp_data_dir)
+        stored = dict(data["note_signatures"])
+
+        assert not ensure_signatures(data)
+        assert stored == {
+            "n1": signature("Ribosomes build proteins"),
+            "n3": signature("Treaty of Versailles"),
+        }
+
+    def test_captured_notes_are_signed_on_use(self, temp_data_dir: Path) -> None:
+        """Test notes drained from the spool are found too."""
+        notes = NoteService(temp_data_dir)
+        notes.create_note("Ribosomes build proteins")
+        notes.find_near_duplicates("anything")
+        notes.capture_note(MITOCHONDRIA)
+
+        found = notes.find_near_duplicates(MITOCHONDRIA.replace("the cell", "a cell"))
+
+        assert [(n.id, round(s, 2)) for n, s in found] == [("n2", 0.76)]
+
+    def test_create_merges_into_duplicate(self, temp_data_dir: Path) -> None:
+        """Test merging adds the course and topics to the existing note."""
+        notes = NoteService(temp_data_dir)
+        notes.create_note(MITOCHONDRIA, topics=["cells"])
+
+        merged = notes.create_note(
+            MITOCHONDRIA + ".", course="Biology", topics=["energy"], merge_duplicates=True
+        )
+        created = notes.create_note("Ribosomes build proteins", merge_duplicates=True)
+
+        assert merged.id == "n1"
+        assert merged.content == MITOCHONDRIA
+        assert merged.course == "Biology"
+        assert merged.topics == ["cells", "energy"]
+        assert created.id == "n2"
+        assert [n.id for n in notes.list_notes()] == ["n1", "n2"]
+
+    def test_merge_clusters(self, temp_data_dir: Path) -> None:
+        """Test merged clusters keep the oldest note with everyone's links."""
+        notes = NoteService(temp_data_dir)
+        tasks = TaskService(temp_data_dir)
+        notes.create_note(MITOCHONDRIA)
+        notes.create_note("Ribosomes build proteins")
+        notes.create_note(MITOCHONDRIA.lower(), course="Biology", topics=["cells"])
+        tasks.create_task("Review cells")
+        tasks.link_note("t1", "n3")
+
+        clusters = notes.duplicate_clusters()
+        merged = notes.merge_notes([[n.id for n in c] for c in clusters])
+
+        assert [[n.id for n in c] for c in clusters] == [["n1", "n3"]]
+        assert [(n.id, n.course, n.topics, n.linked_from_tasks) for n in merged] == [
+            ("n1", "Biology", ["cells"], ["t1"])
+        ]
+        assert [n.id for n in notes.list_notes()] == ["n1", "n2"]
+        assert tasks.get_task("t1").linked_notes == ["n1"]  # type: ignore[union-attr]
+        assert notes.duplicate_clusters() == []
@@ -0,0 +1,258 @@
+"""Unit tests for the query language and planner."""
+
+import json
+from datetime import date
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from pkm.services.query import (
+    And,
+    Due,
+    Field,
+    Flag,
+    Not,
+    Or,
+    Phrase,
+    Prefix,
+    QuerySyntaxError,
+    Regex,
+    Text,
+    parse_query,
+)
+from pkm.services.query_service import Planner, QueryService
+
+TODAY = date(2025, 11, 20)
+
+
+def write_data(data_dir: Path) -> None:
+    """Write notes and tasks across two courses (one merged into the other)."""
+    note = {"created_at": "2025-11-01T10:00:00", "modified_at": "2025-11-01T10:00:00"}
+    task = {"created_at": "2025-11-01T10:00:00", "priority": "medium", "completed": False}
+    data = {
+        "_schema_version": 2,
+        "courses": [
+            {"id": "c1", "name": "Bio 101"},
+            {"id": "c2", "name": "Bio", "merged_into": "c1"},
+            {"id": "c3", "name": "History"},
+        ],
+        "notes": [
+            {**note, "id": "n1", "content": "The Calvin cycle", "course_id": "c1",
+             "topics": ["cells"]},
+            {**note, "id": "n2", "content": "Cell walls", "course_id": "c2", "topics": ["cells"]},
+            {**note, "id": "n3", "content": "Calvin and Hobbes", "topics": []},
+            {**note, "id": "n4", "content": "Treaty of Versailles", "course_id": "c3",
+             "topics": ["wars"]},
+        ],
+        "tasks": [
+            {**task, "id": "t1", "title": "Calvin cycle quiz", "course_id": "c1",
+             "due_date": "2025-11-22T09:00:00", "priority": "high"},
+            {**task, "id": "t2", "title": "Lab report", "course_id": "c1",
+             "due_date": "2025-11-18T09:00:00", "priority": "high"},
+            {**task, "id": "t3", "title": "Essay", "course_id": "c3",
+             "due_date": "2025-11-30T09:00:00", "completed": True},
+            {**task, "id": "t4", "title": "Buy cells for calculator"},
+        ],
+    }
+    (data_dir / "data.json").write_text(json.dumps(data))
+
+
+def ids(data_dir: Path, query: str) -> list[str]:
+    """Run a query and list the IDs found, notes first."""
+    result = QueryService(data_dir).execute(query, TODAY)
+    return [n.id for n in result.notes] + [t.id for t in result.tasks]
+
+
+class TestParseQuery:
+    """Tests for parsing queries into an AST."""
+
+    def test_example_query(self) -> None:
+        """Test the terms of a typical query."""
+        node = parse_query(
+            'course:"Bio 101" topic:cells due<7d -completed priority:high "calvin cycle"', TODAY
+        )
+
+        assert node == And((
+            Field("course", "Bio 101"),
+            Field("topic", "cells"),
+            Due("<", date(2025, 11, 27)),
+            Not(Flag("completed")),
+            Field("priority", "high"),
+            Phrase("calvin cycle"),
+        ))
+
+    def test_or_and_grouping(self) -> None:
+        """Test OR binds looser than juxtaposition and parentheses group."""
+        node = parse_query("a b OR -(c OR d)", TODAY)
+
+        assert node == Or((And((Text("a"), Text("b"))), Not(Or((Text("c"), Text("d"))))))
+        assert str(node) == "(a b) OR -(c OR d)"
+
+    @pytest.mark.parametrize(
+        ("term", "expected"),
+        [
+            ("due:today", Due("=", TODAY)),
+            ("due>=tomorrow", Due(">=", date(2025, 11, 21))),
+            ("due<-1w", Due("<", date(2025, 11, 13))),
+            ("due<=2025-12-01", Due("<=", date(2025, 12, 1))),
+        ],
+    )
+    def test_due_dates(self, term: str, expected: Due) -> None:
+        """Test relative and absolute due dates."""
+        assert parse_query(term, TODAY) == expected
+
+    def test_quoted_keywords_are_text(self) -> None:
+        """Test quoting a keyword searches for it as text."""
+        assert parse_query('"completed" "OR"', TODAY) == And((Phrase("completed"), Phrase("or")))
+
+    def test_prefix(self) -> None:
+        """Test a trailing ``*`` on a word makes a prefix term."""
+        assert parse_query("Photo* c++*", TODAY) == And((Prefix("photo"), Text("c++*")))
+
+    @pytest.mark.parametrize(
+        "query",
+        ["", "(a", "a)", '"open', "colour:red", "priority:urgent", "due<someday", "course<x"],
+    )
+    def test_syntax_errors(self, query: str) -> None:
+        """Test malformed queries are rejected."""
+        with pytest.raises(QuerySyntaxError):
+            parse_query(query, TODAY)
+
+
+class TestQueryService:
+    """Tests for planning and running queries."""
+
+    def test_example_query(self, temp_data_dir: Path) -> None:
+        """Test a query combining every kind of term."""
+        write_data(temp_data_dir)
+
+        found = ids(
+            temp_data_dir,
+            'course:"Bio 101" due<7d -completed priority:high "calvin cycle"',
+        )
+
+        assert found == ["t1"]
+
+    @pytest.mark.parametrize(
+        ("query", "expected"),
+        [
+            ("calvin", ["n1", "n3", "t1"]),
+            ("cell", ["n1", "n2", "t4"]),  # substring of words and topics
+            ('"calvin cycle"', ["n1", "t1"]),
+            ('"cycle quiz"', ["t1"]),
+            ('"cell"', ["n1", "n2", "t4"]),  # plurals are stemmed
+            ('"cel"', []),  # whole words only
+            ('"cycle calvin"', []),  # words in order
+            ('"cycle bio"', []),  # never across fields
+            ("calc*", ["t4"]),
+            ("cal* -calvin", ["t4"]),
+            ("course:Bio", []),  # merged names no longer resolve
+            ('course:"Bio 101"', ["n1", "n2", "t1", "t2"]),  # includes merged course
+            ("topic:cells -calvin", ["n2"]),
+            ("inbox", ["n3", "t4"]),
+            ("overdue", ["t2"]),
+            ("completed", ["t3"]),
+            ("open type:task", ["t1", "t2", "t4"]),
+            ("due>=today", ["t1", "t3"]),
+            ("due:2025-11-18", ["t2"]),
+            ("-type:note -completed", ["t1", "t2", "t4"]),
+            ("versailles OR essay", ["n4", "t3"]),
+            ("(calvin OR treaty) type:note", ["n1", "n3", "n4"]),
+            ('""', ["n1", "n2", "n3", "n4", "t1", "t2", "t3", "t4"]),
+        ],
+    )
+    def test_results(self, temp_data_dir: Path, query: str, expected: list[str]) -> None:
+        """Test results of single terms and their combinations."""
+        write_data(temp_data_dir)
+
+        assert ids(temp_data_dir, query) == expected
+
+    def test_plan_drives_from_most_selective_index(self, temp_data_dir: Path) -> None:
+        """Test the smallest posting list drives and the rest intersect or filter."""
+        write_data(temp_data_dir)
+
+        result = QueryService(temp_data_dir).execute(
+            'course:"Bio 101" overdue -completed', TODAY
+        )
+
+        assert [(s.action, s.term, s.remaining) for s in result.steps] == [
+            ("index", "overdue", 1),
+            ("filter", 'course:"Bio 101"', 1),
+            ("filter", "-completed", 1),
+        ]
+        assert result.examined == 2
+        assert result.total == 8
+
+    def test_plan_stops_when_empty(self, temp_data_dir: Path) -> None:
+        """Test no further terms run once no candidates are left."""
+        write_data(temp_data_dir)
+
+        result = QueryService(temp_data_dir).execute("zebra calvin -completed", TODAY)
+
+        assert [s.action for s in result.steps] == ["index", "stop"]
+        assert result.examined == 0
+
+
+class TestHighlights:
+    """Tests for match positions returned with query results."""
+
+    def test_word_and_phrase_positions(self, temp_data_dir: Path) -> None:
+        """Test spans point at the matches in the content or title."""
+        write_data(temp_data_dir)
+
+        result = QueryService(temp_data_dir).execute('"calvin cycle" OR calvin', TODAY)
+
+        assert result.highlights["n1"] == [(4, 10), (4, 16)]
+        assert result.highlights["n3"] == [(0, 6)]
+        assert result.highlights["t1"] == [(0, 6), (0, 12)]
+
+    def test_negated_and_topic_matches_not_highlighted(self, temp_data_dir: Path) -> None:
+        """Test only positive matches in the main text are located."""
+        write_data(temp_data_dir)
+
+        result = QueryService(temp_data_dir).execute("wars OR cells -calvin", TODAY)
+
+        assert [n.id for n in result.notes] == ["n2", "n4"]  # n4 through its topic
+        assert "n4" not in result.highlights
+        assert result.highlights["n2"] == [(0, 4)]
+        assert result.highlights["t4"] == [(4, 9)]
+
+    def test_prefix_positions(self, temp_data_dir: Path) -> None:
+        """Test prefix spans cover each whole word found."""
+        write_data(temp_data_dir)
+
+        result = QueryService(temp_data_dir).execute("ca*", TODAY)
+
+        assert result.highlights["n3"] == [(0, 6)]
+        assert result.highlights["t4"] == [(14, 24)]
+
+    def test_regex_positions(self, temp_data_dir: Path) -> None:
+        """Test regex matches are located too."""
+        write_data(temp_data_dir)
+
+        result = QueryService(temp_data_dir).execute(And((Regex(r"ca\w+"), Text("buy"))), TODAY)
+
+        assert result.highlights["t4"] == [(0, 3), (14, 24)]
+
+    def test_only_looked_up_records_are_located(
+        self, temp_data_dir: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test spans are located when a record's highlights are first read."""
+        write_data(temp_data_dir)
+        located: list[str] = []
+        highlight = Planner.highlight
+
+        def counting_highlight(self: Planner, *args: Any) -> list[tuple[int, int]]:
+            located.append(args[1])
+            return highlight(self, *args)
+
+        monkeypatch.setattr(Planner, "highlight", counting_highlight)
+        result = QueryService(temp_data_dir).execute("calvin", TODAY)
+
+        assert located == []
+        assert result.highlights.get("n3") == [(0, 6)]
+        assert result.highlights.get("n3") == [(0, 6)]
+        assert located == ["n3"]
+        assert "n2" not in result.highlights and located == ["n3"]
+        assert dict(result.highlights) == {"n1": [(4, 10)], "n3": [(0, 6)], "t1": [(0, 6)]}
@@ -0,0 +1,198 @@
+"""Unit tests for record checksums and damaged file recovery."""
+
+import json
+from pathlib import Path
+
+from pkm.storage.checksum import CHECKSUM_KEY, checksum_ok, record_checksum, stamp_checksum
+from pkm.storage.json_store import JSONStore
+from pkm.storage.recovery import recover_data, salvage_file
+from pkm.storage.schema import create_empty_schema
+
+
+def make_data(note_count: int, task_count: int = 0) -> dict:
+    """Build current-schema data with numbered notes and tasks."""
+    data = create_empty_schema()
+    data["courses"].append({"id": "c1", "name": "Bio"})
+    data["notes"] = [
+        {"id": f"n{i}", "content": f"note {i}", "course_id": "c1", "topics": []}
+        for i in range(note_count)
+    ]
+    data["tasks"] = [
+        {"id": f"t{i}", "title": f"task {i}", "course_id": None, "subtasks": []}
+        for i in range(task_count)
+    ]
+    return data
+
+
+def saved_text(store: JSONStore, data: dict) -> str:
+    """Save data through the store and return the file text."""
+    store.save(data)
+    return store.data_file.read_text()
+
+
+class TestChecksums:
+    """Tests for per-record checksums."""
+
+    def test_stamp_and_verify(self) -> None:
+        """Test a stamped record verifies until its content changes."""
+        record = stamp_checksum({"id": "n1", "content": "hello"})
+
+        assert checksum_ok(record)
+        record["content"] = "hellp"
+        assert not checksum_ok(record)
+
+    def test_checksum_ignores_itself(self) -> None:
+        """Test re-stamping a record does not change its checksum."""
+        record = stamp_checksum({"id": "n1"})
+        assert record_checksum(record) == record[CHECKSUM_KEY]
+
+    def test_legacy_records_accepted(self) -> None:
+        """Test records written before checksums existed are accepted."""
+        assert checksum_ok({"id": "n1"})
+
+    def test_save_stamps_records(self, temp_data_dir: Path) -> None:
+        """Test every saved note and task carries a valid checksum."""
+        store = JSONStore(temp_data_dir / "data.json")
+        saved = json.loads(saved_text(store, make_data(2, 1)))
+
+        for record in saved["notes"] + saved["tasks"]:
+            assert CHECKSUM_KEY in record
+            assert checksum_ok(record)
+
+
+class TestSalvage:
+    """Tests for the salvage scanner."""
+
+    def test_intact_file_is_not_damaged(self, temp_data_dir: Path) -> None:
+        """Test an intact file is read completely and reported clean."""
+        store = JSONStore(temp_data_dir / "data.json")
+        saved_text(store, make_data(3, 2))
+
+        salvage = salvage_file(store.data_file)
+
+        assert not salvage.damaged
+        assert [r["id"] for r in salvage.records["notes"]] == ["n0", "n1", "n2"]
+        assert len(salvage.records["tasks"]) == 2
+        assert salvage.header["courses"] == [{"id": "c1", "name": "Bio"}]
+
+    def test_truncated_file_keeps_complete_records(self, temp_data_dir: Path) -> None:
+        """Test records before the truncation point survive."""
+        store = JSONStore(temp_data_dir / "data.json")
+        text = saved_text(store, make_data(5))
+        store.data_file.write_text(text[: text.index('"note 3"')])
+
+        salvage = salvage_file(store.data_file)
+
+        assert salvage.damaged
+        assert [r["id"] for r in salvage.records["notes"]] == ["n0", "n1", "n2"]
+        assert list(salvage.damaged_ids["notes"]) == ["n3"]
+
+    def test_garbage_mid_file_skips_one_record(self, temp_data_dir: Path) -> None:
+        """Test scanning resumes at the next record after garbage."""
+        store = JSONStore(temp_data_dir / "data.json")
+        text = saved_text(store, make_data(4, 2))
+        store.data_file.write_text(text.replace('"note 1"', '"note \x00\x00 1'))
+
+        salvage = salvage_file(store.data_file)
+
+        assert [r["id"] for r in salvage.records["notes"]] == ["n0", "n2", "n3"]
+        assert [r["id"] for r in salvage.records["tasks"]] == ["t0", "t1"]
+        assert list(salvage.damaged_ids["notes"]) == ["n1"]
+        assert salvage.header["_schema_version"] == 2
+
+    def test_checksum_mismatch_is_damage(self, temp_data_dir: Path) -> None:
+        """Test a record that parses but fails its checksum is rejected."""
+        store = JSONStore(temp_data_dir / "data.json")
+        text = saved_text(store, make_data(3))
+        store.data_file.write_text(text.replace('"note 1"', '"note 7"'))
+
+        salvage = salvage_file(store.data_file)
+
+        assert salvage.damaged
+        assert [r["id"] for r in salvage.records["notes"]] == ["n0", "n2"]
+        assert list(salvage.damaged_ids["notes"]) == ["n1"]
+
+    def test_unreadable_file(self, temp_data_dir: Path) -> None:
+        """Test a file with no structure yields nothing."""
+        path = temp_data_dir / "data.json"
+        path.write_text("INVALID JSON")
+
+        salvage = salvage_file(path)
+
+        assert salvage.damaged
+        assert not salvage.readable
+
+
+class TestRecoverData:
+    """Tests for merging a salvaged file with its backup."""
+
+    def test_backup_fills_gaps(self, temp_data_dir: Path) -> None:
+        """Test damaged and truncated records are restored from the backup."""
+        store = JSONStore(temp_data_dir / "data.json")
+        store.save(make_data(3, 2))
+        text = saved_text(store, make_data(5, 3))
+        damaged = text.replace('"note 1"', '"note 9"')
+        store.data_file.write_text(damaged[: damaged.index('"t1"')])
+
+        data, report = recover_data(store.data_file, store.bak_file)
+
+        assert [n["id"] for n in data["notes"]] == ["n0", "n2", "n3", "n4", "n1"]
+        assert [t["id"] for t in data["tasks"]] == ["t0", "t1"]
+        assert report.salvaged == {"notes": 4, "tasks": 1}
+        assert report.restored == {"notes": ["n1"], "tasks": ["t1"]}
+        assert report.lost == {"notes": [], "tasks": []}
+        assert report.lost_sections == ["courses"]
+        assert data["courses"] == [{"id": "c1", "name": "Bio"}]
+
+    def test_lost_records_reported(self, temp_data_dir: Path) -> None:
+        """Test damaged records missing from the backup are reported lost."""
+        store = JSONStore(temp_data_dir / "data.json")
+        text = saved_text(store, make_data(3))
+        store.data_file.write_text(text.replace('"note 2"', '"note \x00'))
+
+        data, report = recover_data(store.data_file, store.bak_file)
+
+        assert [n["id"] for n in data["notes"]] == ["n0", "n1"]
+        assert report.lost["notes"] == ["n2"]
+        assert not report.backup_used
+
+    def test_unknown_courses_get_placeholders(self, temp_data_dir: Path) -> None:
+        """Test records keep their course when its registry entry is lost."""
+        store = JSONStore(temp_data_dir / "data.json")
+        text = saved_text(store, make_data(2))
+        store.data_file.write_text(text[: text.index('"courses"')])
+
+        data, report = recover_data(store.data_file)
+
+        assert report.unknown_courses == ["c1"]
+        assert data["courses"] == [{"id": "c1", "name": "Recovered course c1"}]
+        assert [n["course_id"] for n in data["notes"]] == ["c1", "c1"]
+
+    def test_deleted_records_stay_deleted(self, temp_data_dir: Path) -> None:
+        """Test records deleted after the backup are not restored from it."""
+        store = JSONStore(temp_data_dir / "data.json")
+        store.save(make_data(5, 3))
+        data = make_data(5, 3)
+        del data["notes"][1]
+        del data["tasks"][0]
+        text = saved_text(store, data)
+        damaged = text.replace('"note 3"', '"note 9"')
+        store.data_file.write_text(damaged[: damaged.index('"t2"')])
+
+        data, report = recover_data(store.data_file, store.bak_file)
+
+        assert [n["id"] for n in data["notes"]] == ["n0", "n2", "n4", "n3"]
+        assert [t["id"] for t in data["tasks"]] == ["t1", "t2"]
+        assert report.restored == {"notes": ["n3"], "tasks": ["t2"]}
+
+    def test_truncated_section_restored_from_backup(self, temp_data_dir: Path) -> None:
+        """Test a section cut off before its first record is refilled."""
+        store = JSONStore(temp_data_dir / "data.json")
+        store.save(make_data(2, 2))
+        text = saved_text(store, make_data(2, 2))
+        store.data_file.write_text(text[: text.index('"tasks"')])
+
+        data, report = recover_data(store.data_file, store.bak_file)
+
+        assert [t["id"] for t in data["tasks"]] == ["t0", "t1"]
+        assert report.restored == {"notes": [], "tasks": ["t0", "t1"]}
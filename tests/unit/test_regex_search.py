@@ -0,0 +1,88 @@
+"""Unit tests for regex search."""
+
+import re
+import time
+from pathlib import Path
+
+import pytest
+
+from pkm.services.note_service import NoteService
+from pkm.services.query import And, Regex, Text
+from pkm.services.query_service import QueryService
+from pkm.services.regex_search import RegexTimeoutError, required_literals, time_limit
+from pkm.services.search_service import SearchService
+
+
+class TestRegexSearch:
+    """Tests for literal extraction, prefiltering and the time limit."""
+
+    @pytest.mark.parametrize(
+        ("pattern", "expected"),
+        [
+            (r"Calvin\s+cycle", ["calvin", "cycle"]),
+            (r"\bphoto(synthesis|n)", ["photo"]),
+            (r"(?:light)+ reaction", ["light", " reaction"]),
+            (r"colou?r", ["colo", "r"]),
+            (r"cell|membrane", []),
+            (r"[abc]+\d{3}", []),
+            (r"^ch\.\s*5$", ["ch.", "5"]),
+        ],
+    )
+    def test_required_literals(self, pattern: str, expected: list[str]) -> None:
+        """Test only fragments every match contains are extracted."""
+        assert required_literals(pattern) == expected
+
+    def test_regex_runs_only_on_prefiltered_records(self, temp_data_dir: Path) -> None:
+        """Test the regex is tested only against records holding the literals."""
+        service = NoteService(temp_data_dir)
+        for i in range(20):
+            service.create_note(f"Unrelated note {i}")
+        service.create_note("The Calvin   cycle")
+        service.create_note("Calvin and the cycle")
+
+        result = QueryService(temp_data_dir).execute(
+            And((Text("calvin"), Text("cycle"), Regex(r"calvin\s+cycle")))
+        )
+
+        assert [n.content for n in result.notes] == ["The Calvin   cycle"]
+        regex_step = result.steps[-1]
+        assert regex_step.action == "filter" and regex_step.term.startswith("/")
+        assert result.steps[-2].remaining == 2  # of 22 records
+
+    def test_search_regex_with_filters(self, temp_data_dir: Path) -> None:
+        """Test regex search combines with the course filter."""
+        service = NoteService(temp_data_dir)
+        service.create_note("Chapter 5 review", course="Bio")
+        service.create_note("Chapter 12 review", course="History")
+
+        search = SearchService(temp_data_dir)
+
+        notes, _ = search.search(r"chapter \d+", course_filter="Bio", regex=True)
+
+        assert [n.content for n in notes] == ["Chapter 5 review"]
+
+    def test_time_limit_stops_runaway_pattern(self) -> None:
+        """Test a catastrophic backtracking pattern is interrupted."""
+        with pytest.raises(RegexTimeoutError), time_limit(0.2):
+            re.search(r"(a+)+$", "a" * 40 + "b")
+
+    def test_execute_respects_time_limit(self, temp_data_dir: Path) -> None:
+        """Test highlighting a runaway pattern stops within the query's time limit."""
+        NoteService(temp_data_dir).create_note("xab " + "a" * 28 + "c")
+
+        started = time.monotonic()
+        result = QueryService(temp_data_dir).execute(And((Regex("(a+)+b"),)), timeout=0.3)
+
+        assert time.monotonic() - started < 1.5
+        assert [n.id for n in result.notes] == ["n1"]
+        assert result.highlights["n1"] == [(1, 3)]
+
+    def test_prefilter_literals_not_highlighted(self, temp_data_dir: Path) -> None:
+        """Test only the regex match is highlighted, not its literals elsewhere."""
+        NoteService(temp_data_dir).create_note(
+            "the moon has a cycle. later: calvin   cycle in stroma"
+        )
+
+        result = SearchService(temp_data_dir).search_result(r"calvin\s+cycle", regex=True)
+
+        assert result.highlights["n1"] == [(29, 43)]
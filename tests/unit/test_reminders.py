@@ -0,0 +1,174 @@
+"""Unit tests for the reminder queue and service."""
+
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from pkm.models.task import Recurrence
+from pkm.services.reminder_service import Reminder, ReminderQueue, ReminderService
+from pkm.services.task_service import TaskService
+from pkm.storage.course_registry import CourseRegistry
+from pkm.storage.schema import create_empty_schema
+
+NOW = datetime(2025, 11, 20, 9, 0)
+HOUR = timedelta(hours=1)
+
+
+def task(task_id: str, due: datetime | None, **fields: object) -> dict:
+    """Build a raw task record."""
+    return {
+        "id": task_id,
+        "title": task_id,
+        "created_at": "2025-11-01T10:00:00",
+        "due_date": due.isoformat() if due else None,
+        "priority": "medium",
+        "completed": False,
+        "course_id": None,
+        **fields,
+    }
+
+
+COURSES = CourseRegistry(create_empty_schema())
+
+
+class TestReminderQueue:
+    """Tests for ReminderQueue."""
+
+    def test_reminders_come_in_time_order(self) -> None:
+        """Test each lead time gives a reminder, earliest first."""
+        queue = ReminderQueue([HOUR, timedelta(0)])
+        records = [
+            task("t1", NOW + 5 * HOUR),
+            task("t2", NOW + 2 * HOUR),
+            task("t3", None),
+            task("t4", NOW + 3 * HOUR, completed=True),
+        ]
+
+        assert queue.update(records, COURSES, NOW) == 4
+        assert len(queue) == 4
+        assert queue.next_time() == NOW + HOUR
+
+        reminders = queue.pop_due(NOW + 4 * HOUR)
+        assert [(r.task_id, r.at) for r in reminders] == [
+            ("t2", NOW + HOUR),
+            ("t2", NOW + 2 * HOUR),
+            ("t1", NOW + 4 * HOUR),
+        ]
+        assert reminders[0].due == NOW + 2 * HOUR
+        assert queue.next_time() == NOW + 5 * HOUR
+
+    def test_past_reminders_are_not_scheduled(self) -> None:
+        """Test reminders whose time has already passed are skipped."""
+        queue = ReminderQueue([2 * HOUR, timedelta(0)])
+
+        queue.update([task("t1", NOW + HOUR), task("t2", NOW - HOUR)], COURSES, NOW)
+
+        assert [r.at for r in queue.upcoming(10)] == [NOW + HOUR]
+
+    def test_update_reschedules_only_changed_tasks(self) -> None:
+        """Test changed, completed and deleted tasks drop their old reminders."""
+        queue = ReminderQueue([HOUR])
+        records = [task(f"t{i}", NOW + i * HOUR) for i in range(2, 6)]
+        queue.update(records, COURSES, NOW)
+
+        moved = task("t2", NOW + 10 * HOUR)
+        done = dict(records[1], completed=True)
+        assert queue.update([moved, done, records[2]], COURSES, NOW) == 3
+
+        assert [(r.task_id, r.at) for r in queue.upcoming(10)] == [
+            ("t4", NOW + 3 * HOUR),
+            ("t2", NOW + 9 * HOUR),
+        ]
+        assert queue.update([moved, done, records[2]], COURSES, NOW) == 0
+
+    def test_heap_is_compacted(self) -> None:
+        """Test stale entries do not pile up when tasks keep changing."""
+        queue = ReminderQueue([HOUR])
+        for n in range(100):
+            queue.update([task("t1", NOW + (n + 2) * HOUR)], COURSES, NOW)
+
+        assert len(queue._heap) <= 32
+        assert [r.due for r in queue.upcoming(10)] == [NOW + 101 * HOUR]
+
+    def test_recurring_task_schedules_next_occurrence(self) -> None:
+        """Test a series is reminded of each occurrence in turn."""
+        queue = ReminderQueue([HOUR])
+        first = NOW.replace(hour=17) - timedelta(days=3)
+        queue.update(
+            [task("t1", first, recurrence=Recurrence(unit="day").model_dump(mode="json"))],
+            COURSES,
+            NOW,
+        )
+
+        assert queue.next_time() == NOW.replace(hour=16)
+        reminders = queue.pop_due(NOW + timedelta(days=1))
+        assert [r.due for r in reminders] == [NOW.replace(hour=17)]
+        assert queue.next_time() == NOW.replace(hour=16) + timedelta(days=1)
+
+    def test_recurring_task_skips_passed_occurrence(self) -> None:
+        """Test an occurrence too close to remind of moves on to the next."""
+        queue = ReminderQueue([timedelta(days=1)])
+        recurrence = Recurrence(unit="week", until=NOW.date() + timedelta(days=7))
+        record = task("t1", NOW + HOUR, recurrence=recurrence.model_dump(mode="json"))
+
+        queue.update([record], COURSES, NOW)
+
+        assert [r.due for r in queue.upcoming(10)] == [NOW + HOUR + timedelta(days=7)]
+        assert queue.pop_due(NOW + timedelta(days=30))
+        assert queue.next_time() is None
+
+
+class TestReminderService:
+    """Tests for ReminderService."""
+
+    def test_poll_picks_up_changes(self, temp_data_dir: Path) -> None:
+        """Test tasks added and completed after the first poll are followed."""
+        tasks = TaskService(temp_data_dir)
+        now = datetime.now()
+        essay = tasks.create_task("Essay", due_date=now + 3 * HOUR)
+        reminders = ReminderService(temp_data_dir, [HOUR])
+
+        assert reminders.poll(now) == []
+        assert reminders.refresh(now) == 0
+
+        tasks.capture_task("Lab", due_date=now + 2 * HOUR)
+        assert reminders.refresh(now) == 1
+        assert [r.title for r in reminders.poll(now + 90 * timedelta(minutes=1))] == ["Lab"]
+
+        tasks.complete_task(essay.id)
+        assert reminders.poll(now + 4 * HOUR) == []
+        assert reminders.queue.next_time() is None
+
+    def test_refresh_never_writes(self, temp_data_dir: Path) -> None:
+        """Test a watcher follows captures without draining the spool."""
+        tasks = TaskService(temp_data_dir)
+        now = datetime.now()
+        tasks.create_task("Essay", due_date=now + 3 * HOUR)
+        tasks.capture_task("Lab", due_date=now + 2 * HOUR)
+        data_file = temp_data_dir / "data.json"
+        before = data_file.stat().st_mtime_ns, data_file.read_bytes()
+
+        reminders = ReminderService(temp_data_dir, [HOUR])
+        assert reminders.refresh(now) == 2
+
+        assert [r.title for r in reminders.queue.upcoming(10)] == ["Lab", "Essay"]
+        assert (data_file.stat().st_mtime_ns, data_file.read_bytes()) == before
+        assert (temp_data_dir / "spool" / "t2.json").exists()
+        assert reminders.refresh(now) == 0
+
+    def test_watch_sleeps_until_reminder(self, temp_data_dir: Path) -> None:
+        """Test the watcher wakes for the next reminder and emits it."""
+        TaskService(temp_data_dir).create_task(
+            "Quiz", due_date=datetime.now() + HOUR + timedelta(seconds=0.3)
+        )
+        reminders = ReminderService(temp_data_dir, [HOUR])
+        stop = threading.Event()
+        emitted = []
+
+        def emit(reminder: Reminder) -> None:
+            emitted.append(reminder)
+            stop.set()
+
+        reminders.watch(emit, stop, interval=5.0)
+
+        assert [r.title for r in emitted] == ["Quiz"]
@@ -0,0 +1,185 @@
+"""Unit tests for incrementally maintained saved views."""
+
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+from pkm.services import saved_view_service, saved_views
+from pkm.services.course_service import CourseService
+from pkm.services.maintenance_service import MaintenanceService
+from pkm.services.note_service import NoteService
+from pkm.services.query import Node
+from pkm.services.query_index import RecordIndex
+from pkm.services.saved_view_service import SavedViewService
+from pkm.services.saved_views import matching_ids
+from pkm.services.task_service import TaskService
+from pkm.storage.json_store import JSONStore
+
+TODAY = date.today()
+
+
+def stored_ids(data_dir: Path, name: str) -> list[str] | None:
+    """Get the stored results of a view, sorted."""
+    entry = JSONStore(data_dir / "data.json").load()["saved_views"]["views"][name]
+    return sorted(entry["ids"]) if "ids" in entry else None
+
+
+def fresh_ids(data_dir: Path, query: str) -> list[str]:
+    """Evaluate a query from scratch, sorted."""
+    return sorted(matching_ids(JSONStore(data_dir / "data.json").load(), query, TODAY))
+
+
+def forbid_full_evaluation(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Fail if opening a view evaluates its query from scratch."""
+
+    def fail(*args: object) -> None:
+        raise AssertionError("view was evaluated in full")
+
+    monkeypatch.setattr(saved_view_service, "refresh_view", fail)
+
+
+class TestSavedViews:
+    """Tests for saving views and keeping their results current."""
+
+    def test_mutations_update_results(
+        self, temp_data_dir: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test every kind of mutation keeps the stored results exact."""
+        query = 'course:"Bio 101" -completed cell'
+        notes = NoteService(temp_data_dir)
+        tasks = TaskService(temp_data_dir)
+        notes.create_note("Cell walls", course="Bio 101")
+        tasks.create_task("Cell quiz", course="Bio 101")
+        views = SavedViewService(temp_data_dir)
+        views.save_view("bio", query)
+        forbid_full_evaluation(monkeypatch)
+
+        steps = [
+            lambda: notes.create_note("Cell membrane", course="Bio 101"),
+            lambda: notes.create_note("Cell cycle"),
+            lambda: notes.organize_note("n3", "Bio 101"),
+            lambda: notes.update_note("n1", "Plant walls"),
+            lambda: tasks.complete_task("t1"),
+            lambda: notes.delete_note("n2"),
+            lambda: tasks.create_task("Cell lab", course="Bio 101"),
+        ]
+        for step in steps:
+            step()
+            assert stored_ids(temp_data_dir, "bio") == fresh_ids(temp_data_dir, query)
+
+        notes_found, tasks_found = views.open_view("bio")  # type: ignore[misc]
+        assert [n.id for n in notes_found] == ["n3"]
+        assert [t.id for t in tasks_found] == ["t2"]
+
+    def test_save_materializes(self, temp_data_dir: Path) -> None:
+        """Test saving stores the current results."""
+        NoteService(temp_data_dir).create_note("Cells", topics=["bio"])
+        NoteService(temp_data_dir).create_note("Wars")
+
+        saved = SavedViewService(temp_data_dir).save_view("bio", "topic:bio")
+
+        assert saved.count == 1
+        assert stored_ids(temp_data_dir, "bio") == ["n1"]
+
+    def test_drained_captures_are_matched(
+        self, temp_data_dir: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test captures drained outside the services still reach the view."""
+        data_dir = temp_data_dir
+        SavedViewService(data_dir).save_view("inbox", "inbox")
+        forbid_full_evaluation(monkeypatch)
+        NoteService(data_dir).capture_note("Cells")
+        TaskService(data_dir).capture_task("Lab", course="Bio 101")
+
+        notes, tasks = SavedViewService(data_dir).open_view("inbox")  # type: ignore[misc]
+
+        assert [n.id for n in notes] == ["n1"]
+        assert tasks == []
+        assert "unseen" not in JSONStore(data_dir / "data.json").load()["saved_views"]
+
+    def test_list_counts_drained_captures(self, temp_data_dir: Path) -> None:
+        """Test listing matches captures first, and hides counts gone stale by date."""
+        views = SavedViewService(temp_data_dir)
+        views.save_view("inbox", "inbox")
+        views.save_view("soon", "due<=today")
+        NoteService(temp_data_dir).capture_note("Cells")
+
+        listed = {v.name: v.count for v in views.list_views()}
+        tomorrow = {v.name: v.count for v in views.list_views(TODAY + timedelta(days=1))}
+
+        assert listed == {"inbox": 1, "soon": 0}
+        assert tomorrow == {"inbox": 1, "soon": None}
+        assert stored_ids(temp_data_dir, "inbox") == ["n1"]
+
+    def test_mutation_parses_and_indexes_once(
+        self, temp_data_dir: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test a mutation indexes the record once and reuses parsed view queries."""
+        views = SavedViewService(temp_data_dir)
+        for name in ("parsed-a", "parsed-b", "parsed-c"):
+            views.save_view(name, f"topic:{name}")
+        parsed: list[str] = []
+        indexed: list[object] = []
+        parse = saved_views.parse_query
+        index = saved_views.RecordIndex
+
+        def counting_parse(query: str, day: date) -> Node:
+            parsed.append(query)
+            return parse(query, day)
+
+        def counting_index(data: object) -> RecordIndex:
+            indexed.append(data)
+            return index(data)  # type: ignore[arg-type]
+
+        monkeypatch.setattr(saved_views, "parse_query", counting_parse)
+        monkeypatch.setattr(saved_views, "RecordIndex", counting_index)
+        notes = NoteService(temp_data_dir)
+        notes.create_note("One", topics=["parsed-a"])
+        notes.create_note("Two", topics=["parsed-b"])
+
+        assert sorted(parsed) == ["topic:parsed-a", "topic:parsed-b", "topic:parsed-c"]
+        assert len(indexed) == 2
+        assert stored_ids(temp_data_dir, "parsed-b") == ["n2"]
+
+    def test_relative_dates_refresh_on_new_day(self, temp_data_dir: Path) -> None:
+        """Test a view with relative dates is re-evaluated the next day."""
+        tomorrow = datetime.combine(TODAY + timedelta(days=1), datetime.min.time())
+        TaskService(temp_data_dir).create_task("Quiz", due_date=tomorrow)
+        views = SavedViewService(temp_data_dir)
+        views.save_view("soon", "due<=today")
+
+        assert stored_ids(temp_data_dir, "soon") == []
+        _, tasks = views.open_view("soon", TODAY + timedelta(days=1))  # type: ignore[misc]
+
+        assert [t.id for t in tasks] == ["t1"]
+
+    def test_course_rename_invalidates(self, temp_data_dir: Path) -> None:
+        """Test a rename makes course terms evaluate again."""
+        NoteService(temp_data_dir).create_note("Cells", course="Bio")
+        views = SavedViewService(temp_data_dir)
+        views.save_view("bio", "course:Biology")
+        CourseService(temp_data_dir).rename_course("Bio", "Biology")
+
+        assert stored_ids(temp_data_dir, "bio") is None
+        notes, _ = views.open_view("bio")  # type: ignore[misc]
+
+        assert [n.id for n in notes] == ["n1"]
+
+    def test_archive_forgets_records(self, temp_data_dir: Path) -> None:
+        """Test archived tasks leave every view."""
+        tasks = TaskService(temp_data_dir)
+        tasks.create_task("Old essay")
+        tasks.complete_task("t1")
+        SavedViewService(temp_data_dir).save_view("done", "completed")
+
+        MaintenanceService(temp_data_dir).archive(before=datetime.max)
+
+        assert stored_ids(temp_data_dir, "done") == []
+
+    def test_missing_view(self, temp_data_dir: Path) -> None:
+        """Test opening or deleting an unknown view."""
+        views = SavedViewService(temp_data_dir)
+
+        assert views.open_view("nope") is None
+        assert not views.delete_view("nope")
@@ -0,0 +1,152 @@
+"""Unit tests for the search index sidecar."""
+
+import copy
+import json
+import random
+from pathlib import Path
+
+import pytest
+
+from pkm.services.analysis import Analyzer, default_analyzer
+from pkm.services.note_service import NoteService
+from pkm.services.query_service import QueryService
+from pkm.storage import search_index
+from pkm.storage.json_store import JSONStore
+from pkm.storage.schema import create_empty_schema
+from pkm.storage.search_index import (
+    SearchIndex,
+    read_search_index,
+    search_index_file,
+    write_search_index,
+)
+
+WORDS = ["cell", "cells", "studies", "study", "mitosis", "calvin", "cycle", "wall", "lab"]
+
+
+def random_data(count: int = 60) -> dict:
+    """Data with notes and tasks made of a few related words."""
+    rng = random.Random(5)
+    data = create_empty_schema()
+    data["courses"].append({"id": "c1", "name": "Bio 101"})
+    for i in range(1, count + 1):
+        data["notes"].append(
+            {
+                "id": f"n{i}",
+                "content": " ".join(rng.choices(WORDS, k=6)),
+                "topics": rng.sample(WORDS, 1),
+                "course_id": rng.choice([None, "c1"]),
+            }
+        )
+        data["tasks"].append({"id": f"t{i}", "title": " ".join(rng.choices(WORDS, k=3))})
+    return data
+
+
+def postings(index: SearchIndex) -> dict[str, dict[str, list[int]]]:
+    """Get the postings of every word, dropping words no record has left."""
+    found = {word: index.postings(word) for word in index.sorted_words()}
+    return {word: records for word, records in found.items() if records}
+
+
+def mutate(data: dict, rng: random.Random) -> None:
+    """Edit, delete and add a few records."""
+    for note in rng.sample(data["notes"], 3):
+        note["content"] = " ".join(rng.choices(WORDS, k=4))
+    del data["tasks"][rng.randrange(len(data["tasks"]))]
+    data["notes"].append({"id": f"n{rng.randrange(1000, 9999)}", "content": "new mitosis lab"})
+
+
+class TestSearchIndex:
+    """Tests for building, updating and storing the search index."""
+
+    @pytest.mark.parametrize("merge_min", [0, 10_000])
+    def test_updates_match_fresh_build(
+        self, merge_min: int, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test updating from an earlier index gives the postings of a fresh build."""
+        monkeypatch.setattr(search_index, "MERGE_MIN", merge_min)
+        analyzer = default_analyzer()
+        rng = random.Random(8)
+        data = random_data()
+        index = SearchIndex.build(data, analyzer)
+        original = copy.deepcopy(data)
+
+        for _ in range(5):
+            mutate(data, rng)
+            index = SearchIndex.build(data, analyzer, index)
+            if index.needs_merge():
+                index.merge(analyzer)
+            fresh = SearchIndex.build(data, analyzer)
+            assert len(index) == len(fresh) == len(data["notes"]) + len(data["tasks"])
+            assert postings(index) == postings(fresh)
+            assert index.variants("cell", analyzer) == ["cell", "cells"]
+
+        # Restoring the original records brings back their merged postings
+        index = SearchIndex.build(original, analyzer, index)
+        assert postings(index) == postings(SearchIndex.build(original, analyzer))
+
+    def test_only_changed_records_are_analyzed(self) -> None:
+        """Test an update puts just the changed records in the delta."""
+        analyzer = default_analyzer()
+        data = random_data()
+        index = SearchIndex.build(data, analyzer)
+        index.merge(analyzer)
+        assert index.delta == {} and index.removed == set()
+
+        data["notes"][1]["content"] = "mitosis"
+        index = SearchIndex.build(data, analyzer, index)
+
+        assert list(index.delta) == ["n2"]
+        assert index.removed == {index.ids.index("n2")}
+        assert index.postings("mitosis")["n2"] == [0]
+        assert index.doc_count("mitosis") == len(index.postings("mitosis"))
+
+    def test_other_analyzer_rebuilds(self) -> None:
+        """Test an index made with other analyzer steps is not updated in place."""
+        data = random_data(5)
+        stemmed = SearchIndex.build(data, default_analyzer())
+        plain = Analyzer(("fold",))
+
+        index = SearchIndex.build(data, plain, stemmed)
+
+        assert index is not stemmed and index.steps == plain.steps
+        assert index.variants("cell", plain) == ["cell"]
+
+    def test_round_trip_and_staleness(self, temp_data_dir: Path) -> None:
+        """Test the sidecar is read back only while the data file is unchanged."""
+        data_file = temp_data_dir / "data.json"
+        data = random_data(20)
+        data_file.write_text(json.dumps(data))
+        written = write_search_index(data_file, data, default_analyzer())
+        read = read_search_index(data_file)
+
+        assert written is not None and read is not None
+        assert read.ids == written.ids and read.steps == written.steps
+        assert postings(read) == postings(written)
+
+        data_file.write_text(json.dumps(data) + " ")
+        assert read_search_index(data_file) is None
+        assert read_search_index(data_file, current=False) is not None
+
+        search_index_file(data_file).write_bytes(b"not an index")
+        assert read_search_index(data_file, current=False) is None
+
+    def test_store_keeps_index_current(self, temp_data_dir: Path) -> None:
+        """Test every commit updates the sidecar and stale ones are brought up to date."""
+        notes = NoteService(temp_data_dir)
+        notes.create_note("Cell walls")
+        notes.create_note("Calvin cycle")
+        store = JSONStore(temp_data_dir / "data.json")
+
+        index = read_search_index(store.data_file)
+        assert index is not None and sorted(index.postings("calvin")) == ["n2"]
+
+        notes.update_note("n1", "Mitosis")
+        assert [n.id for n in QueryService(temp_data_dir).execute("mitosis").notes] == ["n1"]
+
+        # Edited behind the store's back
+        data = store.load()
+        data["notes"][1]["content"] = "Krebs cycle"
+        store.data_file.write_text(json.dumps(data))
+
+        assert [n.id for n in QueryService(temp_data_dir).execute("krebs").notes] == ["n2"]
+        assert read_search_index(store.data_file) is not None
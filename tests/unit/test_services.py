@@ -0,0 +1,363 @@
+"""Unit tests for the service layer query API."""
+
+import io
+import json
+from datetime import date, datetime, timedelta
+from itertools import islice
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from pkm.models.task import Recurrence
+from pkm.services.course_service import CourseService
+from pkm.services.course_stats import rebuild_course_stats
+from pkm.services.filters import has_topic, in_course, in_inbox
+from pkm.services.maintenance_service import MaintenanceService
+from pkm.services.note_service import NoteService
+from pkm.services.task_service import TaskService
+from pkm.storage.json_store import JSONStore
+from pkm.storage.schema import deserialize_note
+
+
+class TestStreamingQueries:
+    """Tests for iter_notes / iter_tasks."""
+
+    def test_iter_notes_filters_on_raw_records(self, temp_data_dir: Path) -> None:
+        """Test iter_notes yields only matching notes."""
+        service = NoteService(temp_data_dir)
+        service.create_note("Inbox note")
+        service.create_note("Bio note", course="Bio 101", topics=["cells"])
+        service.create_note("Chem note", course="Chem 110")
+
+        assert [n.content for n in service.iter_notes(in_inbox)] == ["Inbox note"]
+        assert [n.content for n in service.iter_notes(in_course({"c1"}))] == ["Bio note"]
+        assert [n.content for n in service.iter_notes(has_topic("cells"))] == ["Bio note"]
+        assert service.count_notes() == 3
+        assert service.count_notes(in_course({"c2"})) == 1
+
+    def test_iter_notes_hydrates_lazily(self, temp_data_dir: Path) -> None:
+        """Test early termination only validates the records consumed."""
+        service = NoteService(temp_data_dir)
+        for i in range(20):
+            service.create_note(f"Note {i}")
+
+        with patch(
+            "pkm.services.note_service.deserialize_note", wraps=deserialize_note
+        ) as spy:
+            first_page = list(islice(service.iter_notes(), 5))
+
+        assert len(first_page) == 5
+        assert spy.call_count == 5
+
+    def test_count_notes_does_not_hydrate(self, temp_data_dir: Path) -> None:
+        """Test counting never builds models."""
+        service = NoteService(temp_data_dir)
+        service.create_note("One")
+        service.create_note("Two")
+
+        with patch("pkm.services.note_service.deserialize_note") as spy:
+            assert service.count_notes(in_inbox) == 2
+        spy.assert_not_called()
+
+    def test_course_lookups_load_once(self, temp_data_dir: Path) -> None:
+        """Test course queries resolve the name in the data they already loaded."""
+        notes = NoteService(temp_data_dir)
+        tasks = TaskService(temp_data_dir)
+        notes.create_note("Bio note", course="Bio 101")
+        notes.create_note("Intro note", course="Bio")
+        notes.create_note("Inbox note")
+        tasks.create_task("Bio lab", course="Bio")
+        CourseService(temp_data_dir).merge_courses("Bio", "Bio 101")
+
+        with patch.object(JSONStore, "load", autospec=True, side_effect=JSONStore.load) as load:
+            assert notes.count_notes(course="Bio 101") == 2
+            assert [n.content for n in notes.iter_notes(in_inbox, course="Bio 101")] == []
+            assert [n.content for n in notes.get_notes_by_course("Bio 101")] == [
+                "Bio note",
+                "Intro note",
+            ]
+            assert [t.title for t in tasks.get_tasks_by_course("Bio 101")] == ["Bio lab"]
+
+        assert load.call_count == 4
+
+    def test_iter_tasks_filters_on_raw_records(self, temp_data_dir: Path) -> None:
+        """Test iter_tasks and count_tasks apply raw-record filters."""
+        service = TaskService(temp_data_dir)
+        service.create_task("Inbox task")
+        service.create_task("Bio lab", course="Bio 101")
+        service.create_task("Chem quiz", course="Chem 110")
+
+        assert [t.title for t in service.iter_tasks(in_inbox)] == ["Inbox task"]
+        assert [t.title for t in service.iter_tasks(in_course({"c2"}))] == ["Chem quiz"]
+        assert service.count_tasks(in_course({"c1", "c2"})) == 2
+        assert service.count_tasks() == 3
+
+
+class TestRecurringTasks:
+    """Tests for recurring tasks and their occurrences."""
+
+    def test_views_expand_occurrences(self, temp_data_dir: Path) -> None:
+        """Test day windows list occurrences, overdue lists the current one."""
+        service = TaskService(temp_data_dir)
+        today = datetime.combine(date.today(), datetime.min.time()).replace(hour=9)
+        service.create_task(
+            "Flashcards", due_date=today - timedelta(days=3), recurrence=Recurrence(unit="day")
+        )
+        service.create_task("Essay", due_date=today + timedelta(days=2))
+
+        week = service.get_tasks_this_week()
+        assert [t.title for t in week].count("Flashcards") == 8
+        days = {t.due_date for t in week if t.title == "Flashcards"}
+        assert days == {today + timedelta(days=n) for n in range(8)}
+        assert [t.title for t in service.get_tasks_today()] == ["Flashcards"]
+        overdue = service.get_tasks_overdue()
+        assert [t.due_date for t in overdue] == [today - timedelta(days=3)]
+        assert len(service.list_tasks()) == 2
+
+    def test_create_moves_to_first_occurrence(self, temp_data_dir: Path) -> None:
+        """Test a due date off the listed weekdays moves to the next one."""
+        service = TaskService(temp_data_dir)
+        monday = datetime(2025, 11, 17, 17, 0)
+
+        task = service.create_task("Lab", due_date=monday, recurrence=Recurrence(weekdays=[2, 4]))
+        captured = service.capture_task("Quiz", recurrence=Recurrence(unit="day"))
+
+        assert task.due_date == datetime(2025, 11, 19, 17, 0)
+        assert captured.due_date is not None and captured.due_date.date() == date.today()
+        stored = service.get_task(captured.id)
+        assert stored is not None and stored.recurrence == Recurrence(unit="day")
+
+    def test_complete_stores_occurrence_and_advances(self, temp_data_dir: Path) -> None:
+        """Test completing stores the occurrence and moves to the next one."""
+        service = TaskService(temp_data_dir)
+        friday = datetime(2025, 11, 21, 17, 0)
+        series = service.create_task(
+            "Problem set",
+            due_date=friday,
+            course="Math",
+            recurrence=Recurrence(until=date(2025, 11, 28)),
+        )
+        service.add_subtask(series.id, "Question 1")
+        service.complete_subtask(series.id, 1)
+
+        done = service.complete_task(series.id)
+        assert done is not None and done.id != series.id
+        assert done.completed and done.recurrence is None
+        assert done.due_date == friday and done.course == "Math"
+        assert done.subtasks[0].completed
+
+        advanced = service.get_task(series.id)
+        assert advanced is not None and not advanced.completed
+        assert advanced.due_date == datetime(2025, 11, 28, 17, 0)
+        assert not advanced.subtasks[0].completed
+
+        # The last occurrence completes the task itself
+        last = service.complete_task(series.id)
+        assert last is not None and last.id == series.id and last.completed
+        assert len(service.list_tasks()) == 2
+
+
+class TestCourseStats:
+    """Tests for incrementally maintained course statistics."""
+
+    def test_stats_follow_mutations(self, temp_data_dir: Path) -> None:
+        """Test counts are updated by every note and task mutation."""
+        notes = NoteService(temp_data_dir)
+        tasks = TaskService(temp_data_dir)
+        courses = CourseService(temp_data_dir)
+
+        note = notes.create_note("Cells", course="Bio 101")
+        notes.create_note("Inbox thought")
+        late = tasks.create_task(
+            "Lab", due_date=datetime.now() - timedelta(days=3), course="Bio 101"
+        )
+        essay = tasks.create_task("Essay")
+        tasks.organize_task(essay.id, "Bio 101")
+        tasks.complete_task(essay.id)
+
+        bio = courses.get_course("Bio 101")
+        assert bio is not None
+        assert (bio.note_count, bio.task_count) == (1, 2)
+        assert (bio.open_count, bio.completed_count, bio.overdue_count) == (1, 1, 1)
+        assert bio.last_activity is not None
+
+        tasks.complete_task(late.id)
+        notes.organize_note(note.id, "Chem 110")
+        bio = courses.get_course("Bio 101")
+        assert bio is not None
+        assert (bio.note_count, bio.open_count, bio.overdue_count) == (0, 0, 0)
+        assert [c.name for c in courses.list_courses()] == ["Bio 101", "Chem 110"]
+
+        notes.delete_note(note.id)
+        assert courses.get_course("Chem 110") is None
+
+    def test_stats_match_full_rebuild(self, temp_data_dir: Path) -> None:
+        """Test incremental stats equal a from-scratch recount."""
+        notes = NoteService(temp_data_dir)
+        tasks = TaskService(temp_data_dir)
+        soon = datetime.now() + timedelta(days=2)
+        for i in range(6):
+            course = ["A", "B", None][i % 3]
+            notes.create_note(f"Note {i}", course=course)
+            task = tasks.create_task(f"Task {i}", due_date=soon, course=course)
+            if i % 2:
+                tasks.complete_task(task.id)
+        tasks.delete_task("t1")
+
+        data = tasks.store.load()
+        incremental = data["course_stats"]
+        rebuilt = rebuild_course_stats(data)
+        for entry in (*incremental.values(), *rebuilt.values()):
+            entry.pop("last_activity")
+        assert incremental == rebuilt
+
+    def test_legacy_file_is_upgraded(self, sample_data_file: Path) -> None:
+        """Test files without a stats section are rebuilt once on read."""
+        data = json.loads(sample_data_file.read_text())
+        data["notes"][0]["course"] = "History"
+        sample_data_file.write_text(json.dumps(data))
+
+        courses = CourseService(sample_data_file.parent).list_courses()
+
+        assert [(c.name, c.note_count) for c in courses] == [("History", 1)]
+        assert "course_stats" in json.loads(sample_data_file.read_text())
+
+
+class TestMaintenanceService:
+    """Tests for streaming export, integrity check and archive."""
+
+    def test_export_json_lines(self, temp_data_dir: Path) -> None:
+        """Test each record becomes one line with its course name."""
+        NoteService(temp_data_dir).create_note("Cells", course="Bio 101")
+        TaskService(temp_data_dir).create_task("Lab report")
+        out = io.StringIO()
+
+        counts = MaintenanceService(temp_data_dir).export(out)
+
+        lines = [json.loads(line) for line in out.getvalue().splitlines()]
+        assert counts == {"notes": 1, "tasks": 1}
+        assert [line["type"] for line in lines] == ["note", "task"]
+        assert lines[0]["course"] == "Bio 101"
+        assert "course_id" not in lines[0]
+        assert "_checksum" not in lines[0]
+
+    def test_check_clean_file(self, temp_data_dir: Path) -> None:
+        """Test a consistent file has no issues."""
+        note = NoteService(temp_data_dir).create_note("Cells", course="Bio 101")
+        tasks = TaskService(temp_data_dir)
+        task = tasks.create_task("Lab report")
+        tasks.link_note(task.id, note.id)
+
+        checked, issues = MaintenanceService(temp_data_dir).check()
+
+        assert checked == 2
+        assert issues == []
+
+    def test_check_finds_problems(self, temp_data_dir: Path) -> None:
+        """Test checksum, duplicate, course and link problems are reported."""
+        NoteService(temp_data_dir).create_note("Cells")
+        path = temp_data_dir / "data.json"
+        data = json.loads(path.read_text())
+        note = data["notes"][0]
+        data["notes"].append(dict(note))
+        note["content"] = "Edited outside pkm"
+        data["tasks"].append({"id": "t1", "course_id": "c9", "linked_notes": ["n_missing"]})
+        path.write_text(json.dumps(data))
+
+        _, issues = MaintenanceService(temp_data_dir).check()
+
+        assert {issue.kind for issue in issues} == {
+            "checksum",
+            "duplicate_id",
+            "unknown_course",
+            "dangling_link",
+        }
+
+    def test_check_damaged_file(self, temp_data_dir: Path) -> None:
+        """Test a file that does not parse is reported as damaged."""
+        NoteService(temp_data_dir).create_note("Cells")
+        path = temp_data_dir / "data.json"
+        path.write_text(path.read_text()[:-40])
+
+        _, issues = MaintenanceService(temp_data_dir).check()
+
+        assert issues[-1].kind == "damaged"
+
+    def test_archive_completed_tasks(self, temp_data_dir: Path) -> None:
+        """Test old completed tasks move to the archive and lose backlinks."""
+        note = NoteService(temp_data_dir).create_note("Cells")
+        tasks = TaskService(temp_data_dir)
+        old = tasks.create_task("Old lab", course="Bio 101")
+        tasks.link_note(old.id, note.id)
+        tasks.complete_task(old.id)
+        tasks.create_task("Open task")
+        service = MaintenanceService(temp_data_dir)
+
+        assert service.archive(datetime.now() + timedelta(days=1), dry_run=True) == [old.id]
+        assert tasks.get_task(old.id) is not None
+
+        assert service.archive(datetime.now() + timedelta(days=1)) == [old.id]
+
+        assert tasks.get_task(old.id) is None
+        assert [t.title for t in tasks.list_tasks()] == ["Open task"]
+        assert NoteService(temp_data_dir).get_note(note.id).linked_from_tasks == []
+        archived = [json.loads(line) for line in service.archive_file.read_text().splitlines()]
+        assert archived[0]["id"] == old.id
+        assert "archived_at" in archived[0]
+        assert service.check()[1] == []
+        assert CourseService(temp_data_dir).get_course("Bio 101") is None
+
+    def test_failed_archive_writes_nothing(self, temp_data_dir: Path) -> None:
+        """Test a failed rewrite leaves no archive entries and can be retried."""
+        tasks = TaskService(temp_data_dir)
+        task = tasks.create_task("Old lab")
+        tasks.complete_task(task.id)
+        service = MaintenanceService(temp_data_dir)
+        cutoff = datetime.now() + timedelta(days=1)
+
+        with patch(
+            "pkm.services.maintenance_service.rewrite_file", side_effect=OSError("disk full")
+        ):
+            with pytest.raises(OSError):
+                service.archive(cutoff)
+
+        assert not service.archive_file.exists()
+        assert not service.pending_file.exists()
+        assert tasks.get_task(task.id) is not None
+        assert service.archive(cutoff) == [task.id]
+        assert len(service.archive_file.read_text().splitlines()) == 1
+
+    def test_interrupted_append_is_finished_once(self, temp_data_dir: Path) -> None:
+        """Test entries left pending after the rewrite are appended exactly once."""
+        tasks = TaskService(temp_data_dir)
+        first = tasks.create_task("First")
+        second = tasks.create_task("Second")
+        tasks.complete_task(first.id)
+        tasks.complete_task(second.id)
+        service = MaintenanceService(temp_data_dir)
+
+        with patch.object(MaintenanceService, "_append_pending", side_effect=OSError):
+            with pytest.raises(OSError):
+                service.archive(datetime.now() + timedelta(days=1))
+        # The append got as far as the first entry and a torn second line
+        lines = service.pending_file.read_text().splitlines()
+        service.archive_file.write_text(lines[0] + "\n" + lines[1][:10])
+
+        assert service.archive(datetime.now() + timedelta(days=1)) == []
+
+        # The torn line stays, on a line of its own
+        first_line, _, second_line = service.archive_file.read_text().splitlines()
+        assert json.loads(first_line)["id"] == first.id
+        assert json.loads(second_line)["id"] == second.id
+        assert not service.pending_file.exists()
+        assert tasks.list_tasks() == []
+
+    def test_archive_keeps_recent_tasks(self, temp_data_dir: Path) -> None:
+        """Test tasks completed after the cutoff stay."""
+        tasks = TaskService(temp_data_dir)
+        task = tasks.create_task("Recent")
+        tasks.complete_task(task.id)
+
+        assert MaintenanceService(temp_data_dir).archive(datetime.now() - timedelta(days=1)) == []
+        assert tasks.get_task(task.id) is not None
@@ -0,0 +1,183 @@
+"""Unit tests for term statistics and related notes."""
+
+from pathlib import Path
+
+import pytest
+
+from pkm.services import similarity
+from pkm.services.analysis import Analyzer
+from pkm.services.note_service import NoteService
+from pkm.services.similarity import TfidfVectors
+from pkm.services.term_stats import rebuild_term_stats
+from pkm.storage.json_store import JSONStore
+
+
+def load(data_dir: Path) -> dict:
+    """Load the data file."""
+    return JSONStore(data_dir / "data.json").load()  # type: ignore[return-value]
+
+
+def add_notes(data_dir: Path) -> NoteService:
+    """Create notes on two subjects and build their term statistics."""
+    notes = NoteService(data_dir)
+    notes.create_note("Photosynthesis turns light into chemical energy", topics=["plants"])
+    notes.create_note("Light reactions of photosynthesis happen in thylakoids")
+    notes.create_note("The Calvin cycle fixes carbon", topics=["plants"])
+    notes.create_note("Treaty of Versailles ended the war")
+    notes.create_note("Causes of the first world war")
+    notes.related_notes("n1")  # builds term_stats
+    return notes
+
+
+class TestTermStats:
+    """Tests for the incrementally maintained term counts."""
+
+    def test_mutations_keep_counts_exact(self, temp_data_dir: Path) -> None:
+        """Test every note mutation leaves the same counts as a rebuild."""
+        notes = add_notes(temp_data_dir)
+        steps = [
+            lambda: notes.create_note("Chlorophyll absorbs light"),
+            lambda: notes.update_note("n3", "Carbon fixation"),
+            lambda: notes.add_topics("n4", ["history", "wars"]),
+            lambda: notes.remove_topic("n1", "plants"),
+            lambda: notes.organize_note("n2", "Bio 101"),
+            lambda: notes.delete_note("n5"),
+        ]
+        for step in steps:
+            step()
+            data = load(temp_data_dir)
+            stored = data["term_stats"]
+
+            assert stored == rebuild_term_stats(data)
+
+    def test_drained_captures_keep_counts(self, temp_data_dir: Path) -> None:
+        """Test notes arriving through the spool are counted as they are drained."""
+        notes = add_notes(temp_data_dir)
+        notes.capture_note("Photosynthesis in the light")
+
+        data = load(temp_data_dir)
+        assert data["term_stats"] == rebuild_term_stats(dict(data))  # type: ignore[arg-type]
+        related = [n.id for n, _ in notes.related_notes("n6")]
+
+        assert related[:2] == ["n2", "n1"]
+        assert load(temp_data_dir)["term_stats"]["notes"] == 6
+
+    def test_other_analyzer_rebuilds(
+        self, temp_data_dir: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test counts made with different analyzer steps are not reused."""
+        notes = add_notes(temp_data_dir)
+        monkeypatch.setenv("PKM_ANALYZER", "fold")
+        notes.create_note("Light and shade")
+
+        assert "term_stats" not in load(temp_data_dir)
+        notes.related_notes("n1")
+
+        assert load(temp_data_dir)["term_stats"]["analyzer"] == ["fold"]
+
+    def test_stats_without_note_counts_are_upgraded(self, temp_data_dir: Path) -> None:
+        """Test statistics from before per-note counts were kept are rebuilt once."""
+        notes = add_notes(temp_data_dir)
+        store = JSONStore(temp_data_dir / "data.json")
+        data = store.load()
+        del data["term_stats"]["tf"]
+        store.save(data)
+
+        notes.update_note("n3", "Carbon fixation")
+        assert "term_stats" not in load(temp_data_dir)
+        notes.related_notes("n1")
+
+        data = load(temp_data_dir)
+        assert data["term_stats"] == rebuild_term_stats(data)
+
+
+class TestRelatedNotes:
+    """Tests for TF-IDF neighbours."""
+
+    def test_neighbours_share_distinctive_terms(self, temp_data_dir: Path) -> None:
+        """Test notes on the same subject rank first and unrelated ones not at all."""
+        notes = add_notes(temp_data_dir)
+
+        related = notes.related_notes("n1")
+
+        assert [n.id for n, _ in related] == ["n2", "n3"]
+        assert 1 > related[0][1] > related[1][1] > 0
+        assert [n.id for n, _ in notes.related_notes("n4")] == ["n5"]
+        assert notes.related_notes("n99") == []
+
+    def test_vectors_come_from_stored_counts(
+        self, temp_data_dir: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test looking up neighbours analyzes no note."""
+        notes = add_notes(temp_data_dir)
+        counts = load(temp_data_dir)["term_stats"]["tf"]["n3"]
+        assert counts == {"calvin": 1, "cycle": 1, "fixe": 1, "carbon": 1, "plant": 1}
+
+        def analyze(record: dict, analyzer: Analyzer) -> list[str]:
+            raise AssertionError(f"{record['id']} analyzed again")
+
+        monkeypatch.setattr(similarity, "note_terms", analyze)
+
+        assert [n.id for n, _ in notes.related_notes("n1")] == ["n2", "n3"]
+
+    def test_limit(self, temp_data_dir: Path) -> None:
+        """Test only the closest notes are returned."""
+        notes = add_notes(temp_data_dir)
+
+        assert [n.id for n, _ in notes.related_notes("n1", limit=1)] == ["n2"]
+
+    def test_fallback_matches_numpy(
+        self, temp_data_dir: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test the pure-Python and NumPy scores agree."""
+        pytest.importorskip("numpy")
+        add_notes(temp_data_dir)
+        data = load(temp_data_dir)
+        with_numpy = TfidfVectors(data, Analyzer()).neighbours("n1")
+        monkeypatch.setattr(similarity, "np", None)
+        without = TfidfVectors(data, Analyzer()).neighbours("n1")
+
+        assert [i for i, _ in with_numpy] == [i for i, _ in without]
+        assert [s for _, s in with_numpy] == pytest.approx([s for _, s in without])
+
+    def test_pure_python_path(self, temp_data_dir: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test neighbours are found without NumPy."""
+        monkeypatch.setattr(similarity, "np", None)
+        notes = add_notes(temp_data_dir)
+
+        assert [n.id for n, _ in notes.related_notes("n1")] == ["n2", "n3"]
+
+    def test_pruned_scores_are_exact(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test skipping common posting lists still ranks like brute force."""
+        monkeypatch.setattr(similarity, "np", None)
+        words = ["cell", "wall", "light", "treaty", "war", "orbit", "comet", "verb"]
+        notes = [
+            {
+                "id": f"n{i}",
+                "content": f"lecture review {words[i % 8]} {words[i * 3 % 8]}"
+                f" g{i // 4} h{(i + 2) // 4}",  # small groups share rare terms
+            }
+            for i in range(1, 201)
+        ]
+        data = {"notes": notes, "tasks": [], "courses": []}
+        rebuild_term_stats(data)  # type: ignore[arg-type]
+        vectors = TfidfVectors(data, Analyzer())  # type: ignore[arg-type]
+        assert "lecture" in vectors.common and "g5" not in vectors.common
+        walks = []
+        walk = vectors._walk
+        monkeypatch.setattr(vectors, "_walk", lambda *args: walks.append(1) or walk(*args))
+
+        for note in notes[:20]:
+            mine = vectors.vector(note)
+            brute = sorted(
+                (
+                    (-sum(w * vectors.vector(other).get(t, 0.0) for t, w in mine.items()), i)
+                    for i, other in enumerate(notes)
+                    if other is not note
+                ),
+            )[:5]
+            found = vectors.neighbours(note["id"])
+
+            assert [vectors.ids[i] for _, i in brute] == [i for i, _ in found]
+            assert [-s for s, _ in brute] == pytest.approx([s for _, s in found])
+        assert len(walks) < 40  # some lookups never walked the common lists
@@ -0,0 +1,146 @@
+"""Unit tests for the capture spool."""
+
+import json
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from pkm.services.course_stats import rebuild_course_stats
+from pkm.services.note_service import NoteService
+from pkm.services.task_service import TaskService
+from pkm.storage.json_store import JSONStore
+from pkm.storage.spool import CaptureSpool
+from pkm.storage.summary import read_summary
+
+
+def spooled(data_dir: Path) -> list[str]:
+    """List the captures and reservations left in the spool."""
+    return sorted(p.name for p in (data_dir / "spool").iterdir() if p.suffix != ".issued")
+
+
+class TestCaptureSpool:
+    """Tests for capturing into the spool and draining it."""
+
+    def test_capture_does_not_touch_data_file(self, temp_data_dir: Path) -> None:
+        """Test a capture only writes its own spool file."""
+        note = NoteService(temp_data_dir).capture_note("Cells", topics=["bio"])
+
+        assert note.id == "n1"
+        assert not (temp_data_dir / "data.json").exists()
+        assert spooled(temp_data_dir) == ["n1.id", "n1.json"]
+
+    def test_next_load_drains(self, temp_data_dir: Path) -> None:
+        """Test captures reach the data file on the next load, with courses."""
+        notes = NoteService(temp_data_dir)
+        notes.capture_note("Cells", course="Bio 101")
+        TaskService(temp_data_dir).capture_task("Lab report")
+
+        data = JSONStore(temp_data_dir / "data.json").load()
+
+        assert [n["content"] for n in data["notes"]] == ["Cells"]
+        assert [t["title"] for t in data["tasks"]] == ["Lab report"]
+        assert data["courses"][0]["name"] == "Bio 101"
+        assert notes.get_note("n1").course == "Bio 101"  # type: ignore[union-attr]
+        assert spooled(temp_data_dir) == []
+        on_disk = json.loads((temp_data_dir / "data.json").read_text())
+        assert len(on_disk["notes"]) == 1
+
+    def test_peek_leaves_spool(self, temp_data_dir: Path) -> None:
+        """Test a read-only load sees captures but neither drains nor writes."""
+        TaskService(temp_data_dir).create_task("Essay")
+        TaskService(temp_data_dir).capture_task("Lab report", course="Bio 101")
+        data_file = temp_data_dir / "data.json"
+        before = data_file.read_bytes()
+
+        data = JSONStore(data_file).peek()
+
+        assert [t["title"] for t in data["tasks"]] == ["Essay", "Lab report"]
+        assert data["courses"][0]["name"] == "Bio 101"
+        assert data_file.read_bytes() == before
+        assert "t2.json" in spooled(temp_data_dir)
+
+    def test_drain_keeps_course_stats(self, temp_data_dir: Path) -> None:
+        """Test drained captures are counted into the existing course statistics."""
+        TaskService(temp_data_dir).create_task("Essay", course="Bio 101")
+        NoteService(temp_data_dir).capture_note("Cells", course="Bio 101")
+        TaskService(temp_data_dir).capture_task("Lab report", course="Chem 110")
+
+        data = JSONStore(temp_data_dir / "data.json").load()
+        incremental = data["course_stats"]
+        rebuilt = rebuild_course_stats(dict(data))  # type: ignore[arg-type]
+        for entry in (*incremental.values(), *rebuilt.values()):
+            entry.pop("last_activity")
+
+        assert incremental == rebuilt
+        assert incremental["c1"]["note_count"] == 1 and incremental["c1"]["task_count"] == 1
+        assert incremental["c2"]["open_count"] == 1
+
+    def test_ids_continue_after_existing_data(self, sample_data_file: Path) -> None:
+        """Test the first capture takes the ID after the highest in the data file."""
+        note = NoteService(sample_data_file.parent).capture_note("Next")
+
+        assert note.id == "n2"
+
+    def test_ids_not_reused_after_delete(self, temp_data_dir: Path) -> None:
+        """Test deleting the newest note does not free its ID."""
+        service = NoteService(temp_data_dir)
+        service.create_note("One")
+        service.create_note("Two")
+        service.delete_note("n2")
+
+        assert service.create_note("Three").id == "n3"
+        assert service.capture_note("Four").id == "n4"
+
+    def test_concurrent_captures_never_collide(self, temp_data_dir: Path) -> None:
+        """Test parallel captures get distinct IDs and all arrive."""
+
+        def capture(i: int) -> str:
+            return NoteService(temp_data_dir).capture_note(f"Note {i}").id
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            ids = list(pool.map(capture, range(40)))
+
+        assert len(set(ids)) == 40
+        data = JSONStore(temp_data_dir / "data.json").load()
+        assert sorted(n["id"] for n in data["notes"]) == sorted(ids)
+
+    def test_drain_is_idempotent(self, temp_data_dir: Path) -> None:
+        """Test a capture seen again after a crash is not added twice."""
+        NoteService(temp_data_dir).capture_note("Cells")
+        kept = temp_data_dir / "n1.json"
+        shutil.copy(temp_data_dir / "spool" / "n1.json", kept)
+        store = JSONStore(temp_data_dir / "data.json")
+        store.load()
+
+        # As if the process died after the commit but before the cleanup
+        shutil.copy(kept, temp_data_dir / "spool" / "n1.json")
+        data = store.load()
+
+        assert [n["id"] for n in data["notes"]] == ["n1"]
+        assert spooled(temp_data_dir) == []
+
+    def test_damaged_data_file_keeps_captures(self, temp_data_dir: Path) -> None:
+        """Test captures wait in the spool while the data file is damaged."""
+        (temp_data_dir / "data.json").write_text('{"notes": [')
+        NoteService(temp_data_dir).capture_note("Cells")
+
+        JSONStore(temp_data_dir / "data.json").drain()
+
+        assert spooled(temp_data_dir) == ["n1.id", "n1.json"]
+
+    def test_reserve_skips_taken_markers(self, temp_data_dir: Path) -> None:
+        """Test a reservation never reuses a marker another capture holds."""
+        spool = CaptureSpool(temp_data_dir / "data.json")
+
+        assert [spool.reserve("t") for _ in range(3)] == ["t1", "t2", "t3"]
+        assert spool.reserve("n") == "n1"
+
+    def test_summary_counts_spooled_captures(self, temp_data_dir: Path) -> None:
+        """Test the prompt summary includes captures not drained yet."""
+        NoteService(temp_data_dir).capture_note("Cells")
+        TaskService(temp_data_dir).capture_task("Lab", course="Bio 101")
+
+        summary = read_summary(temp_data_dir / "data.json")
+
+        assert summary is not None
+        assert (summary["inbox"], summary["open"]) == (1, 1)
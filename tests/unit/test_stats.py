@@ -0,0 +1,122 @@
+"""Unit tests for work analytics."""
+
+from datetime import date, datetime
+
+import pytest
+
+from pkm.services import stats_service
+from pkm.services.stats_service import compute_stats
+from pkm.storage.course_registry import CourseRegistry
+from pkm.storage.schema import create_empty_schema
+from pkm.storage.task_columns import TaskColumns
+
+NOW = datetime(2025, 11, 20, 9, 0)
+
+
+def task(task_id: str, course_id: str | None = None, **fields: object) -> dict:
+    """Build a raw task record."""
+    return {
+        "id": task_id,
+        "title": task_id,
+        "created_at": "2025-11-01T10:00:00",
+        "priority": "medium",
+        "completed": False,
+        "course_id": course_id,
+        **fields,
+    }
+
+
+def sample_data() -> dict:
+    """Data with two courses (one merged into the other) and inbox items."""
+    data = create_empty_schema()
+    data["courses"] = [
+        {"id": "c1", "name": "Biology"},
+        {"id": "c2", "name": "Bio", "merged_into": "c1"},
+        {"id": "c3", "name": "History"},
+    ]
+    data["tasks"] = [
+        # Biology: 3 tasks, 2 done (one day late, one day early)
+        task(
+            "t1",
+            "c1",
+            completed=True,
+            due_date="2025-11-10T00:00:00",
+            completed_at="2025-11-11T00:00:00",
+        ),
+        task(
+            "t2",
+            "c2",
+            completed=True,
+            due_date="2025-11-12T00:00:00",
+            completed_at="2025-11-11T00:00:00",
+        ),
+        task("t3", "c2", due_date="2025-11-21T23:59:00"),
+        # History: done without a due date, plus an overdue task
+        task("t4", "c3", completed=True, completed_at="2025-11-15T00:00:00"),
+        task("t5", "c3", due_date="2025-11-19T23:59:00"),
+        # Inbox: due today, created 10 days ago and just now
+        task("t6", due_date="2025-11-20T23:59:00", created_at="2025-11-10T09:00:00"),
+        task("t7", created_at="2025-11-20T08:00:00"),
+    ]
+    data["notes"] = [
+        {"id": "n1", "content": "x", "created_at": "2025-10-01T09:00:00", "course_id": None},
+        {"id": "n2", "content": "y", "created_at": "2025-11-01T09:00:00", "course_id": "c1"},
+    ]
+    return data
+
+
+@pytest.fixture(params=["numpy", "array"])
+def mode(request: pytest.FixtureRequest, monkeypatch: pytest.MonkeyPatch) -> str:
+    """Run a test with NumPy counts (if installed) and with one loop."""
+    if request.param == "numpy":
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(stats_service, "np", None)
+    return str(request.param)
+
+
+class TestComputeStats:
+    """Tests for compute_stats."""
+
+    def test_completion_and_lateness(self, mode: str) -> None:
+        """Test completion is counted per course name with aliases merged."""
+        data = sample_data()
+        stats = compute_stats(TaskColumns.build(data), data["notes"], CourseRegistry(data), NOW)
+
+        summary = [(c.course, c.total, c.completed, c.lateness_days) for c in stats.courses]
+        assert summary == [
+            ("Biology", 3, 2, 0.0),
+            ("History", 2, 1, None),
+            (None, 2, 0, None),
+        ]
+        assert stats.courses[0].rate == pytest.approx(2 / 3)
+        assert stats.lateness_days == 0.0
+
+    def test_workload_and_inbox_ages(self, mode: str) -> None:
+        """Test open tasks are counted per due day and inbox items by age."""
+        data = sample_data()
+        stats = compute_stats(
+            TaskColumns.build(data), data["notes"], CourseRegistry(data), NOW, weeks=1
+        )
+
+        assert stats.overdue == 1
+        assert len(stats.workload) == 7
+        assert stats.workload[0] == (date(2025, 11, 20), 1)
+        assert stats.workload[1] == (date(2025, 11, 21), 1)
+        assert sum(count for _, count in stats.workload) == 2
+        assert stats.inbox_ages == [
+            ("Under a day", 1),
+            ("1-7 days", 0),
+            ("1-4 weeks", 1),
+            ("Over 4 weeks", 1),
+        ]
+
+    def test_empty_data(self, mode: str) -> None:
+        """Test empty data gives empty statistics."""
+        data = create_empty_schema()
+        stats = compute_stats(TaskColumns.build(data), [], CourseRegistry(data), NOW)
+
+        assert stats.courses == []
+        assert stats.lateness_days is None
+        assert stats.overdue == 0
+        assert all(count == 0 for _, count in stats.workload + stats.inbox_ages)
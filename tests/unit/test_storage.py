@@ -1,11 +1,26 @@
 """Unit tests for storage layer."""
 
 import json
+import os
+import subprocess
+import sys
+import time
 from pathlib import Path
+from unittest.mock import patch
 
 import pytest
 
-from pkm.storage.json_store import JSONStore
+import pkm
+from pkm.storage.course_registry import CourseRegistry
+from pkm.storage.durability import GroupCommit, default_durability, set_default_durability
+from pkm.storage.json_store import JSONStore, on_commit
+from pkm.storage.migrations import (
+    MigrationStep,
+    get_schema_version,
+    migrate_file,
+    migrate_to_latest,
+    register_migration,
+)
 from pkm.storage.schema import create_empty_schema
 
 
@@ -113,9 +128,281 @@ class TestJSONStore:
         assert len(loaded["notes"]) == 1
         assert loaded["notes"][0]["id"] == "backup_note"
 
+    def test_commit_runs_registered_hooks(self, temp_data_dir: Path) -> None:
+        """Test every commit hands the written data to the registered sidecar writers."""
+        store = JSONStore(temp_data_dir / "data.json")
+        seen: list[tuple[Path, int]] = []
+
+        with patch("pkm.storage.json_store._COMMIT_HOOKS", []):
+            on_commit(lambda data_file, data: seen.append((data_file, len(data["notes"]))))
+            data = create_empty_schema()
+            data["notes"].append({"id": "n1", "content": "x"})
+            store.save(data)
+
+        assert seen == [(store.data_file, 1)]
+
+    def test_storage_does_not_import_services(self) -> None:
+        """Test the storage layer loads without the services built on it."""
+        code = (
+            "import sys\n"
+            "import pkm.storage.json_store\n"
+            "print(sorted(m for m in sys.modules if m.startswith('pkm.services')))\n"
+        )
+        env = {**os.environ, "PYTHONPATH": str(Path(pkm.__file__).parents[1])}
+
+        result = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True, check=True, env=env
+        )
+
+        assert result.stdout.splitlines()[-1] == "[]"
+
     def test_restore_without_backup_fails(self, temp_data_dir: Path) -> None:
         """Test that restore fails when no backup exists."""
         store = JSONStore(temp_data_dir / "data.json")
 
         with pytest.raises(FileNotFoundError):
             store.restore_from_backup()
+
+
+class TestCourseRegistry:
+    """Tests for the course registry and dictionary-encoded course IDs."""
+
+    def test_ensure_assigns_stable_ids(self) -> None:
+        """Test each distinct name gets one ID."""
+        data = create_empty_schema()
+        registry = CourseRegistry(data)
+
+        assert registry.ensure("Bio 101") == "c1"
+        assert registry.ensure("Chem 110") == "c2"
+        assert registry.ensure("Bio 101") == "c1"
+        assert data["courses"] == [
+            {"id": "c1", "name": "Bio 101"},
+            {"id": "c2", "name": "Chem 110"},
+        ]
+
+    def test_rename_and_merge(self) -> None:
+        """Test rename and merge only touch registry entries."""
+        data = create_empty_schema()
+        registry = CourseRegistry(data)
+        registry.ensure("Bio")
+        registry.ensure("Biology 101")
+
+        assert registry.rename("Bio", "Bio (old)") == "c1"
+        assert registry.name_of("c1") == "Bio (old)"
+        with pytest.raises(ValueError):
+            registry.rename("Bio (old)", "Biology 101")
+
+        assert registry.merge("Bio (old)", "Biology 101") == ("c1", "c2")
+        assert registry.name_of("c1") == "Biology 101"
+        assert registry.ids_for("Biology 101") == {"c1", "c2"}
+        assert registry.id_of("Bio (old)") is None
+        assert registry.merge("Nope", "Biology 101") is None
+        with pytest.raises(ValueError):
+            registry.merge("Biology 101", "Biology 101")
+
+        # Alias entries survive a reload
+        reloaded = CourseRegistry(data)
+        assert reloaded.resolve("c1") == "c2"
+        assert reloaded.names() == ["Biology 101"]
+
+
+class TestMigrations:
+    """Tests for schema migrations."""
+
+    def test_v1_course_names_become_ids(self, temp_data_dir: Path) -> None:
+        """Test loading a v1 file registers courses and encodes records."""
+        store = JSONStore(temp_data_dir / "data.json")
+        store.data_file.write_text(
+            json.dumps(
+                {
+                    "notes": [
+                        {"id": "n1", "content": "a", "course": "Bio 101"},
+                        {"id": "n2", "content": "b", "course": None},
+                    ],
+                    "tasks": [{"id": "t1", "title": "c", "course": "Bio 101"}],
+                    "courses": [],
+                    "course_stats": {"Bio 101": {}},
+                }
+            )
+        )
+
+        data = store.load()
+
+        assert get_schema_version(data) == 2
+        assert data["courses"] == [{"id": "c1", "name": "Bio 101"}]
+        assert [n["course_id"] for n in data["notes"]] == ["c1", None]
+        assert data["tasks"][0]["course_id"] == "c1"
+        assert "course" not in data["notes"][0]
+        assert "course_stats" not in data
+
+    def test_current_version_is_untouched(self) -> None:
+        """Test migrating current data is a no-op."""
+        data = create_empty_schema()
+        data["courses"].append({"id": "c3", "name": "Art"})
+
+        assert migrate_to_latest(dict(data)) == data
+
+    def test_migrate_file_streams_to_current_schema(self, temp_data_dir: Path) -> None:
+        """Test migrating a file on disk keeps a backup and reports counts."""
+        path = temp_data_dir / "data.json"
+        path.write_text(
+            json.dumps(
+                {
+                    "notes": [{"id": "n1", "course": "Bio"}, {"id": "n2", "course": "Art"}],
+                    "tasks": [{"id": "t1", "course": "Art"}],
+                    "courses": [],
+                }
+            )
+        )
+        seen: list[tuple[str, int]] = []
+
+        report = migrate_file(path, progress=lambda s, n: seen.append((s, n)))
+
+        data = json.loads(path.read_text())
+        assert (report.from_version, report.to_version) == (1, 2)
+        assert report.records == {"notes": 2, "tasks": 1}
+        assert seen == [("notes", 2), ("tasks", 1)]
+        assert data["courses"] == [{"id": "c1", "name": "Bio"}, {"id": "c2", "name": "Art"}]
+        assert data["tasks"][0]["course_id"] == "c2"
+        assert data["_schema_version"] == 2
+        assert json.loads(path.with_suffix(".json.bak").read_text())["notes"][0]["course"] == "Bio"
+        assert not path.with_suffix(".json.rewrite").exists()
+
+    def test_migrate_file_dry_run_writes_nothing(self, temp_data_dir: Path) -> None:
+        """Test dry runs report the migration but leave the file alone."""
+        path = temp_data_dir / "data.json"
+        original = json.dumps({"notes": [{"id": "n1", "course": "Bio"}], "tasks": []})
+        path.write_text(original)
+
+        report = migrate_file(path, dry_run=True)
+
+        assert report.dry_run
+        assert report.records == {"notes": 1, "tasks": 0}
+        assert len(report.steps) == 1
+        assert path.read_text() == original
+        assert not path.with_suffix(".json.bak").exists()
+
+    def test_migrate_file_current_version_is_noop(self, temp_data_dir: Path) -> None:
+        """Test files already at the current version are not rewritten."""
+        store = JSONStore(temp_data_dir / "data.json")
+        store.save(create_empty_schema())
+
+        report = migrate_file(store.data_file)
+
+        assert report.steps == []
+        assert not store.bak_file.exists()
+
+    def test_newer_schema_rejected(self) -> None:
+        """Test data from a newer program version is not migrated."""
+        with pytest.raises(ValueError, match="newer"):
+            migrate_to_latest({"notes": [], "tasks": [], "courses": [], "_schema_version": 99})
+
+    def test_duplicate_step_registration_rejected(self) -> None:
+        """Test two steps cannot claim the same source version."""
+
+        class Duplicate(MigrationStep):
+            from_version = 1
+            description = "duplicate"
+
+        with pytest.raises(ValueError, match="already registered"):
+            register_migration(Duplicate)
+
+
+class TestDurability:
+    """Tests for fsync policy and group commit."""
+
+    def test_per_commit_syncs_file_and_directory(self, temp_data_dir: Path) -> None:
+        """Test per-commit fsyncs the new file and the directory."""
+        store = JSONStore(temp_data_dir / "data.json", durability="per-commit")
+
+        with patch("pkm.storage.fileops.os.fsync") as fsync:
+            store.save(create_empty_schema())
+
+        assert fsync.call_count == 2
+        assert json.loads(store.data_file.read_text())["notes"] == []
+
+    def test_none_never_syncs(self, temp_data_dir: Path) -> None:
+        """Test durability none skips fsync entirely."""
+        store = JSONStore(temp_data_dir / "data.json", durability="none")
+
+        with patch("pkm.storage.fileops.os.fsync") as fsync:
+            store.save(create_empty_schema())
+
+        fsync.assert_not_called()
+        assert store.data_file.exists()
+
+    def test_grouped_coalesces_commits(self, temp_data_dir: Path) -> None:
+        """Test grouped commits share one write until flushed."""
+        store = JSONStore(temp_data_dir / "data.json", durability="grouped")
+
+        with patch("pkm.storage.fileops.os.fsync") as fsync:
+            for i in range(5):
+                data = store.load()
+                data["notes"].append({"id": f"n{i}"})
+                store.save(data)
+
+            assert not store.data_file.exists()
+            assert len(JSONStore(store.data_file, durability="grouped").load()["notes"]) == 5
+
+            store.flush()
+
+        assert fsync.call_count == 2
+        assert len(json.loads(store.data_file.read_text())["notes"]) == 5
+
+    def test_grouped_loads_are_isolated(self, temp_data_dir: Path) -> None:
+        """Test changes to loaded data that are never saved stay out of the commit."""
+        store = JSONStore(temp_data_dir / "data.json", durability="grouped")
+        data = store.load()
+        data["notes"].append({"id": "n1"})
+        store.save(data)
+
+        store.load()["notes"].append({"id": "n2"})
+
+        assert [n["id"] for n in store.load()["notes"]] == ["n1"]
+        store.flush()
+        assert [n["id"] for n in json.loads(store.data_file.read_text())["notes"]] == ["n1"]
+
+    def test_grouped_writes_when_window_closes(self, temp_data_dir: Path) -> None:
+        """Test the first commit after the window flushes the group."""
+        group = GroupCommit(window=0)
+        written: list[dict] = []
+
+        group.submit(temp_data_dir / "data.json", {"n": 1}, written.append)
+
+        assert written == [{"n": 1}]
+        assert group.pending(temp_data_dir / "data.json") is None
+
+    def test_grouped_single_commit_reaches_disk(self, temp_data_dir: Path) -> None:
+        """Test a lone grouped commit is written by the timer once its window closes."""
+        store = JSONStore(temp_data_dir / "data.json", durability="grouped")
+
+        group = GroupCommit(window=0.05)
+
+        with patch("pkm.storage.json_store.group_commit", group):
+            data = store.load()
+            data["notes"].append({"id": "n1"})
+            store.save(data)
+            assert not store.data_file.exists()
+
+            deadline = time.monotonic() + 2
+            while not store.data_file.exists() and time.monotonic() < deadline:
+                time.sleep(0.01)
+
+        assert group.flush() == 0  # waits for the timer's write to finish
+        assert [n["id"] for n in json.loads(store.data_file.read_text())["notes"]] == ["n1"]
+
+    def test_default_mode_from_environment(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test the default mode comes from PKM_DURABILITY unless overridden."""
+        monkeypatch.setenv("PKM_DURABILITY", "none")
+        assert default_durability() == "none"
+
+        set_default_durability("grouped")
+        try:
+            assert default_durability() == "grouped"
+        finally:
+            set_default_durability(None)
+
+        monkeypatch.setenv("PKM_DURABILITY", "bogus")
+        assert default_durability() == "per-commit"
+        with pytest.raises(ValueError):
+            set_default_durability("bogus")  # type: ignore[arg-type]
@@ -0,0 +1,118 @@
+"""Unit tests for incremental data file reading and writing."""
+
+import io
+import json
+import tracemalloc
+from pathlib import Path
+
+import pytest
+
+from pkm.storage.checksum import CHECKSUM_KEY, checksum_ok
+from pkm.storage.stream import StreamWriter, iter_document, iter_records, read_header
+
+
+def write_json(path: Path, data: dict) -> Path:
+    """Write a JSON document to ``path``."""
+    path.write_text(json.dumps(data, indent=2))
+    return path
+
+
+class TestStreamReader:
+    """Tests for the incremental reader."""
+
+    def test_records_streamed_in_order(self, temp_data_dir: Path) -> None:
+        """Test each record is yielded individually and in file order."""
+        path = write_json(
+            temp_data_dir / "data.json",
+            {
+                "notes": [{"id": "n1"}, {"id": "n2"}],
+                "tasks": [{"id": "t1", "subtasks": [{"id": 1}]}],
+                "courses": [{"id": "c1", "name": "Bio"}],
+                "_schema_version": 2,
+            },
+        )
+
+        assert [r["id"] for r in iter_records(path, "notes")] == ["n1", "n2"]
+        assert list(iter_records(path, "tasks")) == [{"id": "t1", "subtasks": [{"id": 1}]}]
+        assert read_header(path) == {
+            "courses": [{"id": "c1", "name": "Bio"}],
+            "_schema_version": 2,
+        }
+
+    def test_small_chunks_match_json_load(self, temp_data_dir: Path) -> None:
+        """Test values split across many chunk boundaries decode correctly."""
+        data = {
+            "_schema_version": 12345,
+            "notes": [{"id": f"n{i}", "content": "é ✓ \"quoted\" " * i} for i in range(30)],
+            "tasks": [],
+            "flag": True,
+        }
+        path = write_json(temp_data_dir / "data.json", data)
+
+        rebuilt: dict = {"notes": [], "tasks": []}
+        for key, value, is_record in iter_document(path, chunk_size=7):
+            if is_record:
+                rebuilt[key].append(value)
+            else:
+                rebuilt[key] = value
+
+        assert rebuilt == data
+
+    def test_empty_sections(self, temp_data_dir: Path) -> None:
+        """Test empty objects and arrays are handled."""
+        path = write_json(temp_data_dir / "data.json", {"notes": [], "tasks": []})
+        assert list(iter_records(path, "notes")) == []
+        assert read_header(path) == {}
+
+        (temp_data_dir / "empty.json").write_text("{}")
+        assert list(iter_document(temp_data_dir / "empty.json")) == []
+
+    def test_truncated_file_raises(self, temp_data_dir: Path) -> None:
+        """Test a truncated document raises a decode error."""
+        path = temp_data_dir / "data.json"
+        path.write_text('{"notes": [{"id": "n1"}, {"id": "n2')
+
+        with pytest.raises(json.JSONDecodeError):
+            list(iter_records(path, "notes"))
+
+    def test_memory_bounded_by_record_size(self, temp_data_dir: Path) -> None:
+        """Test streaming a file does not hold its records in memory."""
+        notes = [{"id": f"n{i}", "content": "x" * 200} for i in range(20000)]
+        path = write_json(temp_data_dir / "data.json", {"notes": notes, "tasks": []})
+        size = path.stat().st_size
+        del notes
+
+        tracemalloc.start()
+        count = sum(1 for _ in iter_records(path, "notes"))
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        assert count == 20000
+        assert peak < size / 8
+
+
+class TestStreamWriter:
+    """Tests for the incremental writer."""
+
+    def test_round_trip(self) -> None:
+        """Test written output parses back to the same document."""
+        out = io.StringIO()
+        writer = StreamWriter(out)
+        writer.begin_section("notes")
+        writer.write_record({"id": "n1", "topics": ["a", "b"]})
+        writer.write_record({"id": "n2", "topics": []})
+        writer.end_section()
+        writer.begin_section("tasks")
+        writer.end_section()
+        writer.close({"courses": [], "_schema_version": 2})
+
+        data = json.loads(out.getvalue())
+        assert all(checksum_ok(r) and CHECKSUM_KEY in r for r in data["notes"])
+        for record in data["notes"]:
+            del record[CHECKSUM_KEY]
+        assert data == {
+            "notes": [{"id": "n1", "topics": ["a", "b"]}, {"id": "n2", "topics": []}],
+            "tasks": [],
+            "courses": [],
+            "_schema_version": 2,
+        }
@@ -0,0 +1,194 @@
+"""Unit tests for the prompt summary and the fast entry point."""
+
+import json
+import os
+import subprocess
+import sys
+from datetime import date
+from pathlib import Path
+
+import pytest
+
+import pkm
+from pkm.cli.entry import main, parse_prompt_args
+from pkm.storage.json_store import JSONStore
+from pkm.storage.schema import create_empty_schema
+from pkm.storage.summary import (
+    PROMPT_FORMAT,
+    build_summary,
+    read_summary,
+    render_prompt,
+    status_fields,
+    summary_file,
+)
+
+TODAY = date(2025, 11, 20)
+HOME = Path.home() / ".pkm"
+
+
+def sample_data() -> dict:
+    """Data with an inbox note, an organized note and tasks due on several days."""
+    data = create_empty_schema()
+    data["notes"] = [
+        {"id": "n1", "content": "Inbox", "course_id": None},
+        {"id": "n2", "content": "Filed", "course_id": "c1"},
+    ]
+    data["tasks"] = [
+        {"id": "t1", "title": "Late", "due_date": "2025-11-18T09:00:00", "course_id": "c1"},
+        {"id": "t2", "title": "Evening", "due_date": "2025-11-20T21:00:00", "course_id": None},
+        {"id": "t3", "title": "Morning", "due_date": "2025-11-20T08:00:00", "course_id": "c1"},
+        {"id": "t4", "title": "Done", "due_date": "2025-11-10T08:00:00", "completed": True},
+        {"id": "t5", "title": "Someday", "due_date": None, "course_id": "c1"},
+        {"id": "t6", "title": "Quiz", "due_date": "2025-11-24T23:59:00", "course_id": "c1"},
+    ]
+    return data
+
+
+class TestSummary:
+    """Tests for building and reading the summary."""
+
+    def test_build_summary(self) -> None:
+        """Test counts and the first task due on each day."""
+        summary = build_summary(sample_data())
+
+        assert summary["inbox"] == 3  # n1, t2 and the completed t4
+        assert summary["open"] == 5
+        assert summary["due"] == [
+            ["2025-11-18", 1, "Late"],
+            ["2025-11-20", 2, "Morning"],
+            ["2025-11-24", 1, "Quiz"],
+        ]
+
+    def test_status_fields_depend_on_date(self) -> None:
+        """Test today and overdue are derived from the date of the query."""
+        summary = build_summary(sample_data())
+
+        fields = status_fields(summary, TODAY)
+        later = status_fields(summary, date(2025, 11, 22))
+
+        assert (fields["today"], fields["overdue"]) == (2, 1)
+        assert (fields["next"], fields["next_due"]) == ("Morning", "2025-11-20")
+        assert (later["today"], later["overdue"]) == (0, 3)
+        assert later["next"] == "Quiz"
+
+    def test_status_fields_nothing_due(self) -> None:
+        """Test a summary without due tasks."""
+        fields = status_fields(build_summary(create_empty_schema()), TODAY)
+
+        assert fields == {
+            "today": 0,
+            "overdue": 0,
+            "inbox": 0,
+            "open": 0,
+            "next": "",
+            "next_due": "",
+        }
+
+    def test_written_on_every_commit(self, temp_data_dir: Path) -> None:
+        """Test saving data refreshes the summary file."""
+        data_file = temp_data_dir / "data.json"
+        store = JSONStore(data_file)
+
+        store.save(sample_data())
+
+        summary = json.loads(summary_file(data_file).read_text())
+        assert summary["open"] == 5
+        assert read_summary(data_file) == summary
+
+    def test_stale_summary_rebuilt(self, temp_data_dir: Path) -> None:
+        """Test a data file changed behind the store's back is re-summarized."""
+        data_file = temp_data_dir / "data.json"
+        JSONStore(data_file).save(sample_data())
+        data_file.write_text(json.dumps({"notes": [], "tasks": [], "courses": []}))
+
+        summary = read_summary(data_file)
+
+        assert summary is not None and summary["inbox"] == 0
+        assert json.loads(summary_file(data_file).read_text())["inbox"] == 0
+
+    def test_no_data(self, temp_data_dir: Path) -> None:
+        """Test there is no summary, and an empty prompt, without data."""
+        data_file = temp_data_dir / "data.json"
+
+        assert read_summary(data_file) is None
+        assert render_prompt(data_file) == ""
+
+    def test_damaged_data(self, temp_data_dir: Path) -> None:
+        """Test an unreadable data file gives no summary instead of an error."""
+        data_file = temp_data_dir / "data.json"
+        data_file.write_text('{"notes": [')
+
+        assert read_summary(data_file) is None
+
+    def test_render_prompt(self, temp_data_dir: Path) -> None:
+        """Test the default and custom prompt formats."""
+        data_file = temp_data_dir / "data.json"
+        JSONStore(data_file).save(sample_data())
+
+        assert render_prompt(data_file, today=TODAY) == "today 2 | overdue 1 | inbox 3"
+        assert render_prompt(data_file, "{next} @ {next_due}", TODAY) == "Morning @ 2025-11-20"
+        with pytest.raises(KeyError):
+            render_prompt(data_file, "{nope}", TODAY)
+
+
+class TestEntryPoint:
+    """Tests for the fast path in the console entry point."""
+
+    @pytest.mark.parametrize(
+        ("args", "expected"),
+        [
+            (["status", "--prompt"], (HOME, PROMPT_FORMAT)),
+            (["--data-dir", "/d", "status", "--prompt"], (Path("/d"), PROMPT_FORMAT)),
+            (["--data-dir=/d", "status", "--prompt", "--format", "{x}"], (Path("/d"), "{x}")),
+            (["status", "--format={today}", "--prompt"], (HOME, "{today}")),
+        ],
+    )
+    def test_parse_prompt_args(self, args: list[str], expected: tuple) -> None:
+        """Test prompt queries are recognised."""
+        assert parse_prompt_args(args) == expected
+
+    @pytest.mark.parametrize(
+        "args",
+        [
+            [],
+            ["status"],
+            ["view", "today"],
+            ["--verbose", "status", "--prompt"],
+            ["status", "--prompt", "extra"],
+            ["--data-dir"],
+        ],
+    )
+    def test_other_commands_not_fast(self, args: list[str]) -> None:
+        """Test anything else goes to the full CLI."""
+        assert parse_prompt_args(args) is None
+
+    def test_main_prints_prompt(
+        self, temp_data_dir: Path, monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture
+    ) -> None:
+        """Test main answers a prompt query from the summary."""
+        JSONStore(temp_data_dir / "data.json").save(sample_data())
+        args = ["--data-dir", str(temp_data_dir), "status", "--prompt", "--format", "{open} open"]
+        monkeypatch.setattr(sys, "argv", ["pkm", *args])
+
+        main()
+
+        assert capsys.readouterr().out == "5 open\n"
+
+    def test_fast_path_skips_heavy_imports(self, temp_data_dir: Path) -> None:
+        """Test a prompt query imports neither click, rich nor pydantic."""
+        JSONStore(temp_data_dir / "data.json").save(sample_data())
+        code = (
+            "import sys\n"
+            f"sys.argv = ['pkm', '--data-dir', {str(temp_data_dir)!r}, 'status', '--prompt']\n"
+            "from pkm.cli.entry import main\n"
+            "main()\n"
+            "print(sorted({'click', 'rich', 'pydantic'} & set(sys.modules)))\n"
+        )
+
+        env = {**os.environ, "PYTHONPATH": str(Path(pkm.__file__).parents[1])}
+
+        result = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True, check=True, env=env
+        )
+
+        assert result.stdout.splitlines()[-1] == "[]"
@@ -0,0 +1,151 @@
+"""Unit tests for the columnar task cache."""
+
+import json
+import random
+from collections.abc import Callable
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+from pkm.services import filters
+from pkm.services.task_service import TaskService
+from pkm.storage import task_columns
+from pkm.storage.json_store import JSONStore
+from pkm.storage.schema import RecordFilter, create_empty_schema
+from pkm.storage.task_columns import (
+    TaskColumns,
+    columns_file,
+    read_task_columns,
+    write_task_columns,
+)
+
+TODAY = date(2025, 11, 20)
+
+
+def random_data(count: int = 300) -> dict:
+    """Data with tasks of every kind of due date, priority, status and course."""
+    rng = random.Random(3)
+    data = create_empty_schema()
+    for i in range(1, count + 1):
+        due = TODAY + timedelta(days=rng.randint(-10, 10), hours=rng.randint(0, 23))
+        data["tasks"].append(
+            {
+                "id": f"t{i}",
+                "title": f"Task {i}",
+                "created_at": "2025-11-01T10:00:00",
+                "due_date": due.isoformat() if rng.random() < 0.8 else None,
+                "priority": rng.choice(["high", "medium", "low"]),
+                "completed": rng.random() < 0.3,
+                "course_id": rng.choice([None, "c1", "c2", "c3"]),
+            }
+        )
+    return data
+
+
+@pytest.fixture(params=["numpy", "array"])
+def mode(request: pytest.FixtureRequest, monkeypatch: pytest.MonkeyPatch) -> str:
+    """Run a test with NumPy masks (if installed) and with array loops."""
+    if request.param == "numpy":
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(task_columns, "np", None)
+    return str(request.param)
+
+
+class TestTaskColumns:
+    """Tests for building, storing and filtering task columns."""
+
+    def test_select_matches_record_filters(self, mode: str) -> None:
+        """Test column conditions pick the same tasks as predicates over the records."""
+        data = random_data()
+        columns = TaskColumns.build(data)
+        tasks = data["tasks"]
+        week = TODAY + timedelta(days=7)
+
+        def ids(rows: list[int]) -> list[str]:
+            return [columns.ids[row] for row in rows]
+
+        def matching(predicate: RecordFilter) -> list[str]:
+            return [t["id"] for t in tasks if predicate(t)]
+
+        def open_due(test: Callable[[date], bool]) -> RecordFilter:
+            return lambda t: (
+                not t["completed"]
+                and t["due_date"] is not None
+                and test(datetime.fromisoformat(t["due_date"]).date())
+            )
+
+        cases = [
+            (columns.select(inbox=True), matching(filters.in_inbox)),
+            (
+                columns.select(open_only=True, due_from=TODAY, due_before=week + timedelta(days=1)),
+                matching(open_due(lambda day: TODAY <= day <= week)),
+            ),
+            (
+                columns.select(open_only=True, due_before=TODAY),
+                matching(open_due(lambda day: day < TODAY)),
+            ),
+            (
+                columns.select(open_only=True, priority="high"),
+                matching(lambda t: not t["completed"] and t["priority"] == "high"),
+            ),
+            (
+                columns.select(course_ids=["c1", "c3", "c9"]),
+                matching(filters.in_course(["c1", "c3", "c9"])),
+            ),
+        ]
+        for selected, expected in cases:
+            assert expected
+            assert ids(selected) == expected
+
+    def test_recurring_tasks_match_any_start(self, mode: str) -> None:
+        """Test a recurring task matches a window starting after its due date."""
+        data = random_data(4)
+        for task in data["tasks"]:
+            task.update(completed=False, due_date="2025-11-10T17:00:00")
+        data["tasks"][1]["recurrence"] = {"every": 1, "unit": "day"}
+        columns = TaskColumns.build(data)
+
+        week = columns.select(open_only=True, due_from=TODAY, due_before=TODAY + timedelta(days=8))
+        overdue = columns.select(open_only=True, due_before=TODAY)
+
+        assert [columns.ids[row] for row in week] == ["t2"]
+        assert len(overdue) == 4
+        assert columns.select(due_from=TODAY, due_before=date(2025, 11, 1)) == []
+
+    def test_round_trip_and_staleness(self, temp_data_dir: Path) -> None:
+        """Test the sidecar is read back only while the data file is unchanged."""
+        data_file = temp_data_dir / "data.json"
+        data = random_data(20)
+        data_file.write_text(json.dumps(data))
+        written = write_task_columns(data_file, data)
+        read = read_task_columns(data_file)
+
+        assert written is not None and read is not None
+        assert read.ids == written.ids and read.courses == written.courses
+        for name, _, _ in task_columns._LAYOUT:
+            assert getattr(read, name) == getattr(written, name)
+
+        data_file.write_text(json.dumps(data) + " ")
+        assert read_task_columns(data_file) is None
+
+        columns_file(data_file).write_bytes(b"not columns")
+        assert read_task_columns(data_file) is None
+
+    def test_store_keeps_columns_current(self, temp_data_dir: Path) -> None:
+        """Test every commit rewrites the sidecar and stale ones are rebuilt."""
+        tasks = TaskService(temp_data_dir)
+        tasks.create_task("Lab report")
+        tasks.create_task("Essay", priority="high")
+        store = JSONStore(temp_data_dir / "data.json")
+
+        assert read_task_columns(store.data_file).ids == ["t1", "t2"]  # type: ignore[union-attr]
+
+        # Edited behind the store's back
+        data = store.load()
+        data["tasks"][0]["priority"] = "high"
+        store.data_file.write_text(json.dumps(data))
+
+        assert [t.id for t in tasks.get_tasks_by_priority("high")] == ["t1", "t2"]
+        assert read_task_columns(store.data_file) is not None